@@ -0,0 +1,62 @@
+# Generated by Django 4.2.15 on 2026-10-18 14:51
+
+from django.db import migrations, models
+from django.db.models import F, FloatField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def merge_duplicate_cart_items(apps, schema_editor):
+    """
+    Gộp các dòng cart_item trùng (cart, product, store) vào dòng có id nhỏ nhất
+    trước khi thêm unique constraint.
+    """
+    CartItem = apps.get_model('cart', 'CartItem')
+    keep = {}
+    for item in CartItem.objects.order_by('id'):
+        key = (item.cart_id, item.product_id, item.store_id)
+        if key not in keep:
+            keep[key] = item
+            continue
+        first = keep[key]
+        first.quantity += item.quantity
+        first.save(update_fields=['quantity'])
+        item.delete()
+
+
+def backfill_cart_totals(apps, schema_editor):
+    Cart = apps.get_model('cart', 'Cart')
+    CartItem = apps.get_model('cart', 'CartItem')
+    totals = CartItem.objects.filter(cart_id=OuterRef('pk')).order_by().values('cart_id')
+    count = totals.annotate(total=Sum('quantity')).values('total')
+    amount = totals.annotate(total=Sum(F('quantity') * F('product__price'), output_field=FloatField())).values('total')
+    Cart.objects.update(
+        item_count=Coalesce(Subquery(count), Value(0)),
+        subtotal=Coalesce(Subquery(amount, output_field=FloatField()), Value(0.0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0002_alter_cart_table_alter_cartitem_table'),
+        ('product', '0005_product_code_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='item_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='cart',
+            name='subtotal',
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(merge_duplicate_cart_items, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='cartitem',
+            constraint=models.UniqueConstraint(fields=('cart', 'product', 'store'), name='cart_item_unique_product_store'),
+        ),
+        migrations.RunPython(backfill_cart_totals, migrations.RunPython.noop),
+    ]
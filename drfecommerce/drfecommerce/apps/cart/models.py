@@ -7,6 +7,9 @@ from drfecommerce.apps.store.models import Store
 class Cart(models.Model):
     id = models.AutoField(primary_key=True)
     guest = models.ForeignKey(Guest, on_delete=models.CASCADE)  # Một người dùng có thể có nhiều giỏ hàng (nếu cần)
+    # Tổng số lượng và tổng tiền của các item, cập nhật trong cart/services.py
+    item_count = models.IntegerField(default=0)
+    subtotal = models.FloatField(default=0)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -26,6 +29,10 @@ class CartItem(models.Model):
     
     class Meta:
         db_table = 'cart_item'
+        constraints = [
+            # Mỗi product của một store chỉ có một dòng trong giỏ, thêm lần nữa thì cộng số lượng
+            models.UniqueConstraint(fields=['cart', 'product', 'store'], name='cart_item_unique_product_store'),
+        ]
         
     def __str__(self):
         return f'CartItem {self.id} - Product: {self.product.name} - Quantity: {self.quantity}'
\ No newline at end of file
@@ -0,0 +1,214 @@
+"""
+Giỏ hàng: thao tác ghi và read model.
+
+- Cart lưu sẵn item_count (tổng số lượng) và subtotal (tổng tiền theo giá hiện tại của product).
+  Thêm / sửa / xoá item cộng trừ chênh lệch bằng một câu UPDATE F() trong cùng transaction với item,
+  nên giỏ hàng (badge, tổng tiền) đọc được mà không cần đọc các item.
+- Khi giá product thay đổi (sửa / import) hoặc item bị xoá hàng loạt (đặt hàng), subtotal được
+  tính lại bằng recalculate_carts (một câu UPDATE với subquery).
+- Số lượng của item được cộng bằng F('quantity') + n, (cart, product, store) là duy nhất,
+  nên hai request thêm cùng lúc không làm mất số lượng và không tạo item trùng.
+- cart_lines: toàn bộ item của giỏ kèm tên, ảnh, giá, khuyến mãi của product, tên store và
+  thành tiền trong một câu query join. Giá của dòng là product.price giống như khi đặt hàng (checkout).
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F, FloatField, ExpressionWrapper, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from rest_framework import status
+
+from drfecommerce.apps.guest.models import Guest
+from drfecommerce.apps.product.models import Product
+from drfecommerce.apps.store.models import Store
+from .models import Cart, CartItem
+
+LINE_FIELDS = {
+    'product_name': F('product__name'),
+    'product_image': F('product__image'),
+    'unit_price': F('product__price'),
+    'store_name': F('store__name'),
+    'promotion_id': F('product__promotion_id'),
+    'promotion_name': F('product__promotion__name'),
+    'promotion_code': F('product__promotion__code'),
+    'promotion_rate': F('product__promotion__rate'),
+}
+
+
+class CartError(Exception):
+    """
+    Lỗi nghiệp vụ của giỏ hàng, view trả về message và status_code tương ứng.
+    """
+    def __init__(self, message, status_code=status.HTTP_400_BAD_REQUEST):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def _int(value, message):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise CartError(message) from None
+
+
+def get_cart(guest_id, create=True):
+    """
+    Giỏ hàng của guest (mỗi guest một giỏ, tạo khi cần).
+    :raise CartError: guest không tồn tại, hoặc chưa có giỏ khi create=False
+    """
+    guest_id = _int(guest_id, "Guest ID is required.")
+    cart = Cart.objects.filter(guest_id=guest_id).order_by('id').first()
+    if cart is not None:
+        return cart
+    if not Guest.objects.filter(id=guest_id).exists():
+        raise CartError("Guest not found.", status.HTTP_404_NOT_FOUND)
+    if not create:
+        raise CartError("Cart not found.", status.HTTP_404_NOT_FOUND)
+    return Cart.objects.create(guest_id=guest_id)
+
+
+def _add_totals(cart_id, quantity, amount):
+    Cart.objects.filter(id=cart_id).update(
+        item_count=F('item_count') + quantity, subtotal=F('subtotal') + amount, updated_at=timezone.now())
+
+
+def add_item(guest_id, product_id, store_id, quantity=1):
+    """
+    Thêm product của store vào giỏ, cộng dồn nếu đã có.
+    :return: dict dòng giỏ hàng (xem cart_lines) kèm item_count / subtotal của giỏ
+    :raise CartError: guest / product / store không tồn tại, số lượng không hợp lệ
+    """
+    quantity = _int(quantity, "Quantity must be an integer.")
+    if quantity <= 0:
+        raise CartError("Quantity must be greater than zero.")
+    product_id = _int(product_id, "Product not found.")
+    store_id = _int(store_id, "Store not found.")
+    price = Product.objects.filter(id=product_id).values_list('price', flat=True).first()
+    if price is None:
+        raise CartError("Product not found.", status.HTTP_404_NOT_FOUND)
+    if not Store.objects.filter(id=store_id).exists():
+        raise CartError("Store not found.", status.HTTP_404_NOT_FOUND)
+    cart = get_cart(guest_id)
+
+    items = CartItem.objects.filter(cart_id=cart.id, product_id=product_id, store_id=store_id)
+    with transaction.atomic():
+        updated = items.update(quantity=F('quantity') + quantity, updated_at=timezone.now())
+        if not updated:
+            try:
+                with transaction.atomic():
+                    CartItem.objects.create(cart_id=cart.id, product_id=product_id, store_id=store_id, quantity=quantity)
+            except IntegrityError:
+                # Request khác vừa tạo item này
+                items.update(quantity=F('quantity') + quantity, updated_at=timezone.now())
+        _add_totals(cart.id, quantity, price * quantity)
+    return cart_line(items)
+
+
+def update_item(guest_id, cart_item_id, quantity):
+    """
+    Đặt số lượng của một item, số lượng <= 0 thì xoá item.
+    :return: dict dòng giỏ hàng, hoặc None nếu item bị xoá
+    :raise CartError: guest / item không tồn tại, số lượng không hợp lệ
+    """
+    quantity = _int(quantity, "Quantity must be an integer.")
+    if quantity <= 0:
+        remove_item(guest_id, cart_item_id)
+        return None
+    items = _guest_items(guest_id, cart_item_id)
+    with transaction.atomic():
+        item = items.select_for_update().values('id', 'cart_id', 'quantity', 'product__price').first()
+        if item is None:
+            raise CartError("Cart item not found.", status.HTTP_404_NOT_FOUND)
+        delta = quantity - item['quantity']
+        CartItem.objects.filter(id=item['id']).update(quantity=quantity, updated_at=timezone.now())
+        _add_totals(item['cart_id'], delta, item['product__price'] * delta)
+    return cart_line(items)
+
+
+def remove_item(guest_id, cart_item_id):
+    """
+    :raise CartError: guest / item không tồn tại
+    """
+    items = _guest_items(guest_id, cart_item_id)
+    with transaction.atomic():
+        item = items.select_for_update().values('id', 'cart_id', 'quantity', 'product__price').first()
+        if item is None:
+            raise CartError("Cart item not found.", status.HTTP_404_NOT_FOUND)
+        CartItem.objects.filter(id=item['id']).delete()
+        _add_totals(item['cart_id'], -item['quantity'], -item['product__price'] * item['quantity'])
+
+
+def _guest_items(guest_id, cart_item_id):
+    cart = get_cart(guest_id, create=False)
+    return CartItem.objects.filter(id=_int(cart_item_id, "Cart item not found."), cart_id=cart.id)
+
+
+def recalculate_carts(carts):
+    """
+    Tính lại item_count / subtotal từ các item (một câu UPDATE).
+    :param carts: queryset Cart cần tính lại, ví dụ Cart.objects.filter(items__product_id__in=ids)
+    :return: số giỏ hàng được cập nhật
+    """
+    totals = CartItem.objects.filter(cart_id=OuterRef('pk')).order_by().values('cart_id')
+    count = totals.annotate(total=Sum('quantity')).values('total')
+    amount = totals.annotate(total=Sum(F('quantity') * F('product__price'), output_field=FloatField())).values('total')
+    return Cart.objects.filter(id__in=carts.values('id')).update(
+        item_count=Coalesce(Subquery(count), Value(0)),
+        subtotal=Coalesce(Subquery(amount, output_field=FloatField()), Value(0.0)),
+    )
+
+
+def _lines(items, **extra):
+    line_total = ExpressionWrapper(F('quantity') * F('product__price'), output_field=FloatField())
+    return items.annotate(line_total=line_total).values(
+        'id', 'quantity', 'created_at', 'line_total',
+        product_ref=F('product_id'), store_ref=F('store_id'), **LINE_FIELDS, **extra,
+    )
+
+
+def _format_line(row):
+    promotion_id = row.pop('promotion_id')
+    promotion = {
+        'id': promotion_id,
+        'name': row.pop('promotion_name'),
+        'code': row.pop('promotion_code'),
+        'rate': row.pop('promotion_rate'),
+    }
+    row['product'] = row.pop('product_ref')
+    row['store'] = row.pop('store_ref')
+    row['promotion'] = promotion if promotion_id is not None else None
+    return row
+
+
+def cart_line(items):
+    """
+    Một dòng giỏ hàng kèm tổng của giỏ (một query).
+    :param items: queryset CartItem chỉ gồm một item
+    """
+    row = _lines(items, item_count=F('cart__item_count'), subtotal=F('cart__subtotal')).first()
+    if row is None:
+        raise CartError("Cart item not found.", status.HTTP_404_NOT_FOUND)
+    totals = {'item_count': row.pop('item_count'), 'subtotal': row.pop('subtotal')}
+    return {**_format_line(row), 'cart': totals}
+
+
+def cart_lines(cart):
+    """
+    Các dòng của giỏ hàng, cũ nhất trước (một query join product, promotion, store).
+    """
+    return [_format_line(row) for row in _lines(CartItem.objects.filter(cart_id=cart.id)).order_by('created_at', 'id')]
+
+
+def cart_detail(cart):
+    """
+    Read model của giỏ hàng cho API my-cart.
+    """
+    return {
+        'id': cart.id,
+        'guest': cart.guest_id,
+        'item_count': cart.item_count,
+        'subtotal': cart.subtotal,
+        'items': cart_lines(cart),
+        'created_at': cart.created_at,
+        'updated_at': cart.updated_at,
+    }
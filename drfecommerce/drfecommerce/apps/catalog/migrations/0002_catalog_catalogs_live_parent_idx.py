@@ -0,0 +1,17 @@
+# Generated by Django 4.2.15 on 2026-10-18 13:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='catalog',
+            index=models.Index(condition=models.Q(('delete_at__isnull', True)), fields=['parent_id', 'name'], name='catalogs_live_parent_idx'),
+        ),
+    ]
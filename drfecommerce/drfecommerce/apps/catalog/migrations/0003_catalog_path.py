@@ -0,0 +1,24 @@
+# Generated by Django 4.2.15 on 2026-10-18 14:03
+
+from django.db import migrations, models
+from drfecommerce.apps.catalog.tree import rebuild_paths
+
+
+def fill_paths(apps, schema_editor):
+    rebuild_paths(apps.get_model('catalog', 'Catalog'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0002_catalog_catalogs_live_parent_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='catalog',
+            name='path',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(fill_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.15 on 2026-10-18 14:08
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+from drfecommerce.search import rebuild_search_documents
+
+
+# Catalog.search_fields tại thời điểm tạo migration
+SEARCH_FIELDS = (('name', 'A'), ('description', 'B'))
+
+
+def fill_search_documents(apps, schema_editor):
+    rebuild_search_documents(apps.get_model('catalog', 'Catalog').objects.all(), SEARCH_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0003_catalog_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='catalog',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='catalog',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='catalog',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='catalogs_search_idx'),
+        ),
+        migrations.RunPython(fill_search_documents, migrations.RunPython.noop),
+    ]
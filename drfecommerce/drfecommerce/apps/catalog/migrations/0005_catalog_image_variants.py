@@ -0,0 +1,18 @@
+# Generated by Django 4.2.15 on 2026-10-18 15:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0004_catalog_search_document'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='catalog',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -1,7 +1,13 @@
 from django.db import models
+from django.db.models import Q
+from django.contrib.postgres.indexes import GinIndex
+from drfecommerce.search import SearchDocumentModel
 from django.utils import timezone
+from .tree import build_path, move_subtree
 
-class Catalog(models.Model):
+class Catalog(SearchDocumentModel):
+    # Field được tìm kiếm và trọng số (xem drfecommerce/search.py)
+    search_fields = (('name', 'A'), ('description', 'B'))
     id = models.AutoField(primary_key=True)  # Integer tự động tăng
     name = models.CharField(max_length=255)  # Tương đương với varchar
     description = models.TextField()  # Tương đương với text
@@ -9,12 +15,31 @@ class Catalog(models.Model):
     level = models.IntegerField()  # Integer
     sort_order = models.FloatField(null=True, blank=True)  # Float
     image = models.CharField(max_length=255, null=True, blank=True)  # Tương đương với varchar
+    image_variants = models.JSONField(default=dict, blank=True)  # URL các bản resize của image (my_admin/images.py)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)  # Tương đương với timestamp
     delete_at = models.DateTimeField(null=True, blank=True, default=None)
+    # Materialized path "/<id tổ tiên>/.../<id>/", tự tính khi save (xem tree.py)
+    path = models.CharField(max_length=255, db_index=True, blank=True, default='', editable=False)
 
     class Meta:
         db_table = 'catalogs'  # Tên bảng trong cơ sở dữ liệu
+        indexes = [
+            models.Index(fields=['parent_id', 'name'], name='catalogs_live_parent_idx', condition=Q(delete_at__isnull=True)),
+            GinIndex(fields=['search_vector'], name='catalogs_search_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # path cần id nên được tính sau khi insert
+        parent_path = self.parent_id.path if self.parent_id else None
+        path = build_path(parent_path, self.pk)
+        if path != self.path:
+            if self.path:
+                move_subtree(Catalog, self.path, path)
+            else:
+                Catalog.objects.filter(pk=self.pk).update(path=path)
+            self.path = path
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
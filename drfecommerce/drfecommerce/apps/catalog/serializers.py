@@ -1,10 +1,11 @@
 from rest_framework import serializers
+from drfecommerce.search import SEARCH_DOCUMENT_FIELDS
 from .models import Catalog
 
 class serializerGetCatalog(serializers.ModelSerializer):
     class Meta:
         model = Catalog
-        fields  = '__all__'
+        exclude = SEARCH_DOCUMENT_FIELDS
 
 class serializerCreateCatalog(serializers.ModelSerializer):
     class Meta:
@@ -0,0 +1,99 @@
+"""
+Cây catalog dạng materialized path: mỗi catalog lưu `path` = "/<id tổ tiên>/.../<id>/".
+- Cây con của một catalog là các dòng có path bắt đầu bằng path của nó (một câu query, dùng index).
+- Cây phân cấp được dựng một lần từ index parent -> children (O(n)) và được cache,
+  chỉ dựng lại khi catalog thay đổi (version của namespace 'catalog' trong response_cache).
+"""
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db.models import Value
+from django.db.models.functions import Concat, Substr
+from django.utils import timezone
+
+from drfecommerce.response_cache import get_versions, CATALOG, KEY_PREFIX
+
+# Thứ tự các catalog cùng cấp (giống thứ tự phân trang mặc định)
+SIBLING_ORDERING = ('-created_at', '-id')
+# Cây chỉ dựng lại khi version thay đổi, TTL chỉ để dọn các version cũ
+TREE_TIMEOUT = 60 * 60 * 24
+TREE_FIELDS = ('id', 'name', 'description', 'level', 'sort_order', 'image', 'created_at', 'updated_at', 'delete_at')
+
+
+def build_path(parent_path, catalog_id):
+    return f"{parent_path or '/'}{catalog_id}/"
+
+
+def rebuild_paths(model, batch_size=1000):
+    """
+    Tính lại path của toàn bộ catalog (dùng cho migration và dữ liệu tạo bằng bulk_create).
+    :param model: model Catalog (model lịch sử khi chạy trong migration)
+    :return: số catalog được cập nhật
+    """
+    rows = list(model.objects.values_list('id', 'parent_id_id', 'path'))
+    children = defaultdict(list)
+    for catalog_id, parent_id, _ in rows:
+        children[parent_id].append(catalog_id)
+
+    paths = {}
+    stack = [(catalog_id, None) for catalog_id in children[None]]
+    while stack:
+        catalog_id, parent_path = stack.pop()
+        paths[catalog_id] = build_path(parent_path, catalog_id)
+        stack.extend((child_id, paths[catalog_id]) for child_id in children[catalog_id])
+
+    changed = [model(id=catalog_id, path=paths[catalog_id]) for catalog_id, _, path in rows
+               if catalog_id in paths and paths[catalog_id] != path]
+    model.objects.bulk_update(changed, ['path'], batch_size=batch_size)
+    return len(changed)
+
+
+def move_subtree(model, old_path, new_path):
+    """
+    Đổi prefix path của cả cây con (khi catalog đổi parent) trong một câu UPDATE.
+    """
+    model.objects.filter(path__startswith=old_path).update(
+        path=Concat(Value(new_path), Substr('path', len(old_path) + 1)))
+
+
+def update_subtree(catalog, **fields):
+    """
+    Cập nhật catalog và toàn bộ catalog con cháu trong một câu UPDATE.
+    :return: số dòng được cập nhật
+    """
+    if not catalog.path:
+        # path rỗng thì startswith sẽ khớp toàn bộ bảng
+        raise ValueError(f"Catalog {catalog.pk} has no path, run rebuild_paths first.")
+    return type(catalog).objects.filter(path__startswith=catalog.path).update(updated_at=timezone.now(), **fields)
+
+
+def build_forest(catalogs):
+    """
+    Dựng cây phân cấp trong một lượt.
+    :param catalogs: các catalog đã sắp xếp theo thứ tự cùng cấp mong muốn
+    :return: dict {id catalog gốc: node}, mỗi node có thêm 'children'
+    """
+    nodes = {}
+    children = defaultdict(list)
+    for catalog in catalogs:
+        node = {field: getattr(catalog, field) for field in TREE_FIELDS}
+        node['children'] = children[catalog.id]
+        nodes[catalog.id] = node
+        children[catalog.parent_id_id].append(node)
+    # Node có parent không nằm trong danh sách (ví dụ parent đã bị xoá) thì không được hiển thị
+    return {node['id']: node for node in children[None]}
+
+
+def get_catalog_forest(model, include_deleted=False):
+    """
+    Cây phân cấp của toàn bộ catalog, cache theo version của namespace 'catalog'.
+    :param include_deleted: True cho API admin (gồm cả catalog bị xoá mềm)
+    """
+    version = get_versions(CATALOG)[0]
+    key = f"{KEY_PREFIX}:catalog:tree:{int(include_deleted)}:{version}"
+    forest = cache.get(key)
+    if forest is None:
+        catalogs = model.objects.all() if include_deleted else model.objects.filter(delete_at__isnull=True)
+        forest = build_forest(catalogs.order_by(*SIBLING_ORDERING))
+        cache.set(key, forest, TREE_TIMEOUT)
+    return forest
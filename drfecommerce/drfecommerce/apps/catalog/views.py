@@ -2,15 +2,17 @@ from rest_framework import viewsets, status
 from rest_framework.response import Response
 from .models import Catalog
 from .serializers import serializerCreateCatalog, serializerGetCatalog
-from django.core.paginator import Paginator
-from django.core.paginator import EmptyPage
-from django.core.paginator import PageNotAnInteger
+from drfecommerce.pagination import paginate
+from drfecommerce.search import search, SEARCH_ORDERING
+from drfecommerce.response_cache import cache_response, invalidate, CATALOG
+from drfecommerce.replicas import read_replica
+from .tree import get_catalog_forest, update_subtree
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from drfecommerce.apps.my_admin.authentication import AdminSafeJWTAuthentication
+from drfecommerce.apps.my_admin.images import save_upload, variants_for, ImageUploadError
 from rest_framework.decorators import action, permission_classes
-import os
 from dotenv import load_dotenv
 from django.utils import timezone
 
@@ -27,115 +29,58 @@ class CatalogViewSetGetData(viewsets.ViewSet):
     @swagger_auto_schema(manual_parameters=[
         openapi.Parameter('page_index', in_=openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description='Index of the page'),
         openapi.Parameter('page_size', in_=openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description='Number of items per page'),
+        openapi.Parameter('cursor', in_=openapi.IN_QUERY, type=openapi.TYPE_STRING, description='Keyset pagination cursor (empty for the first page)'),
     ])
     @action(detail=False, methods=['get'], url_path="get-list-catalogs")
     def list_catalogs(self, request):
         """
         List catalogs with pagination and hierarchical structure.
+        Pagination is applied to root catalogs, each root includes its whole subtree.
 
         Parameters:
         - page_index: The index of the page (default is 1).
         - page_size: The number of items per page (default is 10).
+        - cursor (optional): keyset pagination, empty for the first page then next_cursor / previous_cursor.
         """
-        page_index = int(request.GET.get('page_index', 1))
-        page_size = int(request.GET.get('page_size', 10))
+        # Chia trang theo catalog gốc
+        catalogs_page = paginate(request, Catalog.objects.filter(parent_id__isnull=True).only('id', 'created_at'))
 
-        # Lấy toàn bộ danh sách catalog
-        catalogs = Catalog.objects.all()
-
-        # Chia trang
-        paginator = Paginator(catalogs, page_size)
-        try:
-            catalogs_page = paginator.page(page_index)
-        except PageNotAnInteger:
-            catalogs_page = paginator.page(1)
-        except EmptyPage:
-            catalogs_page = paginator.page(paginator.num_pages)
-
-        # Chuyển đổi dữ liệu thành cấu trúc phân cấp
-        data = self.get_hierarchical_data(catalogs_page)
+        # Mỗi catalog gốc kèm toàn bộ cây con, lấy từ cây phân cấp đã cache
+        forest = get_catalog_forest(Catalog, include_deleted=True)
+        data = [forest[catalog.id] for catalog in catalogs_page.object_list if catalog.id in forest]
 
         return Response({
             "status": 200,
             "message": "OK",
             "data": {
-                "total_pages": paginator.num_pages,
+                **catalogs_page.meta,
                 "data": data
             }
         })
 
-    def get_hierarchical_data(self, catalogs):
-        """
-        Xây dựng cấu trúc phân cấp cho các catalog.
-        """
-        catalog_dict = {catalog.id: catalog for catalog in catalogs}
-        hierarchical_data = []
-
-        for catalog in catalogs:
-            if catalog.parent_id is None:  # Nếu không có parent, thêm vào cấp cao nhất
-                hierarchical_data.append(self.build_catalog_tree(catalog, catalog_dict))
-
-        return hierarchical_data
-
-    def build_catalog_tree(self, catalog, catalog_dict):
-        """
-        Xây dựng cây phân cấp cho một catalog.
-        """
-        catalog_data = {
-            'id': catalog.id,
-            'name': catalog.name,
-            'description': catalog.description,
-            'level': catalog.level,
-            'sort_order': catalog.sort_order,
-            'image': catalog.image,
-            'created_at': catalog.created_at,
-            'updated_at': catalog.updated_at,
-            'delete_at': catalog.delete_at,
-            'children': []
-        }
-
-        # Lấy danh sách con của catalog này
-        children = [cat for cat in catalog_dict.values() if cat.parent_id == catalog]
-
-        for child in children:
-            catalog_data['children'].append(self.build_catalog_tree(child, catalog_dict))
-
-        return catalog_data
-    
     @action(detail=False, methods=['get'], url_path="search-catalogs")
     def search_catalogs(self, request):
         """
         API to search products by name with pagination.
         - page_index (default=1)
         - page_size (default=10)
+        - cursor (optional): keyset pagination, empty for the first page then next_cursor / previous_cursor.
         - name: product name to search
         """
-        page_index = int(request.GET.get('page_index', 1))
-        page_size = int(request.GET.get('page_size', 10))
         name_query = request.GET.get('name', '').strip()
 
-        # Lọc sản phẩm theo tên
-        catalogs = Catalog.objects.filter(name__icontains=name_query)
+        # Tìm theo tên và mô tả (bỏ dấu, khớp tiền tố), kết quả liên quan nhất trước
+        catalogs = search(Catalog.objects.all(), name_query)
 
-        paginator = Paginator(catalogs, page_size)
+        paginated_products = paginate(request, catalogs, ordering=SEARCH_ORDERING)
 
-        try:
-            paginated_products = paginator.page(page_index)
-        except PageNotAnInteger:
-            paginated_products = paginator.page(1)
-        except EmptyPage:
-            paginated_products = paginator.page(paginator.num_pages)
-
-        serializer = serializerGetCatalog(paginated_products, many=True)
+        serializer = serializerGetCatalog(paginated_products.object_list, many=True)
 
         return Response({
             "status": status.HTTP_200_OK,
             "message": "OK",
             "data": {
-                "total_pages": paginator.num_pages,
-                "total_items": paginator.count,
-                "page_index": page_index,
-                "page_size": page_size,
+                **paginated_products.meta,
                 "catalogs": serializer.data
             }
         }, status=status.HTTP_200_OK)
@@ -219,7 +164,8 @@ class CatalogViewSetCreateData(viewsets.ViewSet):
                     
             serializer = serializerCreateCatalog(data=catalog_data)
             if serializer.is_valid():
-                serializer.save()
+                serializer.save(image_variants=variants_for(catalog_data.get('image')))
+                invalidate('catalog')
                 return Response({
                     "status": 200,
                     "message": "Create new user successfully!",
@@ -262,6 +208,7 @@ class CatalogViewSetDeleteData(viewsets.ViewSet):
 
         # Perform soft delete on the catalog and its child catalogs
         self.soft_delete_catalog_and_children(catalog)
+        invalidate('catalog')
 
         return Response({
             "status": status.HTTP_200_OK,
@@ -270,18 +217,9 @@ class CatalogViewSetDeleteData(viewsets.ViewSet):
 
     def soft_delete_catalog_and_children(self, catalog):
         """
-        Recursively soft delete the catalog and its child catalogs.
+        Soft delete the catalog and its child catalogs (một câu UPDATE trên cây con theo path).
         """
-        # Đặt thời gian hiện tại cho trường delete_at
-        catalog.delete_at = timezone.now()
-        catalog.save()
-
-        # Tìm các catalog con của catalog hiện tại
-        child_catalogs = Catalog.objects.filter(parent_id=catalog.id, delete_at__isnull=True)
-
-        # Đệ quy xóa mềm các catalog con
-        for child in child_catalogs:
-            self.soft_delete_catalog_and_children(child)
+        update_subtree(catalog, delete_at=timezone.now())
             
 class CatalogViewSetRestoreData(viewsets.ViewSet):
     authentication_classes = [AdminSafeJWTAuthentication]
@@ -312,6 +250,7 @@ class CatalogViewSetRestoreData(viewsets.ViewSet):
 
         # Khôi phục catalog và các catalog con của nó
         self.restore_catalog_and_children(catalog)
+        invalidate('catalog')
 
         return Response({
             "status": status.HTTP_200_OK,
@@ -320,19 +259,10 @@ class CatalogViewSetRestoreData(viewsets.ViewSet):
 
     def restore_catalog_and_children(self, catalog):
         """
-        Recursively restore the catalog and its child catalogs.
+        Restore the catalog and its child catalogs (một câu UPDATE trên cây con theo path).
         """
-        # Đặt delete_at = None để phục hồi catalog
-        catalog.delete_at = None
-        catalog.save()
-
-        # Tìm các catalog con của catalog hiện tại bị xóa mềm
-        child_catalogs = Catalog.objects.filter(parent_id=catalog.id, delete_at__isnull=False)
+        update_subtree(catalog, delete_at=None)
 
-        # Đệ quy phục hồi các catalog con
-        for child in child_catalogs:
-            self.restore_catalog_and_children(child)
-            
 class CatalogViewSetEditData(viewsets.ViewSet):
     authentication_classes = [AdminSafeJWTAuthentication]
     permission_classes = [IsAuthenticated]
@@ -372,8 +302,10 @@ class CatalogViewSetEditData(viewsets.ViewSet):
             catalog.description = description
         if image:
             catalog.image = image
+            catalog.image_variants = variants_for(image)
 
         catalog.save()
+        invalidate('catalog')
 
         return Response({
             "status": status.HTTP_200_OK,
@@ -385,12 +317,10 @@ class CatalogViewSetEditData(viewsets.ViewSet):
         """
         change image of catalog. form body:
         - id: integer
-        - img_data: binary
-        - img_name: string
+        - file: binary
         """
         catalog_id = request.data.get('id')
-        img_data = request.data.get('file')
-        img_name = request.data.get('file_name')
+        img_data = request.FILES.get('file')
         
         if not catalog_id:
             return Response({
@@ -405,27 +335,31 @@ class CatalogViewSetEditData(viewsets.ViewSet):
                 "message": "Catalog not found or already deleted."
             }, status=status.HTTP_404_NOT_FOUND)
         
-        if img_name:
-            # Lưu file ảnh vào đường dẫn cục bộ
-            img_path = os.path.join("C:/Users/Mine/Documents/document/PROJECT/DATN/Ecommerce_Images/", img_name)
-            # Đọc dữ liệu từ InMemoryUploadedFile và ghi vào file
-            with open(img_path, 'wb') as img_file:
-                for chunk in img_data.chunks():
-                    img_file.write(chunk)
-
-            # Cập nhật đường dẫn ảnh vào trường image của catalog
-            catalog.image = f'file:///C:/Users/Mine/Documents/document/PROJECT/DATN/Ecommerce_Images/{img_name}'
-            print(catalog)
-            catalog.save()
+        if img_data is None:
             return Response({
-                "status": status.HTTP_200_OK,
-                "message": "Catalog updated image successfully."
-            }, status=status.HTTP_200_OK)
-        else:
+                "status": status.HTTP_400_BAD_REQUEST,
+                "message": "file is required"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # Ghi vào storage theo từng chunk, worker process_images tạo các bản resize rồi ghi vào image_variants
+        try:
+            upload = save_upload(img_data, 'catalogs')
+        except ImageUploadError as e:
             return Response({
-                "status": 404,
-                "message": "file_name is required"
-            }, status=status.HTTP_200_OK)
+                "status": e.status_code,
+                "message": e.message
+            }, status=e.status_code)
+
+        # Cập nhật đường dẫn ảnh vào trường image của catalog
+        catalog.image = upload.url
+        catalog.image_variants = {}
+        catalog.save()
+        invalidate('catalog')
+        return Response({
+            "status": status.HTTP_200_OK,
+            "message": "Catalog updated image successfully.",
+            "data": {"image": upload.url}
+        }, status=status.HTTP_200_OK)
             
 @permission_classes([AllowAny])         
 class PublicCatalogViewSetGetData(viewsets.ViewSet):
@@ -438,115 +372,62 @@ class PublicCatalogViewSetGetData(viewsets.ViewSet):
     @swagger_auto_schema(manual_parameters=[
         openapi.Parameter('page_index', in_=openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description='Index of the page'),
         openapi.Parameter('page_size', in_=openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description='Number of items per page'),
+        openapi.Parameter('cursor', in_=openapi.IN_QUERY, type=openapi.TYPE_STRING, description='Keyset pagination cursor (empty for the first page)'),
     ])
     @action(detail=False, methods=['get'], url_path="get-list-catalogs")
+    @cache_response(CATALOG)
+    @read_replica
     def list_catalogs(self, request):
         """
         List catalogs with pagination and hierarchical structure.
+        Pagination is applied to root catalogs, each root includes its whole subtree.
 
         Parameters:
         - page_index: The index of the page (default is 1).
         - page_size: The number of items per page (default is 10).
+        - cursor (optional): keyset pagination, empty for the first page then next_cursor / previous_cursor.
         """
-        page_index = int(request.GET.get('page_index', 1))
-        page_size = int(request.GET.get('page_size', 10))
-
-        # Lấy toàn bộ danh sách catalog
-        catalogs = Catalog.objects.filter(delete_at__isnull = True)
-
-        # Chia trang
-        paginator = Paginator(catalogs, page_size)
-        try:
-            catalogs_page = paginator.page(page_index)
-        except PageNotAnInteger:
-            catalogs_page = paginator.page(1)
-        except EmptyPage:
-            catalogs_page = paginator.page(paginator.num_pages)
+        # Chia trang theo catalog gốc
+        catalogs_page = paginate(request, Catalog.objects.filter(parent_id__isnull=True, delete_at__isnull=True).only('id', 'created_at'))
 
-        # Chuyển đổi dữ liệu thành cấu trúc phân cấp
-        data = self.get_hierarchical_data(catalogs_page)
+        # Mỗi catalog gốc kèm toàn bộ cây con, lấy từ cây phân cấp đã cache
+        forest = get_catalog_forest(Catalog, include_deleted=False)
+        data = [forest[catalog.id] for catalog in catalogs_page.object_list if catalog.id in forest]
 
         return Response({
             "status": 200,
             "message": "OK",
             "data": {
-                "total_pages": paginator.num_pages,
+                **catalogs_page.meta,
                 "data": data
             }
         })
 
-    def get_hierarchical_data(self, catalogs):
-        """
-        Xây dựng cấu trúc phân cấp cho các catalog.
-        """
-        catalog_dict = {catalog.id: catalog for catalog in catalogs}
-        hierarchical_data = []
-
-        for catalog in catalogs:
-            if catalog.parent_id is None:  # Nếu không có parent, thêm vào cấp cao nhất
-                hierarchical_data.append(self.build_catalog_tree(catalog, catalog_dict))
-
-        return hierarchical_data
-
-    def build_catalog_tree(self, catalog, catalog_dict):
-        """
-        Xây dựng cây phân cấp cho một catalog.
-        """
-        catalog_data = {
-            'id': catalog.id,
-            'name': catalog.name,
-            'description': catalog.description,
-            'level': catalog.level,
-            'sort_order': catalog.sort_order,
-            'image': catalog.image,
-            'created_at': catalog.created_at,
-            'updated_at': catalog.updated_at,
-            'delete_at': catalog.delete_at,
-            'children': []
-        }
-
-        # Lấy danh sách con của catalog này
-        children = [cat for cat in catalog_dict.values() if cat.parent_id == catalog]
-
-        for child in children:
-            catalog_data['children'].append(self.build_catalog_tree(child, catalog_dict))
-
-        return catalog_data
-    
     @action(detail=False, methods=['get'], url_path="search-catalogs")
+    @cache_response(CATALOG)
+    @read_replica
     def search_catalogs(self, request):
         """
         API to search products by name with pagination.
         - page_index (default=1)
         - page_size (default=10)
+        - cursor (optional): keyset pagination, empty for the first page then next_cursor / previous_cursor.
         - name: product name to search
         """
-        page_index = int(request.GET.get('page_index', 1))
-        page_size = int(request.GET.get('page_size', 10))
         name_query = request.GET.get('name', '').strip()
 
-        # Lọc sản phẩm theo tên
-        catalogs = Catalog.objects.filter(name__icontains=name_query, delete_at__isnull=True)
+        # Tìm theo tên và mô tả (bỏ dấu, khớp tiền tố), kết quả liên quan nhất trước
+        catalogs = search(Catalog.objects.filter(delete_at__isnull=True), name_query)
 
-        paginator = Paginator(catalogs, page_size)
-
-        try:
-            paginated_products = paginator.page(page_index)
-        except PageNotAnInteger:
-            paginated_products = paginator.page(1)
-        except EmptyPage:
-            paginated_products = paginator.page(paginator.num_pages)
+        paginated_products = paginate(request, catalogs, ordering=SEARCH_ORDERING)
 
-        serializer = serializerGetCatalog(paginated_products, many=True)
+        serializer = serializerGetCatalog(paginated_products.object_list, many=True)
 
         return Response({
             "status": status.HTTP_200_OK,
             "message": "OK",
             "data": {
-                "total_pages": paginator.num_pages,
-                "total_items": paginator.count,
-                "page_index": page_index,
-                "page_size": page_size,
+                **paginated_products.meta,
                 "catalogs": serializer.data
             }
         }, status=status.HTTP_200_OK)
\ No newline at end of file
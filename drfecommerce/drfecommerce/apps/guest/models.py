@@ -1,5 +1,6 @@
 from django.db import models
 from django.utils import timezone
+from drfecommerce.jwt_auth import principal_changed
 
 class Guest(models.Model):
     id = models.AutoField(primary_key=True)
@@ -21,6 +22,11 @@ class Guest(models.Model):
     class Meta:
         db_table = 'guests'
      
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Principal đã cache theo token được nạp lại ở request sau
+        principal_changed('guest', self.pk)
+
     @property
     def is_authenticated(self):
-        return True
\ No newline at end of file
+        return True
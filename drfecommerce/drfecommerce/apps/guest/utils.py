@@ -1,31 +1,19 @@
 # accounts.utils
-import datetime
-import jwt
-import os
-from dotenv import load_dotenv
+from drfecommerce.jwt_auth import encode_token
 
-# Load environment variables from .env file
-load_dotenv()
 
-def generate_access_token(user):
-
-    access_token_payload = {
+def token_claims(user):
+    # is_verified và role nằm trong token để GuestSafeJWTAuthentication không phải query guest ở mỗi request
+    return {
         'user_id': user.id,
-        'exp': datetime.datetime.utcnow() + datetime.timedelta(days=0, minutes=500),
-        'iat': datetime.datetime.utcnow(),
+        'role': 'guest',
+        'is_verified': user.is_verified,
     }
-    access_token = jwt.encode(access_token_payload,
-                              os.getenv('SECRET_KEY'), algorithm='HS256')
-    return access_token
 
 
-def generate_refresh_token(user):
-    refresh_token_payload = {
-        'user_id': user.id,
-        'exp': datetime.datetime.utcnow() + datetime.timedelta(days=7),
-        'iat': datetime.datetime.utcnow()
-    }
-    refresh_token = jwt.encode(
-        refresh_token_payload, os.getenv('SECRET_KEY'), algorithm='HS256')
+def generate_access_token(user):
+    return encode_token(token_claims(user), 'access')
 
-    return refresh_token
\ No newline at end of file
+
+def generate_refresh_token(user):
+    return encode_token(token_claims(user), 'refresh')
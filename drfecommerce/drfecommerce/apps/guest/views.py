@@ -1,11 +1,8 @@
-import jwt
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from .models import Guest
 from drfecommerce.apps.guest.serializers import GuestSerializerCreate, GuestSerializerGetData, GuestSerializerLogin, GuestRefreshTokenSerializer, GuestSerializerChangeInfor, GuestSerializerChangeAvatar
-from django.core.paginator import Paginator
-from django.core.paginator import EmptyPage
-from django.core.paginator import PageNotAnInteger
+from drfecommerce.pagination import paginate
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from django.core.exceptions import ValidationError
@@ -15,6 +12,7 @@ from rest_framework.permissions import AllowAny
 from rest_framework.decorators import action, permission_classes
 from drfecommerce.apps.guest.utils import generate_access_token, generate_refresh_token
 from rest_framework import exceptions
+from drfecommerce.jwt_auth import decode_token, check_not_revoked, revoke_token
 import os
 from dotenv import load_dotenv
 
@@ -36,6 +34,7 @@ class GuestViewSetGetData(viewsets.ViewSet):
     @swagger_auto_schema(manual_parameters=[
         openapi.Parameter('page_index', in_=openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description='Index of the page'),
         openapi.Parameter('page_size', in_=openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description='Number of items per page'),
+        openapi.Parameter('cursor', in_=openapi.IN_QUERY, type=openapi.TYPE_STRING, description='Keyset pagination cursor (empty for the first page)'),
     ])
     @action(detail=False, methods=['get'], url_path="list-guests")
     # @ensure_csrf_cookie
@@ -46,25 +45,17 @@ class GuestViewSetGetData(viewsets.ViewSet):
         Parameters:
         - page_index: The index of the page (default is 1).
         - page_size: The number of items per page (default is 10).
+        - cursor (optional): keyset pagination, empty for the first page then next_cursor / previous_cursor.
         """
-        page_index = int(request.GET.get('page_index', 1))
-        page_size = int(request.GET.get('page_size', 10))
+        users = paginate(request, self.queryset)
 
-        paginator = Paginator(self.queryset, page_size)
-        try:
-            users = paginator.page(page_index)
-        except PageNotAnInteger:
-            users = paginator.page(1)
-        except EmptyPage:
-            users = paginator.page(paginator.num_pages)
-
-        serializer = GuestSerializerGetData(users, many=True)
+        serializer = GuestSerializerGetData(users.object_list, many=True)
 
         return Response({
             "status": 200,
             "message": "OK",
             "data": {
-                "total_pages": paginator.num_pages,
+                **users.meta,
                 "data": serializer.data
                 }
         })
@@ -222,6 +213,34 @@ class GuestViewSetCreate(viewsets.ViewSet):
             'message': serializer.errors['email'][0]
             })
 
+class GuestViewSetLogout(viewsets.ViewSet):
+    """
+    Logout: thu hồi access token đang dùng và refresh token (nếu gửi kèm).
+    """
+    authentication_classes = [GuestSafeJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @action(detail=False, methods=['post'], url_path='logout')
+    def logout(self, request):
+        """
+        Parameters:
+        - refresh_token: string (optional)
+        """
+        revoke_token(request.auth)
+        refresh_token = request.data.get('refresh_token')
+        if refresh_token:
+            try:
+                payload = decode_token(refresh_token, 'refresh')
+            except exceptions.AuthenticationFailed:
+                # refresh token đã hết hạn / không hợp lệ thì không cần thu hồi
+                payload = None
+            if payload is not None and payload.get('user_id') == request.user.id:
+                revoke_token(payload)
+        return Response({
+            "status": 200,
+            "message": "Logged out successfully"
+        }, status=status.HTTP_200_OK)
+
 @permission_classes([AllowAny])
 class GuestViewSetLogin(viewsets.ViewSet):
     """
@@ -276,12 +295,8 @@ class RefreshTokenView(viewsets.ViewSet):
         if refresh_token is None:
             raise exceptions.AuthenticationFailed(
                 'Authentication credentials were not provided.')
-        try:
-            payload = jwt.decode(
-                refresh_token, os.getenv('SECRET_KEY'), algorithms=['HS256'])
-        except jwt.ExpiredSignatureError:
-            raise exceptions.AuthenticationFailed(
-                'expired refresh token, please login again.')
+        payload = decode_token(refresh_token, 'refresh', expired_message='expired refresh token, please login again.')
+        check_not_revoked('guest', payload.get('user_id'), payload)
 
         user = Guest.objects.filter(id=payload.get('user_id')).first()
         if user is None:
@@ -0,0 +1,217 @@
+"""
+Upload ảnh và các bản resize (thumbnail, card, full).
+
+- save_upload ghi file upload vào default_storage theo từng chunk (không đọc cả file vào bộ nhớ,
+  file lớn hơn FILE_UPLOAD_MAX_MEMORY_SIZE đã được Django ghi ra file tạm khi nhận request)
+  và thêm một dòng image_uploads trạng thái pending. Request không chờ resize.
+- Worker `manage.py process_images --loop` lấy các ảnh pending theo lô, resize bằng Pillow
+  (render_variants, chạy trong process pool khi --workers > 1 vì resize tốn CPU) và ghi
+  mỗi kích thước VARIANTS ở cả WebP và JPEG vào storage.
+- URL các bản resize được ghi vào image_variants của product / catalog có image là url của ảnh,
+  các API danh sách trả về image_variants để client dùng ảnh nhỏ thay cho ảnh gốc.
+  Product / catalog được gán ảnh sau khi ảnh đã resize xong thì lấy variants_for(url) khi lưu.
+"""
+import io
+import logging
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+from PIL import Image, ImageOps, UnidentifiedImageError
+from rest_framework import status
+
+from drfecommerce.response_cache import invalidate
+from .models import ImageUpload
+
+logger = logging.getLogger(__name__)
+
+# Tên bản resize và cạnh dài tối đa (px), ảnh nhỏ hơn thì giữ nguyên kích thước
+VARIANTS = (('thumbnail', 160), ('card', 480), ('full', 1280))
+# Định dạng ghi ra: (đuôi file, định dạng Pillow)
+FORMATS = (('webp', 'WEBP'), ('jpeg', 'JPEG'))
+ALLOWED_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp')
+DEFAULT_BATCH_SIZE = 20
+DEFAULT_QUALITY = 82
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+class ImageUploadError(Exception):
+    """
+    File upload không hợp lệ, view trả về message và status_code tương ứng.
+    """
+    def __init__(self, message, status_code=status.HTTP_400_BAD_REQUEST):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def validate_upload(upload):
+    """
+    :raise ImageUploadError: không phải file ảnh
+    """
+    extension = os.path.splitext(upload.name)[1].lower()
+    if extension not in ALLOWED_EXTENSIONS:
+        raise ImageUploadError(f"{upload.name}: unsupported image type, expected one of: {', '.join(ALLOWED_EXTENSIONS)}.")
+
+
+def save_upload(upload, folder):
+    """
+    Ghi file upload vào storage và đưa vào hàng đợi resize.
+    :param upload: UploadedFile của request.FILES
+    :param folder: thư mục trong storage, ví dụ 'products'
+    :return: ImageUpload vừa tạo (url là url của ảnh gốc)
+    :raise ImageUploadError: không phải file ảnh
+    """
+    validate_upload(upload)
+    # Storage đọc upload.chunks(), tên trùng thì storage tự thêm hậu tố
+    name = default_storage.save(f"{folder}/{get_valid_filename(os.path.basename(upload.name))}", upload)
+    return ImageUpload.objects.create(name=name, url=default_storage.url(name))
+
+
+def variants_by_url(urls):
+    """
+    :return: dict url -> image_variants của các ảnh đã resize xong (một query)
+    """
+    uploads = (ImageUpload.objects.filter(url__in=[url for url in urls if url], status='done')
+               .order_by('id').values_list('url', 'variants'))
+    # Cùng url (file bị ghi đè) thì lấy ảnh mới nhất
+    return dict(uploads)
+
+
+def variants_for(url):
+    """
+    :return: image_variants của ảnh đã resize xong có url này, {} nếu chưa có
+    """
+    return variants_by_url([url]).get(url, {})
+
+
+def _flatten(image):
+    # JPEG không có kênh alpha: ghép ảnh lên nền trắng
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def render_variants(data, quality=DEFAULT_QUALITY):
+    """
+    Resize ảnh gốc thành các bản VARIANTS ở mọi FORMATS. Không dùng Django (chạy được trong process pool).
+    :param data: bytes của ảnh gốc
+    :return: list (variant, đuôi file, width, height, bytes)
+    """
+    source = Image.open(io.BytesIO(data))
+    # JPEG được giải mã thẳng ở kích thước nhỏ hơn gần với bản lớn nhất (nhanh, ít bộ nhớ)
+    largest = max(size for _, size in VARIANTS)
+    source.draft('RGB', (largest, largest))
+    source = _flatten(ImageOps.exif_transpose(source))
+
+    results = []
+    for variant, size in VARIANTS:
+        image = source.copy()
+        image.thumbnail((size, size), Image.LANCZOS)
+        for extension, image_format in FORMATS:
+            buffer = io.BytesIO()
+            image.save(buffer, image_format, quality=quality, optimize=True)
+            results.append((variant, extension, image.width, image.height, buffer.getvalue()))
+    return results
+
+
+def _read(upload):
+    with default_storage.open(upload.name, 'rb') as original:
+        return original.read()
+
+
+def _store_variants(upload, rendered):
+    stem = os.path.splitext(upload.name)[0]
+    variants = {}
+    for variant, extension, width, height, data in rendered:
+        name = default_storage.save(f"{stem}.{variant}.{extension}", ContentFile(data))
+        variants.setdefault(variant, {'width': width, 'height': height})[extension] = default_storage.url(name)
+    return variants
+
+
+def link_variants(url, variants):
+    """
+    Ghi variants vào image_variants của product / catalog đang dùng ảnh này.
+    :return: (số product, số catalog) được cập nhật
+    """
+    from drfecommerce.apps.catalog.models import Catalog
+    from drfecommerce.apps.product.models import Product
+
+    products = Product.objects.filter(image=url).update(image_variants=variants)
+    catalogs = Catalog.objects.filter(image=url).update(image_variants=variants)
+    if products:
+        invalidate('product')
+    if catalogs:
+        invalidate('catalog')
+    return products, catalogs
+
+
+def _pending_uploads(batch_size):
+    uploads = ImageUpload.objects.filter(status='pending').order_by('id')
+    if connection.features.has_select_for_update_skip_locked:
+        # Nhiều worker chạy song song thì mỗi worker lấy các ảnh khác nhau
+        uploads = uploads.select_for_update(skip_locked=True)
+    return list(uploads[:batch_size])
+
+
+def _render(data):
+    try:
+        return render_variants(data, getattr(settings, 'IMAGE_VARIANT_QUALITY', DEFAULT_QUALITY))
+    except Exception as e:
+        # Trả lỗi về thay vì raise để một ảnh hỏng không làm hỏng cả lô của process pool
+        return e
+
+
+def process_pending_images(batch_size=DEFAULT_BATCH_SIZE, executor=None):
+    """
+    Resize một lô ảnh pending.
+    :param executor: concurrent.futures executor để resize song song, None thì resize tuần tự
+    :return: (số ảnh đã xử lý, số ảnh lỗi)
+    """
+    max_attempts = getattr(settings, 'IMAGE_VARIANT_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)
+    done = failed = 0
+
+    with transaction.atomic():
+        uploads = _pending_uploads(batch_size)
+        if not uploads:
+            return done, failed
+
+        sources, results = {}, {}
+        for upload in uploads:
+            upload.attempts += 1
+            try:
+                sources[upload.id] = _read(upload)
+            except Exception as e:
+                results[upload.id] = e
+        rendered = (executor.map if executor is not None else map)(_render, sources.values())
+        results.update(zip(sources, rendered))
+
+        for upload in uploads:
+            result = results[upload.id]
+            try:
+                if isinstance(result, Exception):
+                    raise result
+                upload.variants = _store_variants(upload, result)
+            except Exception as e:
+                failed += 1
+                upload.last_error = f"{type(e).__name__}: {e}"
+                # File không phải ảnh thì thử lại cũng không được
+                if upload.attempts >= max_attempts or isinstance(e, UnidentifiedImageError):
+                    upload.status = 'failed'
+                logger.warning("Resizing image %s failed (attempt %s): %s", upload.name, upload.attempts, e)
+                continue
+            done += 1
+            upload.status = 'done'
+            upload.last_error = None
+            upload.processed_at = timezone.now()
+            link_variants(upload.url, upload.variants)
+
+        ImageUpload.objects.bulk_update(uploads, ['variants', 'status', 'attempts', 'last_error', 'processed_at'])
+    return done, failed
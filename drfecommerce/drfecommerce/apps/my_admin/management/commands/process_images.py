@@ -0,0 +1,31 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from drfecommerce.apps.my_admin.images import process_pending_images, DEFAULT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = "Tạo các bản resize (thumbnail, card, full - WebP / JPEG) của ảnh đã upload (image_uploads) theo lô."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=1, help="Số process resize song song")
+        parser.add_argument('--loop', action='store_true', help="Chạy liên tục như một worker")
+        parser.add_argument('--interval', type=float, default=5, help="Số giây chờ khi không có ảnh (với --loop)")
+
+    def handle(self, *args, **options):
+        executor = ProcessPoolExecutor(options['workers']) if options['workers'] > 1 else None
+        try:
+            while True:
+                done, failed = process_pending_images(batch_size=options['batch_size'], executor=executor)
+                if done or failed:
+                    self.stdout.write(f"Processed {done} images, {failed} failed.")
+                if not options['loop']:
+                    break
+                # Lô đầy thì xử lý tiếp ngay, hết ảnh thì chờ
+                if done + failed < options['batch_size']:
+                    time.sleep(options['interval'])
+        finally:
+            if executor is not None:
+                executor.shutdown()
@@ -1,5 +1,6 @@
 from django.db import models
 from django.utils import timezone
+from drfecommerce.jwt_auth import principal_changed
 
 class MyAdmin(models.Model):
     id = models.AutoField(primary_key=True)
@@ -15,6 +16,41 @@ class MyAdmin(models.Model):
     class Meta:
         db_table = 'admins'
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Principal đã cache theo token được nạp lại ở request sau
+        principal_changed('admin', self.pk)
+
     @property
     def is_authenticated(self):
-        return True
\ No newline at end of file
+        return True
+
+class ImageUpload(models.Model):
+    """
+    Ảnh đã upload (upload-image, upload-gallery, edit-image-catalog) và các bản resize của nó.
+    Worker `process_images` tạo các bản resize (xem images.py) rồi ghi vào image_variants của
+    product / catalog có image là url của ảnh.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),  # Không đọc được ảnh hoặc đã hết số lần thử
+    )
+
+    name = models.CharField(max_length=255)  # Tên file trong storage
+    url = models.CharField(max_length=255, db_index=True)
+    variants = models.JSONField(default=dict, blank=True)  # {"thumbnail": {"webp": url, "jpeg": url, ...}, ...}
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'image_uploads'
+        indexes = [
+            models.Index(fields=['id'], name='image_upload_pending_idx', condition=models.Q(status='pending')),
+        ]
+
+    def __str__(self):
+        return f'{self.name} ({self.status})'
@@ -1,31 +1,17 @@
 # accounts.utils
-import datetime
-import jwt
-import os
-from dotenv import load_dotenv
+from drfecommerce.jwt_auth import encode_token
 
-# Load environment variables from .env file
-load_dotenv()
 
-def generate_access_token(admin):
-
-    access_token_payload = {
+def token_claims(admin):
+    return {
         'admin_id': admin.id,
-        'exp': datetime.datetime.utcnow() + datetime.timedelta(days=0, minutes=500),
-        'iat': datetime.datetime.utcnow(),
+        'role': admin.role,
     }
-    access_token = jwt.encode(access_token_payload,
-                              os.getenv('SECRET_KEY'), algorithm='HS256')
-    return access_token
 
 
-def generate_refresh_token(admin):
-    refresh_token_payload = {
-        'admin_id': admin.id,
-        'exp': datetime.datetime.utcnow() + datetime.timedelta(days=7),
-        'iat': datetime.datetime.utcnow()
-    }
-    refresh_token = jwt.encode(
-        refresh_token_payload, os.getenv('SECRET_KEY'), algorithm='HS256')
+def generate_access_token(admin):
+    return encode_token(token_claims(admin), 'access')
 
-    return refresh_token
\ No newline at end of file
+
+def generate_refresh_token(admin):
+    return encode_token(token_claims(admin), 'refresh')
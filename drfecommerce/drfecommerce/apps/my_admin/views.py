@@ -1,13 +1,10 @@
-import jwt
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from .models import MyAdmin
 from drfecommerce.apps.guest.models import Guest
 from drfecommerce.apps.my_admin.serializers import  AdminSerializerGetData, AdminSerializerLogin, AdminRefreshTokenSerializer
 from drfecommerce.apps.guest.serializers import  GuestSerializerGetData
-from django.core.paginator import Paginator
-from django.core.paginator import EmptyPage
-from django.core.paginator import PageNotAnInteger
+from drfecommerce.pagination import paginate
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from django.core.exceptions import ValidationError
@@ -17,11 +14,11 @@ from rest_framework.permissions import AllowAny
 from rest_framework.decorators import action, permission_classes
 from drfecommerce.apps.my_admin.utils import generate_access_token, generate_refresh_token
 from rest_framework import exceptions
-import os
+from drfecommerce.jwt_auth import decode_token, check_not_revoked, revoke_token
 from dotenv import load_dotenv
-from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
-from drfecommerce.settings import base
+from .images import save_upload, ImageUploadError
+from drfecommerce import profiling
+from django.http import HttpResponse
 
 # Load environment variables from .env file
 load_dotenv()
@@ -41,6 +38,7 @@ class GuestViewSetGetData(viewsets.ViewSet):
     @swagger_auto_schema(manual_parameters=[
         openapi.Parameter('page_index', in_=openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description='Index of the page'),
         openapi.Parameter('page_size', in_=openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description='Number of items per page'),
+        openapi.Parameter('cursor', in_=openapi.IN_QUERY, type=openapi.TYPE_STRING, description='Keyset pagination cursor (empty for the first page)'),
     ])
     @action(detail=False, methods=['get'], url_path="get-list-guests")
     # @ensure_csrf_cookie
@@ -51,25 +49,17 @@ class GuestViewSetGetData(viewsets.ViewSet):
         Parameters:
         - page_index: The index of the page (default is 1).
         - page_size: The number of items per page (default is 10).
+        - cursor (optional): keyset pagination, empty for the first page then next_cursor / previous_cursor.
         """
-        page_index = int(request.GET.get('page_index', 1))
-        page_size = int(request.GET.get('page_size', 10))
+        users = paginate(request, self.queryset)
 
-        paginator = Paginator(self.queryset, page_size)
-        try:
-            users = paginator.page(page_index)
-        except PageNotAnInteger:
-            users = paginator.page(1)
-        except EmptyPage:
-            users = paginator.page(paginator.num_pages)
-
-        serializer = GuestSerializerGetData(users, many=True)
+        serializer = GuestSerializerGetData(users.object_list, many=True)
 
         return Response({
             "status": 200,
             "message": "OK",
             "data": {
-                "total_pages": paginator.num_pages,
+                **users.meta,
                 "data": serializer.data
                 }
         })
@@ -89,6 +79,7 @@ class AdminViewSetGetData(viewsets.ViewSet):
     @swagger_auto_schema(manual_parameters=[
         openapi.Parameter('page_index', in_=openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description='Index of the page'),
         openapi.Parameter('page_size', in_=openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description='Number of items per page'),
+        openapi.Parameter('cursor', in_=openapi.IN_QUERY, type=openapi.TYPE_STRING, description='Keyset pagination cursor (empty for the first page)'),
     ])
     @action(detail=False, methods=['get'], url_path="list-admins")
     # @ensure_csrf_cookie
@@ -99,25 +90,17 @@ class AdminViewSetGetData(viewsets.ViewSet):
         Parameters:
         - page_index: The index of the page (default is 1).
         - page_size: The number of items per page (default is 10).
+        - cursor (optional): keyset pagination, empty for the first page then next_cursor / previous_cursor.
         """
-        page_index = int(request.GET.get('page_index', 1))
-        page_size = int(request.GET.get('page_size', 10))
-
-        paginator = Paginator(self.queryset, page_size)
-        try:
-            admins = paginator.page(page_index)
-        except PageNotAnInteger:
-            admins = paginator.page(1)
-        except EmptyPage:
-            admins = paginator.page(paginator.num_pages)
+        admins = paginate(request, self.queryset)
 
-        serializer = AdminSerializerGetData(admins, many=True)
+        serializer = AdminSerializerGetData(admins.object_list, many=True)
 
         return Response({
             "status": 200,
             "message": "OK",
             "data": {
-                "total_pages": paginator.num_pages,
+                **admins.meta,
                 "data": serializer.data
                 }
         })
@@ -207,12 +190,8 @@ class RefreshTokenView(viewsets.ViewSet):
         if refresh_token is None:
             raise exceptions.AuthenticationFailed(
                 'Authentication credentials were not provided.')
-        try:
-            payload = jwt.decode(
-                refresh_token, os.getenv('SECRET_KEY'), algorithms=['HS256'])
-        except jwt.ExpiredSignatureError:
-            raise exceptions.AuthenticationFailed(
-                'expired refresh token, please login again.')
+        payload = decode_token(refresh_token, 'refresh', expired_message='expired refresh token, please login again.')
+        check_not_revoked('admin', payload.get('admin_id'), payload)
 
         admin = MyAdmin.objects.filter(id=payload.get('admin_id')).first()
         if admin is None:
@@ -227,6 +206,34 @@ class RefreshTokenView(viewsets.ViewSet):
             }
             })
 
+class AdminViewSetLogout(viewsets.ViewSet):
+    """
+    Logout: thu hồi access token đang dùng và refresh token (nếu gửi kèm).
+    """
+    authentication_classes = [AdminSafeJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @action(detail=False, methods=['post'], url_path='logout')
+    def logout(self, request):
+        """
+        Parameters:
+        - refresh_token: string (optional)
+        """
+        revoke_token(request.auth)
+        refresh_token = request.data.get('refresh_token')
+        if refresh_token:
+            try:
+                payload = decode_token(refresh_token, 'refresh')
+            except exceptions.AuthenticationFailed:
+                # refresh token đã hết hạn / không hợp lệ thì không cần thu hồi
+                payload = None
+            if payload is not None and payload.get('admin_id') == request.user.id:
+                revoke_token(payload)
+        return Response({
+            "status": 200,
+            "message": "Logged out successfully"
+        }, status=status.HTTP_200_OK)
+
 class AdminViewsetUploadImage(viewsets.ViewSet):
     """
     A simple Viewset for handling upload image actions.
@@ -242,17 +249,30 @@ class AdminViewsetUploadImage(viewsets.ViewSet):
                 "message": "No image file found in request."
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        image = request.FILES['file']
-        img_name = image.name
-
-        # Sử dụng default_storage để lưu ảnh vào thư mục cục bộ hoặc dịch vụ lưu trữ khác trong tương lai
-        save_path = os.path.join(base.MEDIA_ROOT, img_name)
-        file_path = default_storage.save(save_path, ContentFile(image.read()))
-        print(file_path)
-        file_url = default_storage.url(file_path)
+        # Ghi vào storage theo từng chunk, các bản resize được tạo bởi worker process_images
+        try:
+            upload = save_upload(request.FILES['file'], 'images')
+        except ImageUploadError as e:
+            return Response({
+                "status": e.status_code,
+                "message": e.message
+            }, status=e.status_code)
 
         return Response({
             "status": status.HTTP_200_OK,
             "message": "Image uploaded successfully!",
-            "img_url": file_url
-        }, status=status.HTTP_200_OK)
\ No newline at end of file
+            "img_url": upload.url
+        }, status=status.HTTP_200_OK)
+
+
+class AdminMetricsViewSet(viewsets.ViewSet):
+    """
+    Metrics của các request (số request, thời gian, số query, thời gian SQL / serializer, kích thước response)
+    theo định dạng Prometheus, xem drfecommerce/profiling.py.
+    """
+    authentication_classes = [AdminSafeJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @action(detail=False, methods=['get'], url_path="metrics")
+    def metrics(self, request):
+        return HttpResponse(profiling.registry.render(), content_type=profiling.CONTENT_TYPE)
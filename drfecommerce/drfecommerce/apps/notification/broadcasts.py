@@ -0,0 +1,255 @@
+"""
+Broadcast: một thông báo gửi cho tất cả guest hoặc một nhóm guest (segment).
+
+Fan-out on write (mode='write', mặc định):
+- API admin chỉ tạo dòng broadcasts (status pending), worker `send_broadcasts` tạo thông báo cho từng guest.
+- Mỗi lô: đọc chunk_size guest id tiếp theo (keyset theo id, chỉ đọc cột id), một câu bulk INSERT
+  vào notifications và cập nhật tiến độ (last_guest_id) trong cùng transaction. Worker dừng giữa chừng
+  thì chạy lại từ lô chưa xong, không tạo trùng. Nhiều worker lấy các broadcast khác nhau (skip locked).
+- Bộ đếm chưa đọc của guest trong lô bị xoá (một lệnh cache), lần đọc sau đếm lại. Stream SSE đang mở
+  nhận broadcast khi kết nối lại (đọc bù theo Last-Event-ID), không publish cho từng guest.
+- Segment chỉ gồm guest chưa bị xoá mềm, thêm bộ lọc theo SEGMENT_FILTERS.
+
+Fan-out on read (mode='read'):
+- Chỉ một dòng broadcasts, không tạo dòng cho từng guest. Danh sách thông báo của guest có thêm
+  các broadcast này (tạo sau khi guest đăng ký, tối đa FEED_LIMIT broadcast mới nhất), đã đọc hay chưa
+  theo broadcast_reads. Chỉ dùng cho tất cả guest (segment rỗng): không phải kiểm tra guest thuộc segment khi đọc.
+- Số broadcast chưa đọc của guest được cache theo version của danh sách broadcast, tạo broadcast mới
+  thì version tăng nên mọi guest đếm lại ở lần đọc sau.
+"""
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+
+from drfecommerce.apps.guest.models import Guest
+from .counters import forget_unread
+from .models import Broadcast, BroadcastRead, Notification
+
+DEFAULT_CHUNK_SIZE = 5000
+FEED_LIMIT = 20
+CACHE_ALIAS = 'default'
+KEY_PREFIX = 'notification'
+FEED_CACHE_TIMEOUT = 60 * 60
+NOTIFICATION_TYPES = {choice for choice, _ in Notification.NOTIFICATION_TYPES}
+MODES = {choice for choice, _ in Broadcast.MODE_CHOICES}
+
+
+class BroadcastError(Exception):
+    """
+    Dữ liệu broadcast không hợp lệ, view trả về message và status_code tương ứng.
+    """
+    def __init__(self, message, status_code=status.HTTP_400_BAD_REQUEST):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def _bool(value):
+    if isinstance(value, bool):
+        return value
+    raise BroadcastError("is_verified must be true or false.")
+
+
+def _text(value):
+    if isinstance(value, str) and value:
+        return value
+    raise BroadcastError("city / country must be a non-empty string.")
+
+
+def _datetime(value):
+    try:
+        parsed = parse_datetime(value) if isinstance(value, str) else None
+    except ValueError:
+        # Đúng định dạng nhưng ngày không tồn tại (vd 2024-02-30)
+        parsed = None
+    if parsed is None:
+        raise BroadcastError("joined_after / joined_before must be ISO datetimes.")
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+def _ids(value):
+    if isinstance(value, list) and all(isinstance(item, int) for item in value):
+        return value
+    raise BroadcastError("guest_ids must be a list of integers.")
+
+
+# key của segment -> (lookup trên Guest, hàm kiểm tra / chuyển giá trị)
+SEGMENT_FILTERS = {
+    'is_verified': ('is_verified', _bool),
+    'city': ('city__iexact', _text),
+    'country': ('country__iexact', _text),
+    'joined_after': ('created_at__gte', _datetime),
+    'joined_before': ('created_at__lt', _datetime),
+    'guest_ids': ('id__in', _ids),
+}
+
+
+def segment_filters(segment):
+    """
+    :return: dict lookup cho Guest.objects.filter
+    :raise BroadcastError: segment không hợp lệ
+    """
+    if not isinstance(segment, dict):
+        raise BroadcastError("segment must be an object.")
+    unknown = set(segment) - set(SEGMENT_FILTERS)
+    if unknown:
+        raise BroadcastError(f"Unknown segment filters: {', '.join(sorted(unknown))}.")
+    return {SEGMENT_FILTERS[key][0]: SEGMENT_FILTERS[key][1](value) for key, value in segment.items()}
+
+
+def segment_guests(segment):
+    return Guest.objects.filter(delete_at__isnull=True, **segment_filters(segment))
+
+
+def create_broadcast(message, notification_type='general', url=None, attachment_url=None,
+                     segment=None, mode='write', admin_id=None):
+    """
+    :return: Broadcast vừa tạo (mode write: pending, chờ worker; mode read: done ngay)
+    :raise BroadcastError: dữ liệu không hợp lệ
+    """
+    segment = segment or {}
+    if not message:
+        raise BroadcastError("Message is required.")
+    if notification_type not in NOTIFICATION_TYPES:
+        raise BroadcastError(f"notification_type must be one of: {', '.join(sorted(NOTIFICATION_TYPES))}.")
+    if mode not in MODES:
+        raise BroadcastError("mode must be 'write' or 'read'.")
+    segment_filters(segment)
+    if mode == 'read' and segment:
+        raise BroadcastError("Fan-out on read only supports broadcasts to all guests.")
+
+    broadcast = Broadcast.objects.create(
+        admin_id=admin_id, notification_type=notification_type, message=message, url=url,
+        attachment_url=attachment_url, segment=segment, mode=mode,
+        status='done' if mode == 'read' else 'pending',
+        finished_at=timezone.now() if mode == 'read' else None,
+    )
+    if mode == 'read':
+        transaction.on_commit(_bump_feed_version)
+    return broadcast
+
+
+def _next_broadcast():
+    broadcasts = Broadcast.objects.filter(mode='write').exclude(status='done').order_by('id')
+    if connection.features.has_select_for_update_skip_locked:
+        broadcasts = broadcasts.select_for_update(skip_locked=True)
+    else:
+        broadcasts = broadcasts.select_for_update()
+    return broadcasts.first()
+
+
+def fan_out_chunk(chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Tạo thông báo cho lô guest tiếp theo của broadcast chưa xong (cũ nhất trước).
+    :return: (broadcast, số thông báo đã tạo), hoặc (None, 0) nếu không còn broadcast nào
+    """
+    with transaction.atomic():
+        broadcast = _next_broadcast()
+        if broadcast is None:
+            return None, 0
+        guest_ids = list(segment_guests(broadcast.segment).filter(id__gt=broadcast.last_guest_id)
+                         .order_by('id').values_list('id', flat=True)[:chunk_size])
+        now = timezone.now()
+        Notification.objects.bulk_create([
+            Notification(
+                guest_id=guest_id, notification_type=broadcast.notification_type, message=broadcast.message,
+                url=broadcast.url, attachment_url=broadcast.attachment_url, created_at=now,
+            )
+            for guest_id in guest_ids
+        ])
+        forget_unread(guest_ids)
+
+        broadcast.recipients += len(guest_ids)
+        if guest_ids:
+            broadcast.last_guest_id = guest_ids[-1]
+        if len(guest_ids) < chunk_size:
+            broadcast.status = 'done'
+            broadcast.finished_at = now
+        else:
+            broadcast.status = 'sending'
+        broadcast.save(update_fields=['recipients', 'last_guest_id', 'status', 'finished_at'])
+    return broadcast, len(guest_ids)
+
+
+def send_broadcasts(chunk_size=DEFAULT_CHUNK_SIZE, max_chunks=None):
+    """
+    Chạy fan_out_chunk cho đến khi không còn broadcast chưa xong (hoặc đủ max_chunks lô).
+    :return: số thông báo đã tạo
+    """
+    created = chunks = 0
+    while max_chunks is None or chunks < max_chunks:
+        broadcast, count = fan_out_chunk(chunk_size)
+        if broadcast is None:
+            break
+        created += count
+        chunks += 1
+    return created
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _feed_version_key():
+    return f"{KEY_PREFIX}:broadcast_feed_version"
+
+
+def _bump_feed_version():
+    try:
+        _cache().incr(_feed_version_key())
+    except ValueError:
+        _cache().set(_feed_version_key(), int(timezone.now().timestamp()), None)
+
+
+def _feed_version():
+    version = _cache().get(_feed_version_key())
+    if version is None:
+        version = int(timezone.now().timestamp())
+        _cache().add(_feed_version_key(), version, None)
+    return version
+
+
+def _unread_key(guest_id):
+    return f"{KEY_PREFIX}:broadcast_unread:{_feed_version()}:{guest_id}"
+
+
+def feed_broadcasts(guest_id):
+    """
+    Broadcast fan-out on read của guest, mới nhất trước, kèm is_read (một query).
+    """
+    joined_at = Guest.objects.filter(id=guest_id).values('created_at')
+    return (Broadcast.objects.filter(mode='read', created_at__gte=joined_at[:1])
+            .annotate(is_read=Exists(BroadcastRead.objects.filter(broadcast=OuterRef('pk'), guest_id=guest_id)))
+            .order_by('-created_at', '-id')[:FEED_LIMIT])
+
+
+def unread_broadcast_count(guest_id):
+    """
+    Số broadcast fan-out on read guest chưa đọc (không chạy query nếu đang có trong cache).
+    """
+    key = _unread_key(guest_id)
+    count = _cache().get(key)
+    if count is None:
+        count = sum(1 for broadcast in feed_broadcasts(guest_id) if not broadcast.is_read)
+        _cache().set(key, count, FEED_CACHE_TIMEOUT)
+    return count
+
+
+def mark_broadcasts_read(guest_id, ids=None):
+    """
+    Ghi broadcast_reads cho các broadcast trong feed của guest (bỏ qua broadcast đã đọc).
+    :param ids: list id broadcast, None để đánh dấu tất cả broadcast trong feed
+    :return: số broadcast vừa được đánh dấu đã đọc
+    """
+    unread = [broadcast.id for broadcast in feed_broadcasts(guest_id)
+              if not broadcast.is_read and (ids is None or broadcast.id in ids)]
+    BroadcastRead.objects.bulk_create(
+        [BroadcastRead(broadcast_id=broadcast_id, guest_id=guest_id) for broadcast_id in unread],
+        ignore_conflicts=True)
+    if unread:
+        key = _unread_key(guest_id)
+        transaction.on_commit(lambda: _cache().delete(key))
+    return len(unread)
@@ -0,0 +1,91 @@
+"""
+Số thông báo chưa đọc của từng guest, cache trong cache 'default' (Redis khi chạy nhiều process).
+
+- unread_count: đọc từ cache; khi chưa có (lần đầu, hết hạn, Redis restart) thì đếm bằng một câu
+  COUNT trên index notif_guest_unread_idx rồi lưu lại.
+- create_notification và các API đánh dấu đã đọc cộng / trừ bộ đếm (incr) sau khi transaction commit,
+  với số dòng thực sự thay đổi. Bộ đếm chưa có trong cache thì bỏ qua, lần đọc sau sẽ đếm lại.
+- Thông báo tạo hàng loạt (broadcast, broadcasts.py) xoá bộ đếm của các guest trong lô thay vì cộng.
+- Bộ đếm hết hạn sau UNREAD_COUNT_TIMEOUT giây để nếu có lệch (ví dụ sửa trực tiếp trong database)
+  thì cũng chỉ lệch trong khoảng thời gian này.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .models import Notification
+
+CACHE_ALIAS = 'default'
+KEY_PREFIX = 'notification'
+DEFAULT_TIMEOUT = 60 * 60
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _key(guest_id):
+    return f"{KEY_PREFIX}:unread:{guest_id}"
+
+
+def _timeout():
+    return getattr(settings, 'UNREAD_COUNT_TIMEOUT', DEFAULT_TIMEOUT)
+
+
+def unread_count(guest_id):
+    """
+    :return: số thông báo chưa đọc của guest (không chạy query nếu bộ đếm đang có trong cache)
+    """
+    cache = _cache()
+    cached = cache.get(_key(guest_id))
+    if cached is not None and cached >= 0:
+        return cached
+    count = Notification.objects.filter(guest_id=guest_id, is_read=False).count()
+    if cached is None:
+        # add: không ghi đè bộ đếm mà request khác vừa tạo
+        cache.add(_key(guest_id), count, _timeout())
+    else:
+        # Bộ đếm bị lệch xuống dưới 0, ghi lại giá trị đúng
+        cache.set(_key(guest_id), count, _timeout())
+    return count
+
+
+def adjust_unread(guest_id, delta):
+    """
+    Cộng delta vào bộ đếm của guest sau khi transaction hiện tại commit.
+    """
+    if not delta:
+        return
+
+    def apply():
+        try:
+            _cache().incr(_key(guest_id), delta)
+        except ValueError:
+            # Chưa có bộ đếm: lần đọc sau sẽ đếm lại
+            pass
+
+    transaction.on_commit(apply)
+
+
+def forget_unread(guest_ids):
+    """
+    Xoá bộ đếm của nhiều guest sau khi transaction commit (một lệnh cache cho cả lô),
+    dùng khi tạo thông báo hàng loạt: cộng từng bộ đếm sẽ tốn một lệnh cho mỗi guest.
+    """
+    keys = [_key(guest_id) for guest_id in guest_ids]
+    if keys:
+        transaction.on_commit(lambda: _cache().delete_many(keys))
+
+
+def mark_read(guest_id, ids=None):
+    """
+    Đánh dấu đã đọc các thông báo chưa đọc của guest bằng một câu UPDATE.
+    :param ids: list id thông báo, None để đánh dấu tất cả
+    :return: số thông báo vừa chuyển sang đã đọc
+    """
+    notifications = Notification.objects.filter(guest_id=guest_id, is_read=False)
+    if ids is not None:
+        notifications = notifications.filter(id__in=ids)
+    updated = notifications.update(is_read=True)
+    adjust_unread(guest_id, -updated)
+    return updated
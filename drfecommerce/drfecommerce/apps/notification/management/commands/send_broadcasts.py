@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+from drfecommerce.apps.notification.broadcasts import fan_out_chunk, DEFAULT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = "Tạo thông báo cho từng guest của các broadcast fan-out on write (broadcasts), theo lô guest id."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--loop', action='store_true', help="Chạy liên tục như một worker")
+        parser.add_argument('--interval', type=float, default=5, help="Số giây chờ khi không có broadcast (với --loop)")
+
+    def handle(self, *args, **options):
+        while True:
+            broadcast, created = fan_out_chunk(chunk_size=options['chunk_size'])
+            if broadcast is not None:
+                self.stdout.write(f"Broadcast {broadcast.id}: {created} notifications ({broadcast.recipients} total, {broadcast.status}).")
+                # Còn broadcast chưa xong thì làm lô tiếp ngay
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
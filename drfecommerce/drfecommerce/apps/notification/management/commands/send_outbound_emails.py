@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+from drfecommerce.apps.notification.outbox import send_pending_emails, DEFAULT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = "Gửi các email đang chờ trong outbox (outbound_emails) theo lô."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--loop', action='store_true', help="Chạy liên tục như một worker")
+        parser.add_argument('--interval', type=float, default=5, help="Số giây chờ khi outbox trống (với --loop)")
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = send_pending_emails(batch_size=options['batch_size'])
+            if sent or failed:
+                self.stdout.write(f"Sent {sent} emails, {failed} failed.")
+            if not options['loop']:
+                break
+            # Lô đầy thì gửi tiếp ngay, hết email thì chờ
+            if sent + failed < options['batch_size']:
+                time.sleep(options['interval'])
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.15 on 2026-10-18 13:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notification', '0002_alter_notification_table'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['guest', '-created_at'], name='notif_guest_created_idx'),
+        ),
+    ]
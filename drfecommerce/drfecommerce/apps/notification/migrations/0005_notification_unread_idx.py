@@ -0,0 +1,17 @@
+# Generated by Django 4.2.15 on 2026-10-18 14:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notification', '0004_outbound_emails'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['guest'], name='notif_guest_unread_idx'),
+        ),
+    ]
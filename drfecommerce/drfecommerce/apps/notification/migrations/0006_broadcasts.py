@@ -0,0 +1,62 @@
+# Generated by Django 4.2.15 on 2026-10-18 15:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('guest', '0002_alter_guest_table'),
+        ('my_admin', '0002_alter_myadmin_table'),
+        ('notification', '0005_notification_unread_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Broadcast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('notification_type', models.CharField(choices=[('review_reply', 'Review Reply'), ('order_update', 'Order Update'), ('general', 'General Notification')], default='general', max_length=50)),
+                ('message', models.TextField()),
+                ('url', models.TextField(blank=True, null=True)),
+                ('attachment_url', models.TextField(blank=True, null=True)),
+                ('segment', models.JSONField(blank=True, default=dict)),
+                ('mode', models.CharField(choices=[('write', 'Fan-out on write'), ('read', 'Fan-out on read')], default='write', max_length=10)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('done', 'Done')], default='pending', max_length=20)),
+                ('last_guest_id', models.IntegerField(default=0)),
+                ('recipients', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('admin', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='my_admin.myadmin')),
+            ],
+            options={
+                'db_table': 'broadcasts',
+            },
+        ),
+        migrations.CreateModel(
+            name='BroadcastRead',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('read_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('broadcast', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reads', to='notification.broadcast')),
+                ('guest', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='guest.guest')),
+            ],
+            options={
+                'db_table': 'broadcast_reads',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='broadcastread',
+            constraint=models.UniqueConstraint(fields=('guest', 'broadcast'), name='broadcast_read_uniq'),
+        ),
+        migrations.AddIndex(
+            model_name='broadcast',
+            index=models.Index(condition=models.Q(('status', 'done'), _negated=True), fields=['id'], name='broadcast_unfinished_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='broadcast',
+            index=models.Index(condition=models.Q(('mode', 'read')), fields=['-created_at'], name='broadcast_read_mode_idx'),
+        ),
+    ]
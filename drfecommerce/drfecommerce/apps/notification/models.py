@@ -1,5 +1,6 @@
 from django.db import models
 from drfecommerce.apps.guest.models import Guest
+from drfecommerce.apps.my_admin.models import MyAdmin
 from django.utils import timezone
 
 class Notification(models.Model):
@@ -21,6 +22,96 @@ class Notification(models.Model):
     
     class Meta:
         db_table = 'notifications'
+        indexes = [
+            models.Index(fields=['guest', '-created_at'], name='notif_guest_created_idx'),
+            # đếm thông báo chưa đọc khi bộ đếm trong cache chưa có (counters.py)
+            models.Index(fields=['guest'], name='notif_guest_unread_idx', condition=models.Q(is_read=False)),
+        ]
         
     def __str__(self):
-        return f'Notification for {self.guest} - {self.notification_type}'
\ No newline at end of file
+        return f'Notification for {self.guest} - {self.notification_type}'
+
+class Broadcast(models.Model):
+    """
+    Thông báo gửi cho tất cả guest hoặc một nhóm guest (segment), xem broadcasts.py.
+    - write: worker send_broadcasts tạo một dòng notifications cho mỗi guest, theo từng lô guest id
+    - read: không tạo dòng cho từng guest, broadcast được ghép vào danh sách thông báo khi đọc,
+      trạng thái đã đọc của từng guest nằm trong broadcast_reads
+    """
+    MODE_CHOICES = (
+        ('write', 'Fan-out on write'),
+        ('read', 'Fan-out on read'),
+    )
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('done', 'Done'),
+    )
+
+    admin = models.ForeignKey(MyAdmin, on_delete=models.SET_NULL, null=True, blank=True)  # Admin tạo broadcast
+    notification_type = models.CharField(max_length=50, choices=Notification.NOTIFICATION_TYPES, default='general')
+    message = models.TextField()
+    url = models.TextField(null=True, blank=True)
+    attachment_url = models.TextField(null=True, blank=True)
+    segment = models.JSONField(default=dict, blank=True)  # Bộ lọc guest (broadcasts.SEGMENT_FILTERS), rỗng là tất cả
+    mode = models.CharField(max_length=10, choices=MODE_CHOICES, default='write')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    last_guest_id = models.IntegerField(default=0)  # Guest id lớn nhất đã được tạo thông báo (tiến độ của worker)
+    recipients = models.IntegerField(default=0)  # Số thông báo đã tạo
+    created_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'broadcasts'
+        indexes = [
+            models.Index(fields=['id'], name='broadcast_unfinished_idx', condition=~models.Q(status='done')),
+            # broadcast fan-out on read trong danh sách thông báo của guest
+            models.Index(fields=['-created_at'], name='broadcast_read_mode_idx', condition=models.Q(mode='read')),
+        ]
+
+    def __str__(self):
+        return f'Broadcast {self.id} ({self.mode}, {self.status})'
+
+class BroadcastRead(models.Model):
+    #guest đã đọc broadcast fan-out on read
+    broadcast = models.ForeignKey(Broadcast, on_delete=models.CASCADE, related_name='reads')
+    guest = models.ForeignKey(Guest, on_delete=models.CASCADE)
+    read_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'broadcast_reads'
+        constraints = [
+            models.UniqueConstraint(fields=['guest', 'broadcast'], name='broadcast_read_uniq'),
+        ]
+
+class OutboundEmail(models.Model):
+    """
+    Hàng đợi email gửi đi (outbox): request chỉ thêm dòng vào bảng này,
+    worker `send_outbound_emails` gửi theo lô và retry khi SMTP lỗi.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),  # Đã hết số lần retry
+    )
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()  # Nội dung text thuần
+    html_body = models.TextField(null=True, blank=True)
+    from_email = models.CharField(max_length=255)
+    recipients = models.JSONField()  # Danh sách email người nhận
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(null=True, blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)  # Thời điểm được gửi (lại)
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'outbound_emails'
+        indexes = [
+            models.Index(fields=['next_attempt_at', 'id'], name='outbound_email_due_idx', condition=models.Q(status='pending')),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} -> {", ".join(self.recipients)} ({self.status})'
@@ -0,0 +1,106 @@
+import datetime
+import logging
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_MAX_ATTEMPTS = 5
+# Lần retry thứ n chờ RETRY_DELAY * 2^(n-1) giây, tối đa MAX_RETRY_DELAY
+DEFAULT_RETRY_DELAY = 60
+MAX_RETRY_DELAY = 60 * 60
+
+
+def enqueue_email(subject, message, recipient_list, html_message=None, from_email=None):
+    """
+    Thêm email vào outbox thay cho send_mail, nằm trong cùng transaction với thay đổi dữ liệu.
+    :return: OutboundEmail vừa tạo
+    """
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=message,
+        html_body=html_message,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=list(recipient_list),
+    )
+
+
+def retry_delay(attempts):
+    base_delay = getattr(settings, 'EMAIL_OUTBOX_RETRY_DELAY', DEFAULT_RETRY_DELAY)
+    return datetime.timedelta(seconds=min(base_delay * 2 ** (attempts - 1), MAX_RETRY_DELAY))
+
+
+def _build_message(email, mail_connection):
+    message = EmailMultiAlternatives(
+        email.subject, email.body, email.from_email, email.recipients, connection=mail_connection)
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def _due_emails(batch_size):
+    emails = OutboundEmail.objects.filter(status='pending', next_attempt_at__lte=timezone.now()).order_by('next_attempt_at', 'id')
+    if connection.features.has_select_for_update_skip_locked:
+        # Nhiều worker chạy song song thì mỗi worker lấy các dòng khác nhau
+        emails = emails.select_for_update(skip_locked=True)
+    return list(emails[:batch_size])
+
+
+def _mark_failed(email, error, max_attempts):
+    email.last_error = f"{type(error).__name__}: {error}"
+    if email.attempts >= max_attempts:
+        email.status = 'failed'
+    else:
+        email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+    logger.warning("Sending email %s failed (attempt %s): %s", email.id, email.attempts, error)
+
+
+def send_pending_emails(batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Gửi một lô email đến hạn qua một kết nối SMTP dùng chung.
+    Email lỗi được hẹn gửi lại với backoff tăng dần, quá EMAIL_OUTBOX_MAX_ATTEMPTS lần thì chuyển sang 'failed'.
+    :return: (số email đã gửi, số email lỗi)
+    """
+    max_attempts = getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)
+    sent = failed = 0
+
+    with transaction.atomic():
+        emails = _due_emails(batch_size)
+        if not emails:
+            return sent, failed
+
+        mail_connection = get_connection(fail_silently=False)
+        try:
+            mail_connection.open()
+            connection_error = None
+        except Exception as e:
+            # Không kết nối được SMTP thì cả lô được hẹn gửi lại
+            connection_error = e
+
+        for email in emails:
+            email.attempts += 1
+            if connection_error is not None:
+                failed += 1
+                _mark_failed(email, connection_error, max_attempts)
+                continue
+            try:
+                mail_connection.send_messages([_build_message(email, mail_connection)])
+            except Exception as e:
+                failed += 1
+                _mark_failed(email, e, max_attempts)
+            else:
+                sent += 1
+                email.status = 'sent'
+                email.sent_at = timezone.now()
+                email.last_error = None
+
+        if connection_error is None:
+            mail_connection.close()
+        OutboundEmail.objects.bulk_update(
+            emails, ['status', 'attempts', 'last_error', 'next_attempt_at', 'sent_at'])
+    return sent, failed
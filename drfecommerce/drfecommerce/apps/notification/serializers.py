@@ -1,7 +1,20 @@
 from rest_framework import serializers
-from .models import Notification
+from .models import Notification, Broadcast
 
 class NotificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Notification
         fields = '__all__'
+
+class BroadcastSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Broadcast
+        fields = '__all__'
+
+class FeedBroadcastSerializer(serializers.ModelSerializer):
+    # Broadcast fan-out on read trong danh sách thông báo của guest, is_read được annotate (broadcasts.feed_broadcasts)
+    is_read = serializers.BooleanField(read_only=True)
+
+    class Meta:
+        model = Broadcast
+        fields = ['id', 'notification_type', 'message', 'url', 'attachment_url', 'is_read', 'created_at']
@@ -0,0 +1,165 @@
+"""
+Đẩy thông báo mới tới guest bằng Server-Sent Events (GET api/notification/stream/), thay cho việc
+poll get-list-notifications / unread-count.
+
+- create_notification publish thông báo (NotificationSerializer) lên kênh notifications:<guest_id>
+  của broker (drfecommerce/pubsub.py) sau khi transaction commit.
+- Stream chỉ chạy dưới ASGI (uvicorn drfecommerce.asgi:application), mỗi kết nối là một coroutine
+  chờ message, không giữ một worker thread. Dưới WSGI endpoint trả về 501.
+- Xác thực bằng access token của guest: header Authorization như các API khác, hoặc query param
+  access_token vì EventSource của trình duyệt không gửi được header.
+- Các event:
+  - notification: id = id thông báo, data = thông báo dạng JSON
+  - unread_count: số thông báo chưa đọc khi vừa kết nối
+  - comment ": keep-alive" mỗi PUSH_HEARTBEAT_SECONDS giây để proxy không đóng kết nối
+- Kết nối lại: EventSource tự gửi header Last-Event-ID, các thông báo có id lớn hơn được gửi bù
+  từ database (tối đa CATCH_UP_LIMIT). Server đóng stream sau PUSH_STREAM_MAX_SECONDS giây
+  (token được kiểm tra lại khi client kết nối lại) hoặc khi client đọc không kịp.
+"""
+import json
+import logging
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework import exceptions, status
+
+from drfecommerce.apps.guest.authentication import GuestSafeJWTAuthentication
+from drfecommerce.jwt_auth import decode_token
+from drfecommerce.pubsub import get_broker
+from .counters import unread_count
+from .models import Notification
+from .serializers import NotificationSerializer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEARTBEAT_SECONDS = 15
+DEFAULT_STREAM_MAX_SECONDS = 300
+# Thời gian (ms) EventSource chờ trước khi kết nối lại
+RETRY_MS = 3000
+CATCH_UP_LIMIT = 100
+
+
+def channel(guest_id):
+    return f"notifications:{guest_id}"
+
+
+def publish_notification(notification):
+    """
+    Gửi thông báo vừa tạo tới các stream của guest sau khi transaction commit.
+    Lỗi của broker chỉ được ghi log: guest vẫn đọc được thông báo qua API danh sách.
+    """
+    message = NotificationSerializer(notification).data
+
+    def send():
+        try:
+            get_broker().publish(channel(notification.guest_id), dict(message))
+        except Exception:
+            logger.warning("Could not publish notification %s", notification.id, exc_info=True)
+
+    transaction.on_commit(send)
+
+
+def format_event(data, event=None, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+def authenticate_guest(request):
+    """
+    :return: Guest của access token (header Authorization hoặc query param access_token), None nếu không có token
+    :raise AuthenticationFailed: token không hợp lệ / đã bị thu hồi
+    """
+    token = request.GET.get('access_token')
+    if token:
+        # get_bearer_payload dùng payload đã decode này thay cho header
+        request._jwt_payload = decode_token(token)
+    result = GuestSafeJWTAuthentication().authenticate(request)
+    return result[0] if result else None
+
+
+def missed_notifications(guest_id, last_event_id):
+    notifications = (Notification.objects.filter(guest_id=guest_id, id__gt=last_event_id)
+                     .order_by('id')[:CATCH_UP_LIMIT])
+    return NotificationSerializer(notifications, many=True).data
+
+
+def _last_event_id(request):
+    value = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+async def events(guest_id, last_event_id=None):
+    """
+    Nội dung stream của một guest, xem docstring của module.
+    """
+    heartbeat = getattr(settings, 'PUSH_HEARTBEAT_SECONDS', DEFAULT_HEARTBEAT_SECONDS)
+    deadline = time.monotonic() + getattr(settings, 'PUSH_STREAM_MAX_SECONDS', DEFAULT_STREAM_MAX_SECONDS)
+    sent_id = last_event_id or 0
+    # Subscribe trước khi đọc bù để không lỡ thông báo tạo ra ở giữa
+    subscription = await get_broker().subscribe(channel(guest_id))
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        if last_event_id is not None:
+            for notification in await sync_to_async(missed_notifications)(guest_id, last_event_id):
+                sent_id = max(sent_id, notification['id'])
+                yield format_event(notification, 'notification', notification['id'])
+        yield format_event({"unread_count": await sync_to_async(unread_count)(guest_id)}, 'unread_count')
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            message = await subscription.get(min(heartbeat, remaining))
+            if subscription.overflowed:
+                break
+            if message is None:
+                yield ": keep-alive\n\n"
+            elif message['id'] > sent_id:
+                # Thông báo đã gửi trong phần đọc bù thì bỏ qua
+                sent_id = message['id']
+                yield format_event(message, 'notification', message['id'])
+    finally:
+        await subscription.close()
+
+
+async def notification_stream(request):
+    """
+    GET api/notification/stream/
+    - access_token (optional): access token của guest khi không gửi được header Authorization
+    - last_event_id (optional): như header Last-Event-ID
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({
+            "status": status.HTTP_501_NOT_IMPLEMENTED,
+            "message": "Notification stream requires the ASGI server."
+        }, status=status.HTTP_501_NOT_IMPLEMENTED)
+
+    try:
+        guest = await sync_to_async(authenticate_guest)(request)
+    except exceptions.AuthenticationFailed as e:
+        guest, message = None, str(e.detail)
+    else:
+        message = "Authentication credentials were not provided."
+    if guest is None:
+        return JsonResponse({
+            "status": status.HTTP_401_UNAUTHORIZED,
+            "message": message
+        }, status=status.HTTP_401_UNAUTHORIZED)
+
+    response = StreamingHttpResponse(events(guest.id, _last_event_id(request)), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # nginx: không buffer response để event tới client ngay
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,7 +1,7 @@
 from rest_framework import viewsets, status
 from rest_framework.response import Response
-from .models import Notification
-from .serializers import NotificationSerializer
+from .models import Notification, Broadcast
+from .serializers import NotificationSerializer, BroadcastSerializer, FeedBroadcastSerializer
 from drfecommerce.apps.order_detail.models import OrderDetail
 from drfecommerce.apps.product.models import Product
 from drfecommerce.apps.guest.models import Guest
@@ -9,9 +9,10 @@ from rest_framework.permissions import IsAuthenticated
 from drfecommerce.apps.guest.authentication import GuestSafeJWTAuthentication
 from drfecommerce.apps.my_admin.authentication import AdminSafeJWTAuthentication
 from rest_framework.decorators import action
-from django.core.paginator import Paginator
-from django.core.paginator import EmptyPage
-from django.core.paginator import PageNotAnInteger
+from drfecommerce.pagination import paginate
+from .counters import unread_count, adjust_unread, mark_read
+from .stream import publish_notification
+from . import broadcasts
 
 def create_notification(
     guest, notification_type, message, 
@@ -26,7 +27,7 @@ def create_notification(
     :attachment_url: đính kèm thêm ví dụ như link ảnh
     :return: None
     """
-    Notification.objects.create(
+    notification = Notification.objects.create(
         guest=guest,
         notification_type=notification_type,
         message=message,
@@ -34,6 +35,16 @@ def create_notification(
         url=url,
         attachment_url = attachment_url
     )
+    adjust_unread(guest.id, 1)
+    # Đẩy tới các stream SSE đang mở của guest (stream.py)
+    publish_notification(notification)
+
+def _forbidden_guest():
+    return Response({
+        "status": status.HTTP_403_FORBIDDEN,
+        "message": "guest_id does not match the access token."
+    }, status=status.HTTP_403_FORBIDDEN)
+
 
 class NotificationViewSet(viewsets.ViewSet):
     authentication_classes = [GuestSafeJWTAuthentication]
@@ -45,10 +56,9 @@ class NotificationViewSet(viewsets.ViewSet):
         - guest_id: id of guest
         - page_index: The index of the page (default is 1).
         - page_size: The number of items per page (default is 10).
+        - cursor (optional): keyset pagination, empty for the first page then next_cursor / previous_cursor.
         """
         guest_id = request.GET.get('guest_id')
-        page_index = int(request.GET.get('page_index', 1))
-        page_size = int(request.GET.get('page_size', 10))
         if not guest_id:
             return Response({
                 "status": status.HTTP_400_BAD_REQUEST,
@@ -65,26 +75,20 @@ class NotificationViewSet(viewsets.ViewSet):
             
         notifications = Notification.objects.filter(guest=guest)
         
-        paginator = Paginator(notifications, page_size)
-
-        try:
-            paginated_notifications = paginator.page(page_index)
-        except PageNotAnInteger:
-            paginated_notifications = paginator.page(1)
-        except EmptyPage:
-            paginated_notifications = paginator.page(paginator.num_pages)
+        paginated_notifications = paginate(request, notifications)
             
-        serializer = NotificationSerializer(paginated_notifications, many=True)
+        serializer = NotificationSerializer(paginated_notifications.object_list, many=True)
         
         return Response({
             "status": status.HTTP_200_OK,
             "message": "OK",
             "data": {
-                "total_pages": paginator.num_pages,
-                "total_items": paginator.count,
-                "page_index": page_index,
-                "page_size": page_size,
-                "notifications": serializer.data
+                **paginated_notifications.meta,
+                "unread_count": unread_count(guest.id),
+                "unread_broadcasts": broadcasts.unread_broadcast_count(guest.id),
+                "notifications": serializer.data,
+                # Broadcast fan-out on read (broadcasts.py), không phân trang
+                "broadcasts": FeedBroadcastSerializer(broadcasts.feed_broadcasts(guest.id), many=True).data,
             }
         }, status=status.HTTP_200_OK)
         
@@ -102,20 +106,156 @@ class NotificationViewSet(viewsets.ViewSet):
                 "message": "Noti ID is required."
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            noti = Notification.objects.get(id=noti_id)
-        except Notification.DoesNotExist:
+        noti = Notification.objects.filter(id=noti_id).values('guest_id', 'is_read').first()
+        if noti is None:
             return Response({
                 "status": status.HTTP_404_NOT_FOUND,
                 "message": "Notification not found."
             }, status=status.HTTP_404_NOT_FOUND)
-            
-        if not noti.is_read:
-            noti.is_read = True
-        
-        noti.save()
+
+        # Đã đọc rồi thì không ghi lại
+        if not noti['is_read']:
+            updated = Notification.objects.filter(id=noti_id, is_read=False).update(is_read=True)
+            adjust_unread(noti['guest_id'], -updated)
         
         return Response({
             "status": status.HTTP_200_OK,
             "message": "Seen this notification",
-        }, status=status.HTTP_200_OK)
\ No newline at end of file
+        }, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['put'], url_path="read-notifications")
+    def read_notifications(self, request):
+        """
+        Đánh dấu đã đọc nhiều thông báo bằng một câu UPDATE.
+        request body:
+        - guest_id (optional): id of guest, phải là guest của access token (mặc định)
+        - noti_ids (optional): list id thông báo, không gửi thì đánh dấu tất cả thông báo của guest
+        - broadcast_ids (optional): list id broadcast fan-out on read (data.broadcasts của get-list-notifications)
+        """
+        guest_id = request.data.get('guest_id', request.user.id)
+        noti_ids = request.data.get('noti_ids')
+        broadcast_ids = request.data.get('broadcast_ids')
+        try:
+            guest_id = int(guest_id)
+            if noti_ids is not None:
+                if not isinstance(noti_ids, list):
+                    raise TypeError
+                noti_ids = [int(noti_id) for noti_id in noti_ids]
+            if broadcast_ids is not None:
+                if not isinstance(broadcast_ids, list):
+                    raise TypeError
+                broadcast_ids = [int(broadcast_id) for broadcast_id in broadcast_ids]
+        except (TypeError, ValueError):
+            return Response({
+                "status": status.HTTP_400_BAD_REQUEST,
+                "message": "guest_id must be an integer, noti_ids and broadcast_ids lists of integers."
+            }, status=status.HTTP_400_BAD_REQUEST)
+        # Chỉ guest của access token được đánh dấu thông báo của mình
+        if guest_id != request.user.id:
+            return _forbidden_guest()
+
+        # Không gửi cả hai list thì đánh dấu tất cả, chỉ gửi một list thì chỉ đánh dấu loại đó
+        mark_all = noti_ids is None and broadcast_ids is None
+        updated = mark_read(guest_id, noti_ids) if noti_ids is not None or mark_all else 0
+        broadcasts_read = broadcasts.mark_broadcasts_read(guest_id, broadcast_ids) if broadcast_ids is not None or mark_all else 0
+
+        return Response({
+            "status": status.HTTP_200_OK,
+            "message": "OK",
+            "data": {
+                "updated": updated,
+                "broadcasts_read": broadcasts_read,
+                "unread_count": unread_count(guest_id),
+                "unread_broadcasts": broadcasts.unread_broadcast_count(guest_id),
+            }
+        }, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], url_path="unread-count")
+    def get_unread_count(self, request):
+        """
+        Số thông báo chưa đọc (badge), đọc từ bộ đếm trong cache.
+        query_params:
+        - guest_id (optional): id of guest, phải là guest của access token (mặc định)
+        """
+        try:
+            guest_id = int(request.GET.get('guest_id', request.user.id))
+        except (TypeError, ValueError):
+            return Response({
+                "status": status.HTTP_400_BAD_REQUEST,
+                "message": "guest_id must be an integer."
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if guest_id != request.user.id:
+            return _forbidden_guest()
+
+        return Response({
+            "status": status.HTTP_200_OK,
+            "message": "OK",
+            "data": {
+                "unread_count": unread_count(guest_id),
+                "unread_broadcasts": broadcasts.unread_broadcast_count(guest_id),
+            }
+        }, status=status.HTTP_200_OK)
+
+class AdminBroadcastViewSet(viewsets.ViewSet):
+    authentication_classes = [AdminSafeJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    @action(detail=False, methods=['post'], url_path="broadcast")
+    def create_broadcast(self, request):
+        """
+        Gửi thông báo cho tất cả guest hoặc một nhóm guest. Với mode write, thông báo của từng guest
+        được tạo ở background bởi worker send_broadcasts, xem tiến độ qua broadcast-status.
+        request body:
+        - message: nội dung thông báo
+        - notification_type (optional): mặc định general
+        - url, attachment_url (optional)
+        - segment (optional): bộ lọc guest, ví dụ {"is_verified": true, "city": "Hanoi"};
+          is_verified, city, country, joined_after, joined_before, guest_ids. Không gửi là tất cả guest.
+        - mode (optional): write (mặc định) hoặc read (fan-out on read, chỉ cho tất cả guest)
+        """
+        data = request.data
+        try:
+            broadcast = broadcasts.create_broadcast(
+                message=data.get('message'),
+                notification_type=data.get('notification_type') or 'general',
+                url=data.get('url'),
+                attachment_url=data.get('attachment_url'),
+                segment=data.get('segment'),
+                mode=data.get('mode') or 'write',
+                admin_id=request.user.id,
+            )
+        except broadcasts.BroadcastError as e:
+            return Response({
+                "status": e.status_code,
+                "message": e.message
+            }, status=e.status_code)
+
+        return Response({
+            "status": status.HTTP_202_ACCEPTED,
+            "message": "Broadcast accepted.",
+            "data": BroadcastSerializer(broadcast).data
+        }, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, methods=['get'], url_path="broadcast-status")
+    def broadcast_status(self, request):
+        """
+        query_params:
+        - id: id of broadcast
+        """
+        try:
+            broadcast = Broadcast.objects.get(id=int(request.GET.get('id')))
+        except (TypeError, ValueError):
+            return Response({
+                "status": status.HTTP_400_BAD_REQUEST,
+                "message": "Broadcast ID is required."
+            }, status=status.HTTP_400_BAD_REQUEST)
+        except Broadcast.DoesNotExist:
+            return Response({
+                "status": status.HTTP_404_NOT_FOUND,
+                "message": "Broadcast not found."
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({
+            "status": status.HTTP_200_OK,
+            "message": "OK",
+            "data": BroadcastSerializer(broadcast).data
+        }, status=status.HTTP_200_OK)
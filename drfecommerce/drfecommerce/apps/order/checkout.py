@@ -0,0 +1,153 @@
+from django.db import transaction
+from django.db.models import Q
+from rest_framework import status
+from .serializers import OrderSerializer
+from drfecommerce.apps.order_detail.models import OrderDetail
+from drfecommerce.apps.product.models import Product
+from drfecommerce.apps.store.models import Store
+from drfecommerce.apps.product_store.models import StockReservation
+from drfecommerce.apps.product_store.reservations import lock_stock_rows, reserve_stock, InsufficientStock
+from drfecommerce.apps.cart.models import Cart, CartItem
+from drfecommerce.apps.cart.services import recalculate_carts
+from drfecommerce.apps.notification.views import create_notification
+
+# Số câu query tối đa cho một lần đặt hàng, không phụ thuộc vào số dòng trong đơn:
+# products, stores, savepoint, lock product_store, update product_store, insert order,
+# bulk insert order_detail, insert stock_reservation, delete cart_item, update tổng giỏ hàng (carts),
+# insert notification, release savepoint
+PLACE_ORDER_QUERY_BUDGET = 12
+
+
+class CheckoutError(Exception):
+    """
+    Lỗi nghiệp vụ khi đặt hàng, view sẽ trả về message và status_code tương ứng.
+    """
+    def __init__(self, message, status_code=status.HTTP_400_BAD_REQUEST):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def parse_order_lines(order_details):
+    """
+    Chuẩn hoá order_details thành list các dict {product_id, store_id, quantity} kiểu int.
+    """
+    lines = []
+    for detail in order_details:
+        try:
+            lines.append({
+                'product_id': int(detail['product_id']),
+                'store_id': int(detail['store_id']),
+                'quantity': int(detail['quantity']),
+            })
+        except (KeyError, TypeError, ValueError):
+            raise CheckoutError("Invalid data type for order details.")
+    return lines
+
+
+def load_checkout_data(lines):
+    """
+    Lấy toàn bộ product và store được tham chiếu trong đơn hàng, mỗi bảng đúng một query.
+    :return: (products, stores)
+    """
+    products = Product.objects.in_bulk({line['product_id'] for line in lines})
+    stores = Store.objects.in_bulk({line['store_id'] for line in lines})
+    return products, stores
+
+
+def validate_order_lines(lines, products, stores):
+    """
+    Kiểm tra sản phẩm, cửa hàng và số lượng cho từng dòng.
+    :return: dict key (product_id, store_id) -> tổng số lượng (các dòng trùng được cộng dồn)
+    """
+    quantities = {}
+    for line in lines:
+        if line['product_id'] not in products:
+            raise CheckoutError("Product not found.", status.HTTP_404_NOT_FOUND)
+        if line['store_id'] not in stores:
+            raise CheckoutError("Store not found.", status.HTTP_404_NOT_FOUND)
+        if line['quantity'] <= 0:
+            raise CheckoutError("Quantity must be greater than zero.")
+        key = (line['product_id'], line['store_id'])
+        quantities[key] = quantities.get(key, 0) + line['quantity']
+    return quantities
+
+
+def calculate_total_cost(lines, products, gst_amount, shipping_cost):
+    total_cost = 0
+    for line in lines:
+        total_cost += products[line['product_id']].price * line['quantity']
+    #chỗ này cần xem lại gst_amount với shipping_cost (cái này không thể tự truyền lên được)
+    total_cost += total_cost * gst_amount + shipping_cost
+    return total_cost
+
+
+def place_order(guest, order_details, data):
+    """
+    Tạo đơn hàng theo kiểu set-based: đọc dữ liệu theo lô, ghi order_detail bằng một bulk_create,
+    giữ hàng trong kho bằng một câu update, xoá các cart_item tương ứng bằng một câu delete,
+    tất cả trong một transaction.
+    :param guest: Guest đặt hàng
+    :param order_details: list [{store_id, product_id, quantity}]
+    :param data: dữ liệu đơn hàng (gst_amount, shipping_cost, payment_method, shipping_address...)
+    :return: (order, serializer)
+    """
+    lines = parse_order_lines(order_details)
+    if not lines:
+        raise CheckoutError("Order details are required.")
+
+    products, stores = load_checkout_data(lines)
+    quantities = validate_order_lines(lines, products, stores)
+
+    data['total_cost'] = calculate_total_cost(
+        lines, products, float(data['gst_amount']), float(data['shipping_cost']))
+
+    serializer = OrderSerializer(data=data)
+    serializer.is_valid(raise_exception=True)
+
+    with transaction.atomic():
+        # Khoá các dòng tồn kho trước khi kiểm tra để hai đơn đặt cùng lúc không bán quá số lượng
+        stocks = lock_stock_rows(quantities)
+        for key in quantities:
+            if key not in stocks:
+                raise CheckoutError(f"{products[key[0]].name} is not sold in this store.", status.HTTP_404_NOT_FOUND)
+
+        # Giữ hàng cho đơn ngay khi tạo, kho sẽ được trả lại nếu đơn bị huỷ
+        try:
+            reserve_stock(stocks, quantities)
+        except InsufficientStock as e:
+            raise CheckoutError(f"Not enough stock for {products[e.product_id].name}. Available: {e.available}")
+
+        order = serializer.save(guest=guest)
+
+        OrderDetail.objects.bulk_create([
+            OrderDetail(
+                order=order,
+                product=products[line['product_id']],
+                store=stores[line['store_id']],
+                product_code=products[line['product_id']].code,
+                product_name=products[line['product_id']].name,
+                quantity=line['quantity'],
+                unit_price=products[line['product_id']].price,
+                location_pickup=stores[line['store_id']].address,
+            )
+            for line in lines
+        ])
+        StockReservation.objects.create(order=order, status='held')
+
+        # Loại bỏ các sản phẩm đã đặt ra khỏi giỏ hàng của guest
+        purchased = Q()
+        for line in lines:
+            purchased |= Q(product_id=line['product_id'], store_id=line['store_id'])
+        CartItem.objects.filter(purchased, cart__guest=guest).delete()
+        recalculate_carts(Cart.objects.filter(guest=guest))
+
+        create_notification(
+            guest=guest,
+            notification_type="order_update",
+            message=f"Your order #{order.id} has been placed successfully.",
+            related_object_id=order.id,
+            url=f"/orders/{order.id}"
+        )
+
+    return order, serializer
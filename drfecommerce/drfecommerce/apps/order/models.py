@@ -32,3 +32,8 @@ class Order(models.Model):
     
     class Meta:
         db_table = 'orders'
+        indexes = [
+            models.Index(fields=['guest', '-order_date'], name='orders_guest_date_idx'),
+            models.Index(fields=['order_status', '-order_date'], name='orders_status_date_idx'),
+            models.Index(fields=['order_date'], name='orders_date_idx'),
+        ]
@@ -1,29 +1,92 @@
 from rest_framework import viewsets, status
 from rest_framework.response import Response
-from django.core.mail import send_mail
 from .models import Order
 from .serializers import OrderSerializer
 from drfecommerce.apps.order_detail.models import OrderDetail
-from drfecommerce.apps.product.models import Product
-from drfecommerce.apps.cart.models import Cart, CartItem
-from drfecommerce.apps.product_store.models import ProductStore
+from drfecommerce.apps.product_store.reservations import commit_order_stock, release_order_stock, InsufficientStock
 from drfecommerce.apps.product_sale.models import ProductSale
-from drfecommerce.apps.store.models import Store
+from drfecommerce.apps.product_sale.rollups import record_sales
 from drfecommerce.apps.guest.models import Guest
 from drfecommerce.settings import base
 from rest_framework.permissions import IsAuthenticated
 from drfecommerce.apps.guest.authentication import GuestSafeJWTAuthentication
 from drfecommerce.apps.my_admin.authentication import AdminSafeJWTAuthentication
 from rest_framework.decorators import action
-from django.shortcuts import get_object_or_404
+from django.db import transaction
 import json
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
-from django.core.paginator import Paginator
-from django.core.paginator import EmptyPage
-from django.core.paginator import PageNotAnInteger
-from datetime import datetime
+from drfecommerce.pagination import paginate
+from drfecommerce.replicas import read_replica
+from drfecommerce import exports
+from datetime import datetime, time, timedelta
+from django.utils import timezone
 from drfecommerce.apps.notification.views import create_notification
+from drfecommerce.apps.notification.outbox import enqueue_email
+from .checkout import place_order, CheckoutError
+
+# Khoá phân trang của danh sách đơn hàng: đi theo các index (guest, -order_date),
+# (order_status, -order_date) và order_date, id để thứ tự ổn định khi trùng order_date
+ORDER_ORDERING = ('-order_date', '-id')
+
+
+def _filter_admin_orders(request, orders):
+    """
+    Lọc đơn hàng cho admin theo start_date, end_date (YYYY-MM-DD, tính trọn ngày), order_status,
+    payment_method, payment_status của request. Dùng chung cho danh sách và export.
+    :raise ValueError: ngày không đúng định dạng (message dùng được cho response 400)
+    """
+    start_date = request.GET.get('start_date')  # Get the start date parameter
+    end_date = request.GET.get('end_date')      # Get the end date parameter
+    order_status = request.GET.get('order_status')  # Get order status filter
+    payment_method = request.GET.get('payment_method')  # Get payment method filter
+    payment_status = request.GET.get('payment_status')  # Get payment status filter
+
+    if start_date:
+        try:
+            # Parse the start date string to a date object
+            start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
+        except ValueError:
+            raise ValueError("Invalid start date format. Please use YYYY-MM-DD.") from None
+        # So sánh trực tiếp với order_date (không dùng __date) để dùng được index trên order_date
+        orders = orders.filter(order_date__gte=timezone.make_aware(datetime.combine(start_date, time.min)))
+
+    if end_date:
+        try:
+            # Parse the end date string to a date object
+            end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
+        except ValueError:
+            raise ValueError("Invalid end date format. Please use YYYY-MM-DD.") from None
+        orders = orders.filter(order_date__lt=timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min)))
+
+    # Apply filters for order status, payment method, and payment status
+    if order_status:
+        orders = orders.filter(order_status=order_status)
+
+    if payment_method:
+        orders = orders.filter(payment_method=payment_method)
+
+    if payment_status:
+        orders = orders.filter(payment_status=payment_status)
+    return orders
+
+# Cột của file export đơn hàng (tiêu đề, field)
+ORDER_EXPORT_COLUMNS = (
+    ('id', 'id'),
+    ('order_date', 'order_date'),
+    ('guest_id', 'guest_id'),
+    ('guest_email', 'guest__email'),
+    ('recipient_name', 'recipient_name'),
+    ('recipient_phone', 'recipient_phone'),
+    ('shipping_address', 'shipping_address'),
+    ('order_status', 'order_status'),
+    ('payment_method', 'payment_method'),
+    ('payment_status', 'payment_status'),
+    ('gst_amount', 'gst_amount'),
+    ('shipping_cost', 'shipping_cost'),
+    ('total_cost', 'total_cost'),
+)
+
 class OrderViewSet(viewsets.ViewSet):
     #api xử lí tạo đơn hàng khi mà người dùng chọn phương thức là thanh toán khi nhận hàng
     authentication_classes = [GuestSafeJWTAuthentication]
@@ -48,8 +111,6 @@ class OrderViewSet(viewsets.ViewSet):
         """
         data = request.data.copy()
         guest_id = data.get('guest_id')
-        gst_amount = float(data['gst_amount'])  # Chuyển đổi gst_amount sang số
-        shipping_cost = float(data['shipping_cost'])  # Chuyển đổi shipping_cost sang số
         # Nhận order_details dưới dạng chuỗi
         order_details_str = data.get('order_details', [])
 
@@ -67,90 +128,24 @@ class OrderViewSet(viewsets.ViewSet):
         if not order_details:
             return Response({"message": "Order details are required."}, status=status.HTTP_400_BAD_REQUEST)
 
-        total_cost = 0
-        
-        for detail in order_details:
-            quantity = detail['quantity']
-            #cần check thêm ở chỗ product_store. Nếu sản phẩm còn hàng thì cho vào
-            product = get_object_or_404(Product, id=int(detail['product_id']))
-            store = get_object_or_404(Store, id=detail['store_id'])
-            
-            # Kiểm tra số lượng tồn kho
-            product_store = get_object_or_404(ProductStore, product=product, store=store)
-            if product_store.remaining_stock < quantity:
-                return Response({"message": f"Not enough stock for {product.name}. Available: {product_store.remaining_stock}"}, status=status.HTTP_400_BAD_REQUEST)
-
-            if quantity <= 0:
-                return Response({"message": "Quantity must be greater than zero."}, status=status.HTTP_400_BAD_REQUEST)
-
-            product = get_object_or_404(Product, id=int(detail['product_id']))
-            unit_price = product.price
-            total_cost += unit_price * quantity
-        #chỗ này cần xem lại gst_amount với shipping_cost (cái này không thể tự truyền lên được)
-        total_cost += total_cost * gst_amount + shipping_cost
-
-        data['total_cost'] = total_cost
-        # data['payment_methods'] = "cash_on_delivery"
-
-        # guest = get_object_or_404(Guest, id=guest_id)
-        data['guest'] = guest_id
-        
-        serializer = OrderSerializer(data=data)
-        if serializer.is_valid(raise_exception=True):
-            order = serializer.save()
-
-            # Step 2: Create OrderDetails
-            for detail in order_details:
-                product = get_object_or_404(Product, id=detail['product_id'])
-                store = get_object_or_404(Store, id=detail['store_id'])
-                quantity = detail['quantity']
-                unit_price = product.price
-                
-                OrderDetail.objects.create(
-                    order=order,
-                    product=product,
-                    store=store,
-                    product_code=product.code,
-                    product_name=product.name,
-                    quantity=quantity,
-                    unit_price=unit_price,
-                    location_pickup=store.address
-                )
+        try:
+            guest = Guest.objects.get(id=guest_id)  # Lấy đối tượng guest
+        except (Guest.DoesNotExist, ValueError, TypeError):
+            return Response({'message': 'Guest not found.', "status":status.HTTP_404_NOT_FOUND}, status=status.HTTP_404_NOT_FOUND)
 
-            # Step 3: Xử lý các sản phẩm trong giỏ hàng sau khi tạo đơn hàng thành công
-            #Check nếu nó nằm trong giỏ hàng thì loại bỏ nó đi
-            cart = Cart.objects.filter(guest_id=guest_id).first()
-            if cart:
-                for detail in order_details:
-                    product = get_object_or_404(Product, id=detail['product_id'])
-                    store = get_object_or_404(Store, id=detail['store_id'])
-                    
-                    # Kiểm tra sản phẩm có trong giỏ hàng không
-                    cart_item = CartItem.objects.filter(cart=cart, product=product, store=store).first()
-                    if cart_item:
-                        # Nếu có, loại bỏ nó ra khỏi giỏ hàng
-                        cart_item.delete()
-            # Step 4: Gửi thông báo đến guest
-            try:
-                guest = Guest.objects.get(id=guest_id)  # Lấy đối tượng guest
-            except Guest.DoesNotExist:
-                return Response({'Guest': 'Order not found.', "status":status.HTTP_404_NOT_FOUND}, status=status.HTTP_404_NOT_FOUND)
-            
-            create_notification(
-                guest=guest,  # Gửi đối tượng guest
-                notification_type="order_update",  # Loại thông báo
-                message=f"Your order #{order.id} has been placed successfully.",  # Nội dung thông báo
-                related_object_id=order.id,  # Liên kết với mã đơn hàng
-                url=f"/orders/{order.id}"  # URL dẫn đến đơn hàng
-            )
-        
-            # Handle payment processing
-            payment_method = data['payment_methods']
-            if payment_method == "e_wallet":
-                return self.redirect_to_payment_gateway(order)
-            elif payment_method == "cash_on_delivery":
-                self.send_order_email_to_admin(order)
-                return Response(serializer.data, status=status.HTTP_201_CREATED)
+        # Tạo order, order_detail, xoá cart_item và gửi thông báo trong một transaction
+        try:
+            order, serializer = place_order(guest, order_details, data)
+        except CheckoutError as e:
+            return Response({"message": e.message, "status": e.status_code}, status=e.status_code)
+
+        # Handle payment processing
+        payment_method = data['payment_methods']
+        if payment_method == "e_wallet":
+            return self.redirect_to_payment_gateway(order)
+        elif payment_method == "cash_on_delivery":
+            self.send_order_email_to_admin(order)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
@@ -214,6 +209,7 @@ class OrderViewSet(viewsets.ViewSet):
             # Kiểm tra nếu số tiền thanh toán có khớp với total_cost
             if paid_amount == order.total_cost and payment_status == 'success':
                 # Cập nhật trạng thái thanh toán của đơn hàng
+                commit_order_stock(order)
                 order.payment_status = 'paid'
                 order.order_status = 'confirmed'
                 order.save()
@@ -287,17 +283,14 @@ class OrderViewSet(viewsets.ViewSet):
         # Danh sách người nhận
         recipient_list = [base.ADMIN_EMAIL]
 
-        # Gửi email
-        send_mail(
+        # Đưa email vào outbox, worker send_outbound_emails sẽ gửi
+        enqueue_email(
             subject,
             plain_message,  # Nội dung thuần
-            base.DEFAULT_FROM_EMAIL,
             recipient_list,
-            html_message=html_message  # Nội dung HTML
+            html_message=html_message,  # Nội dung HTML
+            from_email=base.DEFAULT_FROM_EMAIL
         )
-
-        # Log gửi email
-        print(f"Email sent to admin: {base.ADMIN_EMAIL} for Order {order.id}")
         
     @action(detail=True, methods=['put'], url_path="cancel-order")
     def cancel_order(self, request):
@@ -311,9 +304,11 @@ class OrderViewSet(viewsets.ViewSet):
 
             # Check if the order status is 'pending'
             if order.order_status == 'pending':
-                # Update the order status to 'cancel'
-                order.order_status = 'cancelled'
-                order.save()
+                # Update the order status to 'cancel' và trả lại phần hàng đã giữ trong kho
+                with transaction.atomic():
+                    release_order_stock(order)
+                    order.order_status = 'cancelled'
+                    order.save()
                 
                 guest = order.guest  # Assuming the guest is related to the order
                 create_notification(
@@ -354,17 +349,18 @@ class OrderViewSet(viewsets.ViewSet):
         # Define recipient list
         recipient_list = [base.ADMIN_EMAIL]
 
-        # Send the email
-        send_mail(
+        # Queue the email, worker send_outbound_emails sẽ gửi
+        enqueue_email(
             subject,
             plain_message,  # Plain text version
-            base.DEFAULT_FROM_EMAIL,
             recipient_list,
-            html_message=html_message  # HTML content version
+            html_message=html_message,  # HTML content version
+            from_email=base.DEFAULT_FROM_EMAIL
         )
         
     #get list order
     @action(detail=False, methods=['get'], url_path="get-list-orders")
+    @read_replica
     def list_orders(self, request):
         """
         Get list of orders with pagination and optional date range filtering.
@@ -372,12 +368,11 @@ class OrderViewSet(viewsets.ViewSet):
         Parameters:
         - page_index: The index of the page (default is 1).
         - page_size: The number of items per page (default is 10).
+        - cursor (optional): keyset pagination, empty for the first page then next_cursor / previous_cursor.
         - guest_id: ID of the guest.
         - start_date: The start date to filter orders (format: YYYY-MM-DD).
         - end_date: The end date to filter orders (format: YYYY-MM-DD).
         """
-        page_index = int(request.GET.get('page_index', 1))
-        page_size = int(request.GET.get('page_size', 10))
         guest_id = request.GET.get('guest_id')
         start_date = request.GET.get('start_date')  # Get the start date parameter
         end_date = request.GET.get('end_date')      # Get the end date parameter
@@ -405,7 +400,8 @@ class OrderViewSet(viewsets.ViewSet):
                 try:
                     # Parse the start date string to a date object
                     start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
-                    orders = orders.filter(order_date__date__gte=start_date)  # Greater than or equal to start_date
+                    # So sánh trực tiếp với order_date (không dùng __date) để dùng được index trên order_date
+                    orders = orders.filter(order_date__gte=timezone.make_aware(datetime.combine(start_date, time.min)))
                 except ValueError:
                     return Response({
                         "status": status.HTTP_400_BAD_REQUEST,
@@ -416,43 +412,99 @@ class OrderViewSet(viewsets.ViewSet):
                 try:
                     # Parse the end date string to a date object
                     end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
-                    orders = orders.filter(order_date__date__lte=end_date)  # Less than or equal to end_date
+                    orders = orders.filter(order_date__lt=timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min)))
                 except ValueError:
                     return Response({
                         "status": status.HTTP_400_BAD_REQUEST,
                         "message": "Invalid end date format. Please use YYYY-MM-DD."
                     }, status=status.HTTP_400_BAD_REQUEST)
 
-        paginator = Paginator(orders, page_size)
-
-        try:
-            paginated_orders = paginator.page(page_index)
-        except PageNotAnInteger:
-            paginated_orders = paginator.page(1)
-        except EmptyPage:
-            paginated_orders = paginator.page(paginator.num_pages)
+        paginated_orders = paginate(request, orders, ordering=ORDER_ORDERING)
 
-        serializer = OrderSerializer(paginated_orders, many=True)
+        serializer = OrderSerializer(paginated_orders.object_list, many=True)
 
         return Response({
             "status": status.HTTP_200_OK,
             "message": "OK",
             "data": {
-                "total_pages": paginator.num_pages,
-                "total_items": paginator.count,
-                "page_index": page_index,
-                "page_size": page_size,
+                **paginated_orders.meta,
                 "orders": serializer.data
             }
         }, status=status.HTTP_200_OK)
-    #admin get list order and xử lí đơn hàng
-    
+
+
+def _change_order_status(order, new_status):
+    """
+    Chuyển đơn hàng sang trạng thái mới: kho, doanh thu (ProductSale, rollup), thông báo và order_status.
+    Phải được gọi bên trong transaction.atomic() với đơn hàng đã bị khoá (select_for_update).
+    :raise InsufficientStock: không đủ hàng để chốt đơn
+    """
+    # Kho đã được giữ khi tạo đơn: confirm/shipped/delivered thì chốt phần hàng đã giữ,
+    # cancelled/returned thì trả lại kho
+    if new_status in ['confirmed', 'shipped', 'delivered']:
+        commit_order_stock(order)
+    elif new_status in ['cancelled', 'returned']:
+        release_order_stock(order)
+
+    if new_status == 'delivered':
+        # Update ProductSale with sale details, đồng thời cộng vào bảng doanh thu theo ngày.
+        # Đơn hàng đã bị khoá nên hai lần cập nhật delivered cùng lúc không cùng tạo ProductSale
+        if not ProductSale.objects.filter(order_detail__order=order).exists():
+            sales = ProductSale.objects.bulk_create([
+                ProductSale(
+                    product_id=detail.product_id,
+                    store_id=detail.store_id,
+                    order_detail=detail,
+                    sale_price=detail.unit_price,
+                    quantity_sold=detail.quantity,
+                    vat=order.gst_amount,
+                    shipping_cost=order.shipping_cost
+                )
+                for detail in order.orderdetail_set.all()
+            ])
+            record_sales(sales)
+
+    # Update the order status
+    order.order_status = new_status
+    if order.order_status == "confirmed":
+        guest = order.guest  # Assuming the guest is related to the order
+        create_notification(
+            guest=guest,  # Gửi đối tượng guest
+            notification_type="order_update",  # Loại thông báo
+            message=f"Your order #{order.id} has been confirmed by VivaFlower.",  # Nội dung thông báo
+            related_object_id=order.id,  # Liên kết với mã đơn hàng
+            url=f"/orders/{order.id}"  # URL dẫn đến đơn hàng đã hủy
+        )
+    if order.order_status == "delivered":
+        guest = order.guest  # Assuming the guest is related to the order
+        create_notification(
+            guest=guest,  # Gửi đối tượng guest
+            notification_type="order_update",  # Loại thông báo
+            message=f"Your order #{order.id} has been delivered. You can rate the product quality.",  # Nội dung thông báo
+            related_object_id=order.id,  # Liên kết với mã đơn hàng
+            url=f"/orders/{order.id}"  # URL dẫn đến đơn hàng đã hủy
+        )
+
+    if order.order_status == "shipped":
+        guest = order.guest  # Assuming the guest is related to the order
+        create_notification(
+            guest=guest,  # Gửi đối tượng guest
+            notification_type="order_update",  # Loại thông báo
+            message=f"Your order #{order.id} has been delivered to the carrier.",  # Nội dung thông báo
+            related_object_id=order.id,  # Liên kết với mã đơn hàng
+            url=f"/orders/{order.id}"  # URL dẫn đến đơn hàng đã hủy
+        )
+
+    order.save()
+
+#admin get list order and xử lí đơn hàng
 class AdminOrderViewSet(viewsets.ViewSet):
     #api xử lí tạo đơn hàng khi mà người dùng chọn phương thức là thanh toán khi nhận hàng
     authentication_classes = [AdminSafeJWTAuthentication]
     permission_classes = [IsAuthenticated]
     #get list order
     @action(detail=False, methods=['get'], url_path="get-list-orders")
+    @read_replica
     def list_orders(self, request):
         """
         Get list of orders with pagination and optional date range filtering.
@@ -460,77 +512,59 @@ class AdminOrderViewSet(viewsets.ViewSet):
         Parameters:
         - page_index: The index of the page (default is 1).
         - page_size: The number of items per page (default is 10).
+        - cursor (optional): keyset pagination, empty for the first page then next_cursor / previous_cursor.
         - start_date: The start date to filter orders (format: YYYY-MM-DD).
         - end_date: The end date to filter orders (format: YYYY-MM-DD).
         - order_status: The status of the order to filter.
         - payment_method: The payment method to filter.
         - payment_status: The payment status to filter.
         """
-        page_index = int(request.GET.get('page_index', 1))
-        page_size = int(request.GET.get('page_size', 10))
-        start_date = request.GET.get('start_date')  # Get the start date parameter
-        end_date = request.GET.get('end_date')      # Get the end date parameter
-        order_status = request.GET.get('order_status')  # Get order status filter
-        payment_method = request.GET.get('payment_method')  # Get payment method filter
-        payment_status = request.GET.get('payment_status')  # Get payment status filter
-        # Start building the query
-        orders = Order.objects.all()
-
-        # If start_date or end_date is provided, filter orders by date range
-        if start_date or end_date:
-            if start_date:
-                try:
-                    # Parse the start date string to a date object
-                    start_date = datetime.strptime(start_date, "%Y-%m-%d").date()
-                    orders = orders.filter(order_date__date__gte=start_date)  # Greater than or equal to start_date
-                except ValueError:
-                    return Response({
-                        "status": status.HTTP_400_BAD_REQUEST,
-                        "message": "Invalid start date format. Please use YYYY-MM-DD."
-                    }, status=status.HTTP_400_BAD_REQUEST)
-
-            if end_date:
-                try:
-                    # Parse the end date string to a date object
-                    end_date = datetime.strptime(end_date, "%Y-%m-%d").date()
-                    orders = orders.filter(order_date__date__lte=end_date)  # Less than or equal to end_date
-                except ValueError:
-                    return Response({
-                        "status": status.HTTP_400_BAD_REQUEST,
-                        "message": "Invalid end date format. Please use YYYY-MM-DD."
-                    }, status=status.HTTP_400_BAD_REQUEST)        
-         # Apply filters for order status, payment method, and payment status
-        if order_status:
-            orders = orders.filter(order_status=order_status)
-        
-        if payment_method:
-            orders = orders.filter(payment_method=payment_method)
-
-        if payment_status:
-            orders = orders.filter(payment_status=payment_status)
-            
-        paginator = Paginator(orders, page_size)
-
         try:
-            paginated_orders = paginator.page(page_index)
-        except PageNotAnInteger:
-            paginated_orders = paginator.page(1)
-        except EmptyPage:
-            paginated_orders = paginator.page(paginator.num_pages)
+            orders = _filter_admin_orders(request, Order.objects.all())
+        except ValueError as e:
+            return Response({
+                "status": status.HTTP_400_BAD_REQUEST,
+                "message": str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
 
-        serializer = OrderSerializer(paginated_orders, many=True)
+        paginated_orders = paginate(request, orders, ordering=ORDER_ORDERING)
+
+        serializer = OrderSerializer(paginated_orders.object_list, many=True)
 
         return Response({
             "status": status.HTTP_200_OK,
             "message": "OK",
             "data": {
-                "total_pages": paginator.num_pages,
-                "total_items": paginator.count,
-                "page_index": page_index,
-                "page_size": page_size,
+                **paginated_orders.meta,
                 "orders": serializer.data
             }
         }, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], url_path="export-orders")
+    @read_replica
+    def export_orders(self, request):
+        """
+        Export orders as a file, streamed from the database (constant memory for any number of rows).
+
+        Parameters:
+        - file_format: csv | xlsx (default=csv).
+        - start_date, end_date, order_status, payment_method, payment_status: same filters as get-list-orders.
+        """
+        file_format = request.GET.get('file_format', 'csv')
+        if file_format not in exports.FORMATS:
+            return Response({
+                "status": status.HTTP_400_BAD_REQUEST,
+                "message": f"Unsupported format, expected one of: {', '.join(exports.FORMATS)}."
+            }, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            orders = _filter_admin_orders(request, Order.objects.order_by('id'))
+        except ValueError as e:
+            return Response({
+                "status": status.HTTP_400_BAD_REQUEST,
+                "message": str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return exports.export_response(orders, ORDER_EXPORT_COLUMNS, file_format, 'orders')
     
     #admin update order
     @action(detail=False, methods=['put'], url_path="update-order-status")
@@ -543,8 +577,8 @@ class AdminOrderViewSet(viewsets.ViewSet):
         data = request.data
         order_id = data.get('order_id')
         new_status = data.get('order_status')
-        # Nếu confirm thì trừ số lượng quantity trong product_store
-        # Returned thì cộng lại quantity vào trong product_store
+        # Kho được giữ khi tạo đơn, confirm thì chốt phần hàng đã giữ trong product_store
+        # Cancelled / Returned thì cộng lại quantity vào trong product_store
         # Delivered thì cập nhật lại vào phần product_sale
         # Mỗi lần cập nhật trạng thái sẽ báo mail về cho người dùng.
         
@@ -554,77 +588,21 @@ class AdminOrderViewSet(viewsets.ViewSet):
                 "status":status.HTTP_400_BAD_REQUEST,
                 "message": "Invalid order status."}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Fetch the order
+        # Kho, doanh thu và trạng thái mới được ghi trong cùng một transaction. Đơn hàng bị khoá trước:
+        # commit_order_stock dựa vào trạng thái hiện tại, hai admin cập nhật cùng lúc thì lần sau chờ lần trước xong
         try:
-            order = Order.objects.get(id=order_id)
-        except Order.DoesNotExist:
-            return Response({"message": "Order not found.", "status":status.HTTP_404_NOT_FOUND}, status=status.HTTP_404_NOT_FOUND)
-
-        # Handle status-specific actions
-        if new_status == 'confirmed':
-            # Reduce quantity from ProductStore for each order detail
-            for detail in order.orderdetail_set.all():
-                product_store = ProductStore.objects.get(product=detail.product, store=detail.store)
-                if product_store.remaining_stock < detail.quantity:
-                    return Response({
-                        "status": status.HTTP_400_BAD_REQUEST,
-                        "message": f"Not enough stock for product {detail.product.name}."
-                        }, status=status.HTTP_400_BAD_REQUEST)
-                product_store.remaining_stock -= detail.quantity
-                product_store.save()
-
-        elif new_status == 'returned':
-            # Add quantity back to ProductStore
-            for detail in order.orderdetail_set.all():
-                product_store = ProductStore.objects.get(product=detail.product, store=detail.store)
-                product_store.remaining_stock += detail.quantity
-                product_store.save()
-
-        elif new_status == 'delivered':
-            # Update ProductSale with sale details
-            for detail in order.orderdetail_set.all():
-                ProductSale.objects.create(
-                    product=detail.product,
-                    store=detail.store,
-                    order_detail=detail,
-                    sale_price=detail.unit_price,
-                    quantity_sold=detail.quantity,
-                    vat=order.gst_amount,
-                    shipping_cost=order.shipping_cost
-                )
+            with transaction.atomic():
+                order = Order.objects.select_for_update().filter(id=order_id).first()
+                if order is None:
+                    return Response({"message": "Order not found.", "status":status.HTTP_404_NOT_FOUND}, status=status.HTTP_404_NOT_FOUND)
+                _change_order_status(order, new_status)
+        except InsufficientStock as e:
+            product_name = OrderDetail.objects.filter(order_id=order_id, product_id=e.product_id).values_list('product_name', flat=True).first()
+            return Response({
+                "status": status.HTTP_400_BAD_REQUEST,
+                "message": f"Not enough stock for product {product_name}."
+                }, status=status.HTTP_400_BAD_REQUEST)
 
-        # Update the order status
-        order.order_status = new_status
-        if order.order_status == "confirmed":
-            guest = order.guest  # Assuming the guest is related to the order
-            create_notification(
-                guest=guest,  # Gửi đối tượng guest
-                notification_type="order_update",  # Loại thông báo
-                message=f"Your order #{order.id} has been confirmed by VivaFlower.",  # Nội dung thông báo
-                related_object_id=order.id,  # Liên kết với mã đơn hàng
-                url=f"/orders/{order.id}"  # URL dẫn đến đơn hàng đã hủy
-            )
-        if order.order_status == "delivered":
-            guest = order.guest  # Assuming the guest is related to the order
-            create_notification(
-                guest=guest,  # Gửi đối tượng guest
-                notification_type="order_update",  # Loại thông báo
-                message=f"Your order #{order.id} has been delivered. You can rate the product quality.",  # Nội dung thông báo
-                related_object_id=order.id,  # Liên kết với mã đơn hàng
-                url=f"/orders/{order.id}"  # URL dẫn đến đơn hàng đã hủy
-            )
-            
-        if order.order_status == "shipped":
-            guest = order.guest  # Assuming the guest is related to the order
-            create_notification(
-                guest=guest,  # Gửi đối tượng guest
-                notification_type="order_update",  # Loại thông báo
-                message=f"Your order #{order.id} has been delivered to the carrier.",  # Nội dung thông báo
-                related_object_id=order.id,  # Liên kết với mã đơn hàng
-                url=f"/orders/{order.id}"  # URL dẫn đến đơn hàng đã hủy
-            )
-            
-        order.save()
         # Send notification email
         self.send_order_status_update_email(order, new_status)
 
@@ -641,12 +619,12 @@ class AdminOrderViewSet(viewsets.ViewSet):
         plain_message = strip_tags(html_message)
         recipient_list = [order.guest.email]
 
-        send_mail(
+        enqueue_email(
             subject,
             plain_message,
-            base.DEFAULT_FROM_EMAIL,
             recipient_list,
             html_message=html_message,
+            from_email=base.DEFAULT_FROM_EMAIL,
         )
 
     #admin update order
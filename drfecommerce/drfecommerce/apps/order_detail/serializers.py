@@ -1,9 +1,11 @@
 from rest_framework import serializers
+from drfecommerce.eager_loading import EagerLoadingMixin
 from .models import OrderDetail
 
-class OrderDetailSerializer(serializers.ModelSerializer):
+class OrderDetailSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     product_image = serializers.CharField(source='product.image', read_only=True)
     product_gallery = serializers.CharField(source='product.gallery', read_only=True)
+    select_related_fields = ('product',)
     class Meta:
         model = OrderDetail
         fields = ['id', 'order', 'product', 'product_image', 'product_gallery','store', 'product_code', 
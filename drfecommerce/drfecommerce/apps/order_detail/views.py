@@ -38,16 +38,17 @@ class OrderDetailViewSet(viewsets.ModelViewSet):
                 "message": "Order not found."
             }, status=status.HTTP_404_NOT_FOUND)
             
-        try:
-            order_detail = OrderDetail.objects.get(order=order)
-            serializer = OrderDetailSerializer(order_detail)
-            return Response({
-                "status": status.HTTP_200_OK,
-                "data": serializer.data
-            }, status=status.HTTP_200_OK)
-        except OrderDetail.DoesNotExist:
+        # Một đơn hàng có nhiều dòng, trả về toàn bộ các dòng (product được load kèm trong cùng query)
+        order_details = OrderDetailSerializer.setup_eager_loading(
+            OrderDetail.objects.filter(order=order).order_by('id'))
+        if not order_details:
             return Response({
                 "status": status.HTTP_404_NOT_FOUND,
                 "message": "Order detail not found."
             }, status=status.HTTP_404_NOT_FOUND)
-            
\ No newline at end of file
+
+        serializer = OrderDetailSerializer(order_details, many=True)
+        return Response({
+            "status": status.HTTP_200_OK,
+            "data": serializer.data
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,302 @@
+"""
+Import / export sản phẩm hàng loạt (CSV hoặc JSONL), dùng cho API admin và lệnh import_products.
+
+Import:
+- File được đọc từng dòng, validate theo lô (batch_size dòng) bằng ProductImportSerializer.
+- catalog / promotion được tra trong dict nạp một lần cho cả file:
+  catalog_id hoặc catalog_name, promotion_id hoặc promotion_code.
+- Mỗi lô là một câu INSERT ... ON CONFLICT (code) DO UPDATE (bulk_create update_conflicts),
+  chỉ cập nhật các cột có trong file (header CSV / key của dòng JSONL đầu tiên).
+  Khi cột price được cập nhật, subtotal của các giỏ hàng chứa product đó được tính lại.
+- Dòng lỗi được bỏ qua và trả về trong danh sách errors (số dòng + lỗi).
+- File hỏng (không phải UTF-8, CSV sai cú pháp) thì dừng đọc ở chỗ hỏng: các dòng đọc được trước đó
+  vẫn được import, phần còn lại được báo là một lỗi.
+
+Export: queryset.iterator() + StreamingHttpResponse, bộ nhớ không phụ thuộc số sản phẩm.
+"""
+import csv
+import io
+import json
+
+from django.db import transaction
+from rest_framework import serializers
+
+from drfecommerce.apps.cart.models import Cart
+from drfecommerce.apps.cart.services import recalculate_carts
+from drfecommerce.apps.catalog.models import Catalog
+from drfecommerce.apps.my_admin.images import variants_by_url
+from drfecommerce.apps.promotion.models import Promotion
+from drfecommerce.exports import csv_rows
+from drfecommerce.search import rebuild_search_documents
+from .models import Product
+
+DEFAULT_BATCH_SIZE = 1000
+# Số lỗi tối đa được trả về, các lỗi sau chỉ được đếm
+MAX_REPORTED_ERRORS = 100
+FORMATS = ('csv', 'jsonl')
+# Lỗi khi đọc file (giải mã UTF-8 / parse CSV), không đọc tiếp được phần sau của file
+FILE_ERRORS = (UnicodeDecodeError, csv.Error)
+
+# Cột của file import / export (export ghi đúng các cột này nên file export import lại được)
+PRODUCT_FIELDS = (
+    'code', 'name', 'short_description', 'description', 'product_type', 'price', 'member_price',
+    'quantity', 'image', 'gallery', 'weight', 'diameter', 'dimensions', 'material', 'label',
+)
+EXPORT_FIELDS = PRODUCT_FIELDS + ('catalog_id', 'promotion_id')
+
+
+class ProductImportSerializer(serializers.Serializer):
+    code = serializers.CharField(max_length=50)
+    name = serializers.CharField(max_length=255)
+    short_description = serializers.CharField(max_length=255, required=False, allow_blank=True, default='')
+    description = serializers.CharField(required=False, allow_blank=True, default='')
+    product_type = serializers.CharField(required=False, allow_blank=True, default='')
+    price = serializers.FloatField(min_value=0)
+    member_price = serializers.FloatField(min_value=0, required=False, default=0)
+    quantity = serializers.IntegerField(min_value=0, required=False, default=0)
+    image = serializers.CharField(max_length=255, required=False, allow_blank=True, default='')
+    gallery = serializers.CharField(required=False, allow_blank=True, default='')
+    weight = serializers.FloatField(min_value=0, required=False, default=0)
+    diameter = serializers.FloatField(min_value=0, required=False, default=0)
+    dimensions = serializers.CharField(max_length=255, required=False, allow_blank=True, default='')
+    material = serializers.CharField(max_length=255, required=False, allow_blank=True, default='')
+    label = serializers.CharField(max_length=255, required=False, allow_blank=True, default='')
+    catalog_id = serializers.IntegerField(required=False, allow_null=True)
+    catalog_name = serializers.CharField(required=False, allow_blank=True)
+    promotion_id = serializers.IntegerField(required=False, allow_null=True)
+    promotion_code = serializers.CharField(required=False, allow_blank=True)
+
+
+class ReferenceMaps:
+    """
+    Tra cứu catalog / promotion trong bộ nhớ, nạp một lần cho cả file import.
+    """
+    def __init__(self):
+        self.catalog_ids = set()
+        self.catalog_names = {}
+        for catalog_id, name in Catalog.objects.filter(delete_at__isnull=True).values_list('id', 'name'):
+            self.catalog_ids.add(catalog_id)
+            # Tên trùng nhau thì không tra theo tên được
+            self.catalog_names[name] = None if name in self.catalog_names else catalog_id
+        self.promotion_ids = set()
+        self.promotion_codes = {}
+        for promotion_id, code in Promotion.objects.values_list('id', 'code'):
+            self.promotion_ids.add(promotion_id)
+            self.promotion_codes[code] = promotion_id
+
+    def resolve(self, row):
+        """
+        :return: (catalog_id, promotion_id, errors)
+        """
+        errors = {}
+        catalog_id = row.get('catalog_id')
+        if catalog_id is not None:
+            if catalog_id not in self.catalog_ids:
+                errors['catalog_id'] = f"Catalog {catalog_id} not found."
+        elif row.get('catalog_name'):
+            catalog_id = self.catalog_names.get(row['catalog_name'])
+            if catalog_id is None:
+                errors['catalog_name'] = (f"Catalog name '{row['catalog_name']}' is ambiguous."
+                                          if row['catalog_name'] in self.catalog_names
+                                          else f"Catalog '{row['catalog_name']}' not found.")
+
+        promotion_id = row.get('promotion_id')
+        if promotion_id is not None:
+            if promotion_id not in self.promotion_ids:
+                errors['promotion_id'] = f"Promotion {promotion_id} not found."
+        elif row.get('promotion_code'):
+            promotion_id = self.promotion_codes.get(row['promotion_code'])
+            if promotion_id is None:
+                errors['promotion_code'] = f"Promotion '{row['promotion_code']}' not found."
+        return catalog_id, promotion_id, errors
+
+
+def _clean(record):
+    # Ô trống trong CSV được coi như không có giá trị
+    return {key.strip(): value for key, value in record.items()
+            if key and value is not None and value != ''}
+
+
+def read_records(stream, file_format):
+    """
+    Đọc file import từng dòng.
+    :param stream: file text
+    :param file_format: 'csv' hoặc 'jsonl'
+    :return: (danh sách cột của file, iterator (số dòng, dict))
+    """
+    if file_format == 'csv':
+        reader = csv.DictReader(stream)
+        columns = [column.strip() for column in reader.fieldnames or []]
+        return columns, ((reader.line_num, _clean(record)) for record in reader)
+
+    lines = ((line_number, line) for line_number, line in enumerate(stream, start=1) if line.strip())
+    first = next(lines, None)
+    if first is None:
+        return [], iter(())
+    try:
+        columns = list(json.loads(first[1]))
+    except (TypeError, ValueError):
+        columns = []
+    return columns, (_parse_json_line(line_number, line) for line_number, line in _chain(first, lines))
+
+
+def _parse_json_line(line_number, line):
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return line_number, None
+    return line_number, _clean(record) if isinstance(record, dict) else None
+
+
+def _chain(first, rest):
+    yield first
+    yield from rest
+
+
+def _file_error(error):
+    if isinstance(error, UnicodeDecodeError):
+        return {'non_field_errors': ["File is not valid UTF-8, the rest of the file was skipped."]}
+    return {'non_field_errors': [f"Invalid CSV ({error}), the rest of the file was skipped."]}
+
+
+def _until_file_error(records):
+    """
+    Đọc records tới khi file hỏng, lỗi đọc file được trả về như một dòng (số dòng, exception).
+    """
+    line = 1
+    try:
+        for line, record in records:
+            yield line, record
+    except FILE_ERRORS as e:
+        yield line + 1, e
+
+
+def _batches(records, batch_size):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors = []
+
+    def add_error(self, line, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'errors': errors})
+
+    def as_dict(self):
+        return {'created': self.created, 'updated': self.updated, 'failed': self.failed, 'errors': self.errors}
+
+
+def _update_fields(columns):
+    fields = [field for field in PRODUCT_FIELDS if field in columns and field != 'code']
+    if 'image' in columns:
+        fields.append('image_variants')
+    if 'catalog_id' in columns or 'catalog_name' in columns:
+        fields.append('catalog')
+    if 'promotion_id' in columns or 'promotion_code' in columns:
+        fields.append('promotion')
+    return fields + ['updated_at']
+
+
+def _import_batch(batch, references, update_fields, admin_id, result):
+    # Một serializer cho cả lô, tránh dựng lại các field cho từng dòng
+    validator = ProductImportSerializer()
+    rows = []
+    for line, record in batch:
+        if isinstance(record, FILE_ERRORS):
+            result.add_error(line, _file_error(record))
+            continue
+        if record is None:
+            result.add_error(line, {'non_field_errors': ["Invalid JSON object."]})
+            continue
+        try:
+            row = validator.run_validation(record)
+        except serializers.ValidationError as e:
+            result.add_error(line, e.detail)
+            continue
+        catalog_id, promotion_id, errors = references.resolve(row)
+        if errors:
+            result.add_error(line, errors)
+            continue
+        rows.append((row, catalog_id, promotion_id))
+    if not rows:
+        return
+
+    # Bản resize của các ảnh đã upload (my_admin/images.py), một query cho cả lô
+    variants = variants_by_url({row['image'] for row, _, _ in rows})
+    products = {}
+    for row, catalog_id, promotion_id in rows:
+        # Mã trùng trong cùng lô: dòng sau ghi đè dòng trước (một câu upsert không sửa một dòng hai lần)
+        products[row['code']] = Product(
+            admin_id=admin_id, catalog_id=catalog_id, promotion_id=promotion_id,
+            image_variants=variants.get(row['image'], {}),
+            **{field: row[field] for field in PRODUCT_FIELDS},
+        )
+
+    codes = list(products)
+    with transaction.atomic():
+        existing = set(Product.objects.filter(code__in=codes).values_list('code', flat=True))
+        Product.objects.bulk_create(
+            products.values(), update_conflicts=True, unique_fields=['code'], update_fields=update_fields)
+        # bulk_create không gọi save() nên tài liệu tìm kiếm được tính lại cho cả lô
+        rebuild_search_documents(Product.objects.filter(code__in=codes), Product.search_fields)
+        if existing and 'price' in update_fields:
+            recalculate_carts(Cart.objects.filter(items__product__code__in=existing))
+    result.updated += len(existing)
+    result.created += len(codes) - len(existing)
+
+
+def import_products(stream, file_format='csv', batch_size=DEFAULT_BATCH_SIZE, admin_id=None):
+    """
+    Import / cập nhật sản phẩm theo code.
+    :param stream: file text (CSV có header, hoặc JSONL mỗi dòng một object)
+    :param admin_id: admin thực hiện import, chỉ gán cho sản phẩm mới
+    :return: ImportResult
+    """
+    if file_format not in FORMATS:
+        raise ValueError(f"Unsupported format '{file_format}', expected one of {', '.join(FORMATS)}.")
+    result = ImportResult()
+    try:
+        columns, records = read_records(stream, file_format)
+    except FILE_ERRORS as e:
+        result.add_error(1, _file_error(e))
+        return result
+    if 'code' not in columns:
+        result.add_error(1, {'code': ["Column 'code' is required."]})
+        return result
+
+    references = ReferenceMaps()
+    update_fields = _update_fields(columns)
+    for batch in _batches(_until_file_error(records), batch_size):
+        _import_batch(batch, references, update_fields, admin_id, result)
+    return result
+
+
+def export_rows(queryset, file_format='csv', chunk_size=2000):
+    """
+    Sinh nội dung file export từng dòng (dùng cho StreamingHttpResponse).
+    """
+    rows = queryset.order_by('id').values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+    if file_format == 'csv':
+        yield from csv_rows(EXPORT_FIELDS, rows)
+    else:
+        for row in rows:
+            yield json.dumps(dict(zip(EXPORT_FIELDS, row)), ensure_ascii=False) + "\n"
+
+
+def open_text(uploaded_file):
+    """
+    File upload (bytes) -> file text, đọc từng dòng không nạp cả file vào bộ nhớ.
+    """
+    return io.TextIOWrapper(uploaded_file.file, encoding='utf-8-sig', newline='')
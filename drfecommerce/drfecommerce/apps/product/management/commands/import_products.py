@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from drfecommerce.apps.my_admin.models import MyAdmin
+from drfecommerce.apps.product.bulk import import_products, DEFAULT_BATCH_SIZE, FORMATS
+from drfecommerce.response_cache import invalidate
+
+
+class Command(BaseCommand):
+    help = "Import / cập nhật sản phẩm hàng loạt từ file CSV hoặc JSONL (khớp theo code)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Đường dẫn file CSV (có header) hoặc JSONL")
+        parser.add_argument('--format', choices=FORMATS, help="Mặc định theo đuôi file, csv nếu không rõ")
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--admin-id', type=int, help="Admin được gán cho sản phẩm mới")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if options['admin_id'] and not MyAdmin.objects.filter(id=options['admin_id']).exists():
+            raise CommandError(f"Admin {options['admin_id']} not found.")
+        file_format = options['format'] or ('jsonl' if path.lower().endswith(('.jsonl', '.json')) else 'csv')
+        try:
+            with open(path, encoding='utf-8-sig', newline='') as stream:
+                result = import_products(stream, file_format, batch_size=options['batch_size'],
+                                         admin_id=options['admin_id'])
+        except OSError as e:
+            raise CommandError(f"Cannot read '{path}': {e}")
+
+        if result.created or result.updated:
+            invalidate('product')
+        for error in result.errors:
+            self.stderr.write(f"line {error['line']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {result.created}, updated {result.updated}, failed {result.failed} products."))
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.15 on 2026-10-18 13:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0002_alter_product_table'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('delete_at__isnull', True)), fields=['created_at', 'id'], name='products_live_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('delete_at__isnull', True)), fields=['catalog', 'created_at'], name='products_live_catalog_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('delete_at__isnull', True)), fields=['promotion', 'created_at'], name='products_live_promotion_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.15 on 2026-10-18 14:08
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+from drfecommerce.search import rebuild_search_documents
+
+
+# Product.search_fields tại thời điểm tạo migration
+SEARCH_FIELDS = (('name', 'A'), ('short_description', 'B'), ('label', 'C'), ('material', 'C'), ('description', 'D'))
+
+
+def fill_search_documents(apps, schema_editor):
+    rebuild_search_documents(apps.get_model('product', 'Product').objects.all(), SEARCH_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0003_product_products_live_created_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='products_search_idx'),
+        ),
+        migrations.RunPython(fill_search_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.15 on 2026-10-18 14:16
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def deduplicate_codes(apps, schema_editor):
+    """
+    code '' được đổi thành NULL, code trùng nhau thì giữ nguyên ở sản phẩm cũ nhất,
+    các sản phẩm còn lại được thêm hậu tố -<id> để tạo được unique constraint.
+    """
+    Product = apps.get_model('product', 'Product')
+    Product.objects.filter(code='').update(code=None)
+    duplicated = (Product.objects.exclude(code=None).values('code')
+                  .annotate(total=Count('id')).filter(total__gt=1).values_list('code', flat=True))
+    for code in list(duplicated):
+        for product in Product.objects.filter(code=code).order_by('id')[1:]:
+            product.code = f"{code}-{product.id}"[:50]
+            product.save(update_fields=['code'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0004_product_search_document'),
+    ]
+
+    operations = [
+        migrations.RunPython(deduplicate_codes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='product',
+            constraint=models.UniqueConstraint(fields=('code',), name='products_code_uniq'),
+        ),
+    ]
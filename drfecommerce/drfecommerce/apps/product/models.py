@@ -1,10 +1,15 @@
 from django.db import models
+from django.db.models import Q
+from django.contrib.postgres.indexes import GinIndex
+from drfecommerce.search import SearchDocumentModel
 from drfecommerce.apps.my_admin.models import MyAdmin
 from drfecommerce.apps.catalog.models import Catalog
 from drfecommerce.apps.promotion.models import Promotion
 from django.utils import timezone
 
-class Product(models.Model):
+class Product(SearchDocumentModel):
+    # Field được tìm kiếm và trọng số (xem drfecommerce/search.py)
+    search_fields = (('name', 'A'), ('short_description', 'B'), ('label', 'C'), ('material', 'C'), ('description', 'D'))
     id = models.AutoField(primary_key=True)
     admin = models.ForeignKey(MyAdmin, on_delete=models.PROTECT, null=True, blank=True)
     catalog = models.ForeignKey(Catalog, on_delete=models.PROTECT, null=True, blank=True)
@@ -15,6 +20,7 @@ class Product(models.Model):
     description = models.TextField()
     product_type = models.TextField()
     image = models.CharField(max_length=255)
+    image_variants = models.JSONField(default=dict, blank=True)  # URL các bản resize của image (my_admin/images.py)
     price = models.FloatField()
     member_price = models.FloatField()  #giá thành viên. tức là người thuộc diện được ưu đãi
     quantity = models.IntegerField()
@@ -30,3 +36,17 @@ class Product(models.Model):
     
     class Meta:
         db_table = 'products'
+        indexes = [
+            # danh sách sản phẩm chưa bị xoá mềm (public list, search, theo catalog / promotion)
+            models.Index(fields=['created_at', 'id'], name='products_live_created_idx', condition=Q(delete_at__isnull=True)),
+            models.Index(fields=['catalog', 'created_at'], name='products_live_catalog_idx', condition=Q(delete_at__isnull=True)),
+            models.Index(fields=['promotion', 'created_at'], name='products_live_promotion_idx', condition=Q(delete_at__isnull=True)),
+            GinIndex(fields=['search_vector'], name='products_search_idx'),
+        ]
+        constraints = [
+            # code là khoá upsert của import hàng loạt (NULL thì không bị ràng buộc)
+            models.UniqueConstraint(fields=['code'], name='products_code_uniq'),
+        ]
+
+    def __str__(self):
+        return self.name
@@ -1,10 +1,25 @@
 from rest_framework import serializers
+from drfecommerce.search import SEARCH_DOCUMENT_FIELDS
+from drfecommerce.eager_loading import EagerLoadingMixin
 from .models import Product
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     catalog_name = serializers.CharField(source='catalog.name', read_only=True)
     promotion_name = serializers.CharField(source='promotion.name', read_only=True)
+    select_related_fields = ('catalog', 'promotion')
     
     class Meta:
         model = Product
-        fields = '__all__'
+        exclude = SEARCH_DOCUMENT_FIELDS
+
+
+class RatedProductSerializer(ProductSerializer):
+    """
+    ProductSerializer kèm số review và điểm trung bình, dùng với queryset đã qua
+    drfecommerce.apps.review.summaries.with_ratings (review_count, rating_sum).
+    """
+    review_count = serializers.IntegerField(read_only=True)
+    average_rating = serializers.SerializerMethodField()
+
+    def get_average_rating(self, obj):
+        return round(obj.rating_sum / obj.review_count, 2) if obj.review_count else 0
@@ -4,19 +4,23 @@ from .models import Product
 from drfecommerce.apps.my_admin.models import MyAdmin
 from drfecommerce.apps.catalog.models import Catalog
 from drfecommerce.apps.promotion.models import Promotion
-from .serializers import ProductSerializer
-from django.core.paginator import Paginator
-from django.core.paginator import EmptyPage
-from django.core.paginator import PageNotAnInteger
+from .serializers import ProductSerializer, RatedProductSerializer
+from . import bulk
+from drfecommerce.pagination import paginate
+from drfecommerce.search import search, SEARCH_ORDERING
+from drfecommerce.response_cache import cache_response, invalidate, PRODUCT
+from drfecommerce.apps.cart.models import Cart
+from drfecommerce.apps.cart.services import recalculate_carts
+from drfecommerce.apps.review.summaries import with_ratings
+from drfecommerce.replicas import read_replica
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from drfecommerce.apps.my_admin.authentication import AdminSafeJWTAuthentication
+from drfecommerce.apps.my_admin.images import save_upload, validate_upload, variants_for, ImageUploadError
 from rest_framework.decorators import action,permission_classes
 from dotenv import load_dotenv
 from django.utils import timezone
-import os
-from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
-from drfecommerce.settings import base
+from django.http import StreamingHttpResponse
+from django.db import IntegrityError, transaction
 
 # Load environment variables from .env file
 load_dotenv()
@@ -30,30 +34,18 @@ class ProductViewSet(viewsets.ViewSet):
         API to get list of products with pagination.
         - page_index (default=1)
         - page_size (default=10)
+        - cursor (optional): keyset pagination, empty for the first page then next_cursor / previous_cursor.
         """
-        page_index = int(request.GET.get('page_index', 1))
-        page_size = int(request.GET.get('page_size', 10))
-
         products = Product.objects.all()
-        paginator = Paginator(products, page_size)
-
-        try:
-            paginated_products = paginator.page(page_index)
-        except PageNotAnInteger:
-            paginated_products = paginator.page(1)
-        except EmptyPage:
-            paginated_products = paginator.page(paginator.num_pages)
+        paginated_products = paginate(request, products)
 
-        serializer = ProductSerializer(paginated_products, many=True)
+        serializer = ProductSerializer(paginated_products.object_list, many=True)
 
         return Response({
             "status": status.HTTP_200_OK,
             "message": "OK",
             "data": {
-                "total_pages": paginator.num_pages,
-                "total_items": paginator.count,
-                "page_index": page_index,
-                "page_size": page_size,
+                **paginated_products.meta,
                 "products": serializer.data
             }
         }, status=status.HTTP_200_OK)   
@@ -64,34 +56,23 @@ class ProductViewSet(viewsets.ViewSet):
         API to search products by name with pagination.
         - page_index (default=1)
         - page_size (default=10)
+        - cursor (optional): keyset pagination, empty for the first page then next_cursor / previous_cursor.
         - name: product name to search
         """
-        page_index = int(request.GET.get('page_index', 1))
-        page_size = int(request.GET.get('page_size', 10))
         name_query = request.GET.get('name', '').strip()
 
-        # Lọc sản phẩm theo tên
-        products = Product.objects.filter(name__icontains=name_query)
+        # Tìm theo tên, mô tả, label, chất liệu, kết quả liên quan nhất trước
+        products = search(Product.objects.all(), name_query)
 
-        paginator = Paginator(products, page_size)
+        paginated_products = paginate(request, products, ordering=SEARCH_ORDERING)
 
-        try:
-            paginated_products = paginator.page(page_index)
-        except PageNotAnInteger:
-            paginated_products = paginator.page(1)
-        except EmptyPage:
-            paginated_products = paginator.page(paginator.num_pages)
-
-        serializer = ProductSerializer(paginated_products, many=True)
+        serializer = ProductSerializer(paginated_products.object_list, many=True)
 
         return Response({
             "status": status.HTTP_200_OK,
             "message": "OK",
             "data": {
-                "total_pages": paginator.num_pages,
-                "total_items": paginator.count,
-                "page_index": page_index,
-                "page_size": page_size,
+                **paginated_products.meta,
                 "products": serializer.data
             }
         }, status=status.HTTP_200_OK)
@@ -127,33 +108,41 @@ class ProductViewSet(viewsets.ViewSet):
             catalog = Catalog.objects.get(id=data['catalog_id'])
             promotion = Promotion.objects.get(id=data['promotion_id']) if data.get('promotion_id') else None
 
-            product = Product.objects.create(
-                admin=admin,
-                catalog=catalog,
-                promotion=promotion,
-                code=data['code'],
-                name=data['name'],
-                short_description=data['short_description'],
-                description=data['description'],
-                product_type=data['product_type'],
-                price=data['price'],
-                member_price=data['member_price'],
-                quantity=data['quantity'],
-                image=data['image'],
-                gallery=data['gallery'],
-                weight=data['weight'],
-                diameter=data['diameter'],
-                dimensions=data['dimensions'],
-                material=data['material'],
-                label=data['label']
-            )
-            product.save()
+            # code trống lưu NULL: unique constraint products_code_uniq chỉ ràng buộc code khác NULL
+            with transaction.atomic():
+                product = Product.objects.create(
+                    admin=admin,
+                    catalog=catalog,
+                    promotion=promotion,
+                    code=data.get('code') or None,
+                    name=data['name'],
+                    short_description=data['short_description'],
+                    description=data['description'],
+                    product_type=data['product_type'],
+                    price=data['price'],
+                    member_price=data['member_price'],
+                    quantity=data['quantity'],
+                    image=data['image'],
+                    image_variants=variants_for(data['image']),
+                    gallery=data['gallery'],
+                    weight=data['weight'],
+                    diameter=data['diameter'],
+                    dimensions=data['dimensions'],
+                    material=data['material'],
+                    label=data['label']
+                )
+            invalidate('product')
 
             return Response({
                 "status": status.HTTP_201_CREATED,
                 "message": "Product created successfully!",
                 "data": ProductSerializer(product).data
             }, status=status.HTTP_201_CREATED)
+        except IntegrityError:
+            return Response({
+                "status": status.HTTP_400_BAD_REQUEST,
+                "message": "Product code already exists."
+            }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({
                 "status": status.HTTP_400_BAD_REQUEST,
@@ -211,6 +200,7 @@ class ProductViewSet(viewsets.ViewSet):
                 product.quantity = data['quantity']
             if data['image']:
                 product.image = data['image']
+                product.image_variants = variants_for(data['image'])
             if data['gallery']:
                 product.gallery = data['gallery']
             if data['weight']:
@@ -223,7 +213,12 @@ class ProductViewSet(viewsets.ViewSet):
                 product.material = data['material']
             if data['label']:
                 product.label = data['label']
-            product.save()
+            with transaction.atomic():
+                product.save()
+            invalidate('product')
+            if data['price']:
+                # subtotal của các giỏ hàng đang có product này tính theo giá mới
+                recalculate_carts(Cart.objects.filter(items__product=product))
 
             return Response({
                 "status": status.HTTP_200_OK,
@@ -240,6 +235,11 @@ class ProductViewSet(viewsets.ViewSet):
                 "status": status.HTTP_404_NOT_FOUND,
                 "message": "Promotion not found."
             }, status=status.HTTP_404_NOT_FOUND)
+        except IntegrityError:
+            return Response({
+                "status": status.HTTP_400_BAD_REQUEST,
+                "message": "Product code already exists."
+            }, status=status.HTTP_400_BAD_REQUEST)
                      
     @action(detail=False, methods=['delete'], url_path="delete-product")
     def delete_product(self, request):
@@ -258,6 +258,7 @@ class ProductViewSet(viewsets.ViewSet):
             product = Product.objects.get(id=product_id)
             product.delete_at = timezone.now()  # Soft delete by setting the delete_at field
             product.save()
+            invalidate('product')
 
             return Response({
                 "status": status.HTTP_200_OK,
@@ -294,11 +295,79 @@ class ProductViewSet(viewsets.ViewSet):
         # Khôi phục catalog và các catalog con của nó
         product.delete_at = None
         product.save() 
+        invalidate('product')
         return Response({
             "status": status.HTTP_200_OK,
             "message": "Product restored successfully."
         }, status=status.HTTP_200_OK)
     
+    @action(detail=False, methods=['post'], url_path="import-products")
+    def import_products(self, request):
+        """
+        API to create / update products in bulk, products are matched by code.
+        form-data:
+        - file: CSV file with header or JSONL file (one product per line), columns:
+          code, name, short_description, description, product_type, price, member_price, quantity,
+          image, gallery, weight, diameter, dimensions, material, label,
+          catalog_id or catalog_name, promotion_id or promotion_code
+        - format (optional): csv | jsonl, default from the file extension
+        - batch_size (optional, default=1000)
+        Only the columns present in the file are updated on existing products.
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({
+                "status": status.HTTP_400_BAD_REQUEST,
+                "message": "No file found in request."
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        file_format = request.data.get('format') or ('jsonl' if upload.name.lower().endswith(('.jsonl', '.json')) else 'csv')
+        if file_format not in bulk.FORMATS:
+            return Response({
+                "status": status.HTTP_400_BAD_REQUEST,
+                "message": f"Unsupported format, expected one of: {', '.join(bulk.FORMATS)}."
+            }, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            batch_size = max(1, int(request.data.get('batch_size', bulk.DEFAULT_BATCH_SIZE)))
+        except ValueError:
+            return Response({
+                "status": status.HTTP_400_BAD_REQUEST,
+                "message": "batch_size must be an integer."
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        result = bulk.import_products(bulk.open_text(upload), file_format, batch_size=batch_size, admin_id=request.user.id)
+        if result.created or result.updated:
+            invalidate('product')
+
+        return Response({
+            "status": status.HTTP_200_OK,
+            "message": "Products imported successfully!" if not result.failed else "Products imported with errors.",
+            "data": result.as_dict()
+        }, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], url_path="export-products")
+    def export_products(self, request):
+        """
+        API to export products as a file (streamed, the same columns as import-products).
+        - file_format: csv | jsonl (default=csv)
+        - include_deleted: true / false (default=false)
+        """
+        file_format = request.GET.get('file_format', 'csv')
+        if file_format not in bulk.FORMATS:
+            return Response({
+                "status": status.HTTP_400_BAD_REQUEST,
+                "message": f"Unsupported format, expected one of: {', '.join(bulk.FORMATS)}."
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        products = Product.objects.all()
+        if request.GET.get('include_deleted', 'false').lower() != 'true':
+            products = products.filter(delete_at__isnull=True)
+
+        content_type = 'text/csv' if file_format == 'csv' else 'application/x-ndjson'
+        response = StreamingHttpResponse(bulk.export_rows(products, file_format), content_type=f'{content_type}; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="products.{file_format}"'
+        return response
+
     @action(detail=False, methods=['post'], url_path="upload-gallery")
     def upload_gallery(self, request):
         """
@@ -311,18 +380,18 @@ class ProductViewSet(viewsets.ViewSet):
             }, status=status.HTTP_400_BAD_REQUEST)
 
         files = request.FILES.getlist('files')  # Lấy danh sách các file từ request
-        image_urls = []  # Danh sách lưu URL của các ảnh đã upload
-
-        for image in files:
-            img_name = image.name
-
-            # Sử dụng default_storage để lưu ảnh vào thư mục cục bộ hoặc dịch vụ lưu trữ khác trong tương lai
-            save_path = os.path.join(base.MEDIA_ROOT, img_name)
-            file_path = default_storage.save(save_path, ContentFile(image.read()))
-            file_url = default_storage.url(file_path)
+        try:
+            for image in files:
+                validate_upload(image)
+        except ImageUploadError as e:
+            return Response({
+                "status": e.status_code,
+                "message": e.message
+            }, status=e.status_code)
 
-            # Lưu URL của ảnh vào danh sách
-            image_urls.append(file_url)
+        # Ghi vào storage theo từng chunk, các bản resize được tạo bởi worker process_images
+        # Lưu URL của ảnh vào danh sách
+        image_urls = [save_upload(image, 'products').url for image in files]
 
         return Response({
             "status": status.HTTP_200_OK,
@@ -333,40 +402,33 @@ class ProductViewSet(viewsets.ViewSet):
 @permission_classes([AllowAny])
 class PublicProductViewset(viewsets.ViewSet):
     @action(detail=False, methods=['get'], url_path="get-list-products")
+    @cache_response(PRODUCT)
+    @read_replica
     def list_products(self, request):
         """
         API to get list of products with pagination.
         - page_index (default=1)
         - page_size (default=10)
+        - cursor (optional): keyset pagination, empty for the first page then next_cursor / previous_cursor.
         """
-        page_index = int(request.GET.get('page_index', 1))
-        page_size = int(request.GET.get('page_size', 10))
-
-        products = Product.objects.filter(delete_at__isnull=True)
-        paginator = Paginator(products, page_size)
-
-        try:
-            paginated_products = paginator.page(page_index)
-        except PageNotAnInteger:
-            paginated_products = paginator.page(1)
-        except EmptyPage:
-            paginated_products = paginator.page(paginator.num_pages)
+        # Số review / điểm trung bình được join từ review_summary trong cùng câu query
+        products = with_ratings(Product.objects.filter(delete_at__isnull=True))
+        paginated_products = paginate(request, products)
 
-        serializer = ProductSerializer(paginated_products, many=True)
+        serializer = RatedProductSerializer(paginated_products.object_list, many=True)
 
         return Response({
             "status": status.HTTP_200_OK,
             "message": "OK",
             "data": {
-                "total_pages": paginator.num_pages,
-                "total_items": paginator.count,
-                "page_index": page_index,
-                "page_size": page_size,
+                **paginated_products.meta,
                 "products": serializer.data
             }
         }, status=status.HTTP_200_OK)
         
     @action(detail=False, methods=['get'], url_path="get-detail-product")
+    @cache_response(PRODUCT)
+    @read_replica
     def get_product(self, request):
         """
         Get product details:
@@ -380,8 +442,8 @@ class PublicProductViewset(viewsets.ViewSet):
             }, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            product = Product.objects.get(id=product_id)
-            serializer = ProductSerializer(product)
+            product = with_ratings(Product.objects.all()).get(id=product_id)
+            serializer = RatedProductSerializer(product)
             return Response({
                 "status": status.HTTP_200_OK,
                 "data": serializer.data
@@ -393,16 +455,17 @@ class PublicProductViewset(viewsets.ViewSet):
             }, status=status.HTTP_404_NOT_FOUND)
             
     @action(detail=False, methods=['get'], url_path="get-list-products-by-catalog")
+    @cache_response(PRODUCT)
+    @read_replica
     def list_products_by_catalog(self, request):
         """
         API to get list of products with pagination.
         - page_index (default=1)
         - page_size (default=10)
+        - cursor (optional): keyset pagination, empty for the first page then next_cursor / previous_cursor.
         - catalog_id: int
         example api/get-list-products/?page_index=1&page_size=10&catalog_id=1
         """
-        page_index = int(request.GET.get('page_index', 1))
-        page_size = int(request.GET.get('page_size', 10))
         catalog_id = request.GET.get('catalog_id') if request.GET.get('catalog_id') else None
         
         if not catalog_id:
@@ -427,41 +490,32 @@ class PublicProductViewset(viewsets.ViewSet):
                 "message": "Catalog not found."
             }, status=status.HTTP_404_NOT_FOUND)
             
-        products = Product.objects.filter(catalog_id = catalog_id, delete_at__isnull=True)
-        paginator = Paginator(products, page_size)
-        
-        try:
-            paginated_products = paginator.page(page_index)
-        except PageNotAnInteger:
-            paginated_products = paginator.page(1)
-        except EmptyPage:
-            paginated_products = paginator.page(paginator.num_pages)
+        products = with_ratings(Product.objects.filter(catalog_id = catalog_id, delete_at__isnull=True))
+        paginated_products = paginate(request, products)
 
-        serializer = ProductSerializer(paginated_products, many=True)
+        serializer = RatedProductSerializer(paginated_products.object_list, many=True)
 
         return Response({
             "status": status.HTTP_200_OK,
             "message": "OK",
             "data": {
-                "total_pages": paginator.num_pages,
-                "total_items": paginator.count,
-                "page_index": page_index,
-                "page_size": page_size,
+                **paginated_products.meta,
                 "products": serializer.data
             }
         }, status=status.HTTP_200_OK)
         
     @action(detail=False, methods=['get'], url_path="get-list-products-by-promotion")
+    @cache_response(PRODUCT)
+    @read_replica
     def list_products_by_promotion(self, request):
         """
         API to get list of products with pagination.
         - page_index (default=1)
         - page_size (default=10)
+        - cursor (optional): keyset pagination, empty for the first page then next_cursor / previous_cursor.
         - promotion_id: int
         example api/get-list-products/?page_index=1&page_size=10&promotion_id=1
         """
-        page_index = int(request.GET.get('page_index', 1))
-        page_size = int(request.GET.get('page_size', 10))
         promotion_id = int(request.GET.get('promotion_id')) if request.GET.get('promotion_id') else None
         
         # xét 2 trường hợp sản phẩm được khuyễn mãi và sản phẩm không được khuyến mãi (promotion_id = null)
@@ -479,65 +533,44 @@ class PublicProductViewset(viewsets.ViewSet):
                     "message": "Promotion not found."
                 }, status=status.HTTP_404_NOT_FOUND)
                 
-        products = Product.objects.filter(promotion_id = promotion_id, delete_at__isnull=True)
-        paginator = Paginator(products, page_size)
-            
-        try:
-            paginated_products = paginator.page(page_index)
-        except PageNotAnInteger:
-            paginated_products = paginator.page(1)
-        except EmptyPage:
-            paginated_products = paginator.page(paginator.num_pages)
+        products = with_ratings(Product.objects.filter(promotion_id = promotion_id, delete_at__isnull=True))
+        paginated_products = paginate(request, products)
 
-        serializer = ProductSerializer(paginated_products, many=True)
+        serializer = RatedProductSerializer(paginated_products.object_list, many=True)
         return Response({
                 "status": status.HTTP_200_OK,
                 "message": "OK",
                 "data": {
-                    "total_pages": paginator.num_pages,
-                    "total_items": paginator.count,
-                    "page_index": page_index,
-                    "page_size": page_size,
+                    **paginated_products.meta,
                     "products": serializer.data
                 }
             }, status=status.HTTP_200_OK)
         
     @action(detail=False, methods=['get'], url_path="search-products")
+    @cache_response(PRODUCT)
+    @read_replica
     def search_products(self, request):
         """
         API to search products by name with pagination.
         - page_index (default=1)
         - page_size (default=10)
+        - cursor (optional): keyset pagination, empty for the first page then next_cursor / previous_cursor.
         - name: product name to search
         """
-        page_index = int(request.GET.get('page_index', 1))
-        page_size = int(request.GET.get('page_size', 10))
         name_query = request.GET.get('name')
         
-        if name_query is None or name_query == "":
-            products = Product.objects.filter(delete_at__isnull=True)
-        else:
-            products = Product.objects.filter(name__icontains=name_query, delete_at__isnull=True)
-
-        paginator = Paginator(products, page_size)
+        # Tìm theo tên, mô tả, label, chất liệu, kết quả liên quan nhất trước (name rỗng thì trả về tất cả)
+        products = with_ratings(search(Product.objects.filter(delete_at__isnull=True), name_query))
 
-        try:
-            paginated_products = paginator.page(page_index)
-        except PageNotAnInteger:
-            paginated_products = paginator.page(1)
-        except EmptyPage:
-            paginated_products = paginator.page(paginator.num_pages)
+        paginated_products = paginate(request, products, ordering=SEARCH_ORDERING)
 
-        serializer = ProductSerializer(paginated_products, many=True)
+        serializer = RatedProductSerializer(paginated_products.object_list, many=True)
 
         return Response({
             "status": status.HTTP_200_OK,
             "message": "OK",
             "data": {
-                "total_pages": paginator.num_pages,
-                "total_items": paginator.count,
-                "page_index": page_index,
-                "page_size": page_size,
+                **paginated_products.meta,
                 "products": serializer.data
             }
         }, status=status.HTTP_200_OK)
\ No newline at end of file
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.15 on 2026-10-18 13:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product_incoming', '0002_alter_productincoming_table'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='productincoming',
+            index=models.Index(fields=['store', 'effective_date'], name='product_inc_store_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productincoming',
+            index=models.Index(fields=['effective_date'], name='product_inc_date_idx'),
+        ),
+    ]
@@ -19,4 +19,8 @@ class ProductIncoming(models.Model):
     
     class Meta:
         db_table = 'product_incomings'
+        indexes = [
+            models.Index(fields=['store', 'effective_date'], name='product_inc_store_date_idx'),
+            models.Index(fields=['effective_date'], name='product_inc_date_idx'),
+        ]
 
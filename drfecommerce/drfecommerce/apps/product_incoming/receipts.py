@@ -0,0 +1,63 @@
+from django.db import transaction
+from drfecommerce.apps.product.models import Product
+from drfecommerce.apps.store.models import Store
+from drfecommerce.apps.product_store.reservations import receive_stock
+from drfecommerce.apps.product_sale.rollups import record_costs
+from .models import ProductIncoming
+
+
+class UnknownReference(Exception):
+    """
+    Phiếu nhập có product / store không tồn tại.
+    """
+    def __init__(self, model_name, ids):
+        super().__init__(f"{model_name} not found: {', '.join(str(i) for i in sorted(ids))}")
+        self.model_name = model_name
+        self.ids = ids
+
+
+def _check_references(lines):
+    for model, field in ((Product, 'product_id'), (Store, 'store_id')):
+        ids = {line[field] for line in lines}
+        missing = ids - set(model.objects.filter(id__in=ids).values_list('id', flat=True))
+        if missing:
+            raise UnknownReference(model.__name__, missing)
+
+
+def receive_goods(lines, effective_date=None):
+    """
+    Ghi nhận một phiếu nhập hàng trong một transaction:
+    - toàn bộ ProductIncoming được tạo bằng một bulk_create
+    - tồn kho product_store được cộng bằng receive_stock (một câu UPDATE F() cho cả phiếu)
+    - chi phí nhập được cộng vào bảng rollup theo ngày (record_costs)
+    :param lines: list dict product_id, store_id, cost_price, quantity_in, vat, shipping_cost
+    :param effective_date: ngày nhập (mặc định là thời điểm ghi nhận)
+    :return: (list ProductIncoming, dict (product_id, store_id) -> ProductStore sau khi nhập)
+    :raise UnknownReference: có product / store không tồn tại
+    """
+    _check_references(lines)
+    quantities = {}
+    for line in lines:
+        key = (line['product_id'], line['store_id'])
+        quantities[key] = quantities.get(key, 0) + line['quantity_in']
+
+    with transaction.atomic():
+        incomings = ProductIncoming.objects.bulk_create([
+            ProductIncoming(
+                product_id=line['product_id'],
+                store_id=line['store_id'],
+                cost_price=line['cost_price'],
+                quantity_in=line['quantity_in'],
+                vat=line.get('vat', 0),
+                shipping_cost=line.get('shipping_cost', 0),
+            )
+            for line in lines
+        ])
+        if effective_date is not None:
+            # effective_date là auto_now_add nên ngày nhập được ghi lại bằng một câu update
+            ProductIncoming.objects.filter(id__in=[incoming.id for incoming in incomings]).update(effective_date=effective_date)
+            for incoming in incomings:
+                incoming.effective_date = effective_date
+        stocks = receive_stock(quantities)
+        record_costs(incomings)
+    return incomings, stocks
@@ -1,20 +1,46 @@
+from decimal import Decimal
 from rest_framework import serializers
+from drfecommerce.eager_loading import EagerLoadingMixin
 from .models import ProductIncoming
 
 
-class ProductIncomingSerializer(serializers.ModelSerializer):
+class ProductIncomingSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     store_name = serializers.CharField(source='store.name', read_only=True)
     product_name = serializers.CharField(source='product.name', read_only=True)
+    select_related_fields = ('store', 'product')
     class Meta:
         model = ProductIncoming
         fields = '__all__'
         
-class ProductIncomingDetailSerializer(serializers.ModelSerializer):    
+class ProductIncomingDetailSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     store_name = serializers.CharField(source='store.name', read_only=True)
     store_phone_number = serializers.CharField(source='store.phone_number', read_only=True)
     store_email = serializers.CharField(source='store.email', read_only=True)
     store_address = serializers.CharField(source='store.address', read_only=True)
     product_name = serializers.CharField(source='product.name', read_only=True)
+    select_related_fields = ('store', 'product')
     class Meta:
         model = ProductIncoming
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+class GoodsReceiptLineSerializer(serializers.Serializer):
+    product_id = serializers.IntegerField()
+    store_id = serializers.IntegerField(required=False)
+    cost_price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal(0))
+    quantity_in = serializers.IntegerField(min_value=1)
+    vat = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal(0), required=False, default=0)
+    shipping_cost = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal(0), required=False, default=0)
+
+
+class GoodsReceiptSerializer(serializers.Serializer):
+    # Phiếu nhập hàng: store_id chung cho cả phiếu, từng dòng có thể ghi đè
+    store_id = serializers.IntegerField(required=False)
+    effective_date = serializers.DateTimeField(required=False)
+    lines = GoodsReceiptLineSerializer(many=True, allow_empty=False, max_length=2000)
+
+    def validate(self, data):
+        for index, line in enumerate(data['lines']):
+            line.setdefault('store_id', data.get('store_id'))
+            if line['store_id'] is None:
+                raise serializers.ValidationError({'lines': {index: {'store_id': ["This field is required."]}}})
+        return data
@@ -1,20 +1,62 @@
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.utils import timezone
 from drfecommerce.apps.product.models import Product
-from drfecommerce.apps.store.models import Store
 from drfecommerce.apps.product_store.models import ProductStore
 from .models import ProductIncoming
-from .serializers import ProductIncomingSerializer,ProductIncomingDetailSerializer
+from .serializers import ProductIncomingSerializer, ProductIncomingDetailSerializer, GoodsReceiptSerializer
+from .receipts import receive_goods, UnknownReference
+from drfecommerce.apps.product_sale.rollups import record_costs
 from drfecommerce.apps.product_store.serializers import ProductStoreSerializer
+from drfecommerce.pagination import paginate
+from drfecommerce import exports
+from drfecommerce.search import search_filter
+from drfecommerce.replicas import read_replica
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from drfecommerce.apps.my_admin.authentication import AdminSafeJWTAuthentication
-from django.core.paginator import Paginator
-from django.core.paginator import EmptyPage
-from django.core.paginator import PageNotAnInteger
 from django.utils.dateparse import parse_datetime
-from django.db.models import Sum
+from django.db import transaction
+from django.db.models import Sum, F
+from django.db.models.functions import Coalesce
+from decimal import Decimal
+
+def _filter_product_incomings(request, product_incomings):
+    """
+    Lọc product_incomings theo store_id, start_date, end_date (YYYY-MM-DD, tính trọn ngày) của request.
+    Dùng chung cho danh sách, tìm kiếm và export.
+    """
+    # Nhận các tham số lọc
+    store_id = request.GET.get('store_id', None)
+    start_date = request.GET.get('start_date', None)
+    end_date = request.GET.get('end_date', None)
+
+    # Lọc theo store nếu có truyền store_id
+    if store_id:
+        product_incomings = product_incomings.filter(store_id=store_id)
+
+    # Lọc theo ngày (start_date và end_date) nếu có truyền
+    if start_date:
+        start_date = parse_datetime(f"{start_date}T00:00:00")
+        product_incomings = product_incomings.filter(effective_date__gte=start_date)
+    if end_date:
+        end_date = parse_datetime(f"{end_date}T23:59:59")
+        product_incomings = product_incomings.filter(effective_date__lte=end_date)
+    return product_incomings
+
+# Cột của file export chi phí nhập hàng (tiêu đề, field)
+INCOMING_EXPORT_COLUMNS = (
+    ('id', 'id'),
+    ('effective_date', 'effective_date'),
+    ('store_id', 'store_id'),
+    ('store_name', 'store__name'),
+    ('product_id', 'product_id'),
+    ('product_code', 'product__code'),
+    ('product_name', 'product__name'),
+    ('cost_price', 'cost_price'),
+    ('quantity_in', 'quantity_in'),
+    ('vat', 'vat'),
+    ('shipping_cost', 'shipping_cost'),
+)
 
 class ProductIncomingViewSet(viewsets.ViewSet):
     authentication_classes = [AdminSafeJWTAuthentication]
@@ -33,43 +75,91 @@ class ProductIncomingViewSet(viewsets.ViewSet):
         - shipping_cost
         - effective_date (optional) YYYY-MM-DD HH:MM:SS
         """
-        product_id = request.data.get('product_id')
-        store_id = request.data.get('store_id')
-        cost_price = request.data.get('cost_price')
-        quantity_in = int(request.data.get('quantity_in', 0))
-        vat = request.data.get('vat', 0)
-        shipping_cost = request.data.get('shipping_cost', 0)
-        effective_date = request.data.get('effective_date', timezone.now())
-        # Validate product and store existence
         try:
-            product = Product.objects.get(id=product_id)
-            store = Store.objects.get(id=store_id)
-        except Product.DoesNotExist:
-            return Response({"message": "Product not found."}, status=status.HTTP_404_NOT_FOUND)
-        except Store.DoesNotExist:
-            return Response({"message": "Store not found."}, status=status.HTTP_404_NOT_FOUND)
+            line = {
+                'product_id': int(request.data.get('product_id')),
+                'store_id': int(request.data.get('store_id')),
+                'cost_price': request.data.get('cost_price'),
+                'quantity_in': int(request.data.get('quantity_in', 0)),
+                'vat': request.data.get('vat', 0),
+                'shipping_cost': request.data.get('shipping_cost', 0),
+            }
+        except (TypeError, ValueError):
+            return Response({"message": "product_id, store_id and quantity_in must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+        effective_date = request.data.get('effective_date')
+        if effective_date and isinstance(effective_date, str):
+            effective_date = parse_datetime(effective_date)
 
-        # Create a new ProductIncoming entry
-        product_incoming = ProductIncoming.objects.create(
-            product=product,
-            store=store,
-            cost_price=cost_price,
-            quantity_in=quantity_in,
-            vat=vat,
-            shipping_cost=shipping_cost,
-            effective_date=effective_date
-        )
-        
-        # Update or create ProductStore entry
-        product_store, created = ProductStore.objects.get_or_create(product=product, store=store)
-        product_store.quantity_in += quantity_in  # Add the incoming quantity to existing stock
-        product_store.remaining_stock += quantity_in  # Update remaining stock
-        product_store.save()
+        # Cùng đường ghi với phiếu nhập nhiều dòng: tồn kho được cộng bằng UPDATE F() nên không mất dữ liệu khi nhập đồng thời
+        try:
+            incomings, stocks = receive_goods([line], effective_date=effective_date or None)
+        except UnknownReference as e:
+            return Response({"message": f"{e.model_name} not found."}, status=status.HTTP_404_NOT_FOUND)
 
         return Response({
             "message": "ProductIncoming added and ProductStore updated successfully.",
-            "product_incoming": ProductIncomingSerializer(product_incoming).data,
-            "product_store": ProductStoreSerializer(product_store).data
+            "product_incoming": ProductIncomingSerializer(incomings[0]).data,
+            "product_store": ProductStoreSerializer(stocks[(line['product_id'], line['store_id'])]).data
+        }, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'], url_path="goods-receipt")
+    def goods_receipt(self, request):
+        """
+        Record a whole delivery note (goods receipt) in one transaction.
+        Request body (json):
+        - store_id (optional): default store for every line
+        - effective_date (optional) YYYY-MM-DD HH:MM:SS
+        - lines: list (max 2000) of
+            - product_id
+            - store_id (optional if given at the top level)
+            - cost_price
+            - quantity_in (>= 1)
+            - vat (optional)
+            - shipping_cost (optional)
+        Response data: totals of the receipt and the new stock level of every (product, store).
+        """
+        serializer = GoodsReceiptSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({
+                "status": status.HTTP_400_BAD_REQUEST,
+                "message": "Invalid goods receipt.",
+                "errors": serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        lines = serializer.validated_data['lines']
+        try:
+            incomings, stocks = receive_goods(lines, effective_date=serializer.validated_data.get('effective_date'))
+        except UnknownReference as e:
+            return Response({
+                "status": status.HTTP_404_NOT_FOUND,
+                "message": str(e)
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        received = {}
+        for line in lines:
+            key = (line['product_id'], line['store_id'])
+            received[key] = received.get(key, 0) + line['quantity_in']
+        product_names = dict(Product.objects.filter(id__in={key[0] for key in stocks}).values_list('id', 'name'))
+
+        return Response({
+            "status": status.HTTP_201_CREATED,
+            "message": "Goods receipt recorded successfully.",
+            "data": {
+                "lines": len(incomings),
+                "total_quantity": sum(line['quantity_in'] for line in lines),
+                "total_cost": sum(line['cost_price'] * line['quantity_in'] + line['vat'] + line['shipping_cost'] for line in lines),
+                "stocks": [
+                    {
+                        "product_id": product_id,
+                        "product_name": product_names.get(product_id),
+                        "store_id": store_id,
+                        "received": received[(product_id, store_id)],
+                        "quantity_in": stock.quantity_in,
+                        "remaining_stock": stock.remaining_stock,
+                    }
+                    for (product_id, store_id), stock in stocks.items()
+                ],
+            }
         }, status=status.HTTP_201_CREATED)
 
     @action(detail=False, methods=['delete'], url_path="delete-product-incoming")
@@ -90,83 +180,78 @@ class ProductIncomingViewSet(viewsets.ViewSet):
         except ProductIncoming.DoesNotExist:
             return Response({"message": "ProductIncoming not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        # Update ProductStore before deletion
-        try:
-            product_store = ProductStore.objects.get(product=product_incoming.product, store=product_incoming.store)
-            product_store.quantity_in -= product_incoming.quantity_in  # Decrease the quantity_in
-            product_store.remaining_stock -= product_incoming.quantity_in  # Decrease the remaining stock
-            product_store.save()
-        except ProductStore.DoesNotExist:
-            return Response({"message": "ProductStore not found."}, status=status.HTTP_404_NOT_FOUND)
+        with transaction.atomic():
+            # Trừ tồn kho bằng UPDATE F() để không ghi đè thay đổi đồng thời
+            updated = ProductStore.objects.filter(product_id=product_incoming.product_id, store_id=product_incoming.store_id).update(
+                quantity_in=F('quantity_in') - product_incoming.quantity_in,
+                remaining_stock=F('remaining_stock') - product_incoming.quantity_in,
+            )
+            if not updated:
+                return Response({"message": "ProductStore not found."}, status=status.HTTP_404_NOT_FOUND)
+
+            # Trừ chi phí đã cộng vào bảng rollup theo ngày
+            record_costs([product_incoming], sign=-1)
 
-        # Finally, delete ProductIncoming entry
-        product_incoming.delete()
+            # Finally, delete ProductIncoming entry
+            product_incoming.delete()
 
         return Response({
             "message": "ProductIncoming deleted and ProductStore updated successfully."
         }, status=status.HTTP_200_OK)
         
     @action(detail=False, methods=['get'], url_path='list-product-incomings')
+    @read_replica
     def list_product_incomings(self, request):
         """
         API lấy danh sách các sản phẩm nhập vào theo khoảng thời gian và store với phân trang.
         query_params:
         - page_index: trang (mặc định là 1)
         - page_size: số lượng sản phẩm trên mỗi trang (mặc định là 10)
+        - cursor (optional): keyset pagination, empty for the first page then next_cursor / previous_cursor.
         - store_id: ID của store để lọc (có thể truyền hoặc không)
         - start_date: ngày bắt đầu để lọc (YYYY-MM-DD) (có thể truyền hoặc không)
         - end_date: ngày kết thúc để lọc (YYYY-MM-DD) (có thể truyền hoặc không)
         """
-        # Nhận page_index và page_size từ query params
-        page_index = int(request.GET.get('page_index', 1))
-        page_size = int(request.GET.get('page_size', 10))
-
-        # Nhận các tham số lọc
-        store_id = request.GET.get('store_id', None)
-        start_date = request.GET.get('start_date', None)
-        end_date = request.GET.get('end_date', None)
-
-        # Tạo queryset ban đầu
-        product_incomings = ProductIncoming.objects.all()
+        # Lọc theo store và khoảng ngày nếu có truyền
+        product_incomings = _filter_product_incomings(request, ProductIncoming.objects.all())
 
-        # Lọc theo store nếu có truyền store_id
-        if store_id:
-            product_incomings = product_incomings.filter(store_id=store_id)
-
-        # Lọc theo ngày (start_date và end_date) nếu có truyền
-        if start_date:
-            start_date = parse_datetime(f"{start_date}T00:00:00")
-            product_incomings = product_incomings.filter(effective_date__gte=start_date)
-        if end_date:
-            end_date = parse_datetime(f"{end_date}T23:59:59")
-            product_incomings = product_incomings.filter(effective_date__lte=end_date)
-
-        # Sử dụng Paginator để phân trang
-        paginator = Paginator(product_incomings, page_size)
-
-        try:
-            paginated_product_incomings = paginator.page(page_index)
-        except PageNotAnInteger:
-            paginated_product_incomings = paginator.page(1)
-        except EmptyPage:
-            paginated_product_incomings = paginator.page(paginator.num_pages)
+        # Phân trang (page_index / page_size hoặc cursor)
+        paginated_product_incomings = paginate(request, product_incomings)
 
         # Serialize dữ liệu
-        serializer = ProductIncomingSerializer(paginated_product_incomings, many=True)
+        serializer = ProductIncomingSerializer(paginated_product_incomings.object_list, many=True)
 
         # Trả về response có phân trang và dữ liệu lọc
         return Response({
             "status": status.HTTP_200_OK,
             "message": "OK",
             "data": {
-                "total_pages": paginator.num_pages,
-                "total_items": paginator.count,
-                "page_index": page_index,
-                "page_size": page_size,
+                **paginated_product_incomings.meta,
                 "product_incomings": serializer.data
             }
         }, status=status.HTTP_200_OK)
         
+    @action(detail=False, methods=['get'], url_path='export-product-incomings')
+    @read_replica
+    def export_product_incomings(self, request):
+        """
+        API export các sản phẩm nhập vào (báo cáo chi phí) ra file, stream trực tiếp từ database.
+        query_params:
+        - file_format: csv | xlsx (mặc định là csv)
+        - store_id: ID của store để lọc (có thể truyền hoặc không)
+        - start_date: ngày bắt đầu để lọc (YYYY-MM-DD) (có thể truyền hoặc không)
+        - end_date: ngày kết thúc để lọc (YYYY-MM-DD) (có thể truyền hoặc không)
+        """
+        file_format = request.GET.get('file_format', 'csv')
+        if file_format not in exports.FORMATS:
+            return Response({
+                "status": status.HTTP_400_BAD_REQUEST,
+                "message": f"Unsupported format, expected one of: {', '.join(exports.FORMATS)}."
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        product_incomings = _filter_product_incomings(request, ProductIncoming.objects.order_by('id'))
+        return exports.export_response(product_incomings, INCOMING_EXPORT_COLUMNS, file_format, 'product-incomings')
+
     @action(detail=True, methods=['get'], url_path='detail-product-incoming')
     def detail_product_incoming(self, request):
         """
@@ -201,67 +286,39 @@ class ProductIncomingViewSet(viewsets.ViewSet):
         query_params:
         - page_index: trang (mặc định là 1)
         - page_size: số lượng sản phẩm trên mỗi trang (mặc định là 10)
+        - cursor (optional): keyset pagination, empty for the first page then next_cursor / previous_cursor.
         - store_id: ID của store để lọc (có thể truyền hoặc không)
         - start_date: ngày bắt đầu để lọc (YYYY-MM-DD)
         - end_date: ngày kết thúc để lọc (YYYY-MM-DD)
         - product_name: tên sản phẩm để tìm kiếm
         """
-        # Nhận page_index và page_size từ query params
-        page_index = int(request.GET.get('page_index', 1))
-        page_size = int(request.GET.get('page_size', 10))
-
-        # Nhận các tham số lọc
-        store_id = request.GET.get('store_id', None)
-        start_date = request.GET.get('start_date', None)
-        end_date = request.GET.get('end_date', None)
         product_name = request.GET.get('product_name', None)
 
-        # Tạo queryset ban đầu
-        product_incomings = ProductIncoming.objects.all()
-
-        # Lọc theo store nếu có truyền store_id
-        if store_id:
-            product_incomings = product_incomings.filter(store_id=store_id)
-
-        # Lọc theo ngày (start_date và end_date) nếu có truyền
-        if start_date:
-            start_date = parse_datetime(f"{start_date}T00:00:00")
-            product_incomings = product_incomings.filter(effective_date__gte=start_date)
-        if end_date:
-            end_date = parse_datetime(f"{end_date}T23:59:59")
-            product_incomings = product_incomings.filter(effective_date__lte=end_date)
+        # Lọc theo store và khoảng ngày nếu có truyền
+        product_incomings = _filter_product_incomings(request, ProductIncoming.objects.all())
 
         # Lọc theo tên sản phẩm nếu có truyền product_name
         if product_name:
-            product_incomings = product_incomings.filter(product__name__icontains=product_name)
-
-        # Sử dụng Paginator để phân trang
-        paginator = Paginator(product_incomings, page_size)
+            product_incomings = product_incomings.filter(search_filter(product_name, prefix='product__'))
 
-        try:
-            paginated_product_incomings = paginator.page(page_index)
-        except PageNotAnInteger:
-            paginated_product_incomings = paginator.page(1)
-        except EmptyPage:
-            paginated_product_incomings = paginator.page(paginator.num_pages)
+        # Phân trang (page_index / page_size hoặc cursor)
+        paginated_product_incomings = paginate(request, product_incomings)
 
         # Serialize dữ liệu
-        serializer = ProductIncomingSerializer(paginated_product_incomings, many=True)
+        serializer = ProductIncomingSerializer(paginated_product_incomings.object_list, many=True)
 
         # Trả về response có phân trang và dữ liệu lọc
         return Response({
             "status": status.HTTP_200_OK,
             "message": "OK",
             "data": {
-                "total_pages": paginator.num_pages,
-                "total_items": paginator.count,
-                "page_index": page_index,
-                "page_size": page_size,
+                **paginated_product_incomings.meta,
                 "product_incomings": serializer.data
             }
         }, status=status.HTTP_200_OK)
         
     @action(detail=False, methods=['get'], url_path="expenditure-statistics")
+    @read_replica
     def expenditure_statistics(self, request):
         #Tính tổng tiền chi để mua sản phẩm
         """
@@ -269,29 +326,18 @@ class ProductIncomingViewSet(viewsets.ViewSet):
         
         Optional Parameters:
         - store_id: ID of the store to filter by.
-        - start_date: Start date for filtering expenditures (optional).
-        - end_date: End date for filtering expenditures (optional).
+        - start_date: Start date for filtering expenditures (optional, format: YYYY-MM-DD).
+        - end_date: End date for filtering expenditures (optional, format: YYYY-MM-DD).
         """
-        store_id = request.GET.get('store_id')
-        start_date = request.GET.get('start_date')
-        end_date = request.GET.get('end_date')
-
-        filter_kwargs = {}
-        if store_id:
-            filter_kwargs['store_id'] = store_id
-        if start_date:
-            filter_kwargs['effective_date__gte'] = start_date
-        if end_date:
-            filter_kwargs['effective_date__lte'] = end_date
-
-        expenditures = ProductIncoming.objects.filter(**filter_kwargs).aggregate(
-            total_cost=Sum('cost_price') + Sum('vat') + Sum('shipping_cost')
+        # Chi phí của một lần nhập là giá nhập * số lượng, cộng VAT và phí vận chuyển
+        expenditures = _filter_product_incomings(request, ProductIncoming.objects.all()).aggregate(
+            total_cost=Coalesce(Sum(F('cost_price') * F('quantity_in') + F('vat') + F('shipping_cost')), Decimal(0))
         )
 
         return Response({
             "status": status.HTTP_200_OK,
             "message": "Expenditure statistics retrieved successfully.",
             "data": {
-                "total_expenditure": expenditures.get('total_cost', 0)
+                "total_expenditure": expenditures['total_cost']
             }
         }, status=status.HTTP_200_OK)
\ No newline at end of file
@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import ProductSale
+from .models import ProductSale, DailyStoreSales, DailyProductSales
 # Register your models here.
 
-admin.site.register(ProductSale)
\ No newline at end of file
+admin.site.register(ProductSale)
+admin.site.register(DailyStoreSales)
+admin.site.register(DailyProductSales)
@@ -0,0 +1,85 @@
+"""
+Thống kê doanh thu / chi phí theo chuỗi thời gian, đọc từ bảng rollup theo ngày (xem rollups.py).
+
+Mỗi request là một câu GROUP BY trên một bảng rollup, gom theo TruncDay / TruncWeek / TruncMonth của sale_date:
+- tổng / theo store: daily_store_sales (một dòng cho mỗi store, ngày)
+- theo catalog (group_by=catalog hoặc lọc catalog_id): daily_catalog_sales (một dòng cho mỗi catalog, ngày),
+  nếu lọc thêm store_id thì đọc daily_product_sales join products
+Số dòng phải đọc không phụ thuộc số đơn hàng / phiếu nhập.
+"""
+from django.db.models import F, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+
+from .models import DailyStoreSales, DailyProductSales, DailyCatalogSales
+
+PERIODS = {'day': TruncDay, 'week': TruncWeek, 'month': TruncMonth}
+GROUPS = ('total', 'store', 'catalog')
+# Số dòng tối đa của một chuỗi, quá thì phải chọn period lớn hơn hoặc khoảng ngày ngắn hơn
+MAX_SERIES_ROWS = 5000
+METRICS = ('revenue', 'cost', 'margin', 'units_sold', 'units_in')
+
+
+class SeriesTooLarge(Exception):
+    pass
+
+
+def filter_rollups(rollups, store_id=None, start_date=None, end_date=None):
+    """
+    Lọc bảng rollup theo store và khoảng ngày (date, tính trọn ngày).
+    """
+    if store_id:
+        rollups = rollups.filter(store_id=store_id)
+    if start_date:
+        rollups = rollups.filter(sale_date__gte=start_date)
+    if end_date:
+        rollups = rollups.filter(sale_date__lte=end_date)
+    return rollups
+
+
+def series(period='day', group_by='total', store_id=None, catalog_id=None, start_date=None, end_date=None,
+           limit=MAX_SERIES_ROWS):
+    """
+    Doanh thu, chi phí nhập, lãi gộp (revenue - cost), số lượng bán / nhập theo từng khoảng thời gian.
+    :param period: 'day' | 'week' | 'month'
+    :param group_by: 'total' | 'store' | 'catalog'
+    :return: list dict bucket (ngày bắt đầu khoảng), [store_id, store_name | catalog_id, catalog_name], các METRICS
+    :raise SeriesTooLarge: kết quả nhiều hơn limit dòng
+    """
+    if not (group_by == 'catalog' or catalog_id):
+        rollups, catalog = DailyStoreSales.objects.all(), None
+    elif store_id or group_by == 'store':
+        # Có thêm store thì phải đọc daily_product_sales join products
+        rollups, catalog = DailyProductSales.objects.all(), 'product__catalog'
+    else:
+        rollups, catalog = DailyCatalogSales.objects.all(), 'catalog'
+    rollups = filter_rollups(rollups, store_id, start_date, end_date)
+    if catalog_id:
+        rollups = rollups.filter(**{f'{catalog}_id': catalog_id})
+
+    keys, groups = ['bucket'], {}
+    if group_by == 'store':
+        keys, groups = ['bucket', 'store_id'], {'store_name': F('store__name')}
+    elif group_by == 'catalog' and catalog == 'catalog':
+        # daily_catalog_sales có sẵn cột catalog_id (values() không đặt được alias trùng tên field)
+        keys, groups = ['bucket', 'catalog_id'], {'catalog_name': F('catalog__name')}
+    elif group_by == 'catalog':
+        groups = {'catalog_id': F('product__catalog_id'), 'catalog_name': F('product__catalog__name')}
+
+    rows = rollups.annotate(bucket=PERIODS[period]('sale_date')).values(*keys, **groups).annotate(
+        revenue=Sum('revenue'),
+        cost=Sum('cost'),
+        units_sold=Sum('quantity_sold'),
+        units_in=Sum('quantity_in'),
+    ).annotate(margin=F('revenue') - F('cost')).order_by('bucket', *keys[1:], *groups)
+
+    rows = list(rows[:limit + 1])
+    if len(rows) > limit:
+        raise SeriesTooLarge(f"More than {limit} rows, use a longer period or a shorter date range.")
+    return rows
+
+
+def totals(rows):
+    """
+    Tổng các METRICS của chuỗi (cộng trên các dòng đã gom, không query lại).
+    """
+    return {metric: sum((row[metric] or 0) for row in rows) for metric in METRICS}
@@ -0,0 +1,29 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from drfecommerce.apps.product_sale.rollups import rebuild_rollups
+
+
+def _parse_date(value):
+    try:
+        return datetime.datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise CommandError(f"Invalid date '{value}'. Please use YYYY-MM-DD.")
+
+
+class Command(BaseCommand):
+    help = "Tính lại bảng doanh thu / chi phí theo ngày (daily_store_sales, daily_product_sales, daily_catalog_sales) từ product_sales và product_incomings."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-date', help="Chỉ tính lại từ ngày này (YYYY-MM-DD)")
+        parser.add_argument('--end-date', help="Chỉ tính lại đến hết ngày này (YYYY-MM-DD)")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        start_date = _parse_date(options['start_date']) if options['start_date'] else None
+        end_date = _parse_date(options['end_date']) if options['end_date'] else None
+
+        store_rows, product_rows, catalog_rows = rebuild_rollups(start_date, end_date, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {store_rows} daily store rows, {product_rows} daily product rows "
+            f"and {catalog_rows} daily catalog rows."))
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.15 on 2026-10-18 13:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product_sale', '0002_alter_productsale_table'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='productsale',
+            index=models.Index(fields=['store', 'sale_date'], name='product_sales_store_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productsale',
+            index=models.Index(fields=['sale_date'], name='product_sales_date_idx'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.15 on 2026-10-18 13:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product', '0003_product_products_live_created_idx_and_more'),
+        ('store', '0003_store_stores_live_created_idx'),
+        ('product_sale', '0003_productsale_product_sales_store_date_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyProductSales',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('sale_date', models.DateField()),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('quantity_sold', models.IntegerField(default=0)),
+                ('sales_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='product.product')),
+                ('store', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='store.store')),
+            ],
+            options={
+                'db_table': 'daily_product_sales',
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyStoreSales',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('sale_date', models.DateField()),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('quantity_sold', models.IntegerField(default=0)),
+                ('sales_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('store', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='store.store')),
+            ],
+            options={
+                'db_table': 'daily_store_sales',
+                'indexes': [models.Index(fields=['sale_date'], name='daily_store_sales_date_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailystoresales',
+            constraint=models.UniqueConstraint(fields=('store', 'sale_date'), name='daily_store_sales_uniq'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyproductsales',
+            index=models.Index(fields=['sale_date', 'store'], name='daily_product_sales_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyproductsales',
+            constraint=models.UniqueConstraint(fields=('product', 'store', 'sale_date'), name='daily_product_sales_uniq'),
+        ),
+    ]
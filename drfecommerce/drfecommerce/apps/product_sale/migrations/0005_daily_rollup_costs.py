@@ -0,0 +1,57 @@
+# Generated by Django 4.2.15 on 2026-10-18 14:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0004_catalog_search_document'),
+        ('product_sale', '0004_daily_sales_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailyproductsales',
+            name='cost',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='dailyproductsales',
+            name='quantity_in',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='dailystoresales',
+            name='cost',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='dailystoresales',
+            name='quantity_in',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='DailyCatalogSales',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('sale_date', models.DateField()),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('quantity_sold', models.IntegerField(default=0)),
+                ('sales_count', models.IntegerField(default=0)),
+                ('cost', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('quantity_in', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('catalog', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='catalog.catalog')),
+            ],
+            options={
+                'db_table': 'daily_catalog_sales',
+                'indexes': [models.Index(fields=['sale_date'], name='daily_catalog_sales_date_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailycatalogsales',
+            constraint=models.UniqueConstraint(fields=('catalog', 'sale_date'), name='daily_catalog_sales_uniq'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.15 on 2026-10-18 15:20
+
+from django.db import migrations, models
+
+TOTAL_FIELDS = ('revenue', 'quantity_sold', 'sales_count', 'cost', 'quantity_in')
+
+
+def merge_duplicate_no_catalog_rows(apps, schema_editor):
+    """
+    Gộp các dòng daily_catalog_sales trùng ngày có catalog NULL vào dòng có id nhỏ nhất
+    trước khi thêm unique constraint.
+    """
+    DailyCatalogSales = apps.get_model('product_sale', 'DailyCatalogSales')
+    keep = {}
+    for row in DailyCatalogSales.objects.filter(catalog__isnull=True).order_by('id'):
+        if row.sale_date not in keep:
+            keep[row.sale_date] = row
+            continue
+        first = keep[row.sale_date]
+        for field in TOTAL_FIELDS:
+            setattr(first, field, getattr(first, field) + getattr(row, field))
+        first.save(update_fields=list(TOTAL_FIELDS))
+        row.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product_sale', '0005_daily_rollup_costs'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_no_catalog_rows, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='dailycatalogsales',
+            constraint=models.UniqueConstraint(condition=models.Q(('catalog__isnull', True)), fields=('sale_date',), name='daily_catalog_sales_no_catalog_uniq'),
+        ),
+    ]
@@ -2,6 +2,7 @@ from django.db import models
 from drfecommerce.apps.store.models import Store
 from drfecommerce.apps.product.models import Product
 from drfecommerce.apps.order_detail.models import OrderDetail
+from drfecommerce.apps.catalog.models import Catalog
 from django.utils import timezone
 
 class ProductSale(models.Model):
@@ -21,4 +22,78 @@ class ProductSale(models.Model):
     
     class Meta:
         db_table = 'product_sales'
+        indexes = [
+            models.Index(fields=['store', 'sale_date'], name='product_sales_store_date_idx'),
+            models.Index(fields=['sale_date'], name='product_sales_date_idx'),
+        ]
 
+
+
+class DailyStoreSales(models.Model):
+    #doanh thu và chi phí nhập hàng theo ngày của từng cửa hàng, cộng dồn mỗi khi có ProductSale / ProductIncoming mới (xem rollups.py)
+    id = models.AutoField(primary_key=True)
+    store = models.ForeignKey(Store, on_delete=models.CASCADE)
+    sale_date = models.DateField()  # Ngày bán (theo múi giờ của hệ thống)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)  # Tổng sale_price * quantity_sold
+    quantity_sold = models.IntegerField(default=0)
+    sales_count = models.IntegerField(default=0)  # Số dòng product_sale
+    cost = models.DecimalField(max_digits=14, decimal_places=2, default=0)  # Tổng chi phí nhập hàng (cost_price * quantity_in + vat + shipping_cost)
+    quantity_in = models.IntegerField(default=0)  # Số lượng nhập vào
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'daily_store_sales'
+        constraints = [
+            models.UniqueConstraint(fields=['store', 'sale_date'], name='daily_store_sales_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['sale_date'], name='daily_store_sales_date_idx'),
+        ]
+
+
+class DailyProductSales(models.Model):
+    #số lượng / doanh thu / chi phí nhập theo ngày của từng sản phẩm tại từng cửa hàng
+    id = models.AutoField(primary_key=True)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    store = models.ForeignKey(Store, on_delete=models.CASCADE)
+    sale_date = models.DateField()
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    quantity_sold = models.IntegerField(default=0)
+    sales_count = models.IntegerField(default=0)
+    cost = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    quantity_in = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'daily_product_sales'
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'store', 'sale_date'], name='daily_product_sales_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['sale_date', 'store'], name='daily_product_sales_date_idx'),
+        ]
+
+
+class DailyCatalogSales(models.Model):
+    #doanh thu / chi phí nhập theo ngày của từng catalog (mọi cửa hàng), dùng cho thống kê theo catalog
+    id = models.AutoField(primary_key=True)
+    catalog = models.ForeignKey(Catalog, on_delete=models.CASCADE, null=True, blank=True)  # null: sản phẩm không thuộc catalog nào
+    sale_date = models.DateField()
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    quantity_sold = models.IntegerField(default=0)
+    sales_count = models.IntegerField(default=0)
+    cost = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    quantity_in = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'daily_catalog_sales'
+        constraints = [
+            models.UniqueConstraint(fields=['catalog', 'sale_date'], name='daily_catalog_sales_uniq'),
+            # Unique ở trên không áp dụng cho catalog NULL, sản phẩm không thuộc catalog nào cũng chỉ có một dòng mỗi ngày
+            models.UniqueConstraint(fields=['sale_date'], condition=models.Q(catalog__isnull=True),
+                                    name='daily_catalog_sales_no_catalog_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['sale_date'], name='daily_catalog_sales_date_idx'),
+        ]
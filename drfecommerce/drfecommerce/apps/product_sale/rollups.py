@@ -0,0 +1,163 @@
+import datetime
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Sum, Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from drfecommerce.apps.product.models import Product
+from drfecommerce.apps.product_incoming.models import ProductIncoming
+from .models import ProductSale, DailyStoreSales, DailyProductSales, DailyCatalogSales
+
+
+def _local_day(value):
+    return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+
+
+def _sale_day(sale):
+    return _local_day(sale.sale_date)
+
+
+def _incoming_day(incoming):
+    return _local_day(incoming.effective_date)
+
+
+def incoming_cost(incoming):
+    """
+    Chi phí của một lần nhập hàng: giá nhập * số lượng + VAT + phí vận chuyển.
+    """
+    return (Decimal(str(incoming.cost_price)) * incoming.quantity_in
+            + Decimal(str(incoming.vat or 0)) + Decimal(str(incoming.shipping_cost or 0)))
+
+
+def _group(items, key, values):
+    """
+    Cộng dồn các giá trị của values(item) (dict field -> số) theo key.
+    """
+    totals = {}
+    for item in items:
+        group = totals.setdefault(key(item), {})
+        for field, value in values(item).items():
+            group[field] = group.get(field, 0) + value
+    return totals
+
+
+def _increment(model, lookup, deltas):
+    row, _ = model.objects.get_or_create(**lookup)
+    model.objects.filter(pk=row.pk).update(**{field: F(field) + delta for field, delta in deltas.items()})
+
+
+def _record(items, day, values):
+    by_store = _group(items, lambda item: (item.store_id, day(item)), values)
+    by_product = _group(items, lambda item: (item.product_id, item.store_id, day(item)), values)
+    catalogs = dict(Product.objects.filter(id__in={item.product_id for item in items}).values_list('id', 'catalog_id'))
+    by_catalog = _group(items, lambda item: (catalogs.get(item.product_id) or 0, day(item)), values)
+
+    with transaction.atomic():
+        # Cập nhật theo thứ tự key để các transaction khoá dòng theo cùng một thứ tự
+        for (store_id, sale_date), deltas in sorted(by_store.items()):
+            _increment(DailyStoreSales, {'store_id': store_id, 'sale_date': sale_date}, deltas)
+        for (product_id, store_id, sale_date), deltas in sorted(by_product.items()):
+            _increment(DailyProductSales, {'product_id': product_id, 'store_id': store_id, 'sale_date': sale_date}, deltas)
+        for (catalog_id, sale_date), deltas in sorted(by_catalog.items()):
+            _increment(DailyCatalogSales, {'catalog_id': catalog_id or None, 'sale_date': sale_date}, deltas)
+
+
+def record_sales(sales):
+    """
+    Cộng các ProductSale vừa tạo vào bảng rollup theo ngày (daily_store_sales, daily_product_sales, daily_catalog_sales).
+    Dùng F() để cộng ngay trong database nên các đơn giao cùng lúc không ghi đè lên nhau.
+    :param sales: list ProductSale đã được lưu
+    """
+    _record(sales, _sale_day, lambda sale: {
+        'revenue': Decimal(str(sale.sale_price)) * sale.quantity_sold,
+        'quantity_sold': sale.quantity_sold,
+        'sales_count': 1,
+    })
+
+
+def record_costs(incomings, sign=1):
+    """
+    Cộng chi phí nhập hàng (cost, quantity_in) vào bảng rollup theo ngày nhập (effective_date).
+    :param incomings: list ProductIncoming đã được lưu
+    :param sign: -1 khi xoá phiếu nhập (trừ lại chi phí đã cộng)
+    """
+    _record(incomings, _incoming_day, lambda incoming: {
+        'cost': sign * incoming_cost(incoming),
+        'quantity_in': sign * incoming.quantity_in,
+    })
+
+
+def _day_bounds(field, start_date, end_date):
+    filters = {}
+    if start_date:
+        filters[f'{field}__gte'] = timezone.make_aware(datetime.datetime.combine(start_date, datetime.time.min))
+    if end_date:
+        filters[f'{field}__lt'] = timezone.make_aware(
+            datetime.datetime.combine(end_date + datetime.timedelta(days=1), datetime.time.min))
+    return filters
+
+
+def _totals(rows, key, fields):
+    """
+    Gom các dòng aggregate (của product_sales và product_incomings) vào cùng một dòng rollup theo key.
+    """
+    totals = {}
+    for row in rows:
+        group = totals.setdefault(tuple(row[field] for field in key), {})
+        group.update({field: row[field] for field in fields})
+    return totals
+
+
+def rebuild_rollups(start_date=None, end_date=None, batch_size=1000):
+    """
+    Tính lại bảng rollup từ product_sales và product_incomings (cho dữ liệu cũ hoặc khi cần đối soát).
+    :param start_date: date, chỉ tính lại từ ngày này (mặc định: toàn bộ)
+    :param end_date: date, chỉ tính lại đến hết ngày này (mặc định: toàn bộ)
+    :return: (số dòng daily_store_sales, daily_product_sales, daily_catalog_sales) đã tạo
+    """
+    sales = ProductSale.objects.filter(**_day_bounds('sale_date', start_date, end_date)).annotate(day=TruncDate('sale_date'))
+    sale_totals = {
+        'revenue': Sum(F('sale_price') * F('quantity_sold')),
+        'quantity_sold': Sum('quantity_sold'),
+        'sales_count': Count('id'),
+    }
+    incomings = ProductIncoming.objects.filter(
+        **_day_bounds('effective_date', start_date, end_date)).annotate(day=TruncDate('effective_date'))
+    cost_totals = {
+        'cost': Sum(F('cost_price') * F('quantity_in') + F('vat') + F('shipping_cost')),
+        'quantity_in': Sum('quantity_in'),
+    }
+
+    def rows(key):
+        totals = _totals(sales.values(*key).annotate(**sale_totals).order_by().iterator(), key, sale_totals)
+        for group_key, values in _totals(incomings.values(*key).annotate(**cost_totals).order_by().iterator(),
+                                         key, cost_totals).items():
+            totals.setdefault(group_key, {}).update(values)
+        return totals
+
+    rollup_filters = {}
+    if start_date:
+        rollup_filters['sale_date__gte'] = start_date
+    if end_date:
+        rollup_filters['sale_date__lte'] = end_date
+
+    with transaction.atomic():
+        DailyStoreSales.objects.filter(**rollup_filters).delete()
+        DailyProductSales.objects.filter(**rollup_filters).delete()
+        DailyCatalogSales.objects.filter(**rollup_filters).delete()
+
+        store_rows = DailyStoreSales.objects.bulk_create([
+            DailyStoreSales(store_id=store_id, sale_date=day, **values)
+            for (store_id, day), values in rows(('store_id', 'day')).items()
+        ], batch_size=batch_size)
+        product_rows = DailyProductSales.objects.bulk_create([
+            DailyProductSales(product_id=product_id, store_id=store_id, sale_date=day, **values)
+            for (product_id, store_id, day), values in rows(('product_id', 'store_id', 'day')).items()
+        ], batch_size=batch_size)
+        catalog_rows = DailyCatalogSales.objects.bulk_create([
+            DailyCatalogSales(catalog_id=catalog_id, sale_date=day, **values)
+            for (catalog_id, day), values in rows(('product__catalog_id', 'day')).items()
+        ], batch_size=batch_size)
+
+    return len(store_rows), len(product_rows), len(catalog_rows)
@@ -1,19 +1,22 @@
 from rest_framework import serializers
+from drfecommerce.search import SEARCH_DOCUMENT_FIELDS
+from drfecommerce.eager_loading import EagerLoadingMixin
 from .models import ProductSale
 from drfecommerce.apps.product.models import Product
 
 class ProductSerializer(serializers.ModelSerializer):
     class Meta:
         model = Product
-        fields = '__all__'
+        exclude = SEARCH_DOCUMENT_FIELDS
         
 class ProductSaleSerializer(serializers.ModelSerializer):
     class Meta:
         model = ProductSale
         fields = '__all__'
     
-class ProductReportSaleSerializer(serializers.ModelSerializer):
+class ProductReportSaleSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     product = ProductSerializer(read_only=True)  # Liên kết với ProductSerializer
+    select_related_fields = ('product',)
 
     class Meta:
         model = ProductSale
@@ -1,22 +1,85 @@
 from rest_framework import viewsets, status
 from rest_framework.response import Response
-from .serializers import ProductSaleSerializer, ProductReportSaleSerializer
-from drfecommerce.apps.product_sale.models import ProductSale
-from drfecommerce.apps.product_sale.models import ProductSale
+from .serializers import ProductSaleSerializer
+from drfecommerce.apps.product_sale.models import ProductSale, DailyStoreSales, DailyProductSales
 from rest_framework.permissions import IsAuthenticated
 from drfecommerce.apps.my_admin.authentication import AdminSafeJWTAuthentication
 from rest_framework.decorators import action
-from django.core.paginator import Paginator
-from django.core.paginator import EmptyPage
-from django.core.paginator import PageNotAnInteger
-from django.utils.dateparse import parse_datetime
-from django.db.models import Sum, F
+from drfecommerce.pagination import paginate
+from drfecommerce.replicas import read_replica
+from drfecommerce import exports
+from . import analytics
+from django.utils.dateparse import parse_datetime, parse_date
+from django.db.models import Sum
+
+def _request_dates(request):
+    """
+    start_date, end_date (YYYY-MM-DD) của request.
+    :return: dict start_date / end_date (date hoặc None nếu không gửi)
+    :raise ValueError: ngày sai định dạng hoặc không tồn tại (ví dụ 2024-02-30)
+    """
+    dates = {}
+    for name in ('start_date', 'end_date'):
+        value = request.GET.get(name)
+        try:
+            dates[name] = parse_date(value) if value else None
+        except ValueError:
+            dates[name] = None
+        if value and dates[name] is None:
+            raise ValueError(f"Invalid {name.replace('_', ' ')} format. Please use YYYY-MM-DD.")
+    return dates
+
+def _filter_rollups(request, rollups):
+    """
+    Lọc bảng rollup theo store_id, start_date, end_date (YYYY-MM-DD, tính trọn ngày) của request.
+    :raise ValueError: ngày không hợp lệ
+    """
+    return analytics.filter_rollups(rollups, store_id=request.GET.get('store_id'), **_request_dates(request))
+
+def _filter_product_sales(request, product_sales):
+    """
+    Lọc product_sales theo store_id, start_date, end_date (YYYY-MM-DD, tính trọn ngày) của request.
+    Dùng chung cho danh sách và export.
+    """
+    store_id = request.GET.get('store_id')
+    start_date = request.GET.get('start_date')
+    end_date = request.GET.get('end_date')
+
+    if store_id:
+        product_sales = product_sales.filter(store_id=store_id)
+
+    # If start_date or end_date is provided, filter product sales by date range
+    if start_date:
+        start_date = parse_datetime(f"{start_date} 00:00:00")
+        product_sales = product_sales.filter(sale_date__gte=start_date)
+
+    if end_date:
+        end_date = parse_datetime(f"{end_date} 23:59:59")
+        product_sales = product_sales.filter(sale_date__lte=end_date)
+    return product_sales
+
+# Cột của file export doanh số (tiêu đề, field)
+SALE_EXPORT_COLUMNS = (
+    ('id', 'id'),
+    ('sale_date', 'sale_date'),
+    ('store_id', 'store_id'),
+    ('store_name', 'store__name'),
+    ('product_id', 'product_id'),
+    ('product_code', 'product__code'),
+    ('product_name', 'product__name'),
+    ('order_id', 'order_detail__order_id'),
+    ('sale_price', 'sale_price'),
+    ('quantity_sold', 'quantity_sold'),
+    ('vat', 'vat'),
+    ('shipping_cost', 'shipping_cost'),
+)
 
 class AdminProductSaleViewSet(viewsets.ViewSet):
     authentication_classes = [AdminSafeJWTAuthentication]
     permission_classes = [IsAuthenticated]
     #Thống kê các sản phẩm đã bán, thường là áp dụng trong ngày
     @action(detail=False, methods=['get'], url_path="get-all-products-sale")
+    @read_replica
     def get_all_products_sale(self, request):
         """
         Get list of product sales with pagination and optional date range filtering.
@@ -24,54 +87,50 @@ class AdminProductSaleViewSet(viewsets.ViewSet):
         Parameters:
         - page_index: The index of the page (default is 1).
         - page_size: The number of items per page (default is 10).
+        - cursor (optional): keyset pagination, empty for the first page then next_cursor / previous_cursor.
         - start_date: The start date to filter product sales (format: YYYY-MM-DD).
         - end_date: The end date to filter product sales (format: YYYY-MM-DD).
         """
-        page_index = int(request.GET.get('page_index', 1))
-        page_size = int(request.GET.get('page_size', 10))
-        store_id = request.GET.get('store_id')
-        start_date = request.GET.get('start_date')
-        end_date = request.GET.get('end_date')
-
-        # Start building the query
-        product_sales = ProductSale.objects.all()
-        if store_id:
-            product_sales = product_sales.filter(store_id = store_id)
-
-        # If start_date or end_date is provided, filter product sales by date range
-        if start_date:
-            start_date = parse_datetime(f"{start_date} 00:00:00")
-            product_sales = product_sales.filter(sale_date__gte=start_date)
-        
-        if end_date:
-            end_date = parse_datetime(f"{end_date} 23:59:59")
-            product_sales = product_sales.filter(sale_date__lte=end_date)
-
-        paginator = Paginator(product_sales, page_size)
+        product_sales = _filter_product_sales(request, ProductSale.objects.all())
 
-        try:
-            paginated_product_sale = paginator.page(page_index)
-        except PageNotAnInteger:
-            paginated_product_sale = paginator.page(1)
-        except EmptyPage:
-            paginated_product_sale = paginator.page(paginator.num_pages)
+        paginated_product_sale = paginate(request, product_sales)
 
-        serializer = ProductSaleSerializer(paginated_product_sale, many=True)
+        serializer = ProductSaleSerializer(paginated_product_sale.object_list, many=True)
 
         return Response({
             "status": status.HTTP_200_OK,
             "message": "OK",
             "data": {
-                "total_pages": paginator.num_pages,
-                "total_items": paginator.count,
-                "page_index": page_index,
-                "page_size": page_size,
+                **paginated_product_sale.meta,
                 "product_sale": serializer.data
             }
         }, status=status.HTTP_200_OK)
         
+    @action(detail=False, methods=['get'], url_path="export-products-sale")
+    @read_replica
+    def export_products_sale(self, request):
+        """
+        Export product sales as a file, streamed from the database (constant memory for any number of rows).
+
+        Parameters:
+        - file_format: csv | xlsx (default=csv).
+        - start_date: The start date to filter product sales (format: YYYY-MM-DD).
+        - end_date: The end date to filter product sales (format: YYYY-MM-DD).
+        - store_id: Filter by store (optional).
+        """
+        file_format = request.GET.get('file_format', 'csv')
+        if file_format not in exports.FORMATS:
+            return Response({
+                "status": status.HTTP_400_BAD_REQUEST,
+                "message": f"Unsupported format, expected one of: {', '.join(exports.FORMATS)}."
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        product_sales = _filter_product_sales(request, ProductSale.objects.order_by('id'))
+        return exports.export_response(product_sales, SALE_EXPORT_COLUMNS, file_format, 'product-sales')
+
     #Thống kê doanh thu của từng cửa hàng
     @action(detail=False, methods=['get'], url_path="get-total-report")
+    @read_replica
     def get_total_report(self, request):
         """
         Get total revenue per store and product quantities sold.
@@ -79,47 +138,94 @@ class AdminProductSaleViewSet(viewsets.ViewSet):
         Parameters:
         - page_index: The index of the page (default is 1).
         - page_size: The number of items per page (default is 10).
+        - cursor (optional): keyset pagination, empty for the first page then next_cursor / previous_cursor.
         - start_date: Filter by start date (optional, format: YYYY-MM-DD).
         - end_date: Filter by end date (optional, format: YYYY-MM-DD).
         - store_id: Filter by store (optional).
         """
-        page_index = int(request.GET.get('page_index', 1))
-        page_size = int(request.GET.get('page_size', 10))
-        start_date = request.GET.get('start_date')
-        end_date = request.GET.get('end_date')
-        store_id = request.GET.get('store_id')
-
-        # Start building the query
-        product_sales = ProductSale.objects.all()
-
-        # Filter by store if provided
-        if store_id:
-            product_sales = product_sales.filter(store_id=store_id)
-
-        # Filter by date range if provided
-        if start_date:
-            product_sales = product_sales.filter(sale_date__gte=start_date)
-        if end_date:
-            product_sales = product_sales.filter(sale_date__lte=end_date)
+        # Đọc bảng rollup theo ngày thay vì group by toàn bộ product_sales,
+        # bỏ các ngày chỉ có nhập hàng (record_costs) để chỉ liệt kê những gì đã bán
+        try:
+            store_sales = _filter_rollups(request, DailyStoreSales.objects.filter(sales_count__gt=0))
+        except ValueError as e:
+            return Response({
+                "status": status.HTTP_400_BAD_REQUEST,
+                "message": str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
 
         # Calculate total revenue for each store
-        store_revenue = product_sales.values('store__name').annotate(
-            total_revenue=Sum(F('sale_price') * F('quantity_sold')),
+        store_revenue = store_sales.values('store__name').annotate(
+            total_revenue=Sum('revenue'),
             total_quantity_sold=Sum('quantity_sold')
         )
 
-        # Get paginated response
-        start = (page_index - 1) * page_size
-        end = page_index * page_size
-        paginated_data = store_revenue[start:end]
+        # Get paginated response, mỗi store là một nhóm nên phân trang theo store__name
+        paginated_data = paginate(request, store_revenue, ordering=('store__name',))
 
         return Response({
             "status": status.HTTP_200_OK,
-            "total_items": store_revenue.count(),
-            "data": paginated_data,
+            **paginated_data.meta,
+            "data": paginated_data.object_list,
         })
         
+    @action(detail=False, methods=['get'], url_path="analytics")
+    @read_replica
+    def sales_analytics(self, request):
+        """
+        Revenue, purchase cost, margin (revenue - cost) and units sold / received per time bucket.
+        Computed with one grouped query over the daily rollup tables.
+
+        Parameters:
+        - period: day | week | month (default=day).
+        - group_by: total | store | catalog (default=total).
+        - start_date: Filter by start date (optional, format: YYYY-MM-DD).
+        - end_date: Filter by end date (optional, format: YYYY-MM-DD).
+        - store_id: Filter by store (optional).
+        - catalog_id: Filter by catalog (optional).
+        """
+        period = request.GET.get('period', 'day')
+        group_by = request.GET.get('group_by', 'total')
+        if period not in analytics.PERIODS or group_by not in analytics.GROUPS:
+            return Response({
+                "status": status.HTTP_400_BAD_REQUEST,
+                "message": f"period must be one of: {', '.join(analytics.PERIODS)}; "
+                           f"group_by must be one of: {', '.join(analytics.GROUPS)}."
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            dates = _request_dates(request)
+        except ValueError as e:
+            return Response({
+                "status": status.HTTP_400_BAD_REQUEST,
+                "message": str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            rows = analytics.series(
+                period, group_by,
+                store_id=request.GET.get('store_id'),
+                catalog_id=request.GET.get('catalog_id'),
+                **dates,
+            )
+        except analytics.SeriesTooLarge as e:
+            return Response({
+                "status": status.HTTP_400_BAD_REQUEST,
+                "message": str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            "status": status.HTTP_200_OK,
+            "message": "OK",
+            "data": {
+                "period": period,
+                "group_by": group_by,
+                "totals": analytics.totals(rows),
+                "series": rows,
+            }
+        }, status=status.HTTP_200_OK)
+
     @action(detail=False, methods=['get'], url_path="get-list-sold-products-filter")
+    @read_replica
     def list_sold_products_filter(self, request):
         """
         #Thống kê các product đã bán (số lượng)
@@ -130,58 +236,36 @@ class AdminProductSaleViewSet(viewsets.ViewSet):
         Parameters:
         - page_index: The index of the page (default is 1).
         - page_size: The number of items per page (default is 10).
+        - cursor (optional): keyset pagination, empty for the first page then next_cursor / previous_cursor.
         - start_date: The start date to filter product sales (format: YYYY-MM-DD).
         - end_date: The end date to filter product sales (format: YYYY-MM-DD).
         - store_id: The ID of a specific store to filter the sales.
         """
-        page_index = int(request.GET.get('page_index', 1))
-        page_size = int(request.GET.get('page_size', 10))
-        start_date = request.GET.get('start_date')
-        end_date = request.GET.get('end_date')
-        store_id = request.GET.get('store_id')
-
-        # Start building the query
-        product_sales = ProductSale.objects.all()
-
-        # Filter by store if provided
-        if store_id:
-            product_sales = product_sales.filter(store_id=store_id)
-
-        # Filter by date range if provided
-        if start_date and end_date:
-            product_sales = product_sales.filter(sale_date__range=[start_date, end_date])
-        elif start_date:
-            product_sales = product_sales.filter(sale_date__gte=start_date)
-        elif end_date:
-            product_sales = product_sales.filter(sale_date__lte=end_date)
+        # Đọc bảng rollup theo ngày thay vì group by toàn bộ product_sales,
+        # bỏ các ngày chỉ có nhập hàng (record_costs) để chỉ liệt kê những gì đã bán
+        try:
+            product_sales = _filter_rollups(request, DailyProductSales.objects.filter(sales_count__gt=0))
+        except ValueError as e:
+            return Response({
+                "status": status.HTTP_400_BAD_REQUEST,
+                "message": str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
 
         # Group by product and calculate the total quantity sold
         product_sales = product_sales.values('product__id', 'product__name').annotate(
-            total_quantity_sold=Sum('quantity_sold')
+            total_quantity_sold=Sum('quantity_sold'),
+            total_revenue=Sum('revenue')
         )
 
-        # Apply pagination
-        paginator = Paginator(product_sales, page_size)
-
-        try:
-            paginated_product_sale = paginator.page(page_index)
-        except PageNotAnInteger:
-            paginated_product_sale = paginator.page(1)
-        except EmptyPage:
-            paginated_product_sale = paginator.page(paginator.num_pages)
-
-        # Serialize the paginated data
-        serializer = ProductReportSaleSerializer(paginated_product_sale, many=True)
+        # Apply pagination, khoá keyset là product__id vì mỗi dòng là một product
+        paginated_product_sale = paginate(request, product_sales, ordering=('product__id',))
 
         return Response({
             "status": status.HTTP_200_OK,
             "message": "OK",
             "data": {
-                "total_pages": paginator.num_pages,
-                "total_items": paginator.count,
-                "page_index": page_index,
-                "page_size": page_size,
-                "product_sale": serializer.data
+                **paginated_product_sale.meta,
+                "product_sale": paginated_product_sale.object_list
             }
         }, status=status.HTTP_200_OK)
 
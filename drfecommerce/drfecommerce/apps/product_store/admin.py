@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import ProductStore
+from .models import ProductStore, StockReservation
 # Register your models here.
 
 admin.site.register(ProductStore)
+admin.site.register(StockReservation)
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.15 on 2026-10-18 13:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0002_alter_order_table'),
+        ('product_store', '0002_alter_productstore_table'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockReservation',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('held', 'Held'), ('committed', 'Committed'), ('released', 'Released')], default='held', max_length=20)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('order', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stock_reservation', to='order.order')),
+            ],
+            options={
+                'db_table': 'stock_reservations',
+            },
+        ),
+    ]
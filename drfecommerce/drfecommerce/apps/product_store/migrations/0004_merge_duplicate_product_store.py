@@ -0,0 +1,31 @@
+from django.db import migrations
+
+
+def merge_duplicate_product_store(apps, schema_editor):
+    """
+    Gộp các dòng product_store trùng (product, store) vào dòng có id nhỏ nhất
+    trước khi thêm unique constraint ở migration sau.
+    """
+    ProductStore = apps.get_model('product_store', 'ProductStore')
+    keep = {}
+    for stock in ProductStore.objects.order_by('id'):
+        key = (stock.product_id, stock.store_id)
+        if key not in keep:
+            keep[key] = stock
+            continue
+        first = keep[key]
+        first.quantity_in += stock.quantity_in
+        first.remaining_stock += stock.remaining_stock
+        first.save(update_fields=['quantity_in', 'remaining_stock'])
+        stock.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product_store', '0003_stockreservation'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_product_store, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.15 on 2026-10-18 13:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('product_store', '0004_merge_duplicate_product_store'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='productstore',
+            index=models.Index(condition=models.Q(('delete_at__isnull', True)), fields=['store', 'product'], name='product_store_live_store_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='productstore',
+            constraint=models.UniqueConstraint(fields=('product', 'store'), name='product_store_product_store_uniq'),
+        ),
+    ]
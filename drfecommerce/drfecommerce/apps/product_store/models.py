@@ -1,6 +1,8 @@
 from django.db import models
+from django.db.models import Q
 from drfecommerce.apps.store.models import Store
 from drfecommerce.apps.product.models import Product
+from drfecommerce.apps.order.models import Order
 from django.utils import timezone
 
 class ProductStore(models.Model):
@@ -15,4 +17,28 @@ class ProductStore(models.Model):
     
     class Meta:
         db_table = 'product_store'
+        constraints = [
+            # mỗi sản phẩm chỉ có một dòng tồn kho trong một cửa hàng
+            models.UniqueConstraint(fields=['product', 'store'], name='product_store_product_store_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['store', 'product'], name='product_store_live_store_idx', condition=Q(delete_at__isnull=True)),
+        ]
 
+
+class StockReservation(models.Model):
+    #giữ hàng cho một đơn hàng: held khi tạo đơn, committed khi đơn được xác nhận, released khi huỷ / trả hàng
+    STATUS_CHOICES = (
+        ('held', 'Held'),
+        ('committed', 'Committed'),
+        ('released', 'Released'),
+    )
+
+    id = models.AutoField(primary_key=True)
+    order = models.OneToOneField(Order, on_delete=models.CASCADE, related_name='stock_reservation')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='held')
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'stock_reservations'
@@ -0,0 +1,182 @@
+from django.db import transaction
+from django.db.models import Case, When, Value, F, Q, IntegerField
+from .models import ProductStore, StockReservation
+from drfecommerce.apps.order_detail.models import OrderDetail
+
+# Các trạng thái mà ở code cũ (trước khi có StockReservation) kho đã bị trừ
+STOCK_DEDUCTED_STATUSES = ('confirmed', 'shipped', 'delivered')
+
+
+class InsufficientStock(Exception):
+    """
+    Không đủ hàng trong kho (hoặc cửa hàng không bán sản phẩm) để giữ cho đơn hàng.
+    """
+    def __init__(self, product_id, store_id, available, requested):
+        super().__init__(f"Not enough stock for product {product_id} in store {store_id}. Available: {available}")
+        self.product_id = product_id
+        self.store_id = store_id
+        self.available = available
+        self.requested = requested
+
+
+def lock_stock_rows(pairs):
+    """
+    Khoá (select_for_update) các dòng product_store theo thứ tự id để tránh deadlock
+    giữa các đơn hàng đặt cùng lúc. Phải được gọi bên trong transaction.atomic().
+    :param pairs: iterable (product_id, store_id)
+    :return: dict key (product_id, store_id) -> ProductStore
+    """
+    condition = Q()
+    for product_id, store_id in set(pairs):
+        condition |= Q(product_id=product_id, store_id=store_id)
+    if not condition:
+        return {}
+    stocks = ProductStore.objects.select_for_update().filter(condition).order_by('id')
+    return {(stock.product_id, stock.store_id): stock for stock in stocks}
+
+
+def _stock_delta(stocks, quantities):
+    return Case(
+        *[When(id=stocks[key].id, then=Value(quantity)) for key, quantity in quantities.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def reserve_stock(stocks, quantities):
+    """
+    Trừ remaining_stock cho cả đơn hàng bằng một câu UPDATE.
+    Điều kiện remaining_stock >= số lượng nằm ngay trong câu UPDATE nên kho không bao giờ bị âm,
+    kể cả trên database không hỗ trợ select_for_update.
+    :param stocks: kết quả của lock_stock_rows
+    :param quantities: dict key (product_id, store_id) -> số lượng cần giữ
+    """
+    for key, quantity in quantities.items():
+        stock = stocks.get(key)
+        if stock is None or stock.remaining_stock < quantity:
+            raise InsufficientStock(key[0], key[1], stock.remaining_stock if stock else 0, quantity)
+    if not quantities:
+        return
+
+    delta = _stock_delta(stocks, quantities)
+    updated = ProductStore.objects.filter(
+        id__in=[stocks[key].id for key in quantities],
+        remaining_stock__gte=delta,
+    ).update(remaining_stock=F('remaining_stock') - delta)
+
+    if updated != len(quantities):
+        # Có đơn khác đã lấy hàng trước, huỷ toàn bộ transaction hiện tại
+        key = next(iter(quantities))
+        raise InsufficientStock(key[0], key[1], stocks[key].remaining_stock, quantities[key])
+
+    for key, quantity in quantities.items():
+        stocks[key].remaining_stock -= quantity
+
+
+def release_stock(stocks, quantities):
+    """
+    Cộng lại remaining_stock cho cả đơn hàng bằng một câu UPDATE.
+    """
+    quantities = {key: quantity for key, quantity in quantities.items() if key in stocks}
+    if not quantities:
+        return
+    delta = _stock_delta(stocks, quantities)
+    ProductStore.objects.filter(
+        id__in=[stocks[key].id for key in quantities]
+    ).update(remaining_stock=F('remaining_stock') + delta)
+
+    for key, quantity in quantities.items():
+        stocks[key].remaining_stock += quantity
+
+
+def receive_stock(quantities):
+    """
+    Nhập kho cho nhiều (product, store) cùng lúc: cộng quantity_in và remaining_stock bằng một câu UPDATE F().
+    Dòng product_store chưa có được tạo trước (bulk_create ignore_conflicts theo unique (product, store)),
+    sau đó các dòng được khoá theo thứ tự id nên các phiếu nhập đồng thời không ghi đè lên nhau.
+    Phải được gọi bên trong transaction.atomic().
+    :param quantities: dict key (product_id, store_id) -> số lượng nhập
+    :return: dict key (product_id, store_id) -> ProductStore với số lượng sau khi nhập
+    """
+    if not quantities:
+        return {}
+    ProductStore.objects.bulk_create(
+        [ProductStore(product_id=product_id, store_id=store_id) for product_id, store_id in quantities],
+        ignore_conflicts=True,
+    )
+    stocks = lock_stock_rows(quantities)
+    delta = _stock_delta(stocks, quantities)
+    ProductStore.objects.filter(id__in=[stocks[key].id for key in quantities]).update(
+        quantity_in=F('quantity_in') + delta,
+        remaining_stock=F('remaining_stock') + delta,
+    )
+
+    for key, quantity in quantities.items():
+        stocks[key].quantity_in += quantity
+        stocks[key].remaining_stock += quantity
+    return stocks
+
+
+def order_quantities(order):
+    """
+    Tổng số lượng theo (product_id, store_id) của một đơn hàng.
+    """
+    quantities = {}
+    for product_id, store_id, quantity in OrderDetail.objects.filter(order=order).values_list('product_id', 'store_id', 'quantity'):
+        key = (product_id, store_id)
+        quantities[key] = quantities.get(key, 0) + quantity
+    return quantities
+
+
+def _locked_reservation(order):
+    return StockReservation.objects.select_for_update().filter(order=order).first()
+
+
+def commit_order_stock(order):
+    """
+    Chuyển phần hàng đang giữ của đơn sang trạng thái committed (khi đơn được xác nhận / giao đi).
+    - held: không trừ kho thêm lần nữa
+    - released: giữ hàng lại từ đầu
+    - chưa có reservation (đơn tạo trước khi có tính năng này): trừ kho nếu đơn chưa từng được xác nhận
+    Gọi với order_status hiện tại của đơn (trước khi cập nhật trạng thái mới).
+    """
+    with transaction.atomic():
+        reservation = _locked_reservation(order)
+        if reservation is not None and reservation.status == 'committed':
+            return reservation
+
+        needs_stock = (
+            (reservation is None and order.order_status not in STOCK_DEDUCTED_STATUSES)
+            or (reservation is not None and reservation.status == 'released')
+        )
+        if needs_stock:
+            quantities = order_quantities(order)
+            reserve_stock(lock_stock_rows(quantities), quantities)
+
+        if reservation is None:
+            reservation = StockReservation(order=order)
+        reservation.status = 'committed'
+        reservation.save()
+        return reservation
+
+
+def release_order_stock(order):
+    """
+    Trả lại kho phần hàng của đơn (khi đơn bị huỷ hoặc trả lại). Gọi nhiều lần cũng chỉ cộng lại một lần.
+    :return: True nếu kho được cộng lại
+    """
+    with transaction.atomic():
+        reservation = _locked_reservation(order)
+        if reservation is None:
+            if order.order_status not in STOCK_DEDUCTED_STATUSES:
+                return False
+            reservation = StockReservation(order=order)
+        elif reservation.status == 'released':
+            return False
+
+        quantities = order_quantities(order)
+        release_stock(lock_stock_rows(quantities), quantities)
+
+        reservation.status = 'released'
+        reservation.save()
+        return True
@@ -8,9 +8,8 @@ from .models import ProductStore
 from .serializers import ProductStoreSerializer, StoreHasProductSerializer, DetailProductStoreSerializer
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from drfecommerce.apps.my_admin.authentication import AdminSafeJWTAuthentication
-from django.core.paginator import Paginator
-from django.core.paginator import EmptyPage
-from django.core.paginator import PageNotAnInteger
+from drfecommerce.pagination import paginate
+from drfecommerce.search import search_filter
 
 class ProductStoreViewSet(viewsets.ModelViewSet):
     queryset = ProductStore.objects.all()
@@ -66,10 +65,9 @@ class ProductStoreViewSet(viewsets.ModelViewSet):
         query_params:
         - page_index: trang (mặc định là 1)
         - page_size: số lượng sản phẩm trên mỗi trang (mặc định là 10)
+        - cursor (optional): keyset pagination, empty for the first page then next_cursor / previous_cursor.
         - store_id: ID của store để lọc
         """
-        page_index = int(request.GET.get('page_index', 1))
-        page_size = int(request.GET.get('page_size', 10))
         store_id = request.GET.get('store_id')
         
         try:
@@ -82,25 +80,15 @@ class ProductStoreViewSet(viewsets.ModelViewSet):
 
         products = ProductStore.objects.filter(store=store)
 
-        paginator = Paginator(products, page_size)
+        paginated_products = paginate(request, products)
 
-        try:
-            paginated_products = paginator.page(page_index)
-        except PageNotAnInteger:
-            paginated_products = paginator.page(1)
-        except EmptyPage:
-            paginated_products = paginator.page(paginator.num_pages)
-
-        serializer = ProductStoreSerializer(paginated_products, many=True)
+        serializer = ProductStoreSerializer(paginated_products.object_list, many=True)
 
         return Response({
             "status": status.HTTP_200_OK,
             "message": "OK",
             "data": {
-                "total_pages": paginator.num_pages,
-                "total_items": paginator.count,
-                "page_index": page_index,
-                "page_size": page_size,
+                **paginated_products.meta,
                 "products": serializer.data
             }
         }, status=status.HTTP_200_OK)
@@ -112,11 +100,10 @@ class ProductStoreViewSet(viewsets.ModelViewSet):
         query_params:
         - page_index: trang (mặc định là 1)
         - page_size: số lượng sản phẩm trên mỗi trang (mặc định là 10)
+        - cursor (optional): keyset pagination, empty for the first page then next_cursor / previous_cursor.
         - store_id: ID của store để lọc
         - product_name: string (tên của sản phẩm)
         """
-        page_index = int(request.GET.get('page_index', 1))
-        page_size = int(request.GET.get('page_size', 10))
         product_name = request.GET.get('product_name', None)
         store_id = request.GET.get('store_id')
         try:
@@ -131,27 +118,17 @@ class ProductStoreViewSet(viewsets.ModelViewSet):
 
         # Lọc theo tên hoặc mã sản phẩm
         if product_name:
-            products = products.filter(product__name__icontains=product_name)
+            products = products.filter(search_filter(product_name, prefix='product__'))
 
-        paginator = Paginator(products, page_size)
-
-        try:
-            paginated_products = paginator.page(page_index)
-        except PageNotAnInteger:
-            paginated_products = paginator.page(1)
-        except EmptyPage:
-            paginated_products = paginator.page(paginator.num_pages)
+        paginated_products = paginate(request, products)
 
-        serializer = ProductStoreSerializer(paginated_products, many=True)
+        serializer = ProductStoreSerializer(paginated_products.object_list, many=True)
 
         return Response({
             "status": status.HTTP_200_OK,
             "message": "OK",
             "data": {
-                "total_pages": paginator.num_pages,
-                "total_items": paginator.count,
-                "page_index": page_index,
-                "page_size": page_size,
+                **paginated_products.meta,
                 "products": serializer.data
             }
         }, status=status.HTTP_200_OK)
@@ -165,10 +142,9 @@ class PublicProductStoreViewSet(viewsets.ModelViewSet):
         query_params:
         - page_index: trang (mặc định là 1)
         - page_size: số lượng sản phẩm trên mỗi trang (mặc định là 10)
+        - cursor (optional): keyset pagination, empty for the first page then next_cursor / previous_cursor.
         - product_id: ID của product để lọc
         """
-        page_index = int(request.GET.get('page_index', 1))
-        page_size = int(request.GET.get('page_size', 10))
         product_id = request.GET.get('product_id')
 
         if not product_id:
@@ -183,25 +159,15 @@ class PublicProductStoreViewSet(viewsets.ModelViewSet):
             
         stores_has_product = ProductStore.objects.filter(product = product)
             
-        paginator = Paginator(stores_has_product, page_size)
+        paginated_stores = paginate(request, stores_has_product)
 
-        try:
-            paginated_stores = paginator.page(page_index)
-        except PageNotAnInteger:
-            paginated_stores = paginator.page(1)
-        except EmptyPage:
-            paginated_stores = paginator.page(paginator.num_pages)
-
-        serializer = StoreHasProductSerializer(paginated_stores, many=True)
+        serializer = StoreHasProductSerializer(paginated_stores.object_list, many=True)
         
         return Response({
             "status": status.HTTP_200_OK,
             "message": "OK",
             "data": {
-                "total_pages": paginator.num_pages,
-                "total_items": paginator.count,
-                "page_index": page_index,
-                "page_size": page_size,
+                **paginated_stores.meta,
                 "stores": serializer.data
             }
         }, status=status.HTTP_200_OK)
@@ -213,12 +179,11 @@ class PublicProductStoreViewSet(viewsets.ModelViewSet):
         query_params:
         - page_index: trang (mặc định là 1)
         - page_size: số lượng sản phẩm trên mỗi trang (mặc định là 10)
+        - cursor (optional): keyset pagination, empty for the first page then next_cursor / previous_cursor.
         - product_id: ID của product để lọc
         - product_name: tên của product (có thể không truyền)
         """
         
-        page_index = int(request.GET.get('page_index', 1))
-        page_size = int(request.GET.get('page_size', 10))
         product_name = request.GET.get('product_name', None)
         product_id = request.GET.get('product_id')
         
@@ -235,29 +200,17 @@ class PublicProductStoreViewSet(viewsets.ModelViewSet):
         stores_has_product = ProductStore.objects.filter(product = product)
         
         if product_name:
-            stores_has_product = stores_has_product.filter(
-                productstore__product__name__icontains=product_name
-            ).distinct()
+            stores_has_product = stores_has_product.filter(search_filter(product_name, prefix='product__'))
 
-        paginator = Paginator(stores_has_product, page_size)
-
-        try:
-            paginated_stores = paginator.page(page_index)
-        except PageNotAnInteger:
-            paginated_stores = paginator.page(1)
-        except EmptyPage:
-            paginated_stores = paginator.page(paginator.num_pages)
+        paginated_stores = paginate(request, stores_has_product)
 
-        serializer = StoreHasProductSerializer(paginated_stores, many=True)
+        serializer = StoreHasProductSerializer(paginated_stores.object_list, many=True)
 
         return Response({
             "status": status.HTTP_200_OK,
             "message": "OK",
             "data": {
-                "total_pages": paginator.num_pages,
-                "total_items": paginator.count,
-                "page_index": page_index,
-                "page_size": page_size,
+                **paginated_stores.meta,
                 "stores": serializer.data
             }
         }, status=status.HTTP_200_OK)
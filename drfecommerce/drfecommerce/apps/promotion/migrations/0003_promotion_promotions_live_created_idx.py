@@ -0,0 +1,17 @@
+# Generated by Django 4.2.15 on 2026-10-18 13:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('promotion', '0002_alter_promotion_table'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='promotion',
+            index=models.Index(condition=models.Q(('delete_at__isnull', True)), fields=['created_at', 'id'], name='promotions_live_created_idx'),
+        ),
+    ]
@@ -1,7 +1,12 @@
 from django.db import models
+from django.db.models import Q
+from django.contrib.postgres.indexes import GinIndex
+from drfecommerce.search import SearchDocumentModel
 from django.utils import timezone
 
-class Promotion(models.Model):
+class Promotion(SearchDocumentModel):
+    # Field được tìm kiếm và trọng số (xem drfecommerce/search.py)
+    search_fields = (('name', 'A'), ('code', 'A'), ('description', 'B'))
     id = models.AutoField(primary_key=True)
     name = models.CharField(max_length=255)
     description = models.TextField()
@@ -16,4 +21,11 @@ class Promotion(models.Model):
     delete_at = models.DateTimeField(null=True, blank=True, default=None)
     
     class Meta:
-        db_table = 'promotions'
\ No newline at end of file
+        db_table = 'promotions'
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='promotions_live_created_idx', condition=Q(delete_at__isnull=True)),
+            GinIndex(fields=['search_vector'], name='promotions_search_idx'),
+        ]
+
+    def __str__(self):
+        return self.name
@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from drfecommerce.search import SEARCH_DOCUMENT_FIELDS
 from .models import Promotion
 
 class PromotionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Promotion
-        fields = '__all__'
+        exclude = SEARCH_DOCUMENT_FIELDS
@@ -2,9 +2,10 @@ from rest_framework import viewsets, status
 from rest_framework.response import Response
 from .models import Promotion
 from .serializers import PromotionSerializer
-from django.core.paginator import Paginator
-from django.core.paginator import EmptyPage
-from django.core.paginator import PageNotAnInteger
+from drfecommerce.pagination import paginate
+from drfecommerce.search import search, SEARCH_ORDERING
+from drfecommerce.response_cache import cache_response, invalidate, PROMOTION
+from drfecommerce.replicas import read_replica
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from drfecommerce.apps.my_admin.authentication import AdminSafeJWTAuthentication
 from rest_framework.decorators import action, permission_classes
@@ -52,6 +53,7 @@ class PromotionViewSet(viewsets.ViewSet):
                 rate=rate
             )
             promotion.save()
+            invalidate('promotion')
             return Response({
                 "status": status.HTTP_200_OK,
                 "message": "Promotion created successfully!",
@@ -108,6 +110,7 @@ class PromotionViewSet(viewsets.ViewSet):
             if rate:
                 promotion.rate = rate
             promotion.save()
+            invalidate('promotion')
             return Response({
                 "status": status.HTTP_200_OK,
                 "message": "Promotion updated successfully!"
@@ -140,6 +143,7 @@ class PromotionViewSet(viewsets.ViewSet):
             promotion = Promotion.objects.get(id=promotion_id)
             promotion.delete_at = timezone.now()  # Soft delete by setting delete_at
             promotion.save()
+            invalidate('promotion')
             return Response({
                 "status": status.HTTP_200_OK,
                 "message": "Promotion soft deleted successfully!"
@@ -181,6 +185,7 @@ class PromotionViewSet(viewsets.ViewSet):
         # Khôi phục catalog và các catalog con của nó
         promotion.delete_at = None
         promotion.save()
+        invalidate('promotion')
 
         return Response({
             "status": status.HTTP_200_OK,
@@ -221,30 +226,18 @@ class PromotionViewSet(viewsets.ViewSet):
         Parameters:
         - page_index: The index of the page (default is 1).
         - page_size: The number of items per page (default is 10).
+        - cursor (optional): keyset pagination, empty for the first page then next_cursor / previous_cursor.
         """
-        page_index = int(request.GET.get('page_index', 1))
-        page_size = int(request.GET.get('page_size', 10))
-
         promotions = Promotion.objects.all()  # Chỉ lấy các promotion chưa bị xóa mềm
-        paginator = Paginator(promotions, page_size)
-
-        try:
-            paginated_promotions = paginator.page(page_index)
-        except PageNotAnInteger:
-            paginated_promotions = paginator.page(1)
-        except EmptyPage:
-            paginated_promotions = paginator.page(paginator.num_pages)
+        paginated_promotions = paginate(request, promotions)
 
-        serializer = PromotionSerializer(paginated_promotions, many=True)
+        serializer = PromotionSerializer(paginated_promotions.object_list, many=True)
 
         return Response({
             "status": status.HTTP_200_OK,
             "message": "OK",
             "data": {
-                "total_pages": paginator.num_pages,
-                "total_items": paginator.count,
-                "page_index": page_index,
-                "page_size": page_size,
+                **paginated_promotions.meta,
                 "promotions": serializer.data
             }
         }, status=status.HTTP_200_OK)
@@ -255,40 +248,31 @@ class PromotionViewSet(viewsets.ViewSet):
         API to search products by name with pagination.
         - page_index (default=1)
         - page_size (default=10)
+        - cursor (optional): keyset pagination, empty for the first page then next_cursor / previous_cursor.
         - name: product name to search
         """
-        page_index = int(request.GET.get('page_index', 1))
-        page_size = int(request.GET.get('page_size', 10))
         name_query = request.GET.get('name', '').strip()
 
-        # Lọc sản phẩm theo tên
-        promotions = Promotion.objects.filter(name__icontains=name_query)
+        # Tìm theo tên và mô tả (bỏ dấu, khớp tiền tố), kết quả liên quan nhất trước
+        promotions = search(Promotion.objects.all(), name_query)
 
-        paginator = Paginator(promotions, page_size)
-
-        try:
-            paginated_products = paginator.page(page_index)
-        except PageNotAnInteger:
-            paginated_products = paginator.page(1)
-        except EmptyPage:
-            paginated_products = paginator.page(paginator.num_pages)
+        paginated_products = paginate(request, promotions, ordering=SEARCH_ORDERING)
 
-        serializer = PromotionSerializer(paginated_products, many=True)
+        serializer = PromotionSerializer(paginated_products.object_list, many=True)
 
         return Response({
             "status": status.HTTP_200_OK,
             "message": "OK",
             "data": {
-                "total_pages": paginator.num_pages,
-                "total_items": paginator.count,
-                "page_index": page_index,
-                "page_size": page_size,
+                **paginated_products.meta,
                 "promotions": serializer.data
             }
         }, status=status.HTTP_200_OK)
 @permission_classes([AllowAny])
 class PublicPromotionViewSet(viewsets.ViewSet):
     @action(detail=False, methods=['get'], url_path="get-list-promotions")
+    @cache_response(PROMOTION)
+    @read_replica
     def list_promotions(self, request):
         """
         Get list of promotions with pagination.
@@ -296,35 +280,25 @@ class PublicPromotionViewSet(viewsets.ViewSet):
         Parameters:
         - page_index: The index of the page (default is 1).
         - page_size: The number of items per page (default is 10).
+        - cursor (optional): keyset pagination, empty for the first page then next_cursor / previous_cursor.
         """
-        page_index = int(request.GET.get('page_index', 1))
-        page_size = int(request.GET.get('page_size', 10))
-
         promotions = Promotion.objects.filter(delete_at__isnull = True)  # Chỉ lấy các promotion chưa bị xóa mềm
-        paginator = Paginator(promotions, page_size)
-
-        try:
-            paginated_promotions = paginator.page(page_index)
-        except PageNotAnInteger:
-            paginated_promotions = paginator.page(1)
-        except EmptyPage:
-            paginated_promotions = paginator.page(paginator.num_pages)
+        paginated_promotions = paginate(request, promotions)
 
-        serializer = PromotionSerializer(paginated_promotions, many=True)
+        serializer = PromotionSerializer(paginated_promotions.object_list, many=True)
 
         return Response({
             "status": status.HTTP_200_OK,
             "message": "OK",
             "data": {
-                "total_pages": paginator.num_pages,
-                "total_items": paginator.count,
-                "page_index": page_index,
-                "page_size": page_size,
+                **paginated_promotions.meta,
                 "promotions": serializer.data
             }
         }, status=status.HTTP_200_OK)
         
     @action(detail=False, methods=['get'], url_path="get-dettail-promotion")
+    @cache_response(PROMOTION)
+    @read_replica
     def get_promotion(self, request):
         """
         Get promotion details: body data:
@@ -351,39 +325,30 @@ class PublicPromotionViewSet(viewsets.ViewSet):
             }, status=status.HTTP_404_NOT_FOUND)
             
     @action(detail=False, methods=['get'], url_path="search-promotions")
+    @cache_response(PROMOTION)
+    @read_replica
     def search_promotions(self, request):
         """
         API to search products by name with pagination.
         - page_index (default=1)
         - page_size (default=10)
+        - cursor (optional): keyset pagination, empty for the first page then next_cursor / previous_cursor.
         - name: product name to search
         """
-        page_index = int(request.GET.get('page_index', 1))
-        page_size = int(request.GET.get('page_size', 10))
         name_query = request.GET.get('name', '').strip()
 
-        # Lọc sản phẩm theo tên
-        promotions = Promotion.objects.filter(name__icontains=name_query, delete_at__isnull = True)
+        # Tìm theo tên và mô tả (bỏ dấu, khớp tiền tố), kết quả liên quan nhất trước
+        promotions = search(Promotion.objects.filter(delete_at__isnull = True), name_query)
 
-        paginator = Paginator(promotions, page_size)
-
-        try:
-            paginated_products = paginator.page(page_index)
-        except PageNotAnInteger:
-            paginated_products = paginator.page(1)
-        except EmptyPage:
-            paginated_products = paginator.page(paginator.num_pages)
+        paginated_products = paginate(request, promotions, ordering=SEARCH_ORDERING)
 
-        serializer = PromotionSerializer(paginated_products, many=True)
+        serializer = PromotionSerializer(paginated_products.object_list, many=True)
 
         return Response({
             "status": status.HTTP_200_OK,
             "message": "OK",
             "data": {
-                "total_pages": paginator.num_pages,
-                "total_items": paginator.count,
-                "page_index": page_index,
-                "page_size": page_size,
+                **paginated_products.meta,
                 "promotions": serializer.data
             }
         }, status=status.HTTP_200_OK)
\ No newline at end of file
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from drfecommerce.apps.review.summaries import rebuild_summaries
+from drfecommerce.response_cache import invalidate
+
+
+class Command(BaseCommand):
+    help = "Tính lại bảng tổng hợp đánh giá (review_summary) theo sản phẩm và cửa hàng từ bảng reviews."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rows = rebuild_summaries(batch_size=options['batch_size'])
+        invalidate('review')
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} review summary rows."))
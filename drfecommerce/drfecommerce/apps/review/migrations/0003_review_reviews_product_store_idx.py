@@ -0,0 +1,17 @@
+# Generated by Django 4.2.15 on 2026-10-18 13:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('review', '0002_alter_review_table_alter_reviewreply_table'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['product', 'store', '-created_at'], name='reviews_product_store_idx'),
+        ),
+    ]
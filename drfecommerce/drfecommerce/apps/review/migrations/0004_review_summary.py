@@ -0,0 +1,53 @@
+# Generated by Django 4.2.15 on 2026-10-18 14:55
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+import django.db.models.deletion
+
+
+def backfill_review_summary(apps, schema_editor):
+    """
+    Tính review_summary cho các review đã có (giống rebuild_summaries trong summaries.py).
+    """
+    Review = apps.get_model('review', 'Review')
+    ReviewSummary = apps.get_model('review', 'ReviewSummary')
+    stars = {f'star_{star}': Count('id', filter=Q(rating=star)) for star in range(1, 6)}
+    rows = (Review.objects.filter(rating__in=range(1, 6)).values('product_id', 'store_id')
+            .annotate(review_count=Count('id'), rating_sum=Sum('rating'), **stars).order_by())
+    ReviewSummary.objects.bulk_create((ReviewSummary(**row) for row in rows.iterator()), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0004_store_search_document'),
+        ('product', '0005_product_code_unique'),
+        ('review', '0003_review_reviews_product_store_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewSummary',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('review_count', models.IntegerField(default=0)),
+                ('rating_sum', models.IntegerField(default=0)),
+                ('star_1', models.IntegerField(default=0)),
+                ('star_2', models.IntegerField(default=0)),
+                ('star_3', models.IntegerField(default=0)),
+                ('star_4', models.IntegerField(default=0)),
+                ('star_5', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='product.product')),
+                ('store', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='store.store')),
+            ],
+            options={
+                'db_table': 'review_summary',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='reviewsummary',
+            constraint=models.UniqueConstraint(fields=('product', 'store'), name='review_summary_uniq'),
+        ),
+        migrations.RunPython(backfill_review_summary, migrations.RunPython.noop),
+    ]
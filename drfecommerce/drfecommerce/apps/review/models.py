@@ -20,10 +20,36 @@ class Review(models.Model):
     
     class Meta:
         db_table = 'reviews'
+        indexes = [
+            models.Index(fields=['product', 'store', '-created_at'], name='reviews_product_store_idx'),
+        ]
 
     def __str__(self):
         return f'Review {self.id} by {self.guest} for {self.product}'
 
+class ReviewSummary(models.Model):
+    #tổng hợp đánh giá của từng sản phẩm tại từng cửa hàng, cộng dồn khi review được tạo / sửa / xoá (xem summaries.py)
+    id = models.AutoField(primary_key=True)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    store = models.ForeignKey(Store, on_delete=models.CASCADE)
+    review_count = models.IntegerField(default=0)
+    rating_sum = models.IntegerField(default=0)  # Tổng rating, average = rating_sum / review_count
+    star_1 = models.IntegerField(default=0)  # Số review 1 sao
+    star_2 = models.IntegerField(default=0)
+    star_3 = models.IntegerField(default=0)
+    star_4 = models.IntegerField(default=0)
+    star_5 = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'review_summary'
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'store'], name='review_summary_uniq'),
+        ]
+
+    def __str__(self):
+        return f'Rating of {self.product_id} at store {self.store_id}: {self.review_count} reviews'
+
 class ReviewReply(models.Model):
     id = models.AutoField(primary_key=True)
     review = models.ForeignKey(Review, on_delete=models.CASCADE)  # Liên kết với review
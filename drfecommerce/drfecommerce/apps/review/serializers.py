@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from drfecommerce.eager_loading import EagerLoadingMixin
 from .models import Review, ReviewReply
 
 class ReviewReplySerializer(serializers.ModelSerializer):
@@ -11,8 +12,9 @@ class ReviewSerializer(serializers.ModelSerializer):
         model = Review
         fields = '__all__'
         
-class GetAllReviewSerializer(serializers.ModelSerializer):
-    replies = ReviewReplySerializer(many=True, read_only=True)
+class GetAllReviewSerializer(EagerLoadingMixin, serializers.ModelSerializer):
+    replies = ReviewReplySerializer(source='reviewreply_set', many=True, read_only=True)
+    prefetch_related_fields = ('reviewreply_set',)
 
     class Meta:
         model = Review
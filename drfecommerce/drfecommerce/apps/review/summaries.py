@@ -0,0 +1,129 @@
+"""
+Tổng hợp đánh giá (review_summary) theo (product, store): số review, tổng rating và số review từng mức sao.
+
+- guest_review / update_review / delete_review cộng trừ chênh lệch bằng F() trong cùng transaction
+  với review, nên trang review và danh sách sản phẩm không phải chạy AVG / COUNT trên bảng reviews.
+- rating_summary: một (product, store), dùng cho API get-list-reviews.
+- product_ratings: tra nhiều product một lần (cộng mọi store), with_ratings: annotate queryset Product
+  để danh sách sản phẩm có review_count / rating_sum trong cùng câu query của trang.
+- rebuild_summaries (lệnh rebuild_review_summaries): tính lại từ bảng reviews khi cần đối soát.
+"""
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Review, ReviewSummary
+
+STARS = range(1, 6)
+
+
+def valid_rating(value):
+    """
+    :return: rating kiểu int trong khoảng 1-5, hoặc None nếu không hợp lệ
+    """
+    try:
+        rating = int(value)
+    except (TypeError, ValueError):
+        return None
+    return rating if rating in STARS else None
+
+
+def _star(rating):
+    return f'star_{rating}'
+
+
+def _increment(product_id, store_id, deltas):
+    row, _ = ReviewSummary.objects.get_or_create(product_id=product_id, store_id=store_id)
+    ReviewSummary.objects.filter(pk=row.pk).update(**{field: F(field) + delta for field, delta in deltas.items()})
+
+
+def record_review(review, sign=1):
+    """
+    Cộng review vừa tạo vào review_summary.
+    :param sign: -1 khi xoá review
+    """
+    if review.rating not in STARS:
+        # review cũ có rating ngoài 1-5 không được tính vào summary (xem rebuild_summaries)
+        return
+    _increment(review.product_id, review.store_id, {
+        'review_count': sign,
+        'rating_sum': sign * review.rating,
+        _star(review.rating): sign,
+    })
+
+
+def change_rating(review, old_rating):
+    """
+    Chuyển review từ old_rating sang review.rating (sửa review).
+    """
+    if old_rating == review.rating:
+        return
+    if old_rating not in STARS:
+        record_review(review)
+        return
+    deltas = {'rating_sum': review.rating - old_rating, _star(old_rating): -1}
+    deltas[_star(review.rating)] = deltas.get(_star(review.rating), 0) + 1
+    _increment(review.product_id, review.store_id, deltas)
+
+
+def summary_data(review_count, rating_sum, histogram=None):
+    data = {
+        "review_count": review_count or 0,
+        "average_rating": round(rating_sum / review_count, 2) if review_count else 0,
+    }
+    if histogram is not None:
+        data["histogram"] = histogram
+    return data
+
+
+def empty_summary():
+    return summary_data(0, 0, {star: 0 for star in STARS})
+
+
+def rating_summary(product_id, store_id):
+    """
+    :return: dict review_count, average_rating, histogram (sao -> số review) của product tại store,
+        None nếu chưa có dòng review_summary (chưa có review, hoặc dữ liệu chưa được rebuild)
+    """
+    row = ReviewSummary.objects.filter(product_id=product_id, store_id=store_id).first()
+    if row is None:
+        return None
+    return summary_data(row.review_count, row.rating_sum, {star: getattr(row, _star(star)) for star in STARS})
+
+
+def product_ratings(product_ids):
+    """
+    Số review và điểm trung bình của nhiều product (cộng mọi store), một query.
+    :return: dict product_id -> {review_count, average_rating}, product chưa có review không có trong dict
+    """
+    rows = (ReviewSummary.objects.filter(product_id__in=product_ids).values('product_id')
+            .annotate(count=Sum('review_count'), total=Sum('rating_sum')).order_by())
+    return {row['product_id']: summary_data(row['count'], row['total']) for row in rows if row['count']}
+
+
+def with_ratings(queryset):
+    """
+    Annotate queryset Product với review_count và rating_sum (subquery trên review_summary, cùng câu query).
+    """
+    summaries = ReviewSummary.objects.filter(product_id=OuterRef('pk')).order_by().values('product_id')
+    return queryset.annotate(
+        review_count=Coalesce(Subquery(summaries.annotate(total=Sum('review_count')).values('total')),
+                              Value(0), output_field=IntegerField()),
+        rating_sum=Coalesce(Subquery(summaries.annotate(total=Sum('rating_sum')).values('total')),
+                            Value(0), output_field=IntegerField()),
+    )
+
+
+def rebuild_summaries(batch_size=1000):
+    """
+    Tính lại review_summary từ bảng reviews.
+    :return: số dòng review_summary đã tạo
+    """
+    stars = {_star(star): Count('id', filter=Q(rating=star)) for star in STARS}
+    rows = (Review.objects.filter(rating__in=STARS).values('product_id', 'store_id')
+            .annotate(review_count=Count('id'), rating_sum=Sum('rating'), **stars).order_by())
+    with transaction.atomic():
+        ReviewSummary.objects.all().delete()
+        created = ReviewSummary.objects.bulk_create(
+            (ReviewSummary(**row) for row in rows.iterator()), batch_size=batch_size)
+    return len(created)
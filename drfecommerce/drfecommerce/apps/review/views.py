@@ -10,10 +10,10 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from drfecommerce.apps.guest.authentication import GuestSafeJWTAuthentication
 from drfecommerce.apps.my_admin.authentication import AdminSafeJWTAuthentication
 from rest_framework.decorators import action, permission_classes
-from django.core.paginator import Paginator
-from django.core.paginator import EmptyPage
-from django.core.paginator import PageNotAnInteger
-from django.db.models import Avg
+from drfecommerce.pagination import paginate
+from drfecommerce.response_cache import invalidate
+from django.db import transaction
+from .summaries import valid_rating, record_review, change_rating, rating_summary, empty_summary
 
 class ReviewViewSet(viewsets.ViewSet):
     authentication_classes = [GuestSafeJWTAuthentication]
@@ -45,6 +45,13 @@ class ReviewViewSet(viewsets.ViewSet):
                 "message": "Guest ID is required."
             }, status=status.HTTP_400_BAD_REQUEST)
 
+        rating = valid_rating(rating)
+        if rating is None:
+            return Response({
+                "status": status.HTTP_400_BAD_REQUEST,
+                "message": "Rating must be an integer from 1 to 5."
+            }, status=status.HTTP_400_BAD_REQUEST)
+
         try:
             guest = Guest.objects.get(id=guest_id)
         except Guest.DoesNotExist:
@@ -71,16 +78,19 @@ class ReviewViewSet(viewsets.ViewSet):
                              'status': 400
                              }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Tạo đánh giá
-        review = Review.objects.create(
-            guest=guest,
-            product_id=product_id,
-            store_id=store_id,
-            order_detail=order_detail,
-            rating=rating,
-            comment=comment,
-            gallery=gallery
-        )
+        # Tạo đánh giá và cộng vào review_summary
+        with transaction.atomic():
+            review = Review.objects.create(
+                guest=guest,
+                product_id=product_id,
+                store_id=store_id,
+                order_detail=order_detail,
+                rating=rating,
+                comment=comment,
+                gallery=gallery
+            )
+            record_review(review)
+        invalidate('review')
         
         # Serialize và trả về phản hồi
         serializer = ReviewSerializer(review)
@@ -113,6 +123,13 @@ class ReviewViewSet(viewsets.ViewSet):
                 "message": "Guest ID is required."
             }, status=status.HTTP_400_BAD_REQUEST)
 
+        rating = valid_rating(rating)
+        if rating is None:
+            return Response({
+                "status": status.HTTP_400_BAD_REQUEST,
+                "message": "Rating must be an integer from 1 to 5."
+            }, status=status.HTTP_400_BAD_REQUEST)
+
         try:
             guest = Guest.objects.get(id=guest_id)
         except Guest.DoesNotExist:
@@ -120,17 +137,22 @@ class ReviewViewSet(viewsets.ViewSet):
                 "status": status.HTTP_404_NOT_FOUND,
                 "message": "Guest not found."
             }, status=status.HTTP_404_NOT_FOUND)
-        try:
-            review = Review.objects.get(guest=guest, product_id=product_id, store_id = store_id)
-        except Review.DoesNotExist:
-            return Response({
-                "status": status.HTTP_404_NOT_FOUND,
-                "message": "Review not found."
-            }, status=status.HTTP_404_NOT_FOUND)
-        review.comment = comment
-        review.rating = rating
-        review.gallery = gallery
-        review.save()
+        with transaction.atomic():
+            try:
+                # Khoá review để hai lần sửa cùng lúc không cùng trừ rating cũ
+                review = Review.objects.select_for_update().get(guest=guest, product_id=product_id, store_id = store_id)
+            except Review.DoesNotExist:
+                return Response({
+                    "status": status.HTTP_404_NOT_FOUND,
+                    "message": "Review not found."
+                }, status=status.HTTP_404_NOT_FOUND)
+            old_rating = review.rating
+            review.comment = comment
+            review.rating = rating
+            review.gallery = gallery
+            review.save()
+            change_rating(review, old_rating)
+        invalidate('review')
         return Response({
             "data": "Update reiew successfully",
             "status": 200
@@ -162,14 +184,17 @@ class ReviewViewSet(viewsets.ViewSet):
                 "status": status.HTTP_404_NOT_FOUND,
                 "message": "Guest not found."
             }, status=status.HTTP_404_NOT_FOUND)
-        try:
-            review = Review.objects.get(guest=guest, product_id=product_id, store_id = store_id)
-        except Review.DoesNotExist:
-            return Response({
-                "status": status.HTTP_404_NOT_FOUND,
-                "message": "Review not found."
-            }, status=status.HTTP_404_NOT_FOUND)
-        review.delete()
+        with transaction.atomic():
+            try:
+                review = Review.objects.select_for_update().get(guest=guest, product_id=product_id, store_id = store_id)
+            except Review.DoesNotExist:
+                return Response({
+                    "status": status.HTTP_404_NOT_FOUND,
+                    "message": "Review not found."
+                }, status=status.HTTP_404_NOT_FOUND)
+            review.delete()
+            record_review(review, sign=-1)
+        invalidate('review')
         return Response({
             "data": "Delete reiew successfully",
             "status": 200
@@ -238,36 +263,29 @@ class PublicReviewViewset(viewsets.ViewSet):
         - store_id: id of product
         - page_index (default=1)
         - page_size (default=10)
+        - cursor (optional): keyset pagination, empty for the first page then next_cursor / previous_cursor.
         """
-        page_index = int(request.GET.get('page_index', 1))
-        page_size = int(request.GET.get('page_size', 10))
         product_id = request.GET.get('product_id')
         store_id = request.GET.get('store_id')
 
         reviews = Review.objects.filter(product_id=product_id, store_id = store_id)
-          # Tính toán đánh giá trung bình
-        average_rating = reviews.aggregate(average_rating=Avg('rating'))['average_rating'] or 0
-        
-        paginator = Paginator(reviews, page_size)
+        # Số review, điểm trung bình và số review theo sao đọc từ review_summary (không AVG / COUNT trên reviews).
+        # Chưa có dòng summary thì phân trang vẫn đếm trên reviews
+        summary = rating_summary(product_id, store_id) if product_id and store_id else None
 
-        try:
-            paginated_reviews = paginator.page(page_index)
-        except PageNotAnInteger:
-            paginated_reviews = paginator.page(1)
-        except EmptyPage:
-            paginated_reviews = paginator.page(paginator.num_pages)
+        paginated_reviews = paginate(request, reviews, total=summary["review_count"] if summary else None)
+        summary = summary or empty_summary()
 
-        serializer = GetAllReviewSerializer(paginated_reviews, many=True)
+        serializer = GetAllReviewSerializer(paginated_reviews.object_list, many=True)
 
         return Response({
             "status": status.HTTP_200_OK,
             "message": "OK",
             "data": {
-                "total_pages": paginator.num_pages,
-                "total_items": paginator.count,
-                "page_index": page_index,
-                "page_size": page_size,
-                "average_rating": round(average_rating, 2),  # Đánh giá trung bình, làm tròn đến 2 chữ số
+                **paginated_reviews.meta,
+                "average_rating": summary["average_rating"],  # Đánh giá trung bình, làm tròn đến 2 chữ số
+                "review_count": summary["review_count"],
+                "histogram": summary["histogram"],  # Số review theo sao (1-5)
                 "reviews": serializer.data
             }
         }, status=status.HTTP_200_OK)
@@ -1,7 +1,12 @@
 from django.db import models
+from django.db.models import Q
+from django.contrib.postgres.indexes import GinIndex
+from drfecommerce.search import SearchDocumentModel
 from django.utils import timezone
 
-class Store(models.Model):
+class Store(SearchDocumentModel):
+    # Field được tìm kiếm và trọng số (xem drfecommerce/search.py)
+    search_fields = (('name', 'A'), ('address', 'B'))
     id = models.AutoField(primary_key=True)
     name = models.CharField(max_length=255)
     phone_number = models.CharField(max_length=20)
@@ -16,3 +21,7 @@ class Store(models.Model):
     
     class Meta:
         db_table = 'stores'
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='stores_live_created_idx', condition=Q(delete_at__isnull=True)),
+            GinIndex(fields=['search_vector'], name='stores_search_idx'),
+        ]
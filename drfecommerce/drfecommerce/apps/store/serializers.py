@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from drfecommerce.search import SEARCH_DOCUMENT_FIELDS
 from .models import Store
 
 class StoreSerializer(serializers.ModelSerializer):
     class Meta:
         model = Store
-        fields = '__all__'
+        exclude = SEARCH_DOCUMENT_FIELDS
@@ -2,15 +2,13 @@ from rest_framework import viewsets, status
 from rest_framework.response import Response
 from .models import Store
 from .serializers import StoreSerializer
-from django.core.paginator import Paginator
-from django.core.paginator import EmptyPage
-from django.core.paginator import PageNotAnInteger
+from drfecommerce.pagination import paginate
+from drfecommerce.search import search, SEARCH_ORDERING
 from rest_framework.permissions import IsAuthenticated
 from drfecommerce.apps.my_admin.authentication import AdminSafeJWTAuthentication
 from rest_framework.decorators import action
 from dotenv import load_dotenv
 from django.utils import timezone
-from django.db import models
 
 # Load environment variables from .env file
 load_dotenv()
@@ -174,30 +172,18 @@ class StoreViewSet(viewsets.ViewSet):
         Parameters:
         - page_index: Chỉ số của trang (mặc định là 1).
         - page_size: Số lượng item trên mỗi trang (mặc định là 10).
+        - cursor (optional): keyset pagination, empty for the first page then next_cursor / previous_cursor.
         """
-        page_index = int(request.GET.get('page_index', 1))
-        page_size = int(request.GET.get('page_size', 10))
-
         stores = Store.objects.all().order_by('-created_at')  # Lấy tất cả các store
-        paginator = Paginator(stores, page_size)
-
-        try:
-            paginated_stores = paginator.page(page_index)
-        except PageNotAnInteger:
-            paginated_stores = paginator.page(1)
-        except EmptyPage:
-            paginated_stores = paginator.page(paginator.num_pages)
+        paginated_stores = paginate(request, stores)
 
-        serializer = StoreSerializer(paginated_stores, many=True)
+        serializer = StoreSerializer(paginated_stores.object_list, many=True)
 
         return Response({
             "status": status.HTTP_200_OK,
             "message": "OK",
             "data": {
-                "total_pages": paginator.num_pages,
-                "total_items": paginator.count,
-                "page_index": page_index,
-                "page_size": page_size,
+                **paginated_stores.meta,
                 "stores": serializer.data
             }
         }, status=status.HTTP_200_OK)
@@ -211,34 +197,22 @@ class StoreViewSet(viewsets.ViewSet):
         - search: Từ khóa tìm kiếm.
         - page_index: Chỉ số của trang (mặc định là 1).
         - page_size: Số lượng item trên mỗi trang (mặc định là 10).
+        - cursor (optional): keyset pagination, empty for the first page then next_cursor / previous_cursor.
         """
         search_query = request.GET.get('search', '')
-        page_index = int(request.GET.get('page_index', 1))
-        page_size = int(request.GET.get('page_size', 10))
 
-        stores = Store.objects.filter(
-            models.Q(name__icontains=search_query) | models.Q(address__icontains=search_query)
-        ).order_by('-created_at')
+        # Tìm theo tên và địa chỉ, kết quả liên quan nhất trước
+        stores = search(Store.objects.all(), search_query)
 
-        paginator = Paginator(stores, page_size)
-
-        try:
-            paginated_stores = paginator.page(page_index)
-        except PageNotAnInteger:
-            paginated_stores = paginator.page(1)
-        except EmptyPage:
-            paginated_stores = paginator.page(paginator.num_pages)
+        paginated_stores = paginate(request, stores, ordering=SEARCH_ORDERING)
 
-        serializer = StoreSerializer(paginated_stores, many=True)
+        serializer = StoreSerializer(paginated_stores.object_list, many=True)
 
         return Response({
             "status": status.HTTP_200_OK,
             "message": "OK",
             "data": {
-                "total_pages": paginator.num_pages,
-                "total_items": paginator.count,
-                "page_index": page_index,
-                "page_size": page_size,
+                **paginated_stores.meta,
                 "stores": serializer.data
             }
         }, status=status.HTTP_200_OK)
\ No newline at end of file
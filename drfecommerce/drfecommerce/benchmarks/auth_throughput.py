@@ -0,0 +1,108 @@
+"""
+Benchmark số request đã xác thực mỗi giây qua DEFAULT_AUTHENTICATION_CLASSES (guest rồi admin).
+
+Mỗi request đi qua toàn bộ dispatch của DRF (authentication + IsAuthenticated) tới một view rỗng,
+nên kết quả chỉ phản ánh chi phí xác thực:
+- before: token kiểu cũ (chỉ có user_id / admin_id, không có jti), mỗi request decode và query database
+- after: token mới, principal được cache theo jti, request sau không cần query
+
+Cách chạy (từ thư mục chứa manage.py):
+    python -m drfecommerce.benchmarks.auth_throughput --requests 2000 --output auth-benchmark.json
+"""
+import argparse
+import json
+import sys
+import time
+
+from .explain_indexes import setup_django
+
+
+def build_view():
+    from rest_framework.response import Response
+    from rest_framework.views import APIView
+
+    class AuthenticatedView(APIView):
+        def get(self, request):
+            return Response({"status": 200, "message": "OK"})
+
+    return AuthenticatedView.as_view()
+
+
+def legacy_token(claims):
+    import jwt
+    from drfecommerce.jwt_auth import signing_key, ALGORITHM, ACCESS_TOKEN_LIFETIME
+    return jwt.encode({**claims, 'exp': int(time.time()) + ACCESS_TOKEN_LIFETIME}, signing_key(), algorithm=ALGORITHM)
+
+
+def tokens():
+    """
+    :return: list (tên, token) cho guest và admin, cả kiểu cũ và mới
+    """
+    from drfecommerce.apps.guest.models import Guest
+    from drfecommerce.apps.my_admin.models import MyAdmin
+    from drfecommerce.apps.guest import utils as guest_utils
+    from drfecommerce.apps.my_admin import utils as admin_utils
+
+    result = []
+    guest = Guest.objects.filter(is_verified=True).order_by('id').first()
+    if guest is not None:
+        result += [
+            ("guest before", legacy_token({'user_id': guest.id})),
+            ("guest after", guest_utils.generate_access_token(guest)),
+        ]
+    admin = MyAdmin.objects.order_by('id').first()
+    if admin is not None:
+        result += [
+            ("admin before", legacy_token({'admin_id': admin.id})),
+            ("admin after", admin_utils.generate_access_token(admin)),
+        ]
+    return result
+
+
+def measure(view, token, total):
+    """
+    :return: dict {requests_per_second, queries_per_request}
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework.test import APIRequestFactory
+
+    factory = APIRequestFactory()
+    header = f"Bearer {token}"
+    response = view(factory.get('/', HTTP_AUTHORIZATION=header))  # làm nóng cache
+    if response.status_code != 200:
+        raise RuntimeError(f"Authentication failed: {response.status_code} {response.data}")
+
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        for _ in range(total):
+            view(factory.get('/', HTTP_AUTHORIZATION=header))
+        elapsed = time.perf_counter() - started
+    return {
+        'requests_per_second': round(total / elapsed, 1),
+        'queries_per_request': round(len(queries.captured_queries) / total, 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000, help="Số request cho mỗi trường hợp")
+    parser.add_argument('--output', help="Ghi kết quả ra file JSON")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    view = build_view()
+    report = {}
+    for name, token in tokens():
+        report[name] = measure(view, token, args.requests)
+
+    sys.stdout.write("%-16s %14s %16s\n" % ("case", "requests/s", "queries/request"))
+    for name, result in report.items():
+        sys.stdout.write("%-16s %14.1f %16.2f\n" % (name, result['requests_per_second'], result['queries_per_request']))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
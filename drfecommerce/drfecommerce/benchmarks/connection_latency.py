@@ -0,0 +1,114 @@
+"""
+Benchmark độ trễ mỗi request theo cách giữ kết nối database (DB_POOL_MODE, xem settings/database.py).
+
+Request PUT api/notification/read-notification/ (một SELECT và một UPDATE) được gửi qua WSGIHandler
+trong process, nên có đủ tín hiệu request_started / request_finished như server thật: với CONN_MAX_AGE = 0
+kết nối bị đóng sau mỗi request và request sau phải kết nối lại (TCP, xác thực, khởi tạo session).
+- none: CONN_MAX_AGE = 0
+- persistent: CONN_MAX_AGE = 60, CONN_HEALTH_CHECKS = True (mặc định)
+- persistent_no_health_check: CONN_MAX_AGE = 60, không kiểm tra kết nối trước mỗi request
+
+Chênh lệch phụ thuộc vào đường tới database: socket local chỉ vài ms, qua mạng / TLS lớn hơn nhiều,
+nên chạy với DB_HOST giống môi trường thật.
+
+Cách chạy (từ thư mục chứa manage.py, database có dữ liệu benchmark):
+    python -m drfecommerce.benchmarks.connection_latency --requests 500 --output connection-benchmark.json
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from .explain_indexes import setup_django
+
+MODES = {
+    'none': {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False},
+    'persistent': {'CONN_MAX_AGE': 60, 'CONN_HEALTH_CHECKS': True},
+    'persistent_no_health_check': {'CONN_MAX_AGE': 60, 'CONN_HEALTH_CHECKS': False},
+}
+ENDPOINT = '/api/notification/read-notification/'
+
+
+def build_request(notification_id, token):
+    from django.test import RequestFactory
+    request = RequestFactory().put(
+        ENDPOINT, data=json.dumps({'noti_id': notification_id}), content_type='application/json',
+        HTTP_AUTHORIZATION=f'Bearer {token}', SERVER_NAME='localhost',
+    )
+    return request.environ
+
+
+def measure(handler, notification_id, token, total):
+    """
+    :return: dict {median_ms, p90_ms, connections_per_request}
+    """
+    from django.db.backends.signals import connection_created
+
+    opened = []
+
+    def on_connection_created(sender, connection, **kwargs):
+        opened.append(connection.alias)
+
+    def start_response(status, headers):
+        if not status.startswith('200'):
+            raise RuntimeError(f"{ENDPOINT} returned {status}")
+
+    def send():
+        response = handler(build_request(notification_id, token), start_response)
+        # close() gửi request_finished, lúc này Django đóng kết nối đã quá CONN_MAX_AGE
+        response.close()
+
+    send()  # làm nóng (import, cache xác thực theo jti)
+    connection_created.connect(on_connection_created)
+    try:
+        timings = []
+        for _ in range(total):
+            started = time.perf_counter()
+            send()
+            timings.append((time.perf_counter() - started) * 1000)
+    finally:
+        connection_created.disconnect(on_connection_created)
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'p90_ms': round(statistics.quantiles(timings, n=10)[-1], 3),
+        'connections_per_request': round(len(opened) / total, 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=500, help="Số request cho mỗi mode")
+    parser.add_argument('--output', help="Ghi kết quả ra file JSON")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.db import connections
+    from drfecommerce.apps.notification.models import Notification
+    from drfecommerce.apps.guest.utils import generate_access_token
+
+    notification = Notification.objects.select_related('guest').order_by('id').first()
+    if notification is None:
+        raise RuntimeError("No notification found: seed benchmark data first (seed.py).")
+    token = generate_access_token(notification.guest)
+    handler = WSGIHandler()
+    connection = connections['default']
+
+    report = {'vendor': connection.vendor, 'host': connection.settings_dict['HOST'], 'modes': {}}
+    for name, options in MODES.items():
+        connection.close()
+        connection.settings_dict.update(options)
+        report['modes'][name] = measure(handler, notification.id, token, args.requests)
+
+    sys.stdout.write("%-28s %12s %12s %18s\n" % ("mode", "median (ms)", "p90 (ms)", "connections/req"))
+    for name, result in report['modes'].items():
+        sys.stdout.write("%-28s %12.3f %12.3f %18.2f\n" % (
+            name, result['median_ms'], result['p90_ms'], result['connections_per_request']))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Benchmark các index khai báo trong Meta.indexes / Meta.constraints.
+
+Với mỗi truy vấn nóng của API (lọc theo guest, store, khoảng ngày, danh sách chưa xoá mềm...)
+script in ra EXPLAIN và thời gian chạy (median) trong hai trường hợp:
+- after: có đầy đủ index như trong migrations
+- before: các index đó bị DROP trong một transaction rồi rollback (chỉ PostgreSQL, vì DDL có transaction)
+
+Cách chạy (từ thư mục chứa manage.py, trên database dùng riêng cho benchmark):
+    python -m drfecommerce.benchmarks.explain_indexes --seed-rows 1000000 --output index-benchmark.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "drfecommerce.settings.local")
+    import django
+    django.setup()
+
+
+def hot_queries():
+    """
+    Các truy vấn tương ứng với access path của view, tham số lấy từ dữ liệu có sẵn.
+    :return: list (tên, queryset, hàm thực thi)
+    """
+    import datetime
+    from django.db.models import Sum, Count
+    from drfecommerce.apps.product.models import Product
+    from drfecommerce.apps.product_store.models import ProductStore
+    from drfecommerce.apps.order.models import Order
+    from drfecommerce.apps.notification.models import Notification
+    from drfecommerce.apps.product_sale.models import ProductSale
+    from drfecommerce.apps.product_incoming.models import ProductIncoming
+    from drfecommerce.apps.review.models import Review
+
+    stock = ProductStore.objects.order_by('id').first()
+    review = Review.objects.order_by('id').first()
+    guest_id = Order.objects.order_by('id').values_list('guest_id', flat=True).first()
+    notified_guest_id = Notification.objects.order_by('id').values_list('guest_id', flat=True).first()
+    catalog_id = Product.objects.order_by('id').values_list('catalog_id', flat=True).first()
+    start = datetime.datetime(2024, 3, 1, tzinfo=datetime.timezone.utc)
+    end = start + datetime.timedelta(days=31)
+
+    first = lambda qs: qs.first()
+    rows = lambda qs: list(qs)
+    queries = []
+    if stock is not None:
+        queries += [
+            ("product_store by (product, store)",
+             ProductStore.objects.filter(product_id=stock.product_id, store_id=stock.store_id), first),
+            ("live product_store by store",
+             ProductStore.objects.filter(store_id=stock.store_id, delete_at__isnull=True)[:20], rows),
+            ("product_sales by store and month",
+             ProductSale.objects.filter(store_id=stock.store_id, sale_date__gte=start, sale_date__lt=end),
+             lambda qs: qs.aggregate(total=Sum('sale_price'), count=Count('id'))),
+            ("product_incomings by store and month",
+             ProductIncoming.objects.filter(store_id=stock.store_id, effective_date__gte=start, effective_date__lt=end),
+             lambda qs: qs.aggregate(total=Sum('cost_price'), count=Count('id'))),
+        ]
+    if guest_id is not None:
+        queries += [
+            ("orders of guest",
+             Order.objects.filter(guest_id=guest_id).order_by('-order_date')[:20], rows),
+            ("orders by status",
+             Order.objects.filter(order_status='pending').order_by('-order_date')[:20], rows),
+            ("orders by month",
+             Order.objects.filter(order_date__gte=start, order_date__lt=end)[:20], rows),
+        ]
+    if notified_guest_id is not None:
+        queries.append(("notifications of guest",
+                        Notification.objects.filter(guest_id=notified_guest_id).order_by('-created_at')[:20], rows))
+    if review is not None:
+        queries.append(("reviews of product in store",
+                        Review.objects.filter(product_id=review.product_id, store_id=review.store_id).order_by('-created_at')[:20], rows))
+    queries += [
+        ("live products",
+         Product.objects.filter(delete_at__isnull=True).order_by('created_at', 'id')[:20], rows),
+        ("live products by catalog",
+         Product.objects.filter(catalog_id=catalog_id, delete_at__isnull=True).order_by('created_at')[:20], rows),
+    ]
+    return queries
+
+
+def benchmarked_models():
+    from django.apps import apps
+    return [model for model in apps.get_models()
+            if model._meta.indexes or model._meta.constraints]
+
+
+def measure(queries, repeat):
+    """
+    :return: list dict {name, plan, median_ms, min_ms}
+    """
+    from django.db import connection
+    results = []
+    for name, queryset, execute in queries:
+        execute(queryset._chain())  # làm nóng cache của database
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            execute(queryset._chain())
+            timings.append((time.perf_counter() - started) * 1000)
+        options = {'analyze': True} if connection.vendor == 'postgresql' else {}
+        results.append({
+            'name': name,
+            'plan': queryset._chain().explain(**options),
+            'median_ms': round(statistics.median(timings), 3),
+            'min_ms': round(min(timings), 3),
+        })
+    return results
+
+
+def measure_without_indexes(queries, repeat):
+    """
+    DROP toàn bộ index / constraint khai báo trong Meta trong một transaction, đo lại rồi rollback.
+    """
+    from django.db import connection, transaction
+    with transaction.atomic():
+        with connection.schema_editor(atomic=False) as editor:
+            for model in benchmarked_models():
+                for index in model._meta.indexes:
+                    editor.remove_index(model, index)
+                for constraint in model._meta.constraints:
+                    editor.remove_constraint(model, constraint)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        results = measure(queries, repeat)
+        transaction.set_rollback(True)
+    return results
+
+
+def print_report(report, stream):
+    for phase in ('before', 'after'):
+        for result in report.get(phase) or []:
+            stream.write(f"\n[{phase}] {result['name']}: median {result['median_ms']} ms, min {result['min_ms']} ms\n")
+            stream.write(result['plan'] + "\n")
+
+    if report.get('before'):
+        stream.write("\n%-40s %12s %12s %8s\n" % ("query", "before (ms)", "after (ms)", "speedup"))
+        for before, after in zip(report['before'], report['after']):
+            speedup = before['median_ms'] / after['median_ms'] if after['median_ms'] else 0
+            stream.write("%-40s %12.3f %12.3f %7.1fx\n" % (after['name'], before['median_ms'], after['median_ms'], speedup))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seed-rows', type=int, default=0,
+                        help="Sinh trước chừng này dòng dữ liệu (0 = dùng dữ liệu có sẵn)")
+    parser.add_argument('--repeat', type=int, default=20, help="Số lần chạy mỗi truy vấn")
+    parser.add_argument('--output', help="Ghi kết quả ra file JSON")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.db import connection
+
+    if args.seed_rows:
+        from .seed import seed
+        seed(args.seed_rows, stdout=sys.stdout)
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+    queries = hot_queries()
+    report = {'vendor': connection.vendor, 'before': None, 'after': None}
+    if connection.vendor == 'postgresql':
+        report['before'] = measure_without_indexes(queries, args.repeat)
+    else:
+        sys.stdout.write("Before/after comparison needs PostgreSQL (transactional DDL); showing current plans only.\n")
+    report['after'] = measure(queries, args.repeat)
+
+    print_report(report, sys.stdout)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
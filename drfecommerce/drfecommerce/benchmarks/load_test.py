@@ -0,0 +1,327 @@
+"""
+Load test các luồng nóng của API trên một server đang chạy (runserver / gunicorn), chỉ dùng thư viện chuẩn.
+
+Mỗi user ảo là một thread, lặp lại các kịch bản (chọn ngẫu nhiên theo SCENARIOS, seed cố định) đến hết --duration:
+- browse: danh sách sản phẩm (trang ngẫu nhiên), chi tiết sản phẩm, tìm kiếm, danh sách catalog
+- cart: thêm sản phẩm vào giỏ rồi xem giỏ (guest)
+- checkout: đặt hàng cash_on_delivery một sản phẩm (guest)
+- admin_reports: danh sách đơn hàng, thống kê doanh thu theo tháng (admin)
+
+Guest, admin, product / store được đọc từ database của server (cùng DJANGO_SETTINGS_MODULE) và token được
+tạo trực tiếp, nên nên sinh dữ liệu trước bằng --seed-rows (xem seed.py).
+
+Kết quả (in ra và ghi JSON bằng --output): commit, cấu hình, số request, lỗi, requests/s,
+p50 / p90 / p99 (ms) theo từng endpoint. --compare baseline.json so p90 với một lần chạy trước,
+endpoint chậm hơn quá --threshold phần trăm được coi là regression và script thoát với mã 1.
+
+Cách chạy (từ thư mục chứa manage.py, trên database dùng riêng cho benchmark):
+    python manage.py runserver --noreload
+    python -m drfecommerce.benchmarks.load_test --seed-rows 100000 --counts guests=1000 --output load-before.json
+    python -m drfecommerce.benchmarks.load_test --users 20 --duration 60 --compare load-before.json
+"""
+import argparse
+import json
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from .explain_indexes import setup_django
+
+# kịch bản -> trọng số
+SCENARIOS = {
+    'browse': 6,
+    'cart': 2,
+    'checkout': 1,
+    'admin_reports': 1,
+}
+# Số product / store đọc sẵn cho các kịch bản
+SAMPLE_SIZE = 500
+SEARCH_TERMS = ('bench', 'product', 'bench product 1', 'product 2')
+DEFAULT_THRESHOLD = 20
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_fixtures(sample_size=SAMPLE_SIZE):
+    """
+    Dữ liệu cho các kịch bản, lấy từ database theo thứ tự id nên giống nhau giữa các lần chạy.
+    :return: dict guests (list (id, token)), admin_token, stocks (list (product_id, store_id)), product_ids
+    """
+    from drfecommerce.apps.guest.models import Guest
+    from drfecommerce.apps.my_admin.models import MyAdmin
+    from drfecommerce.apps.product_store.models import ProductStore
+    from drfecommerce.apps.guest import utils as guest_utils
+    from drfecommerce.apps.my_admin import utils as admin_utils
+
+    guests = [(guest.id, guest_utils.generate_access_token(guest))
+              for guest in Guest.objects.filter(is_verified=True).order_by('id')[:sample_size]]
+    admin = MyAdmin.objects.filter(delete_at__isnull=True).order_by('id').first()
+    stocks = list(ProductStore.objects.filter(
+        delete_at__isnull=True, product__delete_at__isnull=True, remaining_stock__gte=100,
+    ).order_by('id').values_list('product_id', 'store_id')[:sample_size])
+    if not guests or admin is None or not stocks:
+        raise RuntimeError("No benchmark data: run with --seed-rows first.")
+    return {
+        'guests': guests,
+        'admin_token': admin_utils.generate_access_token(admin),
+        'stocks': stocks,
+        'product_ids': sorted({product_id for product_id, _ in stocks}),
+    }
+
+
+class Recorder:
+    """
+    Thời gian (ms) và số lỗi theo tên endpoint, dùng chung cho mọi thread.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.timings = {}
+        self.errors = {}
+
+    def add(self, name, elapsed_ms, ok):
+        with self._lock:
+            self.timings.setdefault(name, []).append(elapsed_ms)
+            if not ok:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+
+class Client:
+    def __init__(self, base_url, recorder, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.recorder = recorder
+        self.timeout = timeout
+
+    def request(self, name, method, path, params=None, body=None, token=None):
+        url = self.base_url + path
+        if params:
+            url += '?' + urllib.parse.urlencode(params)
+        headers = {'Accept': 'application/json'}
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode()
+            headers['Content-Type'] = 'application/json'
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        request = urllib.request.Request(url, data=data, headers=headers, method=method)
+
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+                ok = True
+        except urllib.error.HTTPError as e:
+            e.read()
+            ok = e.code < 400
+        except (urllib.error.URLError, OSError):
+            ok = False
+        self.recorder.add(name, (time.perf_counter() - started) * 1000, ok)
+
+
+def browse(client, rng, data):
+    client.request('list products', 'GET', '/api/product/get-list-products/',
+                   {'page_index': rng.randint(1, 5), 'page_size': 20})
+    client.request('product detail', 'GET', '/api/product/get-detail-product/', {'id': rng.choice(data['product_ids'])})
+    client.request('search products', 'GET', '/api/product/search-products/', {'name': rng.choice(SEARCH_TERMS)})
+    client.request('list catalogs', 'GET', '/api/catalog/get-list-catalogs/')
+
+
+def cart(client, rng, data):
+    guest_id, token = rng.choice(data['guests'])
+    product_id, store_id = rng.choice(data['stocks'])
+    client.request('add to cart', 'POST', '/api/cart/guests/add-to-cart/', body={
+        'id': guest_id, 'product_id': product_id, 'store_id': store_id, 'quantity': 1,
+    }, token=token)
+    # my-cart đọc guest id trong body của request GET
+    client.request('my cart', 'GET', '/api/cart/guests/my-cart/', body={'id': guest_id}, token=token)
+
+
+def checkout(client, rng, data):
+    guest_id, token = rng.choice(data['guests'])
+    product_id, store_id = rng.choice(data['stocks'])
+    client.request('create order', 'POST', '/api/order/create-new-order/', body={
+        'guest_id': guest_id,
+        'order_details': [{'product_id': product_id, 'store_id': store_id, 'quantity': 1}],
+        'payment_methods': 'cash_on_delivery',
+        'shipping_address': '1 Bench street',
+        'recipient_phone': '0123456789',
+        'recipient_name': 'Bench guest',
+        'shipping_cost': 0,
+        'gst_amount': 0,
+    }, token=token)
+
+
+def admin_reports(client, rng, data):
+    token = data['admin_token']
+    client.request('admin list orders', 'GET', '/api/order/admin/get-list-orders/', {'page_size': 20}, token=token)
+    client.request('admin sales analytics', 'GET', '/api/product_sale/admin/analytics/', {
+        'period': 'month', 'start_date': '2023-01-01', 'end_date': '2024-12-31',
+    }, token=token)
+
+
+SCENARIO_FUNCTIONS = {
+    'browse': browse,
+    'cart': cart,
+    'checkout': checkout,
+    'admin_reports': admin_reports,
+}
+
+
+def run(base_url, data, users, duration, seed=42, scenarios=None):
+    """
+    Chạy `users` user ảo trong `duration` giây.
+    :param scenarios: dict kịch bản -> trọng số (mặc định SCENARIOS)
+    :return: (Recorder, số giây thực tế)
+    """
+    scenarios = scenarios or SCENARIOS
+    names = list(scenarios)
+    weights = [scenarios[name] for name in names]
+    recorder = Recorder()
+    deadline = time.monotonic() + duration
+
+    def user(index):
+        rng = random.Random(seed + index)
+        client = Client(base_url, recorder)
+        while time.monotonic() < deadline:
+            SCENARIO_FUNCTIONS[rng.choices(names, weights)[0]](client, rng, data)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as executor:
+        for future in [executor.submit(user, index) for index in range(users)]:
+            future.result()
+    return recorder, time.perf_counter() - started
+
+
+def percentile(timings, percent):
+    if len(timings) == 1:
+        return timings[0]
+    return statistics.quantiles(timings, n=100, method='inclusive')[percent - 1]
+
+
+def summarize(recorder, elapsed):
+    """
+    :return: dict tên endpoint -> {requests, errors, requests_per_second, p50_ms, p90_ms, p99_ms}
+    """
+    endpoints = {}
+    for name, timings in sorted(recorder.timings.items()):
+        endpoints[name] = {
+            'requests': len(timings),
+            'errors': recorder.errors.get(name, 0),
+            'requests_per_second': round(len(timings) / elapsed, 2),
+            'p50_ms': round(percentile(timings, 50), 2),
+            'p90_ms': round(percentile(timings, 90), 2),
+            'p99_ms': round(percentile(timings, 99), 2),
+        }
+    return endpoints
+
+
+def compare(report, baseline, threshold):
+    """
+    :return: list (endpoint, p90 baseline, p90 hiện tại, thay đổi %) của các endpoint chậm hơn quá threshold %
+    """
+    regressions = []
+    for name, result in report['endpoints'].items():
+        before = baseline.get('endpoints', {}).get(name)
+        if not before or not before['p90_ms']:
+            continue
+        change = (result['p90_ms'] - before['p90_ms']) / before['p90_ms'] * 100
+        if change > threshold:
+            regressions.append((name, before['p90_ms'], result['p90_ms'], round(change, 1)))
+    return regressions
+
+
+def print_report(report, stream):
+    stream.write("%-24s %9s %7s %9s %9s %9s %9s\n" % ("endpoint", "requests", "errors", "req/s", "p50 ms", "p90 ms", "p99 ms"))
+    for name, result in report['endpoints'].items():
+        stream.write("%-24s %9d %7d %9.1f %9.1f %9.1f %9.1f\n" % (
+            name, result['requests'], result['errors'], result['requests_per_second'],
+            result['p50_ms'], result['p90_ms'], result['p99_ms']))
+    stream.write(f"total: {report['requests']} requests, {report['errors']} errors, "
+                 f"{report['requests_per_second']} requests/s\n")
+
+
+def parse_counts(value):
+    """
+    'guests=1000,orders=20000' -> {'guests': 1000, 'orders': 20000}
+    """
+    counts = {}
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        name, _, number = item.partition('=')
+        try:
+            counts[name.strip()] = int(number)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Invalid count '{item}', expected name=number") from None
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--users', type=int, default=10, help="Số user ảo chạy song song")
+    parser.add_argument('--duration', type=float, default=30, help="Thời gian chạy (giây)")
+    parser.add_argument('--seed', type=int, default=42, help="Seed cho dữ liệu và thứ tự kịch bản")
+    parser.add_argument('--seed-rows', type=int, default=0,
+                        help="Sinh trước chừng này dòng dữ liệu (0 = dùng dữ liệu có sẵn)")
+    parser.add_argument('--counts', type=parse_counts, default={},
+                        help="Số dòng riêng cho từng bảng khi sinh dữ liệu, ví dụ guests=1000,orders=20000")
+    parser.add_argument('--scenario', action='append', choices=list(SCENARIOS),
+                        help="Chỉ chạy kịch bản này (lặp lại để chọn nhiều kịch bản)")
+    parser.add_argument('--output', help="Ghi kết quả ra file JSON")
+    parser.add_argument('--compare', help="File JSON của một lần chạy trước để so sánh")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Phần trăm p90 chậm hơn baseline thì coi là regression")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    if args.seed_rows or args.counts:
+        from .seed import seed
+        seed(args.seed_rows, seed=args.seed, stdout=sys.stdout, counts=args.counts)
+    data = load_fixtures()
+
+    scenarios = {name: SCENARIOS[name] for name in args.scenario} if args.scenario else SCENARIOS
+    recorder, elapsed = run(args.base_url, data, args.users, args.duration, seed=args.seed, scenarios=scenarios)
+    endpoints = summarize(recorder, elapsed)
+    total = sum(result['requests'] for result in endpoints.values())
+    report = {
+        'commit': git_commit(),
+        'base_url': args.base_url,
+        'users': args.users,
+        'duration_seconds': round(elapsed, 2),
+        'scenarios': scenarios,
+        'requests': total,
+        'errors': sum(result['errors'] for result in endpoints.values()),
+        'requests_per_second': round(total / elapsed, 2),
+        'endpoints': endpoints,
+    }
+
+    print_report(report, sys.stdout)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        sys.stdout.write(f"\nCompared with {args.compare} (commit {baseline.get('commit')}): ")
+        if not regressions:
+            sys.stdout.write(f"no endpoint slower than {args.threshold}% at p90.\n")
+            return
+        sys.stdout.write(f"{len(regressions)} regression(s)\n")
+        for name, before, after, change in regressions:
+            sys.stdout.write("  %-24s p90 %9.1f -> %9.1f ms (+%s%%)\n" % (name, before, after, change))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Sinh dữ liệu giả (deterministic) cho benchmark.
+
+Tổng số dòng được chia cho các bảng nóng: notifications, orders, order_detail,
+product_sales, product_incomings, reviews, product_store... Cùng `rows` và `seed`
+luôn cho ra cùng một bộ dữ liệu, nên kết quả giữa các lần chạy so sánh được với nhau.
+Số dòng của từng bảng có thể đặt riêng (counts={'guests': 500, 'orders': 20000}, ...).
+Guest và admin benchmark đăng nhập được bằng email guest{i}@bench.local / admin{i}@bench.local
+và mật khẩu BENCH_PASSWORD. Bảng rollup doanh thu theo ngày được tính lại sau khi sinh dữ liệu.
+Chỉ nên chạy trên database dùng riêng cho benchmark (sinh trước khi chạy load_test / explain_indexes
+bằng tham số --seed-rows).
+"""
+import datetime
+import random
+
+from django.db.models import F
+from django.utils import timezone
+
+from drfecommerce.apps.guest.models import Guest
+from drfecommerce.apps.my_admin.models import MyAdmin
+from drfecommerce.apps.store.models import Store
+from drfecommerce.apps.catalog.models import Catalog
+from drfecommerce.apps.catalog.tree import rebuild_paths
+from drfecommerce.search import rebuild_search_documents
+from drfecommerce.apps.promotion.models import Promotion
+from drfecommerce.apps.product.models import Product
+from drfecommerce.apps.product_store.models import ProductStore
+from drfecommerce.apps.order.models import Order
+from drfecommerce.apps.order_detail.models import OrderDetail
+from drfecommerce.apps.notification.models import Notification
+from drfecommerce.apps.product_sale.models import ProductSale
+from drfecommerce.apps.product_sale.rollups import rebuild_rollups
+from drfecommerce.apps.product_incoming.models import ProductIncoming
+from drfecommerce.apps.review.models import Review
+
+START = datetime.datetime(2023, 1, 1, tzinfo=datetime.timezone.utc)
+SPAN_SECONDS = 2 * 365 * 24 * 3600  # dữ liệu trải đều trong 2 năm
+
+# Tỉ lệ số dòng của từng bảng trên tổng `rows`
+SHARES = {
+    'orders': 0.15,
+    'order_details': 0.15,
+    'product_sales': 0.15,
+    'product_incomings': 0.15,
+    'notifications': 0.2,
+    'reviews': 0.1,
+}
+# Số dòng mặc định của các bảng không chia theo `rows`
+FIXED_COUNTS = {
+    'stores': 20,
+    'catalogs': 40,
+    'promotions': 20,
+    'admins': 1,
+}
+# Tên các bảng có thể đặt số dòng riêng
+COUNT_NAMES = (*FIXED_COUNTS, 'guests', 'products', *SHARES)
+BENCH_PASSWORD = "bench-password"
+STORES_PER_PRODUCT = 5
+ORDER_STATUSES = ('pending', 'confirmed', 'shipped', 'delivered', 'cancelled', 'returned')
+
+
+def _log(stdout, message):
+    if stdout is not None:
+        stdout.write(message + "\n")
+
+
+def _chunks(total, size):
+    for start in range(0, total, size):
+        yield range(start, min(start + size, total))
+
+
+class Seeder:
+    def __init__(self, rows, seed=42, batch_size=5000, stdout=None, counts=None):
+        self.rows = rows
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.stdout = stdout
+        self.overrides = counts or {}
+        self.counts = {}
+
+    def moment(self):
+        return START + datetime.timedelta(seconds=self.rng.randrange(SPAN_SECONDS))
+
+    def size(self, name, default):
+        return self.overrides.get(name, default)
+
+    def share(self, name):
+        return self.size(name, int(self.rows * SHARES[name]))
+
+    def bulk(self, model, build, total, label):
+        """
+        Tạo `total` dòng bằng bulk_create theo từng lô, trả về list id theo thứ tự tạo.
+        """
+        ids = []
+        for chunk in _chunks(total, self.batch_size):
+            objs = model.objects.bulk_create([build(i) for i in chunk], batch_size=self.batch_size)
+            ids.extend(obj.pk for obj in objs)
+        self.counts[label] = total
+        _log(self.stdout, f"  {label}: {total}")
+        return ids
+
+    def run(self):
+        rng = self.rng
+        now = timezone.now()
+
+        store_ids = self.bulk(Store, lambda i: Store(
+            name=f"Bench store {i}", phone_number="0123456789", email=f"store{i}@bench.local",
+            address=f"{i} Bench street", opening_hours=datetime.time(8), closing_hours=datetime.time(22),
+            created_at=self.moment(),
+        ), self.size('stores', FIXED_COUNTS['stores']), 'stores')
+
+        catalog_ids = self.bulk(Catalog, lambda i: Catalog(
+            name=f"Bench catalog {i}", description="", level=1, created_at=self.moment(),
+            delete_at=now if i % 10 == 9 else None,
+        ), self.size('catalogs', FIXED_COUNTS['catalogs']), 'catalogs')
+        rebuild_paths(Catalog)
+
+        promotion_ids = self.bulk(Promotion, lambda i: Promotion(
+            name=f"Bench promotion {i}", description="", code=f"BENCH{i}",
+            from_date=datetime.date(2023, 1, 1), to_date=datetime.date(2024, 12, 31),
+            special_price=0, member_price=0, rate=0.1, created_at=self.moment(),
+        ), self.size('promotions', FIXED_COUNTS['promotions']), 'promotions')
+
+        self.bulk(MyAdmin, lambda i: MyAdmin(
+            user_name=f"bench_admin_{i}", email=f"admin{i}@bench.local", password=BENCH_PASSWORD, role="admin",
+        ), self.size('admins', FIXED_COUNTS['admins']), 'admins')
+
+        guest_ids = self.bulk(Guest, lambda i: Guest(
+            first_name="Bench", last_name=str(i), email=f"guest{i}@bench.local",
+            password=BENCH_PASSWORD, is_verified=True, created_at=self.moment(),
+        ), self.size('guests', max(50, self.rows // 100)), 'guests')
+
+        product_ids = self.bulk(Product, lambda i: Product(
+            catalog_id=rng.choice(catalog_ids) if catalog_ids else None,
+            promotion_id=rng.choice(promotion_ids) if promotion_ids and i % 4 == 0 else None,
+            code=f"BENCH{i:07d}", name=f"Bench product {i}", short_description="", description="",
+            product_type="flower", image="", price=rng.randrange(10, 500) * 1000, member_price=0,
+            quantity=0, gallery="", weight=1, diameter=1, dimensions="", material="", label="",
+            created_at=self.moment(), delete_at=now if i % 20 == 19 else None,
+        ), self.size('products', max(100, self.rows // 200)), 'products')
+        # bulk_create không gọi save() nên tài liệu tìm kiếm được tính lại một lần
+        for model in (Store, Catalog, Promotion, Product):
+            rebuild_search_documents(model.objects.all(), model.search_fields)
+
+        pairs = [(product_id, store_id)
+                 for product_id in product_ids
+                 for store_id in rng.sample(store_ids, min(STORES_PER_PRODUCT, len(store_ids)))]
+        self.bulk(ProductStore, lambda i: ProductStore(
+            product_id=pairs[i][0], store_id=pairs[i][1], quantity_in=1000, remaining_stock=rng.randrange(1000),
+            created_at=self.moment(),
+        ), len(pairs), 'product_store')
+
+        def order(i):
+            order_date = self.moment()
+            return Order(
+                guest_id=rng.choice(guest_ids), total_cost=rng.randrange(10, 5000) * 1000,
+                order_status=rng.choice(ORDER_STATUSES), order_date=order_date, created_at=order_date,
+                gst_amount=0.1, shipping_cost=30000,
+            )
+        order_ids = self.bulk(Order, order, self.share('orders') if guest_ids else 0, 'orders')
+
+        detail_pairs = []
+
+        def order_detail(i):
+            product_id, store_id = pairs[rng.randrange(len(pairs))]
+            detail_pairs.append((product_id, store_id))
+            return OrderDetail(
+                order_id=order_ids[i % len(order_ids)], product_id=product_id, store_id=store_id,
+                product_name=f"Bench product {product_id}", quantity=rng.randrange(1, 5),
+                unit_price=100000, location_pickup="",
+            )
+        detail_ids = self.bulk(OrderDetail, order_detail, self.share('order_details') if order_ids and pairs else 0,
+                               'order_details')
+        detail_rows = [(detail_id, *pair) for detail_id, pair in zip(detail_ids, detail_pairs)]
+
+        def product_sale(i):
+            detail_id, product_id, store_id = detail_rows[i % len(detail_rows)]
+            return ProductSale(
+                product_id=product_id, store_id=store_id, order_detail_id=detail_id,
+                sale_price=rng.randrange(10, 500) * 1000, quantity_sold=rng.randrange(1, 5),
+                created_at=self.moment(),
+            )
+        self.bulk(ProductSale, product_sale, self.share('product_sales') if detail_rows else 0, 'product_sales')
+        # sale_date / effective_date là auto_now_add, trải lại theo created_at bằng một câu update
+        ProductSale.objects.update(sale_date=F('created_at'))
+
+        def product_incoming(i):
+            product_id, store_id = pairs[rng.randrange(len(pairs))]
+            return ProductIncoming(
+                product_id=product_id, store_id=store_id, cost_price=rng.randrange(5, 300) * 1000,
+                quantity_in=rng.randrange(1, 100), created_at=self.moment(),
+            )
+        self.bulk(ProductIncoming, product_incoming, self.share('product_incomings') if pairs else 0,
+                  'product_incomings')
+        ProductIncoming.objects.update(effective_date=F('created_at'))
+        # Báo cáo doanh thu / chi phí của admin đọc từ bảng rollup theo ngày
+        store_rows, product_rows, catalog_rows = rebuild_rollups()
+        _log(self.stdout, f"  daily rollups: {store_rows} store, {product_rows} product, {catalog_rows} catalog rows")
+
+        self.bulk(Notification, lambda i: Notification(
+            guest_id=rng.choice(guest_ids), notification_type='order_update', message="Bench notification",
+            is_read=rng.random() < 0.7, created_at=self.moment(),
+        ), self.share('notifications') if guest_ids else 0, 'notifications')
+
+        def review(i):
+            detail_id, product_id, store_id = detail_rows[i % len(detail_rows)]
+            return Review(
+                guest_id=rng.choice(guest_ids), product_id=product_id, store_id=store_id,
+                order_detail_id=detail_id, rating=rng.randrange(1, 6), created_at=self.moment(),
+            )
+        self.bulk(Review, review, self.share('reviews') if guest_ids and detail_rows else 0, 'reviews')
+
+        return self.counts
+
+
+def seed(rows, seed=42, batch_size=5000, stdout=None, counts=None):
+    """
+    Sinh khoảng `rows` dòng dữ liệu benchmark.
+    :param rows: tổng số dòng mong muốn (ví dụ 1_000_000)
+    :param seed: seed cho random, cùng seed cho cùng dữ liệu
+    :param batch_size: số dòng mỗi lần bulk_create
+    :param stdout: stream để in tiến trình (tuỳ chọn)
+    :param counts: dict tên bảng (COUNT_NAMES) -> số dòng, thay cho số dòng tính từ `rows`
+    :return: dict tên bảng -> số dòng đã tạo
+    """
+    unknown = set(counts or {}) - set(COUNT_NAMES)
+    if unknown:
+        raise ValueError(f"Unknown tables: {', '.join(sorted(unknown))}")
+    _log(stdout, f"Seeding ~{rows} rows (seed={seed})")
+    return Seeder(rows, seed=seed, batch_size=batch_size, stdout=stdout, counts=counts).run()
+
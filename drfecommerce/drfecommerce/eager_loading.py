@@ -0,0 +1,69 @@
+"""
+Khai báo các quan hệ mà serializer cần đọc để tránh N+1 query.
+
+Serializer kế thừa EagerLoadingMixin và khai báo:
+- select_related_fields: các ForeignKey / OneToOne được đọc (ví dụ source='catalog.name')
+- prefetch_related_fields: các quan hệ nhiều (reverse FK, M2M) được serializer lồng bên trong đọc
+
+Khi serializer được dùng với many=True, các quan hệ này được áp dụng tự động:
+- queryset chưa chạy: select_related / prefetch_related (join trong cùng câu query)
+- list (ví dụ page.object_list của drfecommerce.pagination): prefetch_related_objects, mỗi quan hệ một query
+Vì vậy số query của một trang không phụ thuộc vào page_size.
+"""
+from django.db import models
+from django.db.models import prefetch_related_objects
+from django.db.models.query import ModelIterable
+from rest_framework import serializers
+
+
+def eager_load(data, select_related=(), prefetch_related=()):
+    """
+    Áp dụng các quan hệ cần đọc lên queryset / list object.
+    :return: queryset mới (nếu data là queryset chưa chạy) hoặc chính data
+    """
+    if not select_related and not prefetch_related:
+        return data
+    if isinstance(data, models.manager.BaseManager):
+        data = data.all()
+
+    if isinstance(data, models.QuerySet):
+        if data._iterable_class is not ModelIterable:
+            # queryset values() / values_list() không có quan hệ để load
+            return data
+        if data._result_cache is None:
+            if select_related:
+                data = data.select_related(*select_related)
+            return data.prefetch_related(*prefetch_related)
+        # queryset đã được prefetch từ serializer cha, chỉ load thêm phần còn thiếu
+        instances = data._result_cache
+    else:
+        instances = data if isinstance(data, list) else list(data)
+        data = instances
+
+    instances = [obj for obj in instances if isinstance(obj, models.Model)]
+    if instances:
+        prefetch_related_objects(instances, *select_related, *prefetch_related)
+    return data
+
+
+class EagerLoadingListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        return super().to_representation(self.child.setup_eager_loading(data))
+
+
+class EagerLoadingMixin:
+    """
+    Mixin cho ModelSerializer, xem docstring của module.
+    """
+    select_related_fields = ()
+    prefetch_related_fields = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        meta = getattr(cls, 'Meta', None)
+        if meta is not None and not hasattr(meta, 'list_serializer_class'):
+            meta.list_serializer_class = EagerLoadingListSerializer
+
+    @classmethod
+    def setup_eager_loading(cls, data):
+        return eager_load(data, cls.select_related_fields, cls.prefetch_related_fields)
@@ -0,0 +1,240 @@
+"""
+Xác thực JWT cho guest và admin (GuestSafeJWTAuthentication, AdminSafeJWTAuthentication).
+
+- Token mang đủ claim để phần lớn request không cần query database: jti (id của token), type
+  (access / refresh), role, is_verified (guest), cùng user_id / admin_id như trước.
+- Payload được decode một lần cho mỗi request, kể cả khi nhiều authentication class cùng chạy
+  (DEFAULT_AUTHENTICATION_CLASSES). Class không nhận loại token đó (không có claim id) thì bỏ qua, không query.
+- Principal (Guest / MyAdmin, chỉ gồm các field cần thiết) được cache theo jti trong
+  AUTH_PRINCIPAL_CACHE_TIMEOUT giây. Mỗi request đọc cache một lần (get_many) để lấy principal
+  và kiểm tra danh sách thu hồi.
+- Thu hồi: revoke_token(payload) cho một token (logout), revoke_principal(kind, id) cho mọi token
+  phát hành trước thời điểm gọi. Khi Guest / MyAdmin được lưu, principal đã cache sẽ được nạp lại.
+- SECRET_KEY chỉ được đọc một lần từ settings.
+"""
+import functools
+import time
+import uuid
+
+import jwt
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication
+
+CACHE_ALIAS = 'default'
+KEY_PREFIX = 'auth'
+ALGORITHM = 'HS256'
+ACCESS_TOKEN_LIFETIME = 500 * 60
+REFRESH_TOKEN_LIFETIME = 7 * 24 * 3600
+DEFAULT_PRINCIPAL_CACHE_TIMEOUT = 300
+REVOKED = 'revoked'
+
+
+@functools.lru_cache(maxsize=None)
+def signing_key():
+    return settings.SECRET_KEY
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _principal_key(jti):
+    return f"{KEY_PREFIX}:principal:{jti}"
+
+
+def _revoked_before_key(kind, principal_id):
+    return f"{KEY_PREFIX}:revoked_before:{kind}:{principal_id}"
+
+
+def _changed_key(kind, principal_id):
+    return f"{KEY_PREFIX}:changed:{kind}:{principal_id}"
+
+
+def encode_token(claims, token_type):
+    """
+    Tạo token đã ký.
+    :param claims: claim riêng của principal (user_id / admin_id, role, ...)
+    :param token_type: 'access' hoặc 'refresh'
+    """
+    now = time.time()
+    lifetime = ACCESS_TOKEN_LIFETIME if token_type == 'access' else REFRESH_TOKEN_LIFETIME
+    payload = {
+        **claims,
+        'type': token_type,
+        'jti': uuid.uuid4().hex,
+        # iat lưu cả phần thập phân để so sánh chính xác với revoked_before
+        'iat': now,
+        'exp': int(now + lifetime),
+    }
+    return jwt.encode(payload, signing_key(), algorithm=ALGORITHM)
+
+
+def decode_token(token, token_type='access', expired_message='access_token expired'):
+    """
+    Giải mã và kiểm tra chữ ký, hạn dùng, loại token.
+    :raise AuthenticationFailed: token không hợp lệ
+    """
+    try:
+        payload = jwt.decode(token, signing_key(), algorithms=[ALGORITHM])
+    except jwt.ExpiredSignatureError:
+        raise exceptions.AuthenticationFailed(expired_message)
+    except jwt.InvalidTokenError:
+        raise exceptions.AuthenticationFailed('Invalid token')
+    # Token phát hành trước khi có claim type thì không phân biệt được access / refresh
+    if payload.get('type', token_type) != token_type:
+        raise exceptions.AuthenticationFailed('Invalid token type')
+    return payload
+
+
+def _remaining_seconds(payload):
+    return max(1, int(payload.get('exp', 0) - time.time()))
+
+
+def revoke_token(payload):
+    """
+    Thu hồi một token (logout), có hiệu lực đến khi token hết hạn.
+    """
+    if payload.get('jti'):
+        _cache().set(_principal_key(payload['jti']), REVOKED, _remaining_seconds(payload))
+
+
+def revoke_principal(kind, principal_id):
+    """
+    Thu hồi mọi token của principal phát hành trước thời điểm gọi (ví dụ đổi mật khẩu).
+    """
+    _cache().set(_revoked_before_key(kind, principal_id), time.time(), REFRESH_TOKEN_LIFETIME)
+
+
+def principal_changed(kind, principal_id):
+    """
+    Đánh dấu principal đã thay đổi, các principal đã cache sẽ được đọc lại từ database.
+    """
+    _cache().set(_changed_key(kind, principal_id), time.time(), ACCESS_TOKEN_LIFETIME)
+
+
+def check_not_revoked(kind, principal_id, payload):
+    """
+    Dùng cho refresh token (không đi qua cache principal).
+    :raise AuthenticationFailed: token đã bị thu hồi
+    """
+    principal_key = _principal_key(payload.get('jti'))
+    revoked_before_key = _revoked_before_key(kind, principal_id)
+    values = _cache().get_many([principal_key, revoked_before_key])
+    _raise_if_revoked(payload, values.get(principal_key), values.get(revoked_before_key))
+
+
+def _raise_if_revoked(payload, entry, revoked_before):
+    if entry == REVOKED:
+        raise exceptions.AuthenticationFailed('Token has been revoked')
+    if revoked_before is not None and payload.get('iat', 0) < revoked_before:
+        raise exceptions.AuthenticationFailed('Token has been revoked')
+
+
+def get_bearer_payload(request):
+    """
+    Payload của access token trong header Authorization, decode một lần cho mỗi request.
+    :return: payload, hoặc None nếu request không có header Authorization
+    """
+    http_request = getattr(request, '_request', request)
+    payload = getattr(http_request, '_jwt_payload', None)
+    if payload is not None:
+        return payload
+
+    authorization_header = request.headers.get('Authorization')
+    if not authorization_header:
+        return None
+    try:
+        # header = 'Token xxxxxxxxxxxxxxxxxxxxxxxx'
+        access_token = authorization_header.split(' ')[1]
+    except IndexError:
+        raise exceptions.AuthenticationFailed('Token prefix missing')
+    payload = decode_token(access_token)
+    http_request._jwt_payload = payload
+    return payload
+
+
+class CachedJWTAuthentication(BaseAuthentication):
+    """
+    Authentication class dùng chung, subclass khai báo:
+    - kind: tên loại principal trong key cache ('guest', 'admin')
+    - id_claim: claim chứa id principal ('user_id', 'admin_id')
+    - model, principal_fields: model và các field được nạp / cache
+    - not_found_message: lỗi khi principal không còn tồn tại
+    - foreign_token_message: lỗi khi token thuộc loại principal khác, None thì bỏ qua để class sau xử lý
+    request.auth là payload của token.
+    """
+    kind = None
+    id_claim = None
+    model = None
+    principal_fields = ('id',)
+    not_found_message = 'User not found'
+    foreign_token_message = None
+
+    def authenticate(self, request):
+        payload = get_bearer_payload(request)
+        if payload is None:
+            return None
+
+        principal_id = payload.get(self.id_claim)
+        if principal_id is None:
+            if self.foreign_token_message:
+                raise exceptions.AuthenticationFailed(self.foreign_token_message)
+            return None
+
+        self.check_claims(payload)
+        principal = self.get_principal(principal_id, payload)
+        self.enforce_csrf(request)
+        return (principal, payload)
+
+    def check_claims(self, payload):
+        """
+        Kiểm tra dựa trên claim của token, không cần database.
+        """
+
+    def check_principal(self, principal):
+        """
+        Kiểm tra principal vừa được nạp từ database.
+        """
+
+    def load_principal(self, principal_id):
+        principal = self.model.objects.only(*self.principal_fields).filter(id=principal_id).first()
+        if principal is None:
+            raise exceptions.AuthenticationFailed(self.not_found_message)
+        self.check_principal(principal)
+        return principal
+
+    def get_principal(self, principal_id, payload):
+        jti = payload.get('jti')
+        if jti is None:
+            # Token phát hành trước khi có jti: đọc database mỗi request như trước
+            return self.load_principal(principal_id)
+
+        cache = _cache()
+        principal_key = _principal_key(jti)
+        revoked_before_key = _revoked_before_key(self.kind, principal_id)
+        changed_key = _changed_key(self.kind, principal_id)
+        values = cache.get_many([principal_key, revoked_before_key, changed_key])
+
+        entry = values.get(principal_key)
+        _raise_if_revoked(payload, entry, values.get(revoked_before_key))
+        changed_at = values.get(changed_key)
+        if entry is not None and (changed_at is None or entry[0] >= changed_at):
+            return entry[1]
+
+        loaded_at = time.time()
+        principal = self.load_principal(principal_id)
+        timeout = getattr(settings, 'AUTH_PRINCIPAL_CACHE_TIMEOUT', DEFAULT_PRINCIPAL_CACHE_TIMEOUT)
+        timeout = min(timeout, _remaining_seconds(payload))
+        if entry is None:
+            # add để không ghi đè REVOKED nếu token vừa bị thu hồi trong lúc đang nạp
+            cache.add(principal_key, (loaded_at, principal), timeout)
+        else:
+            cache.set(principal_key, (loaded_at, principal), timeout)
+        return principal
+
+    def enforce_csrf(self, request):
+        """
+        Enforce CSRF validation
+        """
@@ -0,0 +1,230 @@
+"""
+Phân trang dùng chung cho các API danh sách.
+
+Hai chế độ:
+- offset (mặc định, tương thích với client cũ): page_index / page_size, trả về total_pages, total_items...
+- cursor (keyset): gửi `cursor` (để trống cho trang đầu), trang tiếp theo lấy bằng next_cursor / previous_cursor.
+  Không dùng OFFSET và mặc định không chạy COUNT(*), nên tốc độ không phụ thuộc vào độ sâu của trang.
+
+Tham số `count` quyết định cách tính tổng số dòng:
+- exact: COUNT(*) (mặc định ở chế độ offset)
+- estimated: ước lượng từ planner của PostgreSQL (database khác sẽ dùng COUNT(*))
+- none: không tính (mặc định ở chế độ cursor)
+Khi view đã biết tổng số dòng (ví dụ review_count của bảng review_summary) thì truyền vào paginate(total=...),
+exact / estimated dùng giá trị này thay vì chạy query.
+"""
+import base64
+import json
+import math
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+DEFAULT_PAGE_SIZE = 10
+# Khoá keyset mặc định: mới nhất trước, id để phân biệt các dòng cùng created_at
+DEFAULT_ORDERING = ('-created_at', '-id')
+COUNT_MODES = ('exact', 'estimated', 'none')
+
+
+class InvalidCursor(APIException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_detail = "Invalid cursor."
+    default_code = "invalid_cursor"
+
+
+def estimate_count(queryset):
+    """
+    Ước lượng số dòng của queryset bằng EXPLAIN (không quét bảng).
+    Chỉ PostgreSQL có ước lượng, database khác trả về COUNT(*) chính xác.
+    """
+    if connections[queryset.db].vendor != 'postgresql':
+        return queryset.count()
+    plan = json.loads(queryset.order_by().explain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator với count lấy từ estimate_count thay vì COUNT(*).
+    """
+    @cached_property
+    def count(self):
+        return estimate_count(self.object_list)
+
+
+class Page:
+    """
+    Kết quả phân trang.
+    - object_list: các object của trang hiện tại (truyền vào serializer)
+    - meta: các field phân trang để gộp vào "data" của response
+    """
+    def __init__(self, object_list, meta):
+        self.object_list = object_list
+        self.meta = meta
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def _positive_int(value, default):
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return default
+    return value if value > 0 else default
+
+
+def _count_mode(request, default):
+    mode = request.GET.get('count', default)
+    return mode if mode in COUNT_MODES else default
+
+
+def _total(queryset, mode, known=None):
+    if mode != 'none' and known is not None:
+        return known
+    if mode == 'exact':
+        return queryset.count()
+    if mode == 'estimated':
+        return estimate_count(queryset)
+    return None
+
+
+def encode_cursor(values, reverse=False):
+    payload = json.dumps({'v': values, 'r': reverse}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, model, ordering):
+    """
+    :return: (values, reverse) với values đã được chuyển về kiểu python của từng field
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        values, reverse = payload['v'], bool(payload['r'])
+        if len(values) != len(ordering):
+            raise ValueError
+        return [_to_python(model, name.lstrip('-'), value) for name, value in zip(ordering, values)], reverse
+    except Exception:
+        raise InvalidCursor()
+
+
+def _to_python(model, name, value):
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        # field của bảng liên kết (ví dụ product__id trong queryset values())
+        return value
+    return field.to_python(value)
+
+
+def _cursor_values(obj, ordering):
+    values = []
+    for name in ordering:
+        # queryset values() trả về dict, queryset thường trả về model instance
+        value = obj[name.lstrip('-')] if isinstance(obj, dict) else getattr(obj, name.lstrip('-'))
+        values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+    return values
+
+
+def _keyset_filter(ordering, values, reverse):
+    """
+    Điều kiện "đứng sau" (hoặc "đứng trước" khi reverse) vị trí values theo ordering:
+    (a > x) OR (a = x AND b > y) OR ...
+    """
+    condition = Q()
+    for position, name in enumerate(ordering):
+        field = name.lstrip('-')
+        descending = name.startswith('-')
+        lookup = 'lt' if descending != reverse else 'gt'
+        term = Q(**{f"{field}__{lookup}": values[position]})
+        for previous, value in zip(ordering[:position], values[:position]):
+            term &= Q(**{previous.lstrip('-'): value})
+        condition |= term
+    return condition
+
+
+def _reversed_ordering(ordering):
+    return [name[1:] if name.startswith('-') else '-' + name for name in ordering]
+
+
+def paginate_cursor(request, queryset, ordering=DEFAULT_ORDERING, total=None):
+    ordering = list(ordering)
+    page_size = _positive_int(request.GET.get('page_size'), DEFAULT_PAGE_SIZE)
+    cursor = request.GET.get('cursor')
+    total = _total(queryset, _count_mode(request, 'none'), total)
+
+    reverse = False
+    page_queryset = queryset
+    if cursor:
+        values, reverse = decode_cursor(cursor, queryset.model, ordering)
+        page_queryset = page_queryset.filter(_keyset_filter(ordering, values, reverse))
+    page_queryset = page_queryset.order_by(*(_reversed_ordering(ordering) if reverse else ordering))
+
+    # Lấy thêm một dòng để biết còn trang tiếp theo hay không
+    items = list(page_queryset[:page_size + 1])
+    has_more = len(items) > page_size
+    items = items[:page_size]
+    if reverse:
+        items.reverse()
+        has_next, has_previous = True, has_more
+    else:
+        has_next, has_previous = has_more, bool(cursor)
+
+    meta = {
+        "page_size": page_size,
+        "next_cursor": encode_cursor(_cursor_values(items[-1], ordering)) if has_next and items else None,
+        "previous_cursor": encode_cursor(_cursor_values(items[0], ordering), reverse=True) if has_previous and items else None,
+        "has_next": has_next,
+        "has_previous": has_previous,
+    }
+    if total is not None:
+        meta["total_items"] = total
+        meta["total_pages"] = math.ceil(total / page_size)
+    return Page(items, meta)
+
+
+def paginate_offset(request, queryset, ordering=DEFAULT_ORDERING, total=None):
+    page_index = request.GET.get('page_index', 1)
+    page_size = _positive_int(request.GET.get('page_size'), DEFAULT_PAGE_SIZE)
+    count_mode = _count_mode(request, 'exact')
+
+    paginator_class = EstimatedCountPaginator if count_mode == 'estimated' else Paginator
+    paginator = paginator_class(queryset.order_by(*ordering), page_size)
+    if total is not None:
+        # count là cached_property, gán trước để Paginator không chạy COUNT(*)
+        paginator.count = total
+    try:
+        page = paginator.page(page_index)
+    except PageNotAnInteger:
+        page = paginator.page(1)
+    except EmptyPage:
+        page = paginator.page(paginator.num_pages)
+
+    return Page(list(page.object_list), {
+        "total_pages": paginator.num_pages,
+        "total_items": paginator.count,
+        "page_index": page.number,
+        "page_size": page_size,
+    })
+
+
+def paginate(request, queryset, ordering=DEFAULT_ORDERING, total=None):
+    """
+    Phân trang queryset theo tham số của request.
+    :param request: request của DRF, đọc các tham số page_index, page_size, cursor, count
+    :param queryset: queryset cần phân trang
+    :param ordering: các field keyset, field cuối phải là duy nhất (mặc định ('-created_at', '-id'))
+    :param total: số dòng của queryset nếu đã biết trước, thay cho COUNT(*)
+    :return: Page, dùng page.object_list cho serializer và gộp page.meta vào "data" của response
+    """
+    if 'cursor' in request.GET:
+        return paginate_cursor(request, queryset, ordering, total)
+    return paginate_offset(request, queryset, ordering, total)
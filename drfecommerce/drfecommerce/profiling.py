@@ -0,0 +1,299 @@
+"""
+Đo thời gian xử lý từng request: ProfilingMiddleware (đặt đầu MIDDLEWARE).
+
+Mỗi request ghi lại:
+- tên view (tên url, ví dụ 'admin-get-list-orders'), method, status
+- wall time, số query và tổng thời gian SQL (connection.execute_wrapper trên mọi database)
+- thời gian serializer (serializer.data, chỉ tính serializer ngoài cùng), kích thước response
+
+Kết quả:
+- cộng dồn vào registry theo (view, method), xuất dạng Prometheus ở api/admin/metrics/ (chỉ admin).
+  Registry nằm trong bộ nhớ của từng process: chạy nhiều worker thì mỗi worker có số liệu riêng.
+- header Server-Timing khi PROFILING_SERVER_TIMING = True
+- request chậm hơn PROFILING_SLOW_REQUEST_MS được ghi log (logger drfecommerce.profiling),
+  kèm các câu SQL lặp lại nhiều nhất (thường là N+1 query)
+
+Với StreamingHttpResponse chỉ đo được phần trước khi trả response, query khi stream không được tính.
+Đo thêm một đoạn code bất kỳ: with profiling.timer('render'): ...
+"""
+import contextlib
+import contextvars
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = 'drfecommerce'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# Ngưỡng (giây) của histogram thời gian xử lý request
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULT_SLOW_REQUEST_MS = 1000
+# Số câu SQL lặp lại được ghi vào log request chậm
+DUPLICATE_QUERIES_LOGGED = 5
+UNMATCHED_VIEW = '<unmatched>'
+
+_current = contextvars.ContextVar('request_profile', default=None)
+
+
+class RequestProfile:
+    """
+    Số liệu của một request đang xử lý.
+    """
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.query_count = 0
+        self.query_time = 0.0
+        # sql (câu lệnh với placeholder, chưa gắn tham số) -> [số lần, tổng thời gian]
+        self.queries = {}
+        # tên đoạn đo -> tổng thời gian, ví dụ 'serializer'
+        self.timings = {}
+        self._timer_depth = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        # execute_wrapper của Django
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.query_count += 1
+            self.query_time += elapsed
+            stats = self.queries.setdefault(sql, [0, 0.0])
+            stats[0] += 1
+            stats[1] += elapsed
+
+    @contextlib.contextmanager
+    def timer(self, name):
+        # Lồng nhau (serializer gọi serializer) thì chỉ tính lần ngoài cùng
+        depth = self._timer_depth.get(name, 0)
+        self._timer_depth[name] = depth + 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._timer_depth[name] = depth
+            if depth == 0:
+                self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - started
+
+    def duplicated_queries(self, limit=DUPLICATE_QUERIES_LOGGED):
+        """
+        :return: list (sql, số lần, tổng thời gian) của các câu chạy hơn một lần, nhiều lần nhất trước
+        """
+        duplicated = [(sql, count, seconds) for sql, (count, seconds) in self.queries.items() if count > 1]
+        return sorted(duplicated, key=lambda item: (-item[1], -item[2]))[:limit]
+
+
+def current_profile():
+    return _current.get()
+
+
+@contextlib.contextmanager
+def timer(name):
+    """
+    Cộng thời gian của đoạn code vào request đang được đo (không làm gì nếu không có request nào).
+    """
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    with profile.timer(name):
+        yield
+
+
+class _ViewStats:
+    def __init__(self):
+        self.responses = {}  # status class ('2xx') -> số request
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.count = 0
+        self.duration = 0.0
+        self.queries = 0
+        self.query_time = 0.0
+        self.serializer_time = 0.0
+        self.response_bytes = 0
+
+
+class MetricsRegistry:
+    """
+    Số liệu cộng dồn theo (view, method) của process hiện tại.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def observe(self, view, method, status_code, profile, response_bytes):
+        with self._lock:
+            stats = self._views.get((view, method))
+            if stats is None:
+                stats = self._views[(view, method)] = _ViewStats()
+            status_class = f"{status_code // 100}xx"
+            stats.responses[status_class] = stats.responses.get(status_class, 0) + 1
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if profile.duration <= bound:
+                    stats.buckets[index] += 1
+            stats.count += 1
+            stats.duration += profile.duration
+            stats.queries += profile.query_count
+            stats.query_time += profile.query_time
+            stats.serializer_time += profile.timings.get('serializer', 0.0)
+            stats.response_bytes += response_bytes
+
+    def reset(self):
+        with self._lock:
+            self._views = {}
+
+    def render(self):
+        """
+        :return: nội dung text theo định dạng Prometheus (text exposition format 0.0.4)
+        """
+        with self._lock:
+            views = sorted(self._views.items())
+            lines = []
+
+            def family(name, kind, description, samples):
+                lines.append(f"# HELP {METRIC_PREFIX}_{name} {description}")
+                lines.append(f"# TYPE {METRIC_PREFIX}_{name} {kind}")
+                for suffix, labels, value in samples:
+                    lines.append(f"{METRIC_PREFIX}_{name}{suffix}{_labels(labels)} {_number(value)}")
+
+            family('requests_total', 'counter', "Requests handled, by view, method and status class.", [
+                ('', {'view': view, 'method': method, 'status': status_class}, count)
+                for (view, method), stats in views for status_class, count in sorted(stats.responses.items())
+            ])
+            duration = []
+            for (view, method), stats in views:
+                labels = {'view': view, 'method': method}
+                duration += [('_bucket', {**labels, 'le': _number(bound)}, count)
+                             for bound, count in zip(DURATION_BUCKETS, stats.buckets)]
+                duration += [
+                    ('_bucket', {**labels, 'le': '+Inf'}, stats.count),
+                    ('_sum', labels, stats.duration),
+                    ('_count', labels, stats.count),
+                ]
+            family('request_duration_seconds', 'histogram', "Wall time of requests.", duration)
+            for name, attribute, description in (
+                ('db_queries_total', 'queries', "Database queries executed."),
+                ('db_query_seconds_total', 'query_time', "Time spent executing database queries."),
+                ('serializer_seconds_total', 'serializer_time', "Time spent in serializer.data."),
+                ('response_bytes_total', 'response_bytes', "Size of non-streaming response bodies."),
+            ):
+                family(name, 'counter', description, [
+                    ('', {'view': view, 'method': method}, getattr(stats, attribute)) for (view, method), stats in views
+                ])
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels):
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _number(value):
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+registry = MetricsRegistry()
+
+
+def _install_serializer_timing():
+    """
+    Bọc BaseSerializer.data để đo thời gian serializer của mọi view (Serializer và ListSerializer đều gọi qua đây).
+    """
+    from rest_framework.serializers import BaseSerializer
+
+    original = BaseSerializer.__dict__['data']
+    if getattr(original.fget, 'profiled', False):
+        return
+
+    def data(self):
+        profile = _current.get()
+        if profile is None:
+            return original.fget(self)
+        with profile.timer('serializer'):
+            return original.fget(self)
+
+    data.profiled = True
+    BaseSerializer.data = property(data)
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return UNMATCHED_VIEW
+    return match.view_name or match._func_path
+
+
+def _response_size(response):
+    if getattr(response, 'streaming', False):
+        return 0
+    return len(response.content)
+
+
+def _server_timing(profile):
+    parts = [
+        f'total;dur={profile.duration * 1000:.1f}',
+        f'db;dur={profile.query_time * 1000:.1f};desc="{profile.query_count} queries"',
+    ]
+    parts += [f'{name};dur={seconds * 1000:.1f}' for name, seconds in sorted(profile.timings.items())]
+    return ', '.join(parts)
+
+
+def _log_slow_request(request, view, profile, response_bytes):
+    lines = [
+        "Slow request %s %s (%s): %.1f ms, %s queries in %.1f ms, serializer %.1f ms, %s bytes" % (
+            request.method, request.path, view, profile.duration * 1000, profile.query_count,
+            profile.query_time * 1000, profile.timings.get('serializer', 0.0) * 1000, response_bytes)
+    ]
+    duplicated = profile.duplicated_queries()
+    if duplicated:
+        lines.append("Top duplicated SQL:")
+        lines += ["  %sx %.1f ms %s" % (count, seconds * 1000, sql[:500]) for sql, count, seconds in duplicated]
+    logger.warning("\n".join(lines))
+
+
+class ProfilingMiddleware:
+    """
+    Middleware đo từng request, xem docstring của module.
+    Settings:
+    - PROFILING_ENABLED (mặc định True)
+    - PROFILING_SERVER_TIMING: thêm header Server-Timing (mặc định False)
+    - PROFILING_SLOW_REQUEST_MS: ngưỡng ghi log request chậm, None để tắt (mặc định 1000)
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        _install_serializer_timing()
+
+    def __call__(self, request):
+        if not getattr(settings, 'PROFILING_ENABLED', True):
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        token = _current.set(profile)
+        try:
+            with contextlib.ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        profile.duration = time.perf_counter() - profile.started
+
+        view = _view_name(request)
+        response_bytes = _response_size(response)
+        registry.observe(view, request.method, response.status_code, profile, response_bytes)
+
+        if getattr(settings, 'PROFILING_SERVER_TIMING', False):
+            response['Server-Timing'] = _server_timing(profile)
+        slow_ms = getattr(settings, 'PROFILING_SLOW_REQUEST_MS', DEFAULT_SLOW_REQUEST_MS)
+        if slow_ms is not None and profile.duration * 1000 >= slow_ms:
+            _log_slow_request(request, view, profile, response_bytes)
+        return response
@@ -0,0 +1,153 @@
+"""
+Pub/sub cho server push (Server-Sent Events, xem apps/notification/stream.py).
+
+- publish(channel, message) được gọi từ code sync (view, create_notification), message là dict JSON được.
+- subscribe(channel) được gọi trong event loop của ASGI, trả về Subscription:
+  await subscription.get(timeout) lấy message tiếp theo (None khi hết timeout), await subscription.close().
+
+settings.PUSH_BROKER chọn backend:
+- memory: broker trong process, chỉ đúng khi chạy một process ASGI (local, một node)
+- redis: Redis pub/sub qua settings.REDIS_URL (server tương thích RESP), mọi process / node
+  đều nhận được message. Cần package redis (đã có trong requirements.txt).
+Mặc định là redis khi có REDIS_URL, memory khi không có.
+
+Subscriber đọc chậm không giữ message vô hạn: hàng đợi của mỗi subscription có tối đa
+PUSH_QUEUE_SIZE message, khi đầy thì subscription bị đánh dấu overflowed để stream đóng kết nối
+và client kết nối lại (đọc bù từ database theo Last-Event-ID).
+"""
+import asyncio
+import functools
+import json
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+BROKERS = ('memory', 'redis')
+DEFAULT_QUEUE_SIZE = 100
+
+
+def _queue_size():
+    return getattr(settings, 'PUSH_QUEUE_SIZE', DEFAULT_QUEUE_SIZE)
+
+
+class Subscription:
+    """
+    Subscription của InProcessBroker: hàng đợi asyncio gắn với event loop đã subscribe.
+    """
+    def __init__(self, broker, channel, loop, maxsize):
+        self.broker = broker
+        self.channel = channel
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def deliver(self, message):
+        # publish chạy ở thread khác (view sync), đưa message về event loop của subscriber
+        self.loop.call_soon_threadsafe(self._put, message)
+
+    def _put(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.deliver(message)
+            except RuntimeError:
+                # Event loop của subscriber đã đóng
+                self.unsubscribe(subscription)
+
+    async def subscribe(self, channel):
+        subscription = Subscription(self, channel, asyncio.get_running_loop(), _queue_size())
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+    def subscriber_count(self, channel):
+        with self._lock:
+            return len(self._subscribers.get(channel, ()))
+
+
+class RedisSubscription:
+    overflowed = False
+
+    def __init__(self, client, pubsub):
+        self.client = client
+        self.pubsub = pubsub
+
+    async def get(self, timeout):
+        message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        if message is None:
+            return None
+        return json.loads(message['data'])
+
+    async def close(self):
+        await self.pubsub.aclose()
+        await self.client.aclose()
+
+
+class RedisBroker:
+    def __init__(self, url):
+        import redis
+        self.url = url
+        self._client = redis.Redis.from_url(url)
+
+    def publish(self, channel, message):
+        self._client.publish(channel, json.dumps(message, separators=(',', ':')))
+
+    async def subscribe(self, channel):
+        import redis.asyncio
+        # Mỗi subscription giữ một kết nối riêng tới Redis trong suốt stream
+        client = redis.asyncio.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(channel)
+        return RedisSubscription(client, pubsub)
+
+
+@functools.lru_cache(maxsize=None)
+def _broker(name, url):
+    if name == 'memory':
+        return InProcessBroker()
+    if not url:
+        raise ImproperlyConfigured("PUSH_BROKER=redis needs REDIS_URL.")
+    return RedisBroker(url)
+
+
+def get_broker():
+    """
+    Broker theo settings.PUSH_BROKER (một instance cho mỗi process).
+    :raise ImproperlyConfigured: PUSH_BROKER không hợp lệ hoặc redis khi không có REDIS_URL
+    """
+    url = getattr(settings, 'REDIS_URL', None)
+    name = getattr(settings, 'PUSH_BROKER', None) or ('redis' if url else 'memory')
+    if name not in BROKERS:
+        raise ImproperlyConfigured(f"PUSH_BROKER must be one of: {', '.join(BROKERS)}.")
+    return _broker(name, url)
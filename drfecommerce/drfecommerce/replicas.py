@@ -0,0 +1,139 @@
+"""
+Đọc từ database replica cho các API chỉ đọc (báo cáo admin, duyệt sản phẩm public).
+
+- settings.READ_REPLICAS: list alias replica trong DATABASES (rỗng thì mọi query vẫn vào 'default').
+- View chỉ đọc được đánh dấu bằng @read_replica: trong lúc view chạy, query đọc của ReplicaRouter
+  đi vào một replica chọn ngẫu nhiên. Query ngoài các view này, mọi query ghi, và query đọc
+  trong transaction.atomic vẫn vào 'default'.
+- View @read_replica có @cache_response ở ngoài: lần nạp cache đọc từ 'default' (xem response_cache.py),
+  replica chỉ được dùng ở các view không cache.
+- Read-your-writes: ReplicaPinMiddleware ghi nhớ guest / admin vừa gửi request ghi thành công
+  (POST / PUT / PATCH / DELETE, ví dụ add_to_cart, create_new_order) trong REPLICA_PIN_SECONDS giây.
+  Trong thời gian đó view @read_replica của người này đọc từ 'default', không bị trễ replication.
+  Ghi nhớ nằm trong cache 'default' (Redis khi chạy nhiều process).
+"""
+import contextlib
+import contextvars
+import functools
+import random
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+CACHE_ALIAS = 'default'
+KEY_PREFIX = 'replica'
+DEFAULT_PIN_SECONDS = 10
+
+_read_alias = contextvars.ContextVar('read_alias', default=None)
+
+
+def replica_aliases():
+    return list(getattr(settings, 'READ_REPLICAS', ()))
+
+
+def _pin_key(user):
+    return f"{KEY_PREFIX}:pin:{user._meta.model_name}:{user.pk}"
+
+
+def _principal(user):
+    # Guest / MyAdmin đã xác thực, AnonymousUser thì không ghi nhớ được
+    if user is None or getattr(user, 'pk', None) is None or not getattr(user, 'is_authenticated', False):
+        return None
+    return user
+
+
+def pin(user):
+    """
+    Đọc từ 'default' cho người dùng này trong REPLICA_PIN_SECONDS giây.
+    """
+    if not replica_aliases():
+        return
+    user = _principal(user)
+    if user is None:
+        return
+    timeout = getattr(settings, 'REPLICA_PIN_SECONDS', DEFAULT_PIN_SECONDS)
+    caches[CACHE_ALIAS].set(_pin_key(user), True, timeout)
+
+
+def is_pinned(user):
+    user = _principal(user)
+    return user is not None and bool(caches[CACHE_ALIAS].get(_pin_key(user)))
+
+
+def choose_replica(user=None):
+    """
+    :return: alias replica để đọc, hoặc 'default' nếu không có replica hoặc người dùng vừa ghi
+    """
+    aliases = replica_aliases()
+    if not aliases or is_pinned(user):
+        return DEFAULT_DB_ALIAS
+    return random.choice(aliases)
+
+
+@contextlib.contextmanager
+def use_database(alias):
+    """
+    Query đọc (qua ReplicaRouter) trong khối này đi vào alias.
+    """
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def read_replica(view):
+    """
+    Decorator cho action chỉ đọc của viewset (đặt dưới @action / @cache_response).
+    Nếu lớp ngoài đã chọn database (use_database) thì giữ nguyên lựa chọn đó: @cache_response
+    đọc từ 'default' khi nạp lại cache, không lưu dữ liệu cũ của replica đang bị trễ vào version mới.
+    """
+    @functools.wraps(view)
+    def wrapper(self, request, *args, **kwargs):
+        with use_database(_read_alias.get() or choose_replica(request.user)):
+            return view(self, request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    """
+    Database router (settings.DATABASE_ROUTERS).
+    """
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is None or alias == DEFAULT_DB_ALIAS:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            # Đọc trong transaction phải thấy dữ liệu transaction vừa ghi
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replica có cùng dữ liệu với default
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Schema của replica được đồng bộ bằng replication, không migrate trực tiếp
+        if db in replica_aliases():
+            return False
+        return None
+
+
+class ReplicaPinMiddleware:
+    """
+    Ghi nhớ người dùng vừa ghi dữ liệu thành công, xem docstring của module.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            # DRF gán principal đã xác thực vào request.user của Django
+            pin(getattr(request, 'user', None))
+        return response
@@ -0,0 +1,113 @@
+"""
+Cache cho các API public (catalog, product, promotion): dữ liệu giống nhau với mọi người xem.
+
+- Key = endpoint + query params + version của các namespace mà response phụ thuộc vào.
+- Admin viewset sửa dữ liệu thì gọi invalidate(namespace): version tăng lên nên các key cũ
+  không bao giờ được đọc lại nữa và sẽ tự hết hạn theo TTL.
+- Khi cache miss, response được tính từ 'default' kể cả với view @read_replica: ngay sau invalidate,
+  replica có thể chưa nhận thay đổi và dữ liệu cũ sẽ bị cache dưới version mới đến hết TTL.
+- Backend cấu hình trong settings.CACHES: Redis khi có REDIS_URL, local memory khi chạy local / test.
+"""
+import functools
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from drfecommerce.replicas import use_database
+
+CACHE_ALIAS = 'default'
+KEY_PREFIX = 'public'
+DEFAULT_TIMEOUT = 300
+
+# Namespace mà response của từng loại dữ liệu phụ thuộc vào
+# (ProductSerializer đọc catalog.name và promotion.name nên product phụ thuộc cả catalog, promotion;
+# danh sách sản phẩm public có số sao từ review_summary nên phụ thuộc cả review)
+CATALOG = ('catalog',)
+PROMOTION = ('promotion',)
+PRODUCT = ('product', 'catalog', 'promotion', 'review')
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _version_key(namespace):
+    return f"{KEY_PREFIX}:version:{namespace}"
+
+
+def _new_version():
+    # Dùng thời gian làm version ban đầu để khi key version bị xoá (evict, restart Redis)
+    # thì version mới không trùng với version cũ
+    return int(time.time() * 1000)
+
+
+def get_versions(namespaces):
+    """
+    :return: list version của các namespace (một lần đọc cache)
+    """
+    cache = _cache()
+    keys = [_version_key(namespace) for namespace in namespaces]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _new_version(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def build_cache_key(request, namespaces):
+    query = urlencode(sorted((key, value) for key, values in request.GET.lists() for value in values))
+    versions = '.'.join(str(version) for version in get_versions(namespaces))
+    digest = hashlib.md5(f"{request.path}?{query}".encode()).hexdigest()
+    return f"{KEY_PREFIX}:{namespaces[0]}:{versions}:{digest}"
+
+
+def invalidate(*namespaces):
+    """
+    Làm mới cache của các namespace (gọi sau khi admin tạo / sửa / xoá dữ liệu).
+    Nếu đang trong transaction thì chỉ làm mới sau khi commit.
+    """
+    def bump():
+        cache = _cache()
+        for namespace in namespaces:
+            try:
+                cache.incr(_version_key(namespace))
+            except ValueError:
+                cache.set(_version_key(namespace), _new_version(), None)
+
+    transaction.on_commit(bump)
+
+
+def cache_response(namespaces, timeout=None):
+    """
+    Decorator cho action GET của viewset public, chỉ cache response 200.
+    :param namespaces: tuple namespace mà response phụ thuộc vào (CATALOG, PROMOTION, PRODUCT)
+    :param timeout: TTL (giây), mặc định settings.PUBLIC_CACHE_TIMEOUT
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(self, request, *args, **kwargs):
+            cache = _cache()
+            key = build_cache_key(request, namespaces)
+            data = cache.get(key)
+            if data is not None:
+                response = Response(data, status=status.HTTP_200_OK)
+                response['X-Cache'] = 'HIT'
+                return response
+
+            # Nạp cache từ 'default', xem docstring của module
+            with use_database(DEFAULT_DB_ALIAS):
+                response = view(self, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                ttl = timeout if timeout is not None else getattr(settings, 'PUBLIC_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+                cache.set(key, response.data, ttl)
+                response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,180 @@
+"""
+Tìm kiếm full-text cho product, catalog, promotion, store.
+
+Model kế thừa SearchDocumentModel và khai báo search_fields = (('name', 'A'), ('description', 'D'), ...).
+Khi save, tài liệu tìm kiếm được cập nhật:
+- search_text: nội dung các field đã bỏ dấu, viết thường ("Hoa Hồng Đà Lạt" -> "hoa hong da lat")
+- search_vector (chỉ PostgreSQL): tsvector có trọng số A/B/C/D, config 'simple' trên nội dung đã bỏ dấu, index GIN
+
+Truy vấn cũng được bỏ dấu, mỗi từ khớp theo tiền tố ("hoa ho" khớp "hoa hồng"), tất cả các từ đều phải khớp.
+- PostgreSQL: search_vector @@ to_tsquery('hoa:* & ho:*'), xếp hạng bằng ts_rank
+- database khác (SQLite khi test): lọc search_text bằng LIKE rồi tính điểm trong python theo cùng trọng số
+"""
+import re
+import unicodedata
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+from django.db import connections, models
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Cast
+
+SEARCH_DOCUMENT_FIELDS = ('search_vector', 'search_text')
+# Thứ tự kết quả tìm kiếm: liên quan nhất trước, sau đó là mới nhất
+SEARCH_ORDERING = ('-search_rank', '-created_at', '-id')
+# Trọng số mặc định của ts_rank cho D, C, B, A
+WEIGHTS = {'D': 0.1, 'C': 0.2, 'B': 0.4, 'A': 1.0}
+SEARCH_CONFIG = 'simple'
+
+
+def fold(text):
+    """
+    Bỏ dấu và viết thường (đ -> d), dùng cho cả tài liệu và truy vấn.
+    """
+    text = unicodedata.normalize('NFD', str(text or '').replace('đ', 'd').replace('Đ', 'D'))
+    return ''.join(char for char in text if not unicodedata.combining(char)).lower()
+
+
+def tokenize(text):
+    return re.findall(r'\w+', fold(text))
+
+
+def document_text(instance, fields):
+    return ' '.join(token for field in fields for token in tokenize(getattr(instance, field)))
+
+
+def _is_postgresql(using):
+    return connections[using].vendor == 'postgresql'
+
+
+def _tsquery(terms):
+    # terms chỉ gồm ký tự \w nên an toàn với search_type='raw'
+    return SearchQuery(' & '.join(f'{term}:*' for term in terms), search_type='raw', config=SEARCH_CONFIG)
+
+
+class SearchDocumentModel(models.Model):
+    """
+    Model abstract có tài liệu tìm kiếm, xem docstring của module.
+    """
+    search_fields = ()
+
+    search_vector = SearchVectorField(null=True, editable=False)
+    search_text = models.TextField(default='', blank=True, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def build_search_text(self):
+        return document_text(self, [field for field, _ in self.search_fields])
+
+    def save(self, *args, **kwargs):
+        self.search_text = self.build_search_text()
+        super().save(*args, **kwargs)
+        if _is_postgresql(self._state.db):
+            _save_documents(type(self), [self], self.search_fields)
+
+
+def rebuild_search_documents(queryset, search_fields, batch_size=500):
+    """
+    Tính lại tài liệu tìm kiếm cho các dòng có sẵn (migration, dữ liệu tạo bằng bulk_create / update).
+    :param queryset: queryset của model (model lịch sử khi chạy trong migration)
+    :param search_fields: search_fields của model
+    :return: số dòng được cập nhật
+    """
+    model = queryset.model
+    fields = [field for field, _ in search_fields]
+    total = 0
+    instances = []
+    for instance in queryset.only('pk', *fields).iterator(chunk_size=batch_size):
+        instance.search_text = document_text(instance, fields)
+        instances.append(instance)
+        if len(instances) >= batch_size:
+            total += _save_documents(model, instances, search_fields)
+            instances = []
+    if instances:
+        total += _save_documents(model, instances, search_fields)
+    return total
+
+
+def _save_documents(model, instances, search_fields):
+    using = model.objects.db
+    if not _is_postgresql(using):
+        model.objects.bulk_update(instances, ['search_text'])
+        return len(instances)
+
+    # Một câu UPDATE ... FROM (VALUES ...) cho cả lô, tsvector được tính trong database.
+    # (CASE WHEN theo từng id thì PostgreSQL phải duyệt cả danh sách cho mỗi dòng.)
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    columns = [f"f{index}" for index in range(len(search_fields))]
+    vector = ' || '.join(
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', v.{column}), '{weight}')"
+        for column, (_, weight) in zip(columns, search_fields))
+    row_placeholder = '(' + ', '.join(['%s'] * (len(columns) + 2)) + ')'
+    params = []
+    for instance in instances:
+        params += [instance.pk, instance.search_text, *(fold(getattr(instance, field)) for field, _ in search_fields)]
+    pk_column = quote(model._meta.pk.column)
+    sql = (
+        f"UPDATE {quote(model._meta.db_table)} AS t "
+        f"SET search_text = v.search_text, search_vector = {vector} "
+        f"FROM (VALUES {', '.join([row_placeholder] * len(instances))}) AS v(pk, search_text, {', '.join(columns)}) "
+        f"WHERE t.{pk_column} = v.pk"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+    return len(instances)
+
+
+def search_filter(query, prefix='', using='default'):
+    """
+    Điều kiện lọc theo từ khoá, dùng cả cho quan hệ (prefix='product__').
+    :return: Q, hoặc None nếu query rỗng
+    """
+    terms = tokenize(query)
+    if not terms:
+        return None
+    if _is_postgresql(using):
+        return Q(**{f'{prefix}search_vector': _tsquery(terms)})
+    condition = Q()
+    for term in terms:
+        condition &= Q(**{f'{prefix}search_text__contains': term})
+    return condition
+
+
+def _python_rank(instance, terms):
+    """
+    Điểm liên quan tính trong python (database không phải PostgreSQL), cùng thang trọng số với ts_rank.
+    :return: điểm, hoặc 0 nếu có từ khoá không khớp tiền tố của từ nào
+    """
+    rank = 0.0
+    matched = set()
+    for field, weight in instance.search_fields:
+        for word in tokenize(getattr(instance, field)):
+            for term in terms:
+                if word.startswith(term):
+                    matched.add(term)
+                    rank += WEIGHTS[weight]
+    return rank if len(matched) == len(set(terms)) else 0.0
+
+
+def search(queryset, query):
+    """
+    Lọc và xếp hạng queryset theo từ khoá, kết quả có annotate search_rank (dùng với SEARCH_ORDERING).
+    Query rỗng thì trả về toàn bộ queryset với search_rank = 0.
+    """
+    terms = tokenize(query)
+    if not terms:
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    queryset = queryset.filter(search_filter(query, using=queryset.db))
+    if _is_postgresql(queryset.db):
+        # ts_rank trả về real, đổi sang double precision để giá trị trong cursor so sánh được chính xác
+        return queryset.annotate(search_rank=Cast(SearchRank(F('search_vector'), _tsquery(terms)), FloatField()))
+
+    fields = [field for field, _ in queryset.model.search_fields]
+    ranks = {instance.pk: _python_rank(instance, terms) for instance in queryset.only('pk', *fields)}
+    # LIKE khớp cả giữa từ, chỉ giữ các dòng khớp theo tiền tố giống PostgreSQL
+    ranks = {pk: rank for pk, rank in ranks.items() if rank > 0}
+    whens = [When(pk=pk, then=Value(rank)) for pk, rank in ranks.items()]
+    return queryset.filter(pk__in=list(ranks)).annotate(
+        search_rank=Case(*whens, default=Value(0.0), output_field=FloatField()))
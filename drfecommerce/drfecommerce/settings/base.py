@@ -67,6 +67,11 @@ DEFAULT_FILE_STORAGE = 'django.core.files.storage.FileSystemStorage'
 MEDIA_ROOT = ECOMMERCE_IMAGES_DIR
 MEDIA_URL = '/media/'  # Nếu bạn cần phục vụ ảnh từ URL
 
+# Ảnh upload (apps/my_admin/images.py): ghi vào storage theo từng chunk, worker
+# `manage.py process_images --loop --workers N` tạo các bản thumbnail / card / full (WebP và JPEG)
+IMAGE_VARIANT_QUALITY = 82
+IMAGE_VARIANT_MAX_ATTEMPTS = 3
+
 #config storage to save image in the future
 # DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
 
@@ -83,6 +88,10 @@ MEDIA_URL = '/media/'  # Nếu bạn cần phục vụ ảnh từ URL
 # MEDIA_URL = f'https://{AWS_S3_CUSTOM_DOMAIN}/'
 
 MIDDLEWARE = [
+    # Đặt đầu tiên để đo trọn thời gian xử lý request (drfecommerce/profiling.py)
+    "drfecommerce.profiling.ProfilingMiddleware",
+    # Ghi nhớ người vừa ghi dữ liệu để lần đọc sau không đọc từ replica (drfecommerce/replicas.py)
+    "drfecommerce.replicas.ReplicaPinMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -155,6 +164,51 @@ STATIC_URL = "static/"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Database replica: alias trong DATABASES mà các view @read_replica được đọc (settings local / production)
+DATABASE_ROUTERS = ["drfecommerce.replicas.ReplicaRouter"]
+READ_REPLICAS = []
+# Sau khi guest / admin ghi dữ liệu, đọc từ default trong chừng này giây (read-your-writes)
+REPLICA_PIN_SECONDS = int(os.environ.get("REPLICA_PIN_SECONDS", 10))
+
+# Cache
+# Redis (RESP) khi có REDIS_URL (production), local memory khi chạy local / test
+REDIS_URL = os.environ.get("REDIS_URL")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+            "KEY_PREFIX": "drfecommerce",
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "drfecommerce",
+        }
+    }
+# TTL (giây) của cache các API public: catalog, product, promotion
+PUBLIC_CACHE_TIMEOUT = int(os.environ.get("PUBLIC_CACHE_TIMEOUT", 300))
+# TTL (giây) của guest / admin đã xác thực, cache theo jti của access token (drfecommerce/jwt_auth.py)
+AUTH_PRINCIPAL_CACHE_TIMEOUT = int(os.environ.get("AUTH_PRINCIPAL_CACHE_TIMEOUT", 300))
+# TTL (giây) của bộ đếm thông báo chưa đọc của từng guest (apps/notification/counters.py)
+UNREAD_COUNT_TIMEOUT = int(os.environ.get("UNREAD_COUNT_TIMEOUT", 3600))
+
+# Server push thông báo qua SSE (apps/notification/stream.py, drfecommerce/pubsub.py)
+# memory: một process, redis: Redis pub/sub qua REDIS_URL (mặc định khi có REDIS_URL)
+PUSH_BROKER = os.environ.get("PUSH_BROKER") or ("redis" if REDIS_URL else "memory")
+PUSH_HEARTBEAT_SECONDS = int(os.environ.get("PUSH_HEARTBEAT_SECONDS", 15))
+PUSH_STREAM_MAX_SECONDS = int(os.environ.get("PUSH_STREAM_MAX_SECONDS", 300))
+PUSH_QUEUE_SIZE = int(os.environ.get("PUSH_QUEUE_SIZE", 100))
+
+# Profiling từng request (drfecommerce/profiling.py), metrics xem ở api/admin/metrics/
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "true").lower() == "true"
+# Thêm header Server-Timing vào response (xem được trong DevTools của trình duyệt)
+PROFILING_SERVER_TIMING = os.environ.get("PROFILING_SERVER_TIMING", "false").lower() == "true"
+# Request chậm hơn ngưỡng này (ms) được ghi log kèm các câu SQL lặp lại
+PROFILING_SLOW_REQUEST_MS = int(os.environ.get("PROFILING_SLOW_REQUEST_MS", 1000))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=500),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
@@ -187,7 +241,10 @@ SPECTACULAR_SETTINGS = {
 # EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_PASSWORD")
 
 # Email settings
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'  # Use SMTP backend
+# Use SMTP backend, khi test local có thể đặt EMAIL_BACKEND=django.core.mail.backends.console.EmailBackend
+# hoặc django.core.mail.backends.filebased.EmailBackend (ghi ra thư mục EMAIL_FILE_PATH)
+EMAIL_BACKEND = os.environ.get("EMAIL_BACKEND", 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_FILE_PATH = os.environ.get("EMAIL_FILE_PATH", os.path.join(BASE_DIR, 'sent_emails'))
 EMAIL_HOST = 'smtp.gmail.com'  # e.g., smtp.gmail.com for Gmail
 EMAIL_PORT = 587  # or 465 for SSL
 EMAIL_USE_TLS = True  # Set to True for TLS; False for SSL
@@ -196,3 +253,8 @@ EMAIL_HOST_USER = os.environ.get("EMAIL")  # Your email address
 EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_PASSWORD")  # Your email password
 DEFAULT_FROM_EMAIL = 'VIVAFLOWER <no-reply@yourdomain.com>'
 ADMIN_EMAIL = 'levando20194017@gmail.com'  # Admin email for notifications
+EMAIL_TIMEOUT = 10  # Giây, để worker không bị treo khi SMTP chậm
+
+# Outbox email: API chỉ thêm vào bảng outbound_emails, worker `manage.py send_outbound_emails --loop` gửi
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 60  # Giây, lần retry thứ n chờ RETRY_DELAY * 2^(n-1)
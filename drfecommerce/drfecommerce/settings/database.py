@@ -0,0 +1,93 @@
+"""
+Cấu hình kết nối PostgreSQL theo biến môi trường (dùng trong local.py / production.py).
+
+DB_POOL_MODE chọn cách giữ kết nối:
+- none: mỗi request mở một kết nối mới và đóng khi xong (CONN_MAX_AGE = 0)
+- persistent (mặc định): kết nối được giữ lại cho các request sau trong DB_CONN_MAX_AGE giây,
+  kiểm tra còn sống trước khi dùng lại (CONN_HEALTH_CHECKS)
+- pgbouncer: kết nối tới PgBouncer ở chế độ transaction pooling. Server-side cursor bị tắt vì cursor
+  không sống qua được transaction khi PgBouncer đổi kết nối thật phía sau; queryset.iterator()
+  (export, rebuild rollup) khi đó đọc hết kết quả của mỗi câu query vào bộ nhớ.
+
+Các biến khác: DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, DB_CONNECT_TIMEOUT (giây).
+
+Replica chỉ đọc (xem drfecommerce/replicas.py): DB_REPLICA_HOSTS=host1,host2:5433 tạo các alias
+replica_1, replica_2... cùng database / user / cách giữ kết nối với default, chỉ khác host (và port).
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+POOL_MODES = ('none', 'persistent', 'pgbouncer')
+DEFAULT_POOL_MODE = 'persistent'
+DEFAULT_CONN_MAX_AGE = 60
+DEFAULT_CONNECT_TIMEOUT = 5
+
+
+def _int(environ, name, default):
+    value = environ.get(name)
+    if value in (None, ''):
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ImproperlyConfigured(f"{name} must be an integer, got '{value}'.") from None
+
+
+def database_settings(environ=None, defaults=None):
+    """
+    DATABASES['default'] cho PostgreSQL.
+    :param environ: dict biến môi trường (mặc định os.environ)
+    :param defaults: giá trị mặc định của NAME, USER, PASSWORD, HOST, PORT khi không có biến môi trường
+    :return: dict cấu hình một database
+    :raise ImproperlyConfigured: DB_POOL_MODE hoặc giá trị số không hợp lệ
+    """
+    environ = os.environ if environ is None else environ
+    defaults = defaults or {}
+    mode = environ.get('DB_POOL_MODE', DEFAULT_POOL_MODE).lower()
+    if mode not in POOL_MODES:
+        raise ImproperlyConfigured(f"DB_POOL_MODE must be one of: {', '.join(POOL_MODES)}.")
+
+    database = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': environ.get('DB_NAME', defaults.get('NAME', '')),
+        'USER': environ.get('DB_USER', defaults.get('USER', '')),
+        'PASSWORD': environ.get('DB_PASSWORD', defaults.get('PASSWORD', '')),
+        'HOST': environ.get('DB_HOST', defaults.get('HOST', '')),
+        'PORT': environ.get('DB_PORT', defaults.get('PORT', '')),
+        'CONN_MAX_AGE': 0,
+        'CONN_HEALTH_CHECKS': False,
+        'OPTIONS': {
+            'connect_timeout': _int(environ, 'DB_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT),
+        },
+    }
+
+    if mode in ('persistent', 'pgbouncer'):
+        database['CONN_MAX_AGE'] = _int(environ, 'DB_CONN_MAX_AGE', DEFAULT_CONN_MAX_AGE)
+        database['CONN_HEALTH_CHECKS'] = True
+    if mode == 'pgbouncer':
+        database['DISABLE_SERVER_SIDE_CURSORS'] = True
+    return database
+
+
+def replica_settings(primary, environ=None):
+    """
+    Các database replica theo DB_REPLICA_HOSTS.
+    :param primary: cấu hình database default (kết quả của database_settings)
+    :param environ: dict biến môi trường (mặc định os.environ)
+    :return: dict alias -> cấu hình, rỗng nếu không có replica
+    """
+    environ = os.environ if environ is None else environ
+    hosts = [host.strip() for host in environ.get('DB_REPLICA_HOSTS', '').split(',') if host.strip()]
+    replicas = {}
+    for index, host in enumerate(hosts, start=1):
+        host, _, port = host.partition(':')
+        replicas[f'replica_{index}'] = {
+            **primary,
+            'HOST': host,
+            'PORT': port or primary['PORT'],
+            'OPTIONS': dict(primary['OPTIONS']),
+            # Khi test, replica dùng chung test database của default
+            'TEST': {'MIRROR': 'default'},
+        }
+    return replicas
@@ -1,4 +1,5 @@
 from .base import *
+from .database import database_settings, replica_settings
 
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
@@ -11,13 +12,16 @@ from .base import *
 #     }
 # }
 
+# Kết nối, giữ kết nối / pooling cấu hình bằng biến môi trường DB_* (xem settings/database.py)
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+    'default': database_settings(defaults={
         'NAME': 'EcommerceDjango',  # Tên database
         'USER': 'postgres',  # Tên người dùng của DB
         'PASSWORD': '123456',  # Mật khẩu của DB
         'HOST': 'localhost',  # Hostname, thường là localhost
         'PORT': '5432',  # Cổng mặc định của PostgreSQL là 5432
-    }
-}
\ No newline at end of file
+    })
+}
+# Replica chỉ đọc cho báo cáo / API public (DB_REPLICA_HOSTS, xem drfecommerce/replicas.py)
+DATABASES.update(replica_settings(DATABASES['default']))
+READ_REPLICAS = [alias for alias in DATABASES if alias != 'default']
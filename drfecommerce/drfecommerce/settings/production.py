@@ -1,3 +1,12 @@
 from .base import *
+from .database import database_settings, replica_settings
 
 ALLOWED_HOSTS = ["*"]
+
+# Production đọc toàn bộ thông tin kết nối từ biến môi trường DB_* (xem settings/database.py)
+DATABASES = {
+    'default': database_settings(),
+}
+# Replica chỉ đọc cho báo cáo / API public (DB_REPLICA_HOSTS, xem drfecommerce/replicas.py)
+DATABASES.update(replica_settings(DATABASES['default']))
+READ_REPLICAS = [alias for alias in DATABASES if alias != 'default']
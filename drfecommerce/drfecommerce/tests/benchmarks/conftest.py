@@ -0,0 +1,42 @@
+"""
+Microbenchmark (pytest-benchmark) cho serializer và view của các luồng nóng.
+
+Dữ liệu được sinh bằng drfecommerce.benchmarks.seed (cùng seed nên giống nhau giữa các lần chạy).
+Lưu và so sánh kết quả giữa các commit:
+    pytest drfecommerce/tests/benchmarks --benchmark-autosave
+    pytest drfecommerce/tests/benchmarks --benchmark-compare --benchmark-compare-fail=median:20%
+    pytest drfecommerce/tests/benchmarks --benchmark-json=benchmark.json
+Chạy cùng cả bộ test mà không đo: --benchmark-disable.
+"""
+import pytest
+
+from drfecommerce.benchmarks.seed import seed
+from drfecommerce.benchmarks.load_test import load_fixtures
+
+BENCH_ROWS = 2000
+BENCH_COUNTS = {'stores': 5, 'products': 60, 'guests': 20}
+
+
+@pytest.fixture
+def bench_data(db):
+    """
+    :return: dict guests (list (id, token)), admin_token, stocks (list (product_id, store_id)), product_ids
+    """
+    seed(BENCH_ROWS, counts=BENCH_COUNTS)
+    return load_fixtures()
+
+
+@pytest.fixture
+def guest_client(bench_data, api_client):
+    guest_id, token = bench_data['guests'][0]
+    client = api_client()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    client.guest_id = guest_id
+    return client
+
+
+@pytest.fixture
+def admin_client(bench_data, api_client):
+    client = api_client()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {bench_data['admin_token']}")
+    return client
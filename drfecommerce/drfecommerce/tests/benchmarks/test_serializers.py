@@ -0,0 +1,46 @@
+import pytest
+
+from drfecommerce.apps.product.models import Product
+from drfecommerce.apps.product.serializers import ProductSerializer
+from drfecommerce.apps.order.models import Order
+from drfecommerce.apps.order.serializers import OrderSerializer
+from drfecommerce.apps.product_incoming.models import ProductIncoming
+from drfecommerce.apps.product_incoming.serializers import ProductIncomingSerializer
+
+pytest.importorskip("pytest_benchmark")
+
+pytestmark = [pytest.mark.django_db, pytest.mark.benchmark(group="serializers")]
+
+PAGE_SIZE = 50
+
+
+def serialize(serializer_class, queryset):
+    return serializer_class(queryset, many=True).data
+
+
+def test_product_list(benchmark, bench_data):
+    # Arrange
+    products = Product.objects.filter(delete_at__isnull=True).order_by('id')[:PAGE_SIZE]
+    # Act
+    data = benchmark(serialize, ProductSerializer, products)
+    # Assert
+    assert len(data) == PAGE_SIZE
+    assert data[0]['catalog_name']
+
+
+def test_order_list(benchmark, bench_data):
+    # Arrange
+    orders = Order.objects.order_by('-order_date')[:PAGE_SIZE]
+    # Act
+    data = benchmark(serialize, OrderSerializer, orders)
+    # Assert
+    assert len(data) == PAGE_SIZE
+
+
+def test_product_incoming_list(benchmark, bench_data):
+    # Arrange
+    incomings = ProductIncoming.objects.order_by('-effective_date')[:PAGE_SIZE]
+    # Act
+    data = benchmark(serialize, ProductIncomingSerializer, incomings)
+    # Assert
+    assert len(data) == PAGE_SIZE
@@ -0,0 +1,113 @@
+import json
+
+import pytest
+from django.core.cache import cache
+
+pytest.importorskip("pytest_benchmark")
+
+pytestmark = [pytest.mark.django_db, pytest.mark.benchmark(group="views")]
+
+
+def get(client, endpoint, params=None, data=None):
+    if data is not None:
+        # my-cart đọc guest id trong body của request GET
+        response = client.generic("GET", endpoint, json.dumps(data), content_type="application/json")
+    else:
+        response = client.get(endpoint, params)
+    assert response.status_code == 200, response.data
+    return response
+
+
+class TestPublicViews:
+    def test_list_products_uncached(self, benchmark, bench_data, api_client):
+        # Arrange
+        client = api_client()
+        # Act
+        # response được cache (response_cache), xoá cache trước mỗi lần đo để đo cả query và serializer
+        response = benchmark.pedantic(get, args=(client, "/api/product/get-list-products/", {"page_size": 20}),
+                                      setup=cache.clear, rounds=20)
+        # Assert
+        assert len(response.data["data"]["products"]) == 20
+
+    def test_list_products_cached(self, benchmark, bench_data, api_client):
+        # Arrange
+        client = api_client()
+        get(client, "/api/product/get-list-products/", {"page_size": 20})
+        # Act
+        response = benchmark(get, client, "/api/product/get-list-products/", {"page_size": 20})
+        # Assert
+        assert len(response.data["data"]["products"]) == 20
+
+    def test_product_detail(self, benchmark, bench_data, api_client):
+        # Arrange
+        client = api_client()
+        product_id = bench_data['product_ids'][0]
+        # Act
+        response = benchmark(get, client, "/api/product/get-detail-product/", {"id": product_id})
+        # Assert
+        assert response.data["data"]["id"] == product_id
+
+    def test_search_products(self, benchmark, bench_data, api_client):
+        # Arrange
+        client = api_client()
+        # Act
+        response = benchmark(get, client, "/api/product/search-products/", {"name": "bench product"})
+        # Assert
+        assert response.data["data"]["products"]
+
+
+class TestGuestViews:
+    def test_add_to_cart(self, benchmark, bench_data, guest_client):
+        # Arrange
+        product_id, store_id = bench_data['stocks'][0]
+        payload = {"id": guest_client.guest_id, "product_id": product_id, "store_id": store_id, "quantity": 1}
+        # Act
+        response = benchmark(guest_client.post, "/api/cart/guests/add-to-cart/", payload, format="json")
+        # Assert
+        assert response.status_code in (200, 201)
+
+    def test_my_cart(self, benchmark, bench_data, guest_client):
+        # Arrange
+        for product_id, store_id in bench_data['stocks'][:10]:
+            guest_client.post("/api/cart/guests/add-to-cart/", {
+                "id": guest_client.guest_id, "product_id": product_id, "store_id": store_id,
+            }, format="json")
+        # Act
+        response = benchmark(get, guest_client, "/api/cart/guests/my-cart/", data={"id": guest_client.guest_id})
+        # Assert
+        assert len(response.data["data"]["items"]) == 10
+
+    def test_create_order(self, benchmark, bench_data, guest_client):
+        # Arrange
+        product_id, store_id = bench_data['stocks'][0]
+        payload = {
+            "guest_id": guest_client.guest_id,
+            "order_details": [{"product_id": product_id, "store_id": store_id, "quantity": 1}],
+            "payment_methods": "cash_on_delivery",
+            "shipping_address": "1 Bench street",
+            "recipient_phone": "0123456789",
+            "recipient_name": "Bench guest",
+            "shipping_cost": 0,
+            "gst_amount": 0,
+        }
+        # Act
+        response = benchmark.pedantic(guest_client.post, args=("/api/order/create-new-order/", payload),
+                                      kwargs={"format": "json"}, rounds=20)
+        # Assert
+        assert response.status_code == 201, response.data
+
+
+class TestAdminViews:
+    def test_list_orders(self, benchmark, admin_client):
+        # Act
+        response = benchmark(get, admin_client, "/api/order/admin/get-list-orders/", {"page_size": 20})
+        # Assert
+        assert response.data["data"]
+
+    def test_sales_analytics(self, benchmark, admin_client):
+        # Act
+        response = benchmark(get, admin_client, "/api/product_sale/admin/analytics/", {
+            "period": "month", "start_date": "2023-01-01", "end_date": "2024-12-31",
+        })
+        # Assert
+        assert len(response.data["data"]["series"]) == 24
@@ -0,0 +1,162 @@
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from drfecommerce.apps.cart.models import Cart, CartItem
+from drfecommerce.apps.cart.services import (
+    CartError, add_item, update_item, remove_item, recalculate_carts, cart_lines, get_cart,
+)
+from drfecommerce.apps.order.checkout import place_order
+
+pytestmark = pytest.mark.django_db
+
+
+class TestCartTotals:
+    def test_add_item_creates_cart_and_keeps_totals(self, guest, product_factory, store):
+        # Arrange
+        rose = product_factory(price=100)
+        tulip = product_factory(price=30)
+        # Act
+        add_item(guest.id, rose.id, store.id, 2)
+        line = add_item(guest.id, tulip.id, store.id, 3)
+        # Assert
+        cart = Cart.objects.get(guest=guest)
+        assert (cart.item_count, cart.subtotal) == (5, 290)
+        assert line["cart"] == {"item_count": 5, "subtotal": 290}
+        assert line["line_total"] == 90
+
+    def test_adding_same_product_increments_quantity(self, guest, product, store):
+        # Act
+        add_item(guest.id, product.id, store.id, 1)
+        line = add_item(guest.id, product.id, store.id, 4)
+        # Assert
+        assert CartItem.objects.get(cart__guest=guest).quantity == 5
+        assert line["quantity"] == 5
+        assert line["cart"]["item_count"] == 5
+
+    def test_update_and_remove_apply_delta(self, guest, product_factory, store):
+        # Arrange
+        rose = product_factory(price=100)
+        tulip = product_factory(price=30)
+        rose_line = add_item(guest.id, rose.id, store.id, 2)
+        tulip_line = add_item(guest.id, tulip.id, store.id, 1)
+        # Act
+        update_item(guest.id, rose_line["id"], 5)
+        remove_item(guest.id, tulip_line["id"])
+        # Assert
+        cart = Cart.objects.get(guest=guest)
+        assert (cart.item_count, cart.subtotal) == (5, 500)
+
+    def test_update_to_zero_removes_item(self, guest, product, store):
+        # Arrange
+        line = add_item(guest.id, product.id, store.id, 2)
+        # Act
+        result = update_item(guest.id, line["id"], 0)
+        # Assert
+        assert result is None
+        assert not CartItem.objects.filter(id=line["id"]).exists()
+        assert Cart.objects.get(guest=guest).item_count == 0
+
+    @pytest.mark.parametrize("quantity", [0, -1, "abc"])
+    def test_add_item_rejects_invalid_quantity(self, guest, product, store, quantity):
+        # Act / Assert
+        with pytest.raises(CartError) as excinfo:
+            add_item(guest.id, product.id, store.id, quantity)
+        assert excinfo.value.status_code == 400
+
+    def test_other_guest_cannot_update_item(self, guest, guest_factory, product, store):
+        # Arrange
+        line = add_item(guest.id, product.id, store.id, 1)
+        other = guest_factory()
+        get_cart(other.id)
+        # Act / Assert
+        with pytest.raises(CartError) as excinfo:
+            update_item(other.id, line["id"], 3)
+        assert excinfo.value.status_code == 404
+
+    def test_recalculate_follows_price_change(self, guest, product, store):
+        # Arrange
+        add_item(guest.id, product.id, store.id, 3)
+        product.price = 10
+        product.save()
+        # Act
+        recalculate_carts(Cart.objects.filter(items__product=product))
+        # Assert
+        assert Cart.objects.get(guest=guest).subtotal == 30
+
+    def test_checkout_recalculates_remaining_cart(self, guest, store, product_store_factory, product_factory):
+        # Arrange
+        stock = product_store_factory(store=store)
+        kept = product_factory(price=40)
+        add_item(guest.id, stock.product_id, store.id, 2)
+        add_item(guest.id, kept.id, store.id, 1)
+        details = [{"product_id": stock.product_id, "store_id": store.id, "quantity": 2}]
+        data = {
+            "gst_amount": "0", "shipping_cost": "0", "payment_method": "cash_on_delivery",
+            "shipping_address": "1 Flower Street", "recipient_phone": "0123456789", "recipient_name": "Test Guest",
+        }
+        # Act
+        place_order(guest, details, data)
+        # Assert
+        cart = Cart.objects.get(guest=guest)
+        assert (cart.item_count, cart.subtotal) == (1, 40)
+
+
+class TestCartLines:
+    def test_lines_include_product_store_and_promotion(self, guest, product_factory, promotion, store):
+        # Arrange
+        product = product_factory(price=100, promotion=promotion)
+        add_item(guest.id, product.id, store.id, 2)
+        # Act
+        [line] = cart_lines(get_cart(guest.id))
+        # Assert
+        assert line["product"] == product.id
+        assert line["product_name"] == product.name
+        assert line["product_image"] == product.image
+        assert line["unit_price"] == 100
+        assert line["store"] == store.id
+        assert line["store_name"] == store.name
+        assert line["promotion"] == {
+            "id": promotion.id, "name": promotion.name, "code": promotion.code, "rate": promotion.rate,
+        }
+        assert line["line_total"] == 200
+
+    def test_lines_are_read_in_one_query(self, guest, product_factory, store_factory):
+        # Arrange
+        for _ in range(5):
+            add_item(guest.id, product_factory().id, store_factory().id, 1)
+        cart = get_cart(guest.id)
+        # Act
+        with CaptureQueriesContext(connection) as ctx:
+            lines = cart_lines(cart)
+        # Assert
+        assert len(lines) == 5
+        assert len(ctx.captured_queries) == 1
+
+
+class TestCartEndpoints:
+    def test_my_cart_returns_totals_and_lines(self, guest, product, store, guest_client):
+        # Arrange
+        guest_client.post("/api/cart/guests/add-to-cart/", {
+            "id": guest.id, "product_id": product.id, "store_id": store.id, "quantity": 2,
+        }, format="json")
+        # Act
+        response = guest_client.generic("GET", "/api/cart/guests/my-cart/", json.dumps({"id": guest.id}),
+                                        content_type="application/json")
+        # Assert
+        assert response.status_code == 200
+        data = response.data["data"]
+        assert data["item_count"] == 2
+        assert data["subtotal"] == product.price * 2
+        assert data["items"][0]["product_name"] == product.name
+
+    def test_add_to_cart_unknown_product(self, guest, store, guest_client):
+        # Act
+        response = guest_client.post("/api/cart/guests/add-to-cart/", {
+            "id": guest.id, "product_id": 999999, "store_id": store.id,
+        }, format="json")
+        # Assert
+        assert response.status_code == 404
+        assert response.data["message"] == "Product not found."
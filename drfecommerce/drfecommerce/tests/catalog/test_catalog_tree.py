@@ -0,0 +1,117 @@
+import datetime
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from drfecommerce.apps.catalog.models import Catalog
+from drfecommerce.apps.catalog.tree import rebuild_paths
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def tree(catalog_factory):
+    """
+    root_old
+    root_new
+    ├── child
+    │   └── grandchild
+    └── sibling
+    """
+    day = lambda n: timezone.make_aware(datetime.datetime(2024, 1, n))
+    root_old = catalog_factory(created_at=day(1))
+    root_new = catalog_factory(created_at=day(2))
+    child = catalog_factory(parent_id=root_new, level=2, created_at=day(3))
+    grandchild = catalog_factory(parent_id=child, level=3, created_at=day(4))
+    sibling = catalog_factory(parent_id=root_new, level=2, created_at=day(5))
+    return root_old, root_new, child, grandchild, sibling
+
+
+class TestCatalogPath:
+    def test_path_follows_parents(self, tree):
+        # Arrange
+        root_old, root_new, child, grandchild, sibling = tree
+        # Act
+        grandchild.refresh_from_db()
+        # Assert
+        assert grandchild.path == f"/{root_new.id}/{child.id}/{grandchild.id}/"
+
+    def test_moving_a_catalog_moves_its_subtree(self, tree):
+        # Arrange
+        root_old, root_new, child, grandchild, sibling = tree
+        # Act
+        child.parent_id = root_old
+        child.save()
+        # Assert
+        grandchild.refresh_from_db()
+        assert grandchild.path == f"/{root_old.id}/{child.id}/{grandchild.id}/"
+
+    def test_rebuild_paths_fills_missing_paths(self, tree):
+        # Arrange
+        Catalog.objects.update(path='')
+        # Act
+        updated = rebuild_paths(Catalog)
+        # Assert
+        assert updated == 5
+        assert Catalog.objects.get(id=tree[3].id).path == tree[3].path
+
+
+class TestListCatalogs:
+    endpoint = "/api/catalog/get-list-catalogs/"
+
+    def test_roots_are_paginated_with_whole_subtree(self, tree, admin_client):
+        # Arrange
+        root_old, root_new, child, grandchild, sibling = tree
+        # Act
+        response = admin_client.get(self.endpoint, {"page_size": 1})
+        # Assert
+        data = response.data["data"]
+        assert data["total_items"] == 2
+        assert len(data["data"]) == 1
+        root = data["data"][0]
+        assert root["id"] == root_new.id
+        assert [node["id"] for node in root["children"]] == [sibling.id, child.id]
+        assert root["children"][1]["children"][0]["id"] == grandchild.id
+
+    def test_tree_is_built_once_until_catalogs_change(self, tree, admin_client, django_capture_on_commit_callbacks):
+        # Arrange
+        admin_client.get(self.endpoint)
+        # Act
+        with CaptureQueriesContext(connection) as cached:
+            admin_client.get(self.endpoint, {"page_size": 5})
+        cached_sql = [query["sql"] for query in cached.captured_queries]
+        with django_capture_on_commit_callbacks(execute=True):
+            admin_client.put("/api/catalog/admin/edit-catalog/", {"id": tree[2].id, "name": "Renamed"}, format="json")
+        response = admin_client.get(self.endpoint, {"page_size": 5})
+        # Assert
+        assert cached_sql and not any('"catalogs"."description"' in sql for sql in cached_sql)
+        assert response.data["data"]["data"][0]["children"][1]["name"] == "Renamed"
+
+
+class TestSubtreeSoftDelete:
+    def test_delete_and_restore_whole_subtree(self, tree, admin_client):
+        # Arrange
+        root_old, root_new, child, grandchild, sibling = tree
+        # Act
+        with CaptureQueriesContext(connection) as deleted:
+            admin_client.delete(f"/api/catalog/admin/delete-catalog/?id={child.id}")
+        updates = [query for query in deleted.captured_queries if query["sql"].startswith("UPDATE")]
+        hidden = set(Catalog.objects.filter(delete_at__isnull=False).values_list('id', flat=True))
+        admin_client.put("/api/catalog/admin/restore-catalog/", {"id": child.id}, format="json")
+        # Assert
+        assert hidden == {child.id, grandchild.id}
+        assert len(updates) == 1
+        assert not Catalog.objects.filter(delete_at__isnull=False).exists()
+
+    def test_public_tree_hides_deleted_subtree(self, tree, admin_client, django_capture_on_commit_callbacks):
+        # Arrange
+        root_old, root_new, child, grandchild, sibling = tree
+        with django_capture_on_commit_callbacks(execute=True):
+            admin_client.delete(f"/api/catalog/admin/delete-catalog/?id={child.id}")
+        # Act
+        response = admin_client.get("/api/catalog/get-list-catalogs/")
+        # Assert
+        root = next(node for node in response.data["data"]["data"] if node["id"] == root_new.id)
+        assert [node["id"] for node in root["children"]] == [sibling.id]
@@ -0,0 +1,60 @@
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from drfecommerce.settings.database import database_settings, replica_settings, DEFAULT_CONN_MAX_AGE
+
+
+class TestDatabaseSettings:
+    def test_persistent_by_default(self):
+        # Act
+        database = database_settings({}, defaults={'NAME': 'shop', 'HOST': 'localhost'})
+        # Assert
+        assert database['NAME'] == 'shop'
+        assert database['HOST'] == 'localhost'
+        assert database['CONN_MAX_AGE'] == DEFAULT_CONN_MAX_AGE
+        assert database['CONN_HEALTH_CHECKS'] is True
+        assert 'DISABLE_SERVER_SIDE_CURSORS' not in database
+
+    def test_environment_overrides_defaults(self):
+        # Act
+        database = database_settings({'DB_NAME': 'prod', 'DB_CONN_MAX_AGE': '300', 'DB_CONNECT_TIMEOUT': '2'},
+                                     defaults={'NAME': 'shop'})
+        # Assert
+        assert database['NAME'] == 'prod'
+        assert database['CONN_MAX_AGE'] == 300
+        assert database['OPTIONS']['connect_timeout'] == 2
+
+    def test_none_closes_connection_after_each_request(self):
+        # Act
+        database = database_settings({'DB_POOL_MODE': 'none', 'DB_CONN_MAX_AGE': '300'})
+        # Assert
+        assert database['CONN_MAX_AGE'] == 0
+        assert database['CONN_HEALTH_CHECKS'] is False
+
+    def test_pgbouncer_disables_server_side_cursors(self):
+        # Act
+        database = database_settings({'DB_POOL_MODE': 'pgbouncer', 'DB_PORT': '6432'})
+        # Assert
+        assert database['PORT'] == '6432'
+        assert database['CONN_HEALTH_CHECKS'] is True
+        assert database['DISABLE_SERVER_SIDE_CURSORS'] is True
+
+    @pytest.mark.parametrize("environ", [{'DB_POOL_MODE': 'sometimes'}, {'DB_POOL_MODE': 'pool'}, {'DB_CONN_MAX_AGE': 'forever'}])
+    def test_invalid_values(self, environ):
+        # Act / Assert
+        with pytest.raises(ImproperlyConfigured):
+            database_settings(environ)
+
+    def test_replicas_copy_primary_with_their_own_host(self):
+        # Arrange
+        primary = database_settings({'DB_NAME': 'shop', 'DB_PORT': '5432'})
+        # Act
+        replicas = replica_settings(primary, {'DB_REPLICA_HOSTS': 'r1, r2:5433'})
+        # Assert
+        assert list(replicas) == ['replica_1', 'replica_2']
+        assert replicas['replica_1']['HOST'] == 'r1'
+        assert replicas['replica_1']['PORT'] == '5432'
+        assert replicas['replica_2']['PORT'] == '5433'
+        assert replicas['replica_2']['NAME'] == 'shop'
+        assert replicas['replica_2']['TEST'] == {'MIRROR': 'default'}
+        assert replica_settings(primary, {}) == {}
@@ -0,0 +1,88 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from drfecommerce.apps.product_incoming.models import ProductIncoming
+from drfecommerce.apps.review.models import Review, ReviewReply
+
+pytestmark = pytest.mark.django_db
+
+
+def count_queries(client, endpoint, params):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(endpoint, params)
+    assert response.status_code == 200, response.data
+    return len(queries)
+
+
+class TestListQueryCount:
+    """
+    Số query của một trang không được tăng theo page_size.
+    """
+
+    def test_products(self, product_factory, promotion, api_client):
+        # Arrange
+        for _ in range(12):
+            product_factory(promotion=promotion)
+        client = api_client()
+        endpoint = "/api/product/get-list-products/"
+        # Act
+        small = count_queries(client, endpoint, {"page_size": 2})
+        large = count_queries(client, endpoint, {"page_size": 12})
+        # Assert
+        assert small == large
+
+    def test_product_incomings(self, product_store_factory, admin_client):
+        # Arrange
+        for _ in range(12):
+            stock = product_store_factory()
+            ProductIncoming.objects.create(product=stock.product, store=stock.store, cost_price=10, quantity_in=1)
+        endpoint = "/api/product_incoming/admin/list-product-incomings/"
+        # Act
+        small = count_queries(admin_client, endpoint, {"page_size": 2})
+        large = count_queries(admin_client, endpoint, {"page_size": 12})
+        # Assert
+        assert small == large
+
+    def test_products_in_store(self, store, product_store_factory, admin_client):
+        # Arrange
+        for _ in range(12):
+            product_store_factory(store=store)
+        endpoint = "/api/product_store/admin/search-products-in-store/"
+        # Act
+        small = count_queries(admin_client, endpoint, {"store_id": store.id, "page_size": 2})
+        large = count_queries(admin_client, endpoint, {"store_id": store.id, "page_size": 12, "cursor": ""})
+        # Assert
+        assert small - 1 == large  # chế độ cursor không chạy COUNT(*)
+
+    def test_reviews_with_replies(self, product_store, guest, my_admin, api_client):
+        # Arrange
+        for rating in range(12):
+            review = Review.objects.create(
+                guest=guest, product=product_store.product, store=product_store.store, rating=rating % 5 + 1)
+            ReviewReply.objects.create(review=review, admin=my_admin, reply="Thanks")
+        client = api_client()
+        endpoint = "/api/review/get-list-reviews/"
+        params = {"product_id": product_store.product_id, "store_id": product_store.store_id}
+        # Act
+        small = count_queries(client, endpoint, {**params, "page_size": 2})
+        large = count_queries(client, endpoint, {**params, "page_size": 12})
+        response = client.get(endpoint, {**params, "page_size": 1})
+        # Assert
+        assert small == large
+        assert response.data["data"]["reviews"][0]["replies"][0]["reply"] == "Thanks"
+
+    def test_order_detail_lines(self, order, order_detail_factory, admin_client):
+        # Arrange
+        endpoint = "/api/order/get-order-detail/"
+        order_detail_factory(order=order)
+        one_line = count_queries(admin_client, endpoint, {"order_id": order.id})
+        for _ in range(9):
+            order_detail_factory(order=order)
+        # Act
+        ten_lines = count_queries(admin_client, endpoint, {"order_id": order.id})
+        response = admin_client.get(endpoint, {"order_id": order.id})
+        # Assert
+        assert one_line == ten_lines
+        assert len(response.data["data"]) == 10
+        assert response.data["data"][0]["product_image"] == "product.png"
@@ -0,0 +1,65 @@
+import datetime
+import io
+import zipfile
+from decimal import Decimal
+from xml.etree import ElementTree
+
+from django.utils import timezone
+
+from drfecommerce.exports import csv_rows, xlsx_rows
+
+NS = {'x': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+
+
+def read_xlsx(content):
+    """
+    :return: list sheet, mỗi sheet là list dòng (list giá trị text của các ô)
+    """
+    archive = zipfile.ZipFile(io.BytesIO(content))
+    assert archive.testzip() is None
+    workbook = ElementTree.fromstring(archive.read('xl/workbook.xml'))
+    sheets = []
+    for index in range(1, len(workbook.findall('.//x:sheet', NS)) + 1):
+        root = ElementTree.fromstring(archive.read(f'xl/worksheets/sheet{index}.xml'))
+        sheets.append([[''.join(cell.itertext()) for cell in row.findall('x:c', NS)]
+                       for row in root.findall('.//x:row', NS)])
+    return sheets
+
+
+class TestCsvRows:
+    def test_values_are_formatted(self):
+        # Arrange
+        sold_at = timezone.make_aware(datetime.datetime(2024, 3, 1, 8, 30))
+        # Act
+        content = ''.join(csv_rows(['id', 'sold_at', 'price', 'note'], [(1, sold_at, Decimal('10.50'), None)]))
+        # Assert
+        assert content.splitlines() == ['id,sold_at,price,note', '1,2024-03-01 08:30:00,10.50,']
+
+
+class TestXlsxRows:
+    def test_workbook_is_valid_and_escaped(self):
+        # Arrange
+        rows = [(1, 'Hoa <hồng> & "lan"', Decimal('10.50')), (2, '', 3)]
+        # Act
+        content = b''.join(xlsx_rows(['id', 'name', 'price'], iter(rows)))
+        # Assert
+        assert read_xlsx(content) == [[['id', 'name', 'price'], ['1', 'Hoa <hồng> & "lan"', '10.50'], ['2', '3']]]
+
+    def test_rows_over_the_sheet_limit_go_to_new_sheets(self):
+        # Act
+        content = b''.join(xlsx_rows(['id'], ((i,) for i in range(5)), max_rows=3))
+        # Assert
+        assert read_xlsx(content) == [[['id'], ['0'], ['1']], [['id'], ['2'], ['3']], [['id'], ['4']]]
+
+    def test_empty_export_has_header_sheet(self):
+        # Act
+        content = b''.join(xlsx_rows(['id', 'name'], iter(())))
+        # Assert
+        assert read_xlsx(content) == [[['id', 'name']]]
+
+    def test_output_is_streamed_in_chunks(self):
+        # Act
+        chunks = list(xlsx_rows(['id', 'name'], ((i, f'product {i}') for i in range(5000))))
+        # Assert
+        assert len(chunks) > 5
+        assert len(read_xlsx(b''.join(chunks))[0]) == 5001
@@ -0,0 +1,116 @@
+import jwt
+import pytest
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from drfecommerce.apps.guest.authentication import GuestSafeJWTAuthentication
+from drfecommerce.apps.guest.utils import generate_access_token, generate_refresh_token
+from drfecommerce.apps.my_admin.authentication import AdminSafeJWTAuthentication
+from drfecommerce.apps.my_admin.utils import generate_access_token as generate_admin_access_token
+from drfecommerce.jwt_auth import decode_token, revoke_principal, revoke_token, signing_key
+
+pytestmark = pytest.mark.django_db
+
+
+def authenticated_user(token):
+    # Giống DEFAULT_AUTHENTICATION_CLASSES: guest trước, admin sau
+    request = Request(
+        APIRequestFactory().get('/', HTTP_AUTHORIZATION=f"Bearer {token}"),
+        authenticators=[GuestSafeJWTAuthentication(), AdminSafeJWTAuthentication()],
+    )
+    return request.user
+
+
+class TestJWTAuthentication:
+    def test_cached_principal_needs_no_query(self, guest, django_assert_num_queries):
+        # Arrange
+        token = generate_access_token(guest)
+        with django_assert_num_queries(1):
+            authenticated_user(token)
+
+        # Act / Assert
+        with django_assert_num_queries(0):
+            user = authenticated_user(token)
+        assert user.id == guest.id
+        assert decode_token(token)['is_verified'] is True
+
+    def test_admin_token_is_looked_up_once_with_default_classes(self, my_admin, django_assert_num_queries):
+        # Arrange
+        token = generate_admin_access_token(my_admin)
+
+        # Act
+        with django_assert_num_queries(1):
+            user = authenticated_user(token)
+
+        # Assert
+        assert user.id == my_admin.id
+        assert user.role == my_admin.role
+
+    def test_refresh_token_is_not_an_access_token(self, guest):
+        # Arrange
+        token = generate_refresh_token(guest)
+
+        # Act / Assert
+        with pytest.raises(exceptions.AuthenticationFailed):
+            authenticated_user(token)
+
+    def test_revoked_tokens_are_rejected(self, guest):
+        # Arrange
+        token = generate_access_token(guest)
+        other_token = generate_access_token(guest)
+        authenticated_user(token)
+
+        # Act
+        revoke_token(decode_token(token))
+
+        # Assert
+        with pytest.raises(exceptions.AuthenticationFailed):
+            authenticated_user(token)
+        assert authenticated_user(other_token).id == guest.id
+
+        revoke_principal('guest', guest.id)
+        with pytest.raises(exceptions.AuthenticationFailed):
+            authenticated_user(other_token)
+        assert authenticated_user(generate_access_token(guest)).id == guest.id
+
+    def test_saving_guest_reloads_cached_principal(self, guest):
+        # Arrange
+        token = generate_access_token(guest)
+        authenticated_user(token)
+
+        # Act
+        guest.is_verified = False
+        guest.save()
+
+        # Assert
+        with pytest.raises(exceptions.AuthenticationFailed):
+            authenticated_user(token)
+
+    def test_legacy_token_without_jti_still_works(self, guest):
+        # Arrange
+        token = jwt.encode({'user_id': guest.id}, signing_key(), algorithm='HS256')
+
+        # Act
+        user = authenticated_user(token)
+
+        # Assert
+        assert user.id == guest.id
+
+
+class TestLogout:
+    def test_logout_revokes_access_and_refresh_token(self, api_client, guest):
+        # Arrange
+        client = api_client()
+        login = client.post("/api/guest/login/", {"email": guest.email, "password": guest.password}).data["data"]
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {login['access_token']}")
+
+        # Act
+        response = client.post("/api/guest/logout/", {"refresh_token": login["refresh_token"]})
+
+        # Assert
+        assert response.status_code == 200
+        assert client.post("/api/guest/logout/").status_code == 403
+        client.credentials()
+        refresh = client.post("/api/token/refresh/", {"refresh_token": login["refresh_token"]})
+        assert refresh.status_code == 403
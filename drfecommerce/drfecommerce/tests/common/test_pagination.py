@@ -0,0 +1,113 @@
+import datetime
+
+import pytest
+from django.utils import timezone
+
+from drfecommerce.apps.product_sale.models import ProductSale
+from drfecommerce.apps.product_sale.rollups import record_sales
+
+pytestmark = pytest.mark.django_db
+
+
+class TestPagination:
+    endpoint = "/api/product/get-list-products/"
+
+    @pytest.fixture
+    def products(self, product_factory):
+        # 3 sản phẩm tạo cùng thời điểm để kiểm tra id phân biệt được các dòng trùng created_at
+        same_time = timezone.make_aware(datetime.datetime(2024, 1, 1))
+        products = [product_factory(created_at=same_time) for _ in range(3)]
+        products += [product_factory(created_at=same_time + datetime.timedelta(days=i)) for i in range(1, 5)]
+        return products
+
+    def test_page_index_mode_keeps_legacy_fields(self, products, api_client):
+        # Arrange
+        client = api_client()
+        # Act
+        response = client.get(self.endpoint, {"page_index": 2, "page_size": 3})
+        # Assert
+        data = response.data["data"]
+        assert response.status_code == 200
+        assert (data["total_pages"], data["total_items"], data["page_index"], data["page_size"]) == (3, 7, 2, 3)
+        assert len(data["products"]) == 3
+
+    def test_page_index_out_of_range_returns_last_page(self, products, api_client):
+        # Arrange
+        client = api_client()
+        # Act
+        response = client.get(self.endpoint, {"page_index": 99, "page_size": 3})
+        # Assert
+        assert response.data["data"]["page_index"] == 3
+        assert len(response.data["data"]["products"]) == 1
+
+    def test_cursor_walks_every_row_once_newest_first(self, products, api_client):
+        # Arrange
+        client = api_client()
+        seen = []
+        params = {"cursor": "", "page_size": 2}
+        # Act
+        while True:
+            data = client.get(self.endpoint, params).data["data"]
+            seen += [product["id"] for product in data["products"]]
+            if not data["has_next"]:
+                break
+            params["cursor"] = data["next_cursor"]
+        # Assert
+        expected = sorted(products, key=lambda p: (p.created_at, p.id), reverse=True)
+        assert seen == [product.id for product in expected]
+        assert "total_items" not in data
+
+    def test_previous_cursor_returns_previous_page(self, products, api_client):
+        # Arrange
+        client = api_client()
+        first = client.get(self.endpoint, {"cursor": "", "page_size": 3}).data["data"]
+        second = client.get(self.endpoint, {"cursor": first["next_cursor"], "page_size": 3}).data["data"]
+        # Act
+        back = client.get(self.endpoint, {"cursor": second["previous_cursor"], "page_size": 3}).data["data"]
+        # Assert
+        assert [p["id"] for p in back["products"]] == [p["id"] for p in first["products"]]
+        assert back["has_previous"] is False
+
+    def test_cursor_mode_can_return_count(self, products, api_client):
+        # Arrange
+        client = api_client()
+        # Act
+        exact = client.get(self.endpoint, {"cursor": "", "page_size": 3, "count": "exact"}).data["data"]
+        estimated = client.get(self.endpoint, {"cursor": "", "page_size": 3, "count": "estimated"}).data["data"]
+        # Assert
+        assert (exact["total_items"], exact["total_pages"]) == (7, 3)
+        # PostgreSQL trả về ước lượng của planner, các database khác đếm chính xác
+        assert isinstance(estimated["total_items"], int)
+
+    def test_invalid_cursor_returns_400(self, products, api_client):
+        # Arrange
+        client = api_client()
+        # Act
+        response = client.get(self.endpoint, {"cursor": "not-a-cursor"})
+        # Assert
+        assert response.status_code == 400
+
+
+class TestGroupedReportPagination:
+    endpoint = "/api/product_sale/admin/get-total-report/"
+
+    def test_cursor_pages_grouped_rows(self, my_admin, order_detail_factory, api_client):
+        # Arrange
+        for _ in range(3):
+            detail = order_detail_factory()
+            record_sales([
+                ProductSale.objects.create(
+                    product=detail.product, store=detail.store, order_detail=detail,
+                    sale_price=100, quantity_sold=quantity)
+                for quantity in (1, 2)
+            ])
+        client = api_client()
+        client.force_authenticate(user=my_admin)
+        # Act
+        first = client.get(self.endpoint, {"cursor": "", "page_size": 2}).data
+        second = client.get(self.endpoint, {"cursor": first["next_cursor"], "page_size": 2}).data
+        # Assert
+        rows = first["data"] + second["data"]
+        assert len({row["store__name"] for row in rows}) == 3
+        assert all(row["total_quantity_sold"] == 3 for row in rows)
+        assert second["has_next"] is False
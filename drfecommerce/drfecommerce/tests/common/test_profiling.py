@@ -0,0 +1,100 @@
+import logging
+
+import pytest
+from django.db import connection
+
+from drfecommerce import profiling
+
+pytestmark = pytest.mark.django_db
+
+METRICS = "/api/admin/metrics/"
+ADMINS = "/api/admin/list-admins/"
+
+
+@pytest.fixture(autouse=True)
+def clear_registry():
+    profiling.registry.reset()
+    yield
+    profiling.registry.reset()
+
+
+def sample(text, line_start):
+    return next(float(line.rsplit(" ", 1)[1]) for line in text.splitlines() if line.startswith(line_start))
+
+
+class TestMetricsEndpoint:
+    def test_requests_are_exported_in_prometheus_format(self, admin_client, my_admin_factory):
+        # Arrange
+        my_admin_factory.create_batch(3)
+        admin_client.get(ADMINS)
+        admin_client.get(ADMINS)
+        # Act
+        response = admin_client.get(METRICS)
+        # Assert
+        assert response.status_code == 200
+        assert response["Content-Type"] == profiling.CONTENT_TYPE
+        text = response.content.decode()
+        labels = 'view="admin-list",method="GET"'
+        assert sample(text, f'drfecommerce_requests_total{{{labels},status="2xx"}}') == 2
+        assert sample(text, f'drfecommerce_request_duration_seconds_count{{{labels}}}') == 2
+        assert sample(text, f'drfecommerce_request_duration_seconds_bucket{{{labels},le="+Inf"}}') == 2
+        assert sample(text, f'drfecommerce_db_queries_total{{{labels}}}') >= 2
+        assert sample(text, f'drfecommerce_serializer_seconds_total{{{labels}}}') > 0
+        assert sample(text, f'drfecommerce_response_bytes_total{{{labels}}}') > 0
+        assert "# TYPE drfecommerce_request_duration_seconds histogram" in text
+
+    def test_guest_token_is_rejected(self, guest_client):
+        # Act
+        response = guest_client.get(METRICS)
+        # Assert
+        assert response.status_code in (401, 403)
+
+
+class TestProfilingMiddleware:
+    def test_server_timing_header(self, admin_client, settings):
+        # Arrange
+        settings.PROFILING_SERVER_TIMING = True
+        # Act
+        response = admin_client.get(ADMINS)
+        # Assert
+        timing = response["Server-Timing"]
+        assert timing.startswith("total;dur=")
+        assert "db;dur=" in timing and "serializer;dur=" in timing
+
+    def test_no_header_by_default(self, admin_client):
+        # Act
+        response = admin_client.get(ADMINS)
+        # Assert
+        assert "Server-Timing" not in response
+
+    def test_slow_request_is_logged(self, admin_client, settings, caplog):
+        # Arrange
+        settings.PROFILING_SLOW_REQUEST_MS = 0
+        # Act
+        with caplog.at_level(logging.WARNING, logger="drfecommerce.profiling"):
+            admin_client.get(ADMINS, {"page_size": 5})
+        # Assert
+        assert "Slow request GET /api/admin/list-admins/ (admin-list)" in caplog.text
+
+    def test_duplicated_queries_are_reported(self):
+        # Arrange
+        profile = profiling.RequestProfile()
+        # Act
+        with connection.execute_wrapper(profile):
+            with connection.cursor() as cursor:
+                for value in range(3):
+                    cursor.execute("SELECT %s", [value])
+                cursor.execute("SELECT 1")
+        # Assert
+        assert profile.query_count == 4
+        assert [(sql, count) for sql, count, _ in profile.duplicated_queries()] == [("SELECT %s", 3)]
+
+    def test_nested_timers_count_once(self):
+        # Arrange
+        profile = profiling.RequestProfile()
+        # Act
+        with profile.timer("serializer"):
+            with profile.timer("serializer"):
+                pass
+        # Assert
+        assert list(profile.timings) == ["serializer"]
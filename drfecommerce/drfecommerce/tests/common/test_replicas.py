@@ -0,0 +1,130 @@
+import pytest
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.test.utils import CaptureQueriesContext
+
+from drfecommerce import replicas
+from drfecommerce.response_cache import invalidate
+from drfecommerce.apps.product.models import Product
+from drfecommerce.apps.guest.utils import generate_access_token as generate_guest_access_token
+
+REPLICA = "replica"
+
+
+@pytest.fixture
+def replica(transactional_db, settings):
+    """
+    Alias thứ hai trỏ tới cùng test database (dữ liệu đã commit nên kết nối khác cũng đọc được).
+    """
+    connections.settings[REPLICA] = {**connections["default"].settings_dict}
+    settings.READ_REPLICAS = [REPLICA]
+    yield connections[REPLICA]
+    connections[REPLICA].close()
+    del connections[REPLICA]
+    del connections.settings[REPLICA]
+
+
+class TestReplicaRouter:
+    router = replicas.ReplicaRouter()
+
+    def test_reads_go_to_default_outside_read_replica_views(self, settings):
+        # Arrange
+        settings.READ_REPLICAS = [REPLICA]
+        # Act / Assert
+        assert self.router.db_for_read(Product) == "default"
+        with replicas.use_database(REPLICA):
+            assert self.router.db_for_read(Product) == REPLICA
+            assert self.router.db_for_write(Product) == "default"
+        assert self.router.db_for_read(Product) == "default"
+
+    def test_replicas_are_not_migrated(self, settings):
+        # Arrange
+        settings.READ_REPLICAS = [REPLICA]
+        # Act / Assert
+        assert self.router.allow_migrate(REPLICA, "product") is False
+        assert self.router.allow_migrate("default", "product") is None
+
+    @pytest.mark.django_db(transaction=True)
+    def test_reads_inside_transaction_stay_on_default(self, settings):
+        # Arrange
+        settings.READ_REPLICAS = [REPLICA]
+        # Act / Assert
+        with replicas.use_database(REPLICA), transaction.atomic():
+            assert self.router.db_for_read(Product) == "default"
+
+    @pytest.mark.django_db
+    def test_no_replica_configured(self, guest):
+        # Act
+        replicas.pin(guest)
+        # Assert
+        assert replicas.choose_replica(guest) == "default"
+        assert not replicas.is_pinned(guest)
+
+
+class TestReadReplicaViews:
+    def test_admin_report_reads_from_replica(self, replica, admin_client, order_factory):
+        # Arrange
+        order_factory.create_batch(3)
+        # Act
+        with CaptureQueriesContext(replica) as queries:
+            response = admin_client.get("/api/order/admin/get-list-orders/")
+        # Assert
+        assert response.status_code == 200
+        assert len(response.data["data"]["orders"]) == 3
+        assert any("orders" in query["sql"] for query in queries.captured_queries)
+
+    def test_guest_reads_own_writes_after_add_to_cart(self, replica, api_client, guest, guest_client, guest_factory,
+                                                     product_store):
+        # Arrange
+        other = guest_factory()
+        other_client = api_client()
+        other_client.credentials(HTTP_AUTHORIZATION=f"Bearer {generate_guest_access_token(other)}")
+        # Act
+        response = guest_client.post("/api/cart/guests/add-to-cart/", {
+            "id": guest.id, "product_id": product_store.product_id, "store_id": product_store.store_id,
+        }, format="json")
+        with CaptureQueriesContext(replica) as pinned:
+            cart = guest_client.generic("GET", "/api/cart/guests/my-cart/", f'{{"id": {guest.id}}}',
+                                        content_type="application/json")
+        with CaptureQueriesContext(replica) as not_pinned:
+            other_client.generic("GET", "/api/cart/guests/my-cart/", f'{{"id": {other.id}}}',
+                                 content_type="application/json")
+        # Assert
+        assert response.status_code in (200, 201)
+        assert len(cart.data["data"]["items"]) == 1
+        assert replicas.is_pinned(guest)
+        assert len(pinned.captured_queries) == 0
+        assert len(not_pinned.captured_queries) > 0
+
+    def test_failed_write_does_not_pin(self, replica, guest, guest_client):
+        # Act
+        response = guest_client.post("/api/cart/guests/add-to-cart/", {"id": guest.id, "product_id": 0, "store_id": 0},
+                                     format="json")
+        # Assert
+        assert response.status_code == 404
+        assert not replicas.is_pinned(guest)
+
+    def test_reads_return_to_replica_when_pin_expires(self, replica, settings, guest):
+        # Arrange
+        settings.REPLICA_PIN_SECONDS = 10
+        replicas.pin(guest)
+        # Act
+        cache.delete(replicas._pin_key(guest))
+        # Assert
+        assert replicas.choose_replica(guest) == REPLICA
+
+
+class TestCachedReplicaViews:
+    def test_cache_refill_after_invalidate_reads_default(self, replica, api_client, product):
+        # Arrange
+        client = api_client()
+        assert client.get("/api/product/get-list-products/").status_code == 200
+        Product.objects.filter(id=product.id).update(name="Renamed")
+        invalidate('product')
+        # Act
+        with CaptureQueriesContext(replica) as queries:
+            response = client.get("/api/product/get-list-products/")
+        # Assert
+        assert response["X-Cache"] == "MISS"
+        assert response.data["data"]["products"][0]["name"] == "Renamed"
+        assert len(queries.captured_queries) == 0
@@ -0,0 +1,87 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = pytest.mark.django_db
+
+
+class TestPublicResponseCache:
+    endpoint = "/api/product/get-list-products/"
+
+    def test_second_request_is_served_from_cache(self, product, api_client):
+        # Arrange
+        client = api_client()
+        first = client.get(self.endpoint, {"page_size": 5})
+        # Act
+        with CaptureQueriesContext(connection) as queries:
+            second = client.get(self.endpoint, {"page_size": 5})
+        # Assert
+        assert (first["X-Cache"], second["X-Cache"]) == ("MISS", "HIT")
+        assert len(queries) == 0
+        assert second.data == first.data
+
+    def test_query_params_are_part_of_the_key(self, product_factory, api_client):
+        # Arrange
+        for _ in range(3):
+            product_factory()
+        client = api_client()
+        client.get(self.endpoint, {"page_size": 1})
+        # Act
+        response = client.get(self.endpoint, {"page_size": 2})
+        # Assert
+        assert response["X-Cache"] == "MISS"
+        assert len(response.data["data"]["products"]) == 2
+
+    def test_error_responses_are_not_cached(self, api_client):
+        # Arrange
+        client = api_client()
+        client.get("/api/product/get-detail-product/", {"id": 999})
+        # Act
+        response = client.get("/api/product/get-detail-product/", {"id": 999})
+        # Assert
+        assert response.status_code == 404
+        assert "X-Cache" not in response
+
+
+class TestAdminChangesInvalidateCache:
+    """
+    invalidate() chạy sau khi transaction commit, test chạy trong transaction nên phải chạy các callback on_commit.
+    """
+
+    def test_delete_product_invalidates_product_lists(self, product, admin_client, api_client, django_capture_on_commit_callbacks):
+        # Arrange
+        client = api_client()
+        client.get("/api/product/get-list-products/")
+        # Act
+        with django_capture_on_commit_callbacks(execute=True):
+            admin_client.delete(f"/api/product/admin/delete-product/?id={product.id}")
+        response = client.get("/api/product/get-list-products/")
+        # Assert
+        assert response["X-Cache"] == "MISS"
+        assert response.data["data"]["products"] == []
+
+    def test_delete_promotion_invalidates_products_showing_it(self, product_factory, promotion, admin_client, api_client, django_capture_on_commit_callbacks):
+        # Arrange
+        product_factory(promotion=promotion)
+        client = api_client()
+        client.get("/api/product/get-list-products/")
+        client.get("/api/promotion/get-list-promotions/")
+        # Act
+        with django_capture_on_commit_callbacks(execute=True):
+            admin_client.delete(f"/api/promotion/admin/delete-promotion/?id={promotion.id}")
+        products = client.get("/api/product/get-list-products/")
+        promotions = client.get("/api/promotion/get-list-promotions/")
+        # Assert
+        assert (products["X-Cache"], promotions["X-Cache"]) == ("MISS", "MISS")
+        assert promotions.data["data"]["promotions"] == []
+
+    def test_catalog_change_keeps_promotion_cache(self, catalog, promotion, admin_client, api_client, django_capture_on_commit_callbacks):
+        # Arrange
+        client = api_client()
+        client.get("/api/promotion/get-list-promotions/")
+        # Act
+        with django_capture_on_commit_callbacks(execute=True):
+            admin_client.delete(f"/api/catalog/admin/delete-catalog/?id={catalog.id}")
+        response = client.get("/api/promotion/get-list-promotions/")
+        # Assert
+        assert response["X-Cache"] == "HIT"
@@ -0,0 +1,103 @@
+import pytest
+
+from drfecommerce.apps.product.models import Product
+from drfecommerce.apps.product_incoming.models import ProductIncoming
+from drfecommerce.search import fold, search, rebuild_search_documents, SEARCH_ORDERING
+
+pytestmark = pytest.mark.django_db
+
+
+def test_fold_removes_vietnamese_accents():
+    assert fold("Hoa Hồng Đà Lạt") == "hoa hong da lat"
+
+
+class TestSearch:
+    @pytest.fixture
+    def products(self, product_factory):
+        return {
+            "name": product_factory(name="Hoa Hồng Đà Lạt", description="Bó hoa"),
+            "description": product_factory(name="Giỏ quà", description="Kèm hoa hồng nhỏ"),
+            "other": product_factory(name="Hoa cúc", description="Hoa cúc vàng"),
+        }
+
+    def search_ids(self, query):
+        return [product.id for product in search(Product.objects.all(), query).order_by(*SEARCH_ORDERING)]
+
+    def test_accents_and_prefix_are_ignored(self, products):
+        # Act
+        ids = self.search_ids("hoa hon")
+        # Assert
+        assert set(ids) == {products["name"].id, products["description"].id}
+
+    def test_name_match_ranks_above_description_match(self, products):
+        # Act
+        ids = self.search_ids("hồng")
+        # Assert
+        assert ids == [products["name"].id, products["description"].id]
+
+    def test_prefix_must_start_a_word(self, products):
+        # Act
+        ids = self.search_ids("ong")
+        # Assert
+        assert ids == []
+
+    def test_document_follows_saved_changes(self, products):
+        # Arrange
+        product = products["other"]
+        product.name = "Lan hồ điệp"
+        product.save()
+        # Act
+        ids = self.search_ids("diep")
+        # Assert
+        assert ids == [product.id]
+
+    def test_rebuild_after_bulk_update(self, products):
+        # Arrange
+        Product.objects.filter(id=products["other"].id).update(label="Tết")
+        # Act
+        rebuild_search_documents(Product.objects.all(), Product.search_fields)
+        # Assert
+        assert self.search_ids("tet") == [products["other"].id]
+
+
+class TestSearchEndpoints:
+    def test_public_search_is_ranked(self, product_factory, api_client):
+        # Arrange
+        by_name = product_factory(name="Tulip Hà Lan")
+        by_label = product_factory(label="tulip")
+        client = api_client()
+        # Act
+        response = client.get("/api/product/search-products/", {"name": "tulip"})
+        # Assert
+        assert [product["id"] for product in response.data["data"]["products"]] == [by_name.id, by_label.id]
+        assert "search_text" not in response.data["data"]["products"][0]
+
+    def test_search_cursor_pages(self, product_factory, api_client):
+        # Arrange
+        for i in range(5):
+            product_factory(name=f"Tulip {i}")
+        client = api_client()
+        seen = []
+        params = {"name": "tulip", "cursor": "", "page_size": 2}
+        # Act
+        while True:
+            data = client.get("/api/product/search-products/", params).data["data"]
+            seen += [product["id"] for product in data["products"]]
+            if not data["has_next"]:
+                break
+            params["cursor"] = data["next_cursor"]
+        # Assert
+        assert len(seen) == len(set(seen)) == 5
+
+    def test_product_incomings_filtered_by_product_name(self, product_store_factory, my_admin, api_client):
+        # Arrange
+        rose = product_store_factory(product__name="Hoa hồng")
+        other = product_store_factory(product__name="Hoa cúc")
+        for stock in (rose, other):
+            ProductIncoming.objects.create(product=stock.product, store=stock.store, cost_price=10, quantity_in=1)
+        client = api_client()
+        client.force_authenticate(user=my_admin)
+        # Act
+        response = client.get("/api/product_incoming/admin/search_product_incomings/", {"product_name": "hong"})
+        # Assert
+        assert [row["product"] for row in response.data["data"]["product_incomings"]] == [rose.product_id]
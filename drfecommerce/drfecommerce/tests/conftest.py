@@ -1,14 +1,61 @@
 import pytest
+from django.core.cache import cache
 from pytest_factoryboy import register
 from rest_framework.test import APIClient
 
-from .factories import CategoryFactory, BrandFactory, ProductFactory
+from drfecommerce.apps.guest.utils import generate_access_token
+from .factories import (
+    CategoryFactory,
+    GuestFactory,
+    MyAdminFactory,
+    StoreFactory,
+    CatalogFactory,
+    PromotionFactory,
+    ProductFactory,
+    ProductStoreFactory,
+    CartFactory,
+    CartItemFactory,
+    OrderFactory,
+    OrderDetailFactory,
+)
 
 register(CategoryFactory)
-register(BrandFactory)
+register(GuestFactory)
+register(MyAdminFactory)
+register(StoreFactory)
+register(CatalogFactory)
+register(PromotionFactory)
 register(ProductFactory)
+register(ProductStoreFactory)
+register(CartFactory)
+register(CartItemFactory)
+register(OrderFactory)
+register(OrderDetailFactory)
 
 
 @pytest.fixture
 def api_client():
     return APIClient
+
+
+@pytest.fixture
+def admin_client(my_admin, api_client):
+    client = api_client()
+    client.force_authenticate(user=my_admin)
+    return client
+
+
+@pytest.fixture
+def guest_client(guest, api_client):
+    # Xác thực bằng access token thật: đi qua GuestSafeJWTAuthentication như client thật
+    client = api_client()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {generate_access_token(guest)}")
+    return client
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Cache local memory tồn tại suốt tiến trình test, xoá để các test không đọc response của nhau
+    cache.clear()
+    yield
+    cache.clear()
@@ -1,6 +1,18 @@
+import datetime
+
 import factory
 
-from drfecommerce.product.models import Category, Brand, Product
+from drfecommerce.apps.category.models import Category
+from drfecommerce.apps.guest.models import Guest
+from drfecommerce.apps.my_admin.models import MyAdmin
+from drfecommerce.apps.store.models import Store
+from drfecommerce.apps.catalog.models import Catalog
+from drfecommerce.apps.promotion.models import Promotion
+from drfecommerce.apps.product.models import Product
+from drfecommerce.apps.product_store.models import ProductStore
+from drfecommerce.apps.cart.models import Cart, CartItem
+from drfecommerce.apps.order.models import Order
+from drfecommerce.apps.order_detail.models import OrderDetail
 
 
 class CategoryFactory(factory.django.DjangoModelFactory):
@@ -8,21 +20,134 @@ class CategoryFactory(factory.django.DjangoModelFactory):
         model = Category
 
     name = factory.Sequence(lambda n: "Category_%d" % n)
+    description = "test_description"
+    image = "category.png"
+
+
+class GuestFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Guest
+
+    first_name = "Test"
+    last_name = factory.Sequence(lambda n: "Guest_%d" % n)
+    email = factory.Sequence(lambda n: "guest_%d@example.com" % n)
+    password = "password"
+    is_verified = True
+
+
+class MyAdminFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = MyAdmin
+
+    user_name = factory.Sequence(lambda n: "admin_%d" % n)
+    email = factory.Sequence(lambda n: "admin_%d@example.com" % n)
+    password = "password"
+    role = "admin"
 
 
-class BrandFactory(factory.django.DjangoModelFactory):
+class StoreFactory(factory.django.DjangoModelFactory):
     class Meta:
-        model = Brand
+        model = Store
 
-    name = factory.Sequence(lambda n: "Brand_%d" % n)
+    name = factory.Sequence(lambda n: "Store_%d" % n)
+    phone_number = "0123456789"
+    email = factory.Sequence(lambda n: "store_%d@example.com" % n)
+    address = factory.Sequence(lambda n: "%d Flower Street" % n)
+    opening_hours = datetime.time(8, 0)
+    closing_hours = datetime.time(22, 0)
+
+
+class CatalogFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Catalog
+
+    name = factory.Sequence(lambda n: "Catalog_%d" % n)
+    description = "test_description"
+    level = 1
+
+
+class PromotionFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Promotion
+
+    name = factory.Sequence(lambda n: "Promotion_%d" % n)
+    description = "test_description"
+    code = factory.Sequence(lambda n: "PROMO%d" % n)
+    from_date = datetime.date(2024, 1, 1)
+    to_date = datetime.date(2024, 12, 31)
+    special_price = 0
+    member_price = 0
+    rate = 0.1
 
 
 class ProductFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = Product
 
-    name = "test_product"
+    catalog = factory.SubFactory(CatalogFactory)
+    promotion = None
+    code = factory.Sequence(lambda n: "P%05d" % n)
+    name = factory.Sequence(lambda n: "Product_%d" % n)
+    short_description = "test_short_description"
     description = "test_description"
-    is_digital = True
-    brand = factory.SubFactory(BrandFactory)
-    category = factory.SubFactory(CategoryFactory)
+    product_type = "flower"
+    image = "product.png"
+    price = 100000
+    member_price = 90000
+    quantity = 100
+    gallery = ""
+    weight = 1
+    diameter = 1
+    dimensions = "10x10"
+    material = "rose"
+    label = "new"
+
+
+class ProductStoreFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = ProductStore
+
+    product = factory.SubFactory(ProductFactory)
+    store = factory.SubFactory(StoreFactory)
+    quantity_in = 10
+    remaining_stock = 10
+
+
+class CartFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Cart
+
+    guest = factory.SubFactory(GuestFactory)
+
+
+class CartItemFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = CartItem
+
+    cart = factory.SubFactory(CartFactory)
+    product = factory.SubFactory(ProductFactory)
+    store = factory.SubFactory(StoreFactory)
+    quantity = 1
+
+
+class OrderFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = Order
+
+    guest = factory.SubFactory(GuestFactory)
+    total_cost = 0
+    gst_amount = 0
+    shipping_cost = 0
+
+
+class OrderDetailFactory(factory.django.DjangoModelFactory):
+    class Meta:
+        model = OrderDetail
+
+    order = factory.SubFactory(OrderFactory)
+    product = factory.SubFactory(ProductFactory)
+    store = factory.SubFactory(StoreFactory)
+    product_name = factory.SelfAttribute("product.name")
+    quantity = 1
+    unit_price = factory.SelfAttribute("product.price")
+    location_pickup = factory.SelfAttribute("store.address")
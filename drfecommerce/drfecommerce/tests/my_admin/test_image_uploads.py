@@ -0,0 +1,149 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+from drfecommerce.apps.my_admin.images import process_pending_images, variants_for, VARIANTS
+from drfecommerce.apps.my_admin.models import ImageUpload
+from drfecommerce.apps.product.bulk import import_products
+from drfecommerce.apps.product.models import Product
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+def image_file(name="photo.jpg", size=(2000, 1000), image_format="JPEG", mode="RGB"):
+    buffer = io.BytesIO()
+    Image.new(mode, size, (200, 30, 30, 128) if mode == "RGBA" else (200, 30, 30)).save(buffer, image_format)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type=f"image/{image_format.lower()}")
+
+
+def upload_image(admin_client, **kwargs):
+    response = admin_client.post("/api/admin/upload-image/", {"file": image_file(**kwargs)}, format="multipart")
+    assert response.status_code == 200
+    return response.data["img_url"]
+
+
+def stored_size(url):
+    name = url[len(default_storage.base_url):]
+    with default_storage.open(name) as stored:
+        return Image.open(stored).size
+
+
+class TestUpload:
+    def test_upload_is_queued_without_resizing(self, admin_client):
+        # Act
+        url = upload_image(admin_client)
+        # Assert
+        upload = ImageUpload.objects.get()
+        assert upload.url == url
+        assert upload.status == 'pending'
+        assert default_storage.exists(upload.name)
+        assert upload.name.startswith("images/")
+
+    def test_rejects_non_image_file(self, admin_client):
+        # Act
+        response = admin_client.post("/api/admin/upload-image/",
+                                     {"file": SimpleUploadedFile("run.sh", b"echo")}, format="multipart")
+        # Assert
+        assert response.status_code == 400
+        assert ImageUpload.objects.count() == 0
+
+    def test_gallery_saves_nothing_when_one_file_is_invalid(self, admin_client):
+        # Act
+        response = admin_client.post("/api/product/admin/upload-gallery/",
+                                     {"files": [image_file(), SimpleUploadedFile("notes.txt", b"x")]}, format="multipart")
+        # Assert
+        assert response.status_code == 400
+        assert ImageUpload.objects.count() == 0
+
+
+class TestVariants:
+    def test_worker_writes_every_variant_and_format(self, admin_client):
+        # Arrange
+        upload_image(admin_client)
+        # Act
+        done, failed = process_pending_images()
+        # Assert
+        upload = ImageUpload.objects.get()
+        assert (done, failed) == (1, 0)
+        assert upload.status == 'done'
+        assert set(upload.variants) == {variant for variant, _ in VARIANTS}
+        for variant, size in VARIANTS:
+            assert stored_size(upload.variants[variant]["webp"]) == (size, size // 2)
+            assert stored_size(upload.variants[variant]["jpeg"]) == (size, size // 2)
+
+    def test_small_image_is_not_upscaled(self, admin_client):
+        # Arrange
+        upload_image(admin_client, name="icon.png", size=(100, 80), image_format="PNG", mode="RGBA")
+        # Act
+        process_pending_images(executor=ThreadPoolExecutor(2))
+        # Assert
+        upload = ImageUpload.objects.get()
+        assert upload.variants["full"]["width"] == 100
+        assert stored_size(upload.variants["thumbnail"]["jpeg"]) == (100, 80)
+
+    def test_invalid_image_fails_without_retry(self, admin_client):
+        # Arrange
+        admin_client.post("/api/admin/upload-image/",
+                          {"file": SimpleUploadedFile("broken.png", b"not an image")}, format="multipart")
+        # Act
+        done, failed = process_pending_images()
+        # Assert
+        upload = ImageUpload.objects.get()
+        assert (done, failed) == (0, 1)
+        assert upload.status == 'failed'
+        assert 'UnidentifiedImageError' in upload.last_error
+
+    def test_management_command(self, admin_client):
+        # Arrange
+        upload_image(admin_client)
+        # Act
+        call_command("process_images", "--batch-size", "5")
+        # Assert
+        assert ImageUpload.objects.get().status == 'done'
+
+
+class TestRecordVariants:
+    def test_product_using_image_gets_variants(self, admin_client, api_client, product):
+        # Arrange
+        url = upload_image(admin_client)
+        product.image = url
+        product.save()
+        # Act
+        process_pending_images()
+        response = api_client().get("/api/product/get-list-products/")
+        # Assert
+        item = response.data["data"]["products"][0]
+        assert item["image"] == url
+        assert item["image_variants"] == ImageUpload.objects.get().variants
+
+    def test_product_imported_after_resize_gets_variants(self, admin_client, catalog):
+        # Arrange
+        url = upload_image(admin_client)
+        process_pending_images()
+        content = f"code,name,price,image,catalog_id\nP-1,Rose,10,{url},{catalog.id}\n"
+        # Act
+        import_products(io.StringIO(content), 'csv')
+        # Assert
+        assert Product.objects.get(code="P-1").image_variants == variants_for(url)
+
+    def test_edit_image_catalog(self, admin_client, catalog):
+        # Act
+        response = admin_client.put("/api/catalog/admin/edit-image-catalog/",
+                                    {"id": catalog.id, "file": image_file("banner.jpg")}, format="multipart")
+        process_pending_images()
+        # Assert
+        catalog.refresh_from_db()
+        assert response.status_code == 200
+        assert catalog.image == response.data["data"]["image"]
+        assert catalog.image_variants["card"]["webp"]
@@ -0,0 +1,165 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from drfecommerce.apps.notification import broadcasts
+from drfecommerce.apps.notification.counters import unread_count
+from drfecommerce.apps.notification.models import Broadcast, Notification
+
+pytestmark = pytest.mark.django_db
+
+
+class TestFanOutOnWrite:
+    def test_chunks_cover_every_guest_once(self, guest_factory, django_capture_on_commit_callbacks):
+        # Arrange
+        guests = guest_factory.create_batch(5)
+        broadcast = broadcasts.create_broadcast(message="Sale")
+        # Act
+        with django_capture_on_commit_callbacks(execute=True):
+            created = broadcasts.send_broadcasts(chunk_size=2)
+        # Assert
+        broadcast.refresh_from_db()
+        assert created == 5
+        assert broadcast.status == 'done'
+        assert broadcast.recipients == 5
+        assert broadcast.finished_at is not None
+        assert sorted(Notification.objects.values_list('guest_id', flat=True)) == sorted(g.id for g in guests)
+
+    def test_each_chunk_is_one_insert(self, guest_factory):
+        # Arrange
+        guest_factory.create_batch(4)
+        broadcasts.create_broadcast(message="Sale")
+        # Act
+        with CaptureQueriesContext(connection) as ctx:
+            broadcast, created = broadcasts.fan_out_chunk(chunk_size=10)
+        # Assert
+        inserts = [q for q in ctx.captured_queries if q['sql'].startswith('INSERT INTO "notifications"')]
+        assert created == 4
+        assert len(inserts) == 1
+
+    def test_resumes_from_cursor(self, guest_factory):
+        # Arrange
+        guest_factory.create_batch(3)
+        broadcast = broadcasts.create_broadcast(message="Sale")
+        broadcasts.fan_out_chunk(chunk_size=2)
+        # Act
+        broadcasts.fan_out_chunk(chunk_size=2)
+        # Assert
+        broadcast.refresh_from_db()
+        assert broadcast.status == 'done'
+        assert Notification.objects.count() == 3
+        assert broadcasts.fan_out_chunk(chunk_size=2) == (None, 0)
+
+    def test_segment_filters_guests(self, guest_factory):
+        # Arrange
+        verified = guest_factory(is_verified=True, city="Hanoi")
+        guest_factory(is_verified=False, city="Hanoi")
+        guest_factory(is_verified=True, city="Hanoi", delete_at=timezone.now())
+        broadcasts.create_broadcast(message="Hi", segment={"is_verified": True, "city": "hanoi"})
+        # Act
+        broadcasts.send_broadcasts()
+        # Assert
+        assert list(Notification.objects.values_list('guest_id', flat=True)) == [verified.id]
+
+    def test_warm_unread_counter_is_refreshed(self, guest, django_capture_on_commit_callbacks):
+        # Arrange
+        assert unread_count(guest.id) == 0
+        broadcasts.create_broadcast(message="Sale")
+        # Act
+        with django_capture_on_commit_callbacks(execute=True):
+            broadcasts.send_broadcasts()
+        # Assert
+        assert unread_count(guest.id) == 1
+
+
+class TestFanOutOnRead:
+    def test_feed_and_unread_count(self, guest, guest_client, django_capture_on_commit_callbacks):
+        # Arrange
+        with django_capture_on_commit_callbacks(execute=True):
+            broadcast = broadcasts.create_broadcast(message="Maintenance", mode='read')
+        # Act
+        response = guest_client.get("/api/notification/get-list-notifications/", {"guest_id": guest.id})
+        # Assert
+        assert response.status_code == 200
+        assert response.data["data"]["unread_broadcasts"] == 1
+        assert [(b["id"], b["is_read"]) for b in response.data["data"]["broadcasts"]] == [(broadcast.id, False)]
+        assert Notification.objects.count() == 0
+
+    def test_mark_read_updates_cached_count(self, guest, guest_client, django_capture_on_commit_callbacks):
+        # Arrange
+        with django_capture_on_commit_callbacks(execute=True):
+            first = broadcasts.create_broadcast(message="One", mode='read')
+            broadcasts.create_broadcast(message="Two", mode='read')
+        assert broadcasts.unread_broadcast_count(guest.id) == 2
+        # Act
+        with django_capture_on_commit_callbacks(execute=True):
+            response = guest_client.put("/api/notification/read-notifications/",
+                                        {"guest_id": guest.id, "broadcast_ids": [first.id]}, format="json")
+        # Assert
+        assert response.status_code == 200
+        assert response.data["data"]["broadcasts_read"] == 1
+        assert broadcasts.unread_broadcast_count(guest.id) == 1
+
+    def test_new_broadcast_invalidates_cached_counts(self, guest, django_capture_on_commit_callbacks):
+        # Arrange
+        assert broadcasts.unread_broadcast_count(guest.id) == 0
+        # Act
+        with django_capture_on_commit_callbacks(execute=True):
+            broadcasts.create_broadcast(message="New", mode='read')
+        # Assert
+        assert broadcasts.unread_broadcast_count(guest.id) == 1
+
+    def test_guest_does_not_see_older_broadcasts(self, guest_factory, django_capture_on_commit_callbacks):
+        # Arrange
+        with django_capture_on_commit_callbacks(execute=True):
+            broadcasts.create_broadcast(message="Old", mode='read')
+        Broadcast.objects.update(created_at=timezone.now() - timezone.timedelta(days=1))
+        guest = guest_factory()
+        # Act
+        feed = list(broadcasts.feed_broadcasts(guest.id))
+        # Assert
+        assert feed == []
+
+    def test_read_mode_rejects_segment(self):
+        # Act / Assert
+        with pytest.raises(broadcasts.BroadcastError):
+            broadcasts.create_broadcast(message="Hi", mode='read', segment={"city": "Hanoi"})
+
+
+class TestAdminBroadcastApi:
+    def test_create_and_status(self, admin_client, guest):
+        # Arrange
+        response = admin_client.post("/api/notification/admin/broadcast/",
+                                     {"message": "Sale", "segment": {"guest_ids": [guest.id]}}, format="json")
+        assert response.status_code == 202
+        broadcasts.send_broadcasts()
+        # Act
+        response = admin_client.get("/api/notification/admin/broadcast-status/", {"id": response.data["data"]["id"]})
+        # Assert
+        assert response.status_code == 200
+        assert response.data["data"]["status"] == 'done'
+        assert response.data["data"]["recipients"] == 1
+
+    def test_unknown_segment_filter(self, admin_client):
+        # Act
+        response = admin_client.post("/api/notification/admin/broadcast/",
+                                     {"message": "Sale", "segment": {"age": 30}}, format="json")
+        # Assert
+        assert response.status_code == 400
+        assert Broadcast.objects.count() == 0
+
+    @pytest.mark.parametrize("joined_after", ["2024-02-30T00:00", "yesterday", 20240201])
+    def test_invalid_joined_after(self, admin_client, joined_after):
+        # Act
+        response = admin_client.post("/api/notification/admin/broadcast/",
+                                     {"message": "Sale", "segment": {"joined_after": joined_after}}, format="json")
+        # Assert
+        assert response.status_code == 400
+        assert Broadcast.objects.count() == 0
+
+    def test_requires_admin(self, guest_client):
+        # Act
+        response = guest_client.post("/api/notification/admin/broadcast/", {"message": "Sale"}, format="json")
+        # Assert
+        assert response.status_code in (401, 403)
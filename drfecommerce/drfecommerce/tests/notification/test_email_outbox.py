@@ -0,0 +1,103 @@
+import datetime
+from smtplib import SMTPException
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+from drfecommerce.apps.notification.models import OutboundEmail
+from drfecommerce.apps.notification.outbox import enqueue_email, send_pending_emails
+
+pytestmark = pytest.mark.django_db
+
+FAILING_BACKEND = "drfecommerce.tests.notification.test_email_outbox.FailingBackend"
+
+
+class FailingBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise SMTPException("Connection unexpectedly closed")
+
+
+class CountingBackend(BaseEmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+
+    def send_messages(self, email_messages):
+        mail.outbox.extend(email_messages)
+        return len(email_messages)
+
+
+class TestOrderEndpointsEnqueue:
+    def test_cancel_order_only_enqueues(self, order, api_client, guest):
+        # Arrange
+        client = api_client()
+        client.force_authenticate(user=guest)
+        # Act
+        response = client.put("/api/order/cancel-order/", {"order_id": order.id}, format="json")
+        # Assert
+        assert response.status_code == 200
+        assert mail.outbox == []
+        email = OutboundEmail.objects.get()
+        assert (email.status, email.subject) == ("pending", f"Order #{order.id} Cancellation Notice")
+        assert email.html_body
+
+
+class TestSendPendingEmails:
+    def test_batch_is_sent_over_one_connection(self, settings):
+        # Arrange
+        settings.EMAIL_BACKEND = "drfecommerce.tests.notification.test_email_outbox.CountingBackend"
+        CountingBackend.opened = 0
+        for i in range(3):
+            enqueue_email(f"Subject {i}", "Body", ["guest@example.com"], html_message="<p>Body</p>")
+        # Act
+        sent, failed = send_pending_emails(batch_size=10)
+        # Assert
+        assert (sent, failed, CountingBackend.opened) == (3, 0, 1)
+        assert [message.subject for message in mail.outbox] == ["Subject 0", "Subject 1", "Subject 2"]
+        assert mail.outbox[0].alternatives == [("<p>Body</p>", "text/html")]
+        assert not OutboundEmail.objects.exclude(status="sent").exists()
+
+    def test_failed_email_is_retried_with_backoff(self, settings):
+        # Arrange
+        settings.EMAIL_BACKEND = FAILING_BACKEND
+        settings.EMAIL_OUTBOX_RETRY_DELAY = 60
+        email = enqueue_email("Subject", "Body", ["guest@example.com"])
+        before = timezone.now()
+        # Act
+        send_pending_emails()
+        send_pending_emails()  # chưa đến hạn retry nên không gửi lại
+        OutboundEmail.objects.filter(pk=email.pk).update(next_attempt_at=before)
+        send_pending_emails()
+        # Assert
+        email.refresh_from_db()
+        assert (email.status, email.attempts) == ("pending", 2)
+        assert "Connection unexpectedly closed" in email.last_error
+        assert email.next_attempt_at >= before + datetime.timedelta(seconds=120)
+
+    def test_email_fails_after_max_attempts(self, settings):
+        # Arrange
+        settings.EMAIL_BACKEND = FAILING_BACKEND
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        email = enqueue_email("Subject", "Body", ["guest@example.com"])
+        # Act
+        for _ in range(2):
+            OutboundEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+            send_pending_emails()
+        # Assert
+        email.refresh_from_db()
+        assert (email.status, email.attempts) == ("failed", 2)
+
+    def test_command_sends_with_file_backend(self, settings, tmp_path):
+        # Arrange
+        settings.EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
+        settings.EMAIL_FILE_PATH = str(tmp_path)
+        enqueue_email("Order #1", "Body", ["admin@example.com"])
+        # Act
+        call_command("send_outbound_emails")
+        # Assert
+        assert "Subject: Order #1" in next(tmp_path.iterdir()).read_text()
+        assert OutboundEmail.objects.get().status == "sent"
@@ -0,0 +1,117 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient
+
+from drfecommerce.apps.guest.utils import generate_access_token
+from drfecommerce.apps.notification.models import Notification
+from drfecommerce.apps.notification.views import create_notification
+from drfecommerce.pubsub import InProcessBroker, get_broker
+
+ENDPOINT = "/api/notification/stream/"
+
+
+def parse_event(chunk):
+    chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+    fields = dict(line.split(": ", 1) for line in chunk.strip().splitlines() if not line.startswith(":"))
+    if "data" in fields:
+        fields["data"] = json.loads(fields["data"])
+    return fields
+
+
+class TestInProcessBroker:
+    def test_publish_from_other_thread_reaches_subscriber(self):
+        # Arrange
+        broker = InProcessBroker()
+
+        async def run():
+            subscription = await broker.subscribe("notifications:1")
+            thread = threading.Thread(target=broker.publish, args=("notifications:1", {"id": 7}))
+            thread.start()
+            message = await subscription.get(timeout=1)
+            thread.join()
+            await subscription.close()
+            return message
+
+        # Act
+        message = asyncio.run(run())
+        # Assert
+        assert message == {"id": 7}
+        assert broker.subscriber_count("notifications:1") == 0
+
+    def test_slow_subscriber_is_marked_overflowed(self, settings):
+        # Arrange
+        settings.PUSH_QUEUE_SIZE = 2
+        broker = InProcessBroker()
+
+        async def run():
+            subscription = await broker.subscribe("notifications:1")
+            for index in range(3):
+                broker.publish("notifications:1", {"id": index})
+            await asyncio.sleep(0)
+            return subscription
+
+        # Act
+        subscription = asyncio.run(run())
+        # Assert
+        assert subscription.overflowed
+
+    def test_timeout_returns_none(self):
+        # Arrange
+        broker = InProcessBroker()
+
+        async def run():
+            subscription = await broker.subscribe("notifications:1")
+            return await subscription.get(timeout=0.01)
+
+        # Act / Assert
+        assert asyncio.run(run()) is None
+
+
+@pytest.mark.django_db(transaction=True)
+class TestNotificationStream:
+    def test_streams_catch_up_then_new_notifications(self, guest, settings):
+        # Arrange
+        settings.PUSH_BROKER = "memory"
+        settings.PUSH_HEARTBEAT_SECONDS = 1
+        missed = Notification.objects.create(guest=guest, notification_type="general", message="While offline")
+        token = generate_access_token(guest)
+
+        async def run():
+            response = await AsyncClient().get(ENDPOINT, {"access_token": token, "last_event_id": missed.id - 1})
+            events = aiter(response.streaming_content)
+            received = [await anext(events) for _ in range(3)]
+            await sync_to_async(create_notification)(
+                guest=guest, notification_type="order_update", message="Order shipped", related_object_id=5)
+            received.append(await anext(events))
+            await events.aclose()
+            return response, received
+
+        # Act
+        response, received = asyncio.run(run())
+        # Assert
+        assert response.status_code == 200
+        assert response["Content-Type"] == "text/event-stream"
+        retry, catch_up, unread, pushed = (parse_event(chunk) for chunk in received)
+        assert "retry" in retry
+        assert (catch_up["event"], catch_up["data"]["message"]) == ("notification", "While offline")
+        assert unread == {"event": "unread_count", "data": {"unread_count": 1}}
+        assert pushed["event"] == "notification"
+        assert pushed["data"]["message"] == "Order shipped"
+        assert int(pushed["id"]) == Notification.objects.get(message="Order shipped").id
+        assert get_broker().subscriber_count(f"notifications:{guest.id}") == 0
+
+    def test_rejects_invalid_token(self):
+        # Act
+        response = asyncio.run(AsyncClient().get(ENDPOINT, {"access_token": "not-a-token"}))
+        # Assert
+        assert response.status_code == 401
+
+    def test_wsgi_request_is_not_supported(self, client, guest):
+        # Act
+        response = client.get(ENDPOINT, {"access_token": generate_access_token(guest)})
+        # Assert
+        assert response.status_code == 501
@@ -0,0 +1,130 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from drfecommerce.apps.notification.counters import unread_count
+from drfecommerce.apps.notification.models import Notification
+from drfecommerce.apps.notification.views import create_notification
+
+pytestmark = pytest.mark.django_db
+
+
+def notify(guest, count, capture):
+    with capture(execute=True):
+        for index in range(count):
+            create_notification(guest=guest, notification_type="general", message=f"Message {index}")
+    return list(Notification.objects.filter(guest=guest).order_by('id'))
+
+
+class TestUnreadCounter:
+    def test_counter_is_warm_after_first_read(self, guest, django_capture_on_commit_callbacks):
+        # Arrange
+        notify(guest, 3, django_capture_on_commit_callbacks)
+        assert unread_count(guest.id) == 3
+        # Act
+        with CaptureQueriesContext(connection) as ctx:
+            count = unread_count(guest.id)
+        # Assert
+        assert count == 3
+        assert len(ctx.captured_queries) == 0
+
+    def test_create_notification_increments_warm_counter(self, guest, django_capture_on_commit_callbacks):
+        # Arrange
+        notify(guest, 1, django_capture_on_commit_callbacks)
+        unread_count(guest.id)
+        # Act
+        notify(guest, 2, django_capture_on_commit_callbacks)
+        # Assert
+        with CaptureQueriesContext(connection) as ctx:
+            assert unread_count(guest.id) == 3
+        assert len(ctx.captured_queries) == 0
+
+    def test_unread_count_endpoint(self, guest, guest_client, django_capture_on_commit_callbacks):
+        # Arrange
+        notify(guest, 2, django_capture_on_commit_callbacks)
+        # Act
+        response = guest_client.get("/api/notification/unread-count/", {"guest_id": guest.id})
+        # Assert
+        assert response.status_code == 200
+        assert response.data["data"]["unread_count"] == 2
+
+
+class TestMarkAsRead:
+    def test_read_notification_decrements_once(self, guest, guest_client, django_capture_on_commit_callbacks):
+        # Arrange
+        first, _ = notify(guest, 2, django_capture_on_commit_callbacks)
+        unread_count(guest.id)
+        # Act
+        with django_capture_on_commit_callbacks(execute=True):
+            for _ in range(2):
+                response = guest_client.put("/api/notification/read-notification/", {"noti_id": first.id}, format="json")
+                assert response.status_code == 200
+        # Assert
+        assert Notification.objects.get(id=first.id).is_read
+        assert unread_count(guest.id) == 1
+
+    def test_read_notification_skips_write_when_already_read(self, guest, guest_client):
+        # Arrange
+        notification = Notification.objects.create(guest=guest, notification_type="general", message="Hi", is_read=True)
+        # Act
+        with CaptureQueriesContext(connection) as ctx:
+            response = guest_client.put("/api/notification/read-notification/", {"noti_id": notification.id}, format="json")
+        # Assert
+        assert response.status_code == 200
+        assert not any(q["sql"].upper().startswith("UPDATE") for q in ctx.captured_queries)
+
+    def test_bulk_read_selected_ids(self, guest, guest_factory, guest_client, django_capture_on_commit_callbacks):
+        # Arrange
+        notifications = notify(guest, 4, django_capture_on_commit_callbacks)
+        other = notify(guest_factory(), 1, django_capture_on_commit_callbacks)[0]
+        unread_count(guest.id)
+        ids = [notifications[0].id, notifications[1].id, other.id]
+        # Act
+        with django_capture_on_commit_callbacks(execute=True):
+            with CaptureQueriesContext(connection) as ctx:
+                response = guest_client.put("/api/notification/read-notifications/", {
+                    "guest_id": guest.id, "noti_ids": ids}, format="json")
+        # Assert
+        assert response.status_code == 200
+        assert response.data["data"]["updated"] == 2
+        assert len([q for q in ctx.captured_queries if q["sql"].upper().startswith("UPDATE")]) == 1
+        assert not Notification.objects.get(id=other.id).is_read
+        assert unread_count(guest.id) == 2
+
+    def test_bulk_read_all(self, guest, guest_client, django_capture_on_commit_callbacks):
+        # Arrange
+        notify(guest, 3, django_capture_on_commit_callbacks)
+        unread_count(guest.id)
+        # Act
+        with django_capture_on_commit_callbacks(execute=True):
+            response = guest_client.put("/api/notification/read-notifications/", {"guest_id": guest.id}, format="json")
+        # Assert
+        assert response.data["data"]["updated"] == 3
+        assert unread_count(guest.id) == 0
+        assert not Notification.objects.filter(guest=guest, is_read=False).exists()
+
+    def test_bulk_read_defaults_to_token_guest(self, guest, guest_client, django_capture_on_commit_callbacks):
+        # Arrange
+        notify(guest, 2, django_capture_on_commit_callbacks)
+        # Act
+        response = guest_client.put("/api/notification/read-notifications/", {}, format="json")
+        # Assert
+        assert response.data["data"]["updated"] == 2
+
+    def test_other_guest_is_forbidden(self, guest_factory, guest_client, django_capture_on_commit_callbacks):
+        # Arrange
+        other = guest_factory()
+        notify(other, 2, django_capture_on_commit_callbacks)
+        # Act
+        read = guest_client.put("/api/notification/read-notifications/", {"guest_id": other.id}, format="json")
+        count = guest_client.get("/api/notification/unread-count/", {"guest_id": other.id})
+        # Assert
+        assert (read.status_code, count.status_code) == (403, 403)
+        assert Notification.objects.filter(guest=other, is_read=False).count() == 2
+
+    def test_bulk_read_rejects_invalid_ids(self, guest, guest_client):
+        # Act
+        response = guest_client.put("/api/notification/read-notifications/", {
+            "guest_id": guest.id, "noti_ids": "1,2"}, format="json")
+        # Assert
+        assert response.status_code == 400
@@ -0,0 +1,104 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from drfecommerce.apps.order.checkout import place_order, CheckoutError, PLACE_ORDER_QUERY_BUDGET
+from drfecommerce.apps.order.models import Order
+from drfecommerce.apps.order_detail.models import OrderDetail
+from drfecommerce.apps.cart.models import CartItem
+from drfecommerce.apps.notification.models import Notification
+from drfecommerce.apps.product_store.models import ProductStore, StockReservation
+
+pytestmark = pytest.mark.django_db
+
+
+def order_data():
+    return {
+        "gst_amount": "0",
+        "shipping_cost": "0",
+        "payment_method": "cash_on_delivery",
+        "shipping_address": "1 Flower Street",
+        "recipient_phone": "0123456789",
+        "recipient_name": "Test Guest",
+    }
+
+
+class TestPlaceOrder:
+    def test_creates_order_lines_and_clears_cart(self, guest, store_factory, product_store_factory, cart_item_factory):
+        # Arrange
+        store = store_factory()
+        stocks = product_store_factory.create_batch(3, store=store)
+        for stock in stocks:
+            cart_item_factory(cart__guest=guest, product=stock.product, store=store)
+        details = [{"product_id": s.product_id, "store_id": store.id, "quantity": 2} for s in stocks]
+        # Act
+        order, serializer = place_order(guest, details, order_data())
+        # Assert
+        assert OrderDetail.objects.filter(order=order).count() == 3
+        assert order.total_cost == sum(s.product.price * 2 for s in stocks)
+        assert not CartItem.objects.filter(cart__guest=guest).exists()
+        assert Notification.objects.filter(guest=guest, related_object_id=order.id).exists()
+        assert serializer.data["id"] == order.id
+
+    def test_reserves_stock_when_order_is_placed(self, guest, product_store_factory):
+        # Arrange
+        stock = product_store_factory(remaining_stock=5)
+        details = [{"product_id": stock.product_id, "store_id": stock.store_id, "quantity": 2}]
+        # Act
+        order, _ = place_order(guest, details, order_data())
+        # Assert
+        assert ProductStore.objects.get(id=stock.id).remaining_stock == 3
+        assert StockReservation.objects.get(order=order).status == "held"
+
+    @pytest.mark.parametrize("line_count", [1, 5, 20])
+    def test_query_count_is_constant(self, guest, store, product_store_factory, line_count):
+        # Arrange
+        stocks = product_store_factory.create_batch(line_count, store=store)
+        details = [{"product_id": s.product_id, "store_id": store.id, "quantity": 1} for s in stocks]
+        # Act
+        with CaptureQueriesContext(connection) as ctx:
+            place_order(guest, details, order_data())
+        # Assert
+        assert len(ctx.captured_queries) <= PLACE_ORDER_QUERY_BUDGET
+
+    def test_not_enough_stock_creates_nothing(self, guest, product_store_factory):
+        # Arrange
+        stock = product_store_factory(remaining_stock=1)
+        details = [
+            {"product_id": stock.product_id, "store_id": stock.store_id, "quantity": 1},
+            {"product_id": stock.product_id, "store_id": stock.store_id, "quantity": 1},
+        ]
+        # Act
+        with pytest.raises(CheckoutError) as error:
+            place_order(guest, details, order_data())
+        # Assert
+        assert error.value.status_code == 400
+        assert "Not enough stock" in error.value.message
+        assert not Order.objects.exists()
+        assert ProductStore.objects.get(id=stock.id).remaining_stock == 1
+
+    def test_unknown_product_returns_404(self, guest, store):
+        # Arrange
+        details = [{"product_id": 999999, "store_id": store.id, "quantity": 1}]
+        # Act
+        with pytest.raises(CheckoutError) as error:
+            place_order(guest, details, order_data())
+        # Assert
+        assert error.value.status_code == 404
+
+
+class TestCreateNewOrderEndpoint:
+    endpoint = "/api/order/create-new-order/"
+
+    def test_create_new_order(self, guest, product_store, api_client):
+        # Arrange
+        client = api_client()
+        client.force_authenticate(user=guest)
+        payload = dict(order_data(), guest_id=guest.id, payment_methods="cash_on_delivery", order_details=[
+            {"product_id": product_store.product_id, "store_id": product_store.store_id, "quantity": 2},
+        ])
+        # Act
+        response = client.post(self.endpoint, payload, format="json")
+        # Assert
+        assert response.status_code == 201
+        assert OrderDetail.objects.filter(order_id=response.data["id"]).count() == 1
@@ -0,0 +1,60 @@
+import csv
+import datetime
+import io
+import zipfile
+
+import pytest
+from django.utils import timezone
+
+pytestmark = pytest.mark.django_db
+
+
+def read_csv(response):
+    return list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+
+
+class TestAdminExportOrdersEndpoint:
+    endpoint = "/api/order/admin/export-orders/"
+
+    def test_csv_uses_the_list_filters(self, my_admin, order_factory, api_client):
+        # Arrange
+        local = lambda *args: timezone.make_aware(datetime.datetime(*args))
+        first = order_factory(order_date=local(2024, 3, 1, 0, 0), order_status="pending")
+        last = order_factory(order_date=local(2024, 3, 2, 23, 59, 59), order_status="pending")
+        order_factory(order_date=local(2024, 3, 2, 12, 0), order_status="cancelled")
+        order_factory(order_date=local(2024, 3, 3, 0, 0), order_status="pending")
+        client = api_client()
+        client.force_authenticate(user=my_admin)
+        # Act
+        response = client.get(self.endpoint, {"start_date": "2024-03-01", "end_date": "2024-03-02", "order_status": "pending"})
+        # Assert
+        assert response.status_code == 200
+        assert response["Content-Disposition"] == 'attachment; filename="orders.csv"'
+        header, *rows = read_csv(response)
+        assert header[:2] == ["id", "order_date"]
+        assert [(row[0], row[1]) for row in rows] == [
+            (str(first.id), "2024-03-01 00:00:00"), (str(last.id), "2024-03-02 23:59:59")]
+
+    def test_xlsx(self, my_admin, order_factory, api_client):
+        # Arrange
+        order_factory.create_batch(3)
+        client = api_client()
+        client.force_authenticate(user=my_admin)
+        # Act
+        response = client.get(self.endpoint, {"file_format": "xlsx"})
+        # Assert
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("application/vnd.openxmlformats")
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        assert archive.read("xl/worksheets/sheet1.xml").count(b"<row ") == 4
+
+    @pytest.mark.parametrize("params", [{"file_format": "pdf"}, {"start_date": "01-03-2024"}])
+    def test_invalid_params(self, my_admin, api_client, params):
+        # Arrange
+        client = api_client()
+        client.force_authenticate(user=my_admin)
+        # Act
+        response = client.get(self.endpoint, params)
+        # Assert
+        assert response.status_code == 400
+
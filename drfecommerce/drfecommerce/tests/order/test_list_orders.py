@@ -0,0 +1,38 @@
+import datetime
+
+import pytest
+from django.utils import timezone
+
+pytestmark = pytest.mark.django_db
+
+
+class TestAdminListOrdersEndpoint:
+    endpoint = "/api/order/admin/get-list-orders/"
+
+    def test_date_range_covers_whole_local_days(self, my_admin, order_factory, api_client):
+        # Arrange
+        local = lambda *args: timezone.make_aware(datetime.datetime(*args))
+        inside_first = order_factory(order_date=local(2024, 3, 1, 0, 0))
+        inside_last = order_factory(order_date=local(2024, 3, 2, 23, 59, 59))
+        order_factory(order_date=local(2024, 2, 29, 23, 59, 59))
+        order_factory(order_date=local(2024, 3, 3, 0, 0))
+        client = api_client()
+        client.force_authenticate(user=my_admin)
+        # Act
+        response = client.get(self.endpoint, {"start_date": "2024-03-01", "end_date": "2024-03-02"})
+        # Assert
+        assert response.status_code == 200
+        assert {order["id"] for order in response.data["data"]["orders"]} == {inside_first.id, inside_last.id}
+
+    def test_cursor_pages_follow_order_date(self, my_admin, order_factory, api_client):
+        # Arrange: created_at ngược thứ tự với order_date
+        local = lambda *args: timezone.make_aware(datetime.datetime(*args))
+        orders = [order_factory(order_date=local(2024, 3, day), created_at=local(2024, 4, 10 - day)) for day in (1, 2, 3)]
+        client = api_client()
+        client.force_authenticate(user=my_admin)
+        # Act
+        first = client.get(self.endpoint, {"cursor": "", "page_size": 2})
+        second = client.get(self.endpoint, {"cursor": first.data["data"]["next_cursor"], "page_size": 2})
+        # Assert
+        assert [order["id"] for order in first.data["data"]["orders"]] == [orders[2].id, orders[1].id]
+        assert [order["id"] for order in second.data["data"]["orders"]] == [orders[0].id]
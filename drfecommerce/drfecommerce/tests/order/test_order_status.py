@@ -0,0 +1,69 @@
+import pytest
+
+from drfecommerce.apps.product_store.models import ProductStore, StockReservation
+
+pytestmark = pytest.mark.django_db
+
+
+class TestUpdateOrderStatusEndpoint:
+    endpoint = "/api/order/admin/update-order-status/"
+
+    def test_cancel_releases_reserved_stock(self, my_admin, order_detail_factory, product_store_factory, api_client):
+        # Arrange
+        stock = product_store_factory(remaining_stock=6)
+        detail = order_detail_factory(product=stock.product, store=stock.store, quantity=4)
+        StockReservation.objects.create(order=detail.order, status="held")
+        client = api_client()
+        client.force_authenticate(user=my_admin)
+        # Act
+        response = client.put(self.endpoint, {"order_id": detail.order_id, "order_status": "cancelled"}, format="json")
+        # Assert
+        assert response.status_code == 200
+        assert ProductStore.objects.get(id=stock.id).remaining_stock == 10
+
+    def test_confirm_does_not_deduct_held_stock_again(self, my_admin, order_detail_factory, product_store_factory, api_client):
+        # Arrange
+        stock = product_store_factory(remaining_stock=6)
+        detail = order_detail_factory(product=stock.product, store=stock.store, quantity=4)
+        StockReservation.objects.create(order=detail.order, status="held")
+        client = api_client()
+        client.force_authenticate(user=my_admin)
+        # Act
+        response = client.put(self.endpoint, {"order_id": detail.order_id, "order_status": "confirmed"}, format="json")
+        # Assert
+        assert response.status_code == 200
+        assert ProductStore.objects.get(id=stock.id).remaining_stock == 6
+        assert StockReservation.objects.get(order=detail.order).status == "committed"
+
+    @pytest.mark.django_db(transaction=True)
+    def test_failed_transition_rolls_back_stock(self, my_admin, order_detail_factory, product_store_factory, api_client,
+                                                monkeypatch):
+        # Arrange
+        stock = product_store_factory(remaining_stock=6)
+        detail = order_detail_factory(product=stock.product, store=stock.store, quantity=4, order__order_status="pending")
+        StockReservation.objects.create(order=detail.order, status="held")
+        client = api_client()
+        client.force_authenticate(user=my_admin)
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("notification failed")
+
+        monkeypatch.setattr("drfecommerce.apps.order.views.create_notification", fail)
+        client.raise_request_exception = False
+        # Act
+        response = client.put(self.endpoint, {"order_id": detail.order_id, "order_status": "confirmed"}, format="json")
+        # Assert
+        assert response.status_code == 500
+        detail.order.refresh_from_db()
+        assert detail.order.order_status == "pending"
+        assert StockReservation.objects.get(order=detail.order).status == "held"
+        assert ProductStore.objects.get(id=stock.id).remaining_stock == 6
+
+    def test_unknown_order(self, my_admin, api_client):
+        # Arrange
+        client = api_client()
+        client.force_authenticate(user=my_admin)
+        # Act
+        response = client.put(self.endpoint, {"order_id": 0, "order_status": "confirmed"}, format="json")
+        # Assert
+        assert response.status_code == 404
@@ -0,0 +1,183 @@
+import json
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+
+from drfecommerce.apps.product.models import Product
+
+pytestmark = pytest.mark.django_db
+
+
+def upload(name, content):
+    return SimpleUploadedFile(name, content.encode('utf-8'))
+
+
+class TestImportProducts:
+    endpoint = "/api/product/admin/import-products/"
+
+    def test_csv_import_creates_and_updates_by_code(self, my_admin, product, catalog_factory, admin_client):
+        # Arrange
+        catalog = catalog_factory(name="Hoa cưới")
+        content = (
+            "code,name,price,quantity,catalog_name\n"
+            f"{product.code},Renamed,150000,7,Hoa cưới\n"
+            "NEW-1,Hoa hồng,200000,3,Hoa cưới\n"
+            "NEW-2,,abc,1,Hoa cưới\n"
+            "NEW-3,Unknown catalog,1000,1,Không có\n"
+        )
+
+        # Act
+        response = admin_client.post(self.endpoint, {"file": upload("products.csv", content)}, format="multipart")
+
+        # Assert
+        assert response.status_code == 200
+        data = response.data["data"]
+        assert (data["created"], data["updated"], data["failed"]) == (1, 1, 2)
+        assert [error["line"] for error in data["errors"]] == [4, 5]
+        product.refresh_from_db()
+        assert (product.name, product.price, product.quantity, product.catalog_id) == ("Renamed", 150000, 7, catalog.id)
+        # Cột không có trong file thì giữ nguyên
+        assert product.material == "rose"
+        created = Product.objects.get(code="NEW-1")
+        assert created.admin_id == my_admin.id
+        assert created.search_text == "hoa hong"
+
+    def test_jsonl_import_in_batches(self, catalog, admin_client):
+        # Arrange
+        lines = [json.dumps({"code": f"J{i}", "name": f"Product {i}", "price": 1000 + i, "catalog_id": catalog.id})
+                 for i in range(5)]
+        lines.append(json.dumps({"code": "J0", "name": "Last one wins", "price": 1, "catalog_id": catalog.id}))
+        lines.append("not json")
+
+        # Act
+        response = admin_client.post(self.endpoint, {"file": upload("products.jsonl", "\n".join(lines)), "batch_size": 2},
+                                      format="multipart")
+
+        # Assert
+        data = response.data["data"]
+        assert (data["created"], data["failed"]) == (5, 1)
+        assert Product.objects.get(code="J0").name == "Last one wins"
+
+    def test_invalid_utf8_after_valid_rows(self, admin_client):
+        # Arrange: TextIOWrapper giải mã theo khối 8KB, byte lỗi nằm sau khối đầu tiên
+        rows = "".join(f"OK-{i},Product {i},1000\n" for i in range(500))
+        content = ("code,name,price\n" + rows).encode("utf-8") + b"BAD-1,Hoa h\xf4ng,1000\n"
+
+        # Act
+        response = admin_client.post(self.endpoint, {"file": SimpleUploadedFile("products.csv", content)}, format="multipart")
+
+        # Assert
+        assert response.status_code == 200
+        data = response.data["data"]
+        assert data["failed"] == 1
+        assert Product.objects.filter(code__startswith="OK-").exists()
+        assert not Product.objects.filter(code="BAD-1").exists()
+
+    @pytest.mark.parametrize("name, content", [
+        ("products.csv", b"code,name,price\n\xff\xfeA,B,1\n"),
+        ("products.jsonl", b'{"code": "\xff"}\n'),
+    ])
+    def test_invalid_utf8_file(self, name, content, admin_client):
+        # Act
+        response = admin_client.post(
+            self.endpoint, {"file": SimpleUploadedFile(name, content)}, format="multipart")
+
+        # Assert
+        assert response.status_code == 200
+        data = response.data["data"]
+        assert (data["created"], data["failed"]) == (0, 1)
+        assert data["errors"][0]["line"] == 1
+
+    def test_malformed_csv(self, admin_client):
+        # Arrange: ô dài hơn csv.field_size_limit() làm csv.reader báo lỗi
+        content = f"code,name,price\nOK-1,Lily,1000\nBIG-1,{'x' * 200000},1000\nOK-2,Rose,1000\n"
+
+        # Act
+        response = admin_client.post(self.endpoint, {"file": upload("products.csv", content)}, format="multipart")
+
+        # Assert
+        assert response.status_code == 200
+        data = response.data["data"]
+        assert (data["created"], data["failed"]) == (1, 1)
+        assert data["errors"][0]["line"] == 3
+        assert Product.objects.filter(code="OK-1").exists()
+
+    def test_management_command(self, tmp_path, catalog):
+        # Arrange
+        path = tmp_path / "products.csv"
+        path.write_text(f"code,name,price,catalog_id\nCMD-1,Lily,5000,{catalog.id}\n", encoding="utf-8")
+
+        # Act
+        call_command("import_products", str(path))
+
+        # Assert
+        assert Product.objects.get(code="CMD-1").catalog_id == catalog.id
+
+
+class TestProductCode:
+    fields = {"name": "Lily", "short_description": "", "description": "", "product_type": "", "price": 1000,
+              "member_price": 0, "quantity": 1, "image": "", "gallery": "", "weight": 0, "diameter": 0,
+              "dimensions": "", "material": "", "label": ""}
+
+    def test_blank_codes_are_stored_as_null(self, my_admin, catalog, admin_client):
+        # Arrange
+        payload = {**self.fields, "admin_id": my_admin.id, "catalog_id": catalog.id, "code": ""}
+
+        # Act
+        responses = [admin_client.post("/api/product/admin/create-new-product/", payload, format="json") for _ in range(2)]
+
+        # Assert
+        assert [response.status_code for response in responses] == [201, 201]
+        assert Product.objects.filter(code__isnull=True).count() == 2
+
+    def test_duplicate_code_is_rejected(self, my_admin, product_factory, catalog, admin_client):
+        # Arrange
+        existing, other = product_factory(code="DUP-1"), product_factory(code="OTHER-1")
+
+        # Act
+        created = admin_client.post("/api/product/admin/create-new-product/",
+                                    {**self.fields, "admin_id": my_admin.id, "catalog_id": catalog.id, "code": "DUP-1"},
+                                    format="json")
+        edited = admin_client.put("/api/product/admin/edit-product/",
+                                  {**self.fields, "id": other.id, "sku": "", "part_number": "", "code": "DUP-1"},
+                                  format="json")
+
+        # Assert
+        assert (created.status_code, created.data["message"]) == (400, "Product code already exists.")
+        assert (edited.status_code, edited.data["message"]) == (400, "Product code already exists.")
+        other.refresh_from_db()
+        assert other.code == "OTHER-1"
+        assert Product.objects.filter(code="DUP-1").count() == 1
+
+
+class TestExportProducts:
+    def test_export_streams_rows_that_can_be_imported_again(self, product_factory, admin_client):
+        # Arrange
+        products = product_factory.create_batch(3)
+
+        # Act
+        response = admin_client.get("/api/product/admin/export-products/")
+        content = b"".join(response.streaming_content).decode("utf-8")
+        Product.objects.all().delete()
+        reimport = admin_client.post("/api/product/admin/import-products/", {"file": upload("products.csv", content)},
+                                     format="multipart")
+
+        # Assert
+        assert response.status_code == 200
+        assert response.streaming
+        assert content.splitlines()[0].startswith("code,name,")
+        assert reimport.data["data"]["created"] == 3
+        assert sorted(Product.objects.values_list("code", flat=True)) == sorted(p.code for p in products)
+
+    def test_export_jsonl(self, product_factory, admin_client):
+        # Arrange
+        product = product_factory()
+
+        # Act
+        response = admin_client.get("/api/product/admin/export-products/", {"file_format": "jsonl"})
+
+        # Assert
+        assert response.status_code == 200
+        lines = b"".join(response.streaming_content).decode("utf-8").splitlines()
+        assert [json.loads(line)["code"] for line in lines] == [product.code]
@@ -4,34 +4,34 @@ import json
 pytestmark = pytest.mark.django_db
 
 
-class TestCategoryEndpoints:
-    endpoint = "/api/category/"
+class TestCatalogEndpoints:
+    endpoint = "/api/catalog/get-list-catalogs/"
 
-    def test_category_get(self, category_factory, api_client):
+    def test_catalog_get(self, catalog_factory, api_client):
         # Arrange
-        category_factory.create_batch(4)
+        catalog_factory.create_batch(4)
         # Act
         response = api_client().get(self.endpoint)
         # Assert
         assert response.status_code == 200
-        assert len(json.loads(response.content)) == 4
+        assert len(json.loads(response.content)["data"]["data"]) == 4
 
 
-class TestBrandEndpoints:
-    endpoint = "/api/brand/"
+class TestPromotionEndpoints:
+    endpoint = "/api/promotion/get-list-promotions/"
 
-    def test_brand_get(self, brand_factory, api_client):
+    def test_promotion_get(self, promotion_factory, api_client):
         # Arrange
-        brand_factory.create_batch(4)
+        promotion_factory.create_batch(4)
         # Act
         response = api_client().get(self.endpoint)
         # Assert
         assert response.status_code == 200
-        assert len(json.loads(response.content)) == 4
+        assert len(json.loads(response.content)["data"]["promotions"]) == 4
 
 
 class TestProductEndpoints:
-    endpoint = "/api/product/"
+    endpoint = "/api/product/get-list-products/"
 
     def test_product_get(self, product_factory, api_client):
         # Arrange
@@ -40,4 +40,12 @@ class TestProductEndpoints:
         response = api_client().get(self.endpoint)
         # Assert
         assert response.status_code == 200
-        assert len(json.loads(response.content)) == 4
+        assert len(json.loads(response.content)["data"]["products"]) == 4
+
+    def test_product_detail_get(self, product, api_client):
+        # Arrange
+        # Act
+        response = api_client().get("/api/product/get-detail-product/", {"id": product.id})
+        # Assert
+        assert response.status_code == 200
+        assert json.loads(response.content)["data"]["name"] == product.name
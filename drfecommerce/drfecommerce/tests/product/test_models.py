@@ -12,13 +12,22 @@ class TestCategoryModel:
         assert obj.__str__() == "test_cat"
 
 
-class TestBrandModel:
-    def test_str_method(self, brand_factory):
+class TestCatalogModel:
+    def test_str_method(self, catalog_factory):
         # Arrange
         # Act
-        obj = brand_factory(name="test_brand")
+        obj = catalog_factory(name="test_catalog")
         # Assert
-        assert obj.__str__() == "test_brand"
+        assert obj.__str__() == "test_catalog"
+
+
+class TestPromotionModel:
+    def test_str_method(self, promotion_factory):
+        # Arrange
+        # Act
+        obj = promotion_factory(name="test_promotion")
+        # Assert
+        assert obj.__str__() == "test_promotion"
 
 
 class TestProductModel:
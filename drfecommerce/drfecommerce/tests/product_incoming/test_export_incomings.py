@@ -0,0 +1,57 @@
+import csv
+import io
+
+import pytest
+from django.utils import timezone
+
+from drfecommerce.apps.product_incoming.receipts import receive_goods
+
+pytestmark = pytest.mark.django_db
+
+
+class TestExportProductIncomingsEndpoint:
+    endpoint = "/api/product_incoming/admin/export-product-incomings/"
+
+    def test_same_rows_as_list(self, product_factory, store_factory, my_admin, api_client):
+        # Arrange
+        store, other_store = store_factory.create_batch(2)
+        products = product_factory.create_batch(3)
+        receive_goods([
+            {'product_id': product.id, 'store_id': target.id, 'cost_price': 5, 'quantity_in': 2}
+            for product in products for target in (store, other_store)
+        ])
+        client = api_client()
+        client.force_authenticate(user=my_admin)
+        params = {"store_id": store.id, "start_date": "2000-01-01", "end_date": "2999-12-31"}
+        # Act
+        response = client.get(self.endpoint, params)
+        listed = client.get("/api/product_incoming/admin/list-product-incomings/", {**params, "page_size": 100})
+        # Assert
+        assert response.status_code == 200
+        header, *rows = csv.reader(io.StringIO(b''.join(response.streaming_content).decode()))
+        assert header[:4] == ["id", "effective_date", "store_id", "store_name"]
+        assert sorted(int(row[0]) for row in rows) == sorted(
+            incoming["id"] for incoming in listed.data["data"]["product_incomings"])
+        assert len(rows) == 3
+
+
+class TestExpenditureStatistics:
+    endpoint = "/api/product_incoming/admin/expenditure-statistics/"
+
+    def test_cost_is_multiplied_by_quantity(self, product_factory, store_factory, my_admin, api_client):
+        # Arrange
+        store = store_factory()
+        product = product_factory()
+        receive_goods([
+            {'product_id': product.id, 'store_id': store.id, 'cost_price': 5, 'quantity_in': 3, 'vat': 1, 'shipping_cost': 2},
+            {'product_id': product.id, 'store_id': store.id, 'cost_price': 4, 'quantity_in': 1},
+        ])
+        client = api_client()
+        client.force_authenticate(user=my_admin)
+        today = timezone.localdate().isoformat()
+        # Act
+        response = client.get(self.endpoint, {"store_id": store.id, "start_date": today, "end_date": today})
+        empty = client.get(self.endpoint, {"store_id": store.id, "end_date": "2000-01-01"})
+        # Assert
+        assert response.data["data"]["total_expenditure"] == 22
+        assert empty.data["data"]["total_expenditure"] == 0
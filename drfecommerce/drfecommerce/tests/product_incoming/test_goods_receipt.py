@@ -0,0 +1,115 @@
+import threading
+
+import pytest
+from django.db import connection
+
+from drfecommerce.apps.product_incoming.models import ProductIncoming
+from drfecommerce.apps.product_incoming.receipts import receive_goods
+from drfecommerce.apps.product_store.models import ProductStore
+
+pytestmark = pytest.mark.django_db
+
+ENDPOINT = "/api/product_incoming/admin/goods-receipt/"
+
+
+def stock(product_id, store_id):
+    return ProductStore.objects.get(product_id=product_id, store_id=store_id)
+
+
+class TestGoodsReceipt:
+    def test_records_whole_delivery_note(self, product_store_factory, product_factory, admin_client):
+        # Arrange
+        existing = product_store_factory(quantity_in=10, remaining_stock=4)
+        new_product = product_factory()
+        payload = {
+            "store_id": existing.store_id,
+            "effective_date": "2024-05-01T08:00:00Z",
+            "lines": [
+                {"product_id": existing.product_id, "cost_price": "10.00", "quantity_in": 5},
+                {"product_id": existing.product_id, "cost_price": "11.00", "quantity_in": 1, "vat": "2.00"},
+                {"product_id": new_product.id, "cost_price": "20.00", "quantity_in": 3},
+            ],
+        }
+
+        # Act
+        response = admin_client.post(ENDPOINT, payload, format="json")
+
+        # Assert
+        assert response.status_code == 201
+        data = response.data["data"]
+        assert (data["lines"], data["total_quantity"]) == (3, 9)
+        assert data["total_cost"] == 50 + 11 + 2 + 60
+        stocks = {item["product_id"]: item for item in data["stocks"]}
+        assert (stocks[existing.product_id]["received"], stocks[existing.product_id]["remaining_stock"]) == (6, 10)
+        assert stocks[new_product.id]["quantity_in"] == 3
+        assert stock(existing.product_id, existing.store_id).quantity_in == 16
+        assert stock(new_product.id, existing.store_id).remaining_stock == 3
+        assert ProductIncoming.objects.filter(effective_date__year=2024).count() == 3
+
+    def test_unknown_product_writes_nothing(self, product_store, admin_client):
+        # Arrange
+        payload = {"store_id": product_store.store_id, "lines": [
+            {"product_id": product_store.product_id, "cost_price": "1.00", "quantity_in": 1},
+            {"product_id": 999999, "cost_price": "1.00", "quantity_in": 1},
+        ]}
+
+        # Act
+        response = admin_client.post(ENDPOINT, payload, format="json")
+
+        # Assert
+        assert response.status_code == 404
+        assert ProductIncoming.objects.count() == 0
+        assert stock(product_store.product_id, product_store.store_id).remaining_stock == product_store.remaining_stock
+
+    def test_line_without_store_is_rejected(self, product, admin_client):
+        # Act
+        response = admin_client.post(ENDPOINT, {"lines": [{"product_id": product.id, "cost_price": "1", "quantity_in": 1}]},
+                                     format="json")
+
+        # Assert
+        assert response.status_code == 400
+        assert "lines" in response.data["errors"]
+
+    def test_single_line_endpoint_uses_atomic_update(self, product_store, admin_client):
+        # Act
+        response = admin_client.post("/api/product_incoming/admin/create-product-incoming/", {
+            "product_id": product_store.product_id, "store_id": product_store.store_id,
+            "cost_price": "5.00", "quantity_in": 4,
+        }, format="json")
+
+        # Assert
+        assert response.status_code == 201
+        assert response.data["product_store"]["remaining_stock"] == product_store.remaining_stock + 4
+
+
+@pytest.mark.skipif(not connection.features.has_select_for_update, reason="needs a database with row locks (PostgreSQL)")
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentReceipts:
+    def test_concurrent_receipts_do_not_lose_updates(self, product_factory, store_factory):
+        # Arrange
+        first, second = product_factory(), product_factory()
+        store = store_factory()
+        barrier = threading.Barrier(20)
+
+        def receive(index):
+            # Đảo thứ tự dòng để kiểm tra không deadlock, dòng product_store được tạo lần đầu trong lúc tranh chấp
+            products = (first, second) if index % 2 else (second, first)
+            barrier.wait()
+            try:
+                receive_goods([{"product_id": p.id, "store_id": store.id, "cost_price": 1, "quantity_in": 2}
+                               for p in products])
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=receive, args=(i,)) for i in range(20)]
+
+        # Act
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Assert
+        assert stock(first.id, store.id).remaining_stock == 40
+        assert stock(second.id, store.id).quantity_in == 40
+        assert ProductIncoming.objects.count() == 40
@@ -0,0 +1,148 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+from django.utils import timezone
+
+from drfecommerce.apps.product_incoming.models import ProductIncoming
+from drfecommerce.apps.product_incoming.receipts import receive_goods
+from drfecommerce.apps.product_sale.models import DailyStoreSales, DailyProductSales, DailyCatalogSales
+from drfecommerce.apps.product_sale.rollups import record_sales, rebuild_rollups
+from drfecommerce.tests.product_sale.test_sales_rollups import make_sale
+
+pytestmark = pytest.mark.django_db
+
+ENDPOINT = "/api/product_sale/admin/analytics/"
+
+
+def local(*args):
+    return timezone.make_aware(datetime.datetime(*args))
+
+
+@pytest.fixture
+def activity(order, order_detail_factory, product_factory, store_factory, catalog_factory):
+    """
+    Hai store, hai catalog: bán hàng và nhập hàng trong tháng 3 và tháng 4/2024.
+    """
+    stores = store_factory.create_batch(2)
+    catalogs = catalog_factory.create_batch(2)
+    products = [product_factory(catalog=catalogs[0]), product_factory(catalog=catalogs[1])]
+    details = [order_detail_factory(order=order, product=products[i], store=stores[i]) for i in range(2)]
+    # sale_price 10.50
+    record_sales([
+        make_sale(details[0], 2, local(2024, 3, 1, 0, 30)),   # 21.00
+        make_sale(details[0], 1, local(2024, 3, 31, 23, 0)),  # 10.50
+        make_sale(details[1], 4, local(2024, 3, 15, 12, 0)),  # 42.00
+        make_sale(details[0], 1, local(2024, 4, 1, 0, 0)),    # 10.50
+    ])
+    receive_goods([
+        {'product_id': products[0].id, 'store_id': stores[0].id, 'cost_price': Decimal('5.00'), 'quantity_in': 3,
+         'vat': Decimal('1.00'), 'shipping_cost': Decimal('0.50')},  # 16.50
+        {'product_id': products[1].id, 'store_id': stores[1].id, 'cost_price': Decimal('4.00'), 'quantity_in': 5},  # 20.00
+    ], effective_date=local(2024, 3, 10, 9, 0))
+    return stores, catalogs, products
+
+
+class TestAnalyticsEndpoint:
+    def test_month_series_per_store(self, activity, admin_client):
+        # Arrange
+        stores, _, _ = activity
+        # Act
+        response = admin_client.get(ENDPOINT, {"period": "month", "group_by": "store"})
+        # Assert
+        assert response.status_code == 200, response.data
+        series = [(str(row["bucket"]), row["store_id"], row["revenue"], row["cost"], row["margin"], row["units_sold"], row["units_in"])
+                  for row in response.data["data"]["series"]]
+        assert series == [
+            ("2024-03-01", stores[0].id, Decimal("31.50"), Decimal("16.50"), Decimal("15.00"), 3, 3),
+            ("2024-03-01", stores[1].id, Decimal("42.00"), Decimal("20.00"), Decimal("22.00"), 4, 5),
+            ("2024-04-01", stores[0].id, Decimal("10.50"), Decimal("0.00"), Decimal("10.50"), 1, 0),
+        ]
+        assert response.data["data"]["totals"]["margin"] == Decimal("47.50")
+
+    def test_day_series_filtered_by_catalog(self, activity, admin_client):
+        # Arrange
+        _, catalogs, _ = activity
+        # Act
+        response = admin_client.get(ENDPOINT, {
+            "period": "day", "group_by": "catalog", "catalog_id": catalogs[0].id,
+            "start_date": "2024-03-01", "end_date": "2024-03-31"})
+        # Assert
+        assert response.status_code == 200, response.data
+        assert [(str(row["bucket"]), row["catalog_id"], row["revenue"], row["cost"])
+                for row in response.data["data"]["series"]] == [
+            ("2024-03-01", catalogs[0].id, Decimal("21.00"), Decimal("0.00")),
+            ("2024-03-10", catalogs[0].id, Decimal("0.00"), Decimal("16.50")),
+            ("2024-03-31", catalogs[0].id, Decimal("10.50"), Decimal("0.00")),
+        ]
+
+    def test_catalog_series_with_store_filter(self, activity, admin_client):
+        # Arrange
+        stores, catalogs, _ = activity
+        # Act
+        response = admin_client.get(ENDPOINT, {"period": "month", "group_by": "catalog", "store_id": stores[1].id})
+        # Assert
+        assert response.status_code == 200, response.data
+        assert [(str(row["bucket"]), row["catalog_id"], row["catalog_name"], row["margin"])
+                for row in response.data["data"]["series"]] == [
+            ("2024-03-01", catalogs[1].id, catalogs[1].name, Decimal("22.00")),
+        ]
+
+    def test_week_series_is_one_query(self, activity, admin_client, django_assert_max_num_queries):
+        # Act
+        with django_assert_max_num_queries(1):
+            response = admin_client.get(ENDPOINT, {"period": "week"})
+        # Assert
+        assert response.status_code == 200
+        # 2024-02-26, 2024-03-04, 2024-03-11, 2024-03-25, 2024-04-01
+        assert len(response.data["data"]["series"]) == 5
+        assert response.data["data"]["totals"]["revenue"] == Decimal("84.00")
+
+    @pytest.mark.parametrize("params", [{"period": "year"}, {"group_by": "product"}, {"start_date": "2024-13-01"}, {"end_date": "01/03/2024"}])
+    def test_invalid_params(self, admin_client, params):
+        # Act
+        response = admin_client.get(ENDPOINT, params)
+        # Assert
+        assert response.status_code == 400
+
+
+class TestCostRollups:
+    def test_receipts_without_sales_are_not_listed_as_sold(self, product_factory, store_factory, admin_client):
+        # Arrange
+        product, store = product_factory(), store_factory()
+        receive_goods([{'product_id': product.id, 'store_id': store.id, 'cost_price': Decimal('5.00'), 'quantity_in': 3}],
+                      effective_date=local(2024, 3, 10, 9, 0))
+        # Act
+        total_report = admin_client.get("/api/product_sale/admin/get-total-report/")
+        sold_products = admin_client.get("/api/product_sale/admin/get-list-sold-products-filter/")
+        # Assert
+        assert total_report.status_code == 200
+        assert total_report.data["data"] == []
+        assert sold_products.status_code == 200
+        assert sold_products.data["data"]["product_sale"] == []
+
+    def test_delete_incoming_subtracts_cost(self, activity, admin_client):
+        # Arrange
+        stores, _, _ = activity
+        incoming = ProductIncoming.objects.get(store=stores[1])
+        # Act
+        response = admin_client.delete(f"/api/product_incoming/admin/delete-product-incoming/?id={incoming.id}")
+        # Assert
+        assert response.status_code == 200
+        daily = DailyStoreSales.objects.get(store=stores[1], sale_date=datetime.date(2024, 3, 10))
+        assert (daily.cost, daily.quantity_in) == (Decimal("0.00"), 0)
+
+    def test_rebuild_matches_incremental(self, activity):
+        # Arrange
+        fields = ('store_id', 'sale_date', 'revenue', 'quantity_sold', 'sales_count', 'cost', 'quantity_in')
+        snapshot = lambda model, *extra: sorted(model.objects.values_list(*extra, *fields))
+        catalog_snapshot = lambda: sorted(DailyCatalogSales.objects.values_list('catalog_id', *fields[1:]))
+        incremental = (snapshot(DailyStoreSales), snapshot(DailyProductSales, 'product_id'), catalog_snapshot())
+        # Act
+        DailyStoreSales.objects.all().delete()
+        DailyProductSales.objects.all().delete()
+        DailyCatalogSales.objects.all().delete()
+        rebuild_rollups()
+        # Assert
+        assert (snapshot(DailyStoreSales), snapshot(DailyProductSales, 'product_id')) == incremental[:2]
+        assert catalog_snapshot() == incremental[2]
@@ -0,0 +1,39 @@
+import csv
+import datetime
+import io
+
+import pytest
+from django.utils import timezone
+
+from drfecommerce.tests.product_sale.test_sales_rollups import make_sale
+
+pytestmark = pytest.mark.django_db
+
+
+class TestExportProductsSaleEndpoint:
+    endpoint = "/api/product_sale/admin/export-products-sale/"
+
+    def test_filters_by_store_and_day(self, order, order_detail_factory, product_store_factory, my_admin, api_client):
+        # Arrange
+        local = lambda *args: timezone.make_aware(datetime.datetime(*args))
+        stock = product_store_factory()
+        other = product_store_factory()
+        detail = order_detail_factory(order=order, product=stock.product, store=stock.store, quantity=2)
+        other_detail = order_detail_factory(order=order, product=other.product, store=other.store, quantity=1)
+        inside = make_sale(detail, 2, local(2024, 3, 1, 23, 0))
+        make_sale(detail, 1, local(2024, 3, 2, 0, 0))
+        make_sale(other_detail, 1, local(2024, 3, 1, 10, 0))
+        client = api_client()
+        client.force_authenticate(user=my_admin)
+        # Act
+        response = client.get(self.endpoint, {"store_id": stock.store.id, "start_date": "2024-03-01", "end_date": "2024-03-01"})
+        # Assert
+        assert response.status_code == 200
+        header, *rows = csv.reader(io.StringIO(b''.join(response.streaming_content).decode()))
+        assert [dict(zip(header, row)) for row in rows] == [{
+            "id": str(inside.id), "sale_date": "2024-03-01 23:00:00",
+            "store_id": str(stock.store.id), "store_name": stock.store.name,
+            "product_id": str(stock.product.id), "product_code": stock.product.code, "product_name": stock.product.name,
+            "order_id": str(order.id), "sale_price": "10.50", "quantity_sold": "2",
+            "vat": "0.00", "shipping_cost": "0.00",
+        }]
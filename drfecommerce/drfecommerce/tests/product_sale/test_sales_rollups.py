@@ -0,0 +1,130 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from drfecommerce.apps.product_sale.models import ProductSale, DailyStoreSales, DailyProductSales, DailyCatalogSales
+from drfecommerce.apps.product_sale.rollups import record_sales
+from drfecommerce.apps.product_store.models import StockReservation
+
+pytestmark = pytest.mark.django_db
+
+
+def make_sale(detail, quantity, sale_date):
+    sale = ProductSale.objects.create(
+        product=detail.product, store=detail.store, order_detail=detail,
+        sale_price=Decimal("10.50"), quantity_sold=quantity)
+    # sale_date là auto_now_add nên phải cập nhật lại sau khi tạo
+    ProductSale.objects.filter(pk=sale.pk).update(sale_date=sale_date)
+    sale.sale_date = sale_date
+    return sale
+
+
+class TestDeliveryUpdatesRollups:
+    endpoint = "/api/order/admin/update-order-status/"
+
+    def test_delivered_order_is_added_once(self, order, order_detail_factory, product_store_factory, admin_client):
+        # Arrange
+        stock = product_store_factory()
+        other = product_store_factory(store=stock.store)
+        detail = order_detail_factory(
+            order=order, product=stock.product, store=stock.store, quantity=2, unit_price=Decimal("10.50"))
+        order_detail_factory(order=order, product=other.product, store=stock.store, quantity=1, unit_price=Decimal("4.00"))
+        StockReservation.objects.create(order=order, status="held")
+        # Act
+        for _ in range(2):
+            response = admin_client.put(self.endpoint, {"order_id": order.id, "order_status": "delivered"}, format="json")
+            assert response.status_code == 200, response.data
+        # Assert
+        daily = DailyStoreSales.objects.get(store=detail.store)
+        assert (daily.revenue, daily.quantity_sold, daily.sales_count) == (Decimal("25.00"), 3, 2)
+        assert daily.sale_date == timezone.localdate()
+        assert DailyProductSales.objects.get(product=detail.product).quantity_sold == 2
+        assert ProductSale.objects.count() == 2
+
+
+class TestReportsReadRollups:
+    local = staticmethod(lambda *args: timezone.make_aware(datetime.datetime(*args)))
+
+    @pytest.fixture
+    def sales(self, order_detail_factory):
+        first, second = order_detail_factory(), order_detail_factory()
+        sales = [
+            make_sale(first, 1, self.local(2024, 3, 1, 0, 0)),
+            make_sale(first, 2, self.local(2024, 3, 2, 23, 59)),
+            make_sale(second, 4, self.local(2024, 3, 2, 12, 0)),
+            make_sale(second, 8, self.local(2024, 3, 3, 0, 0)),
+        ]
+        record_sales(sales)
+        return first, second
+
+    def test_total_report_by_date_range(self, sales, admin_client):
+        # Arrange
+        first, second = sales
+        # Act
+        response = admin_client.get("/api/product_sale/admin/get-total-report/",
+                                     {"start_date": "2024-03-01", "end_date": "2024-03-02"})
+        # Assert
+        rows = {row["store__name"]: row for row in response.data["data"]}
+        assert rows[first.store.name]["total_quantity_sold"] == 3
+        assert rows[first.store.name]["total_revenue"] == Decimal("31.50")
+        assert rows[second.store.name]["total_quantity_sold"] == 4
+
+    def test_sold_products_filtered_by_store(self, sales, admin_client):
+        # Arrange
+        first, second = sales
+        # Act
+        response = admin_client.get("/api/product_sale/admin/get-list-sold-products-filter/",
+                                    {"store_id": second.store_id, "start_date": "2024-03-02"})
+        # Assert
+        assert response.status_code == 200
+        rows = response.data["data"]["product_sale"]
+        assert [(row["product__id"], row["total_quantity_sold"]) for row in rows] == [(second.product_id, 12)]
+
+    def test_backfill_matches_incremental_rollups(self, sales):
+        # Arrange
+        incremental = sorted(DailyProductSales.objects.values_list(
+            'product_id', 'store_id', 'sale_date', 'revenue', 'quantity_sold', 'sales_count'))
+        DailyStoreSales.objects.all().delete()
+        DailyProductSales.objects.all().delete()
+        # Act
+        call_command("backfill_sales_rollups")
+        # Assert
+        rebuilt = sorted(DailyProductSales.objects.values_list(
+            'product_id', 'store_id', 'sale_date', 'revenue', 'quantity_sold', 'sales_count'))
+        assert rebuilt == incremental
+        assert DailyStoreSales.objects.count() == 4
+
+
+class TestRollupConstraints:
+    def test_one_no_catalog_row_per_day(self):
+        # Arrange
+        day = datetime.date(2024, 3, 1)
+        DailyCatalogSales.objects.create(catalog=None, sale_date=day)
+        # Act / Assert
+        with pytest.raises(IntegrityError), transaction.atomic():
+            DailyCatalogSales.objects.create(catalog=None, sale_date=day)
+
+    def test_sales_without_catalog_add_to_one_row(self, order_detail_factory):
+        # Arrange
+        detail = order_detail_factory(product__catalog=None)
+        day = timezone.make_aware(datetime.datetime(2024, 3, 1, 12, 0))
+        # Act
+        record_sales([make_sale(detail, 1, day)])
+        record_sales([make_sale(detail, 2, day)])
+        # Assert
+        row = DailyCatalogSales.objects.get(catalog=None)
+        assert (row.quantity_sold, row.sales_count) == (3, 2)
+
+
+class TestReportDateValidation:
+    @pytest.mark.parametrize("endpoint", ["get-total-report", "get-list-sold-products-filter"])
+    @pytest.mark.parametrize("params", [{"start_date": "2024-02-30"}, {"end_date": "01/03/2024"}])
+    def test_invalid_dates_are_rejected(self, admin_client, endpoint, params):
+        # Act
+        response = admin_client.get(f"/api/product_sale/admin/{endpoint}/", params)
+        # Assert
+        assert response.status_code == 400
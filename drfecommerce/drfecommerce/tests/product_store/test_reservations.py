@@ -0,0 +1,125 @@
+import threading
+
+import pytest
+from django.db import connection, transaction
+
+from drfecommerce.apps.product_store.models import ProductStore, StockReservation
+from drfecommerce.apps.product_store.reservations import (
+    lock_stock_rows,
+    reserve_stock,
+    commit_order_stock,
+    release_order_stock,
+    InsufficientStock,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def remaining(product_store):
+    return ProductStore.objects.get(id=product_store.id).remaining_stock
+
+
+class TestReserveStock:
+    def test_reserves_whole_order_in_one_update(self, product_store_factory, django_assert_num_queries):
+        # Arrange
+        first = product_store_factory(remaining_stock=5)
+        second = product_store_factory(remaining_stock=5)
+        quantities = {(first.product_id, first.store_id): 2, (second.product_id, second.store_id): 3}
+        stocks = lock_stock_rows(quantities)
+        # Act
+        with django_assert_num_queries(1):
+            reserve_stock(stocks, quantities)
+        # Assert
+        assert remaining(first) == 3
+        assert remaining(second) == 2
+
+    def test_insufficient_stock_changes_nothing(self, product_store_factory):
+        # Arrange
+        first = product_store_factory(remaining_stock=5)
+        second = product_store_factory(remaining_stock=1)
+        quantities = {(first.product_id, first.store_id): 2, (second.product_id, second.store_id): 3}
+        # Act
+        with pytest.raises(InsufficientStock) as error:
+            reserve_stock(lock_stock_rows(quantities), quantities)
+        # Assert
+        assert error.value.product_id == second.product_id
+        assert error.value.available == 1
+        assert remaining(first) == 5
+
+
+class TestOrderReservationLifecycle:
+    def test_commit_keeps_held_stock_and_release_is_idempotent(self, order_detail_factory, product_store_factory):
+        # Arrange
+        stock = product_store_factory(remaining_stock=10)
+        detail = order_detail_factory(product=stock.product, store=stock.store, quantity=4)
+        order = detail.order
+        quantities = {(stock.product_id, stock.store_id): 4}
+        reserve_stock(lock_stock_rows(quantities), quantities)
+        StockReservation.objects.create(order=order, status='held')
+        # Act
+        commit_order_stock(order)
+        commit_order_stock(order)
+        released = release_order_stock(order)
+        released_again = release_order_stock(order)
+        # Assert
+        assert remaining(stock) == 10
+        assert released is True
+        assert released_again is False
+        assert StockReservation.objects.get(order=order).status == 'released'
+
+    def test_legacy_pending_order_is_deducted_on_commit(self, order_detail_factory, product_store_factory):
+        # Arrange
+        stock = product_store_factory(remaining_stock=10)
+        order = order_detail_factory(product=stock.product, store=stock.store, quantity=3).order
+        # Act
+        commit_order_stock(order)
+        # Assert
+        assert remaining(stock) == 7
+        assert StockReservation.objects.get(order=order).status == 'committed'
+
+    def test_legacy_confirmed_order_is_not_deducted_twice(self, order_detail_factory, product_store_factory):
+        # Arrange
+        stock = product_store_factory(remaining_stock=10)
+        order = order_detail_factory(product=stock.product, store=stock.store, quantity=3, order__order_status='confirmed').order
+        # Act
+        commit_order_stock(order)
+        release_order_stock(order)
+        # Assert
+        assert remaining(stock) == 13
+
+
+@pytest.mark.skipif(not connection.features.has_select_for_update, reason="needs a database with row locks (PostgreSQL)")
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentReservations:
+    def test_no_overselling_under_contention(self, product_store_factory):
+        # Arrange
+        first = product_store_factory(remaining_stock=10)
+        second = product_store_factory(remaining_stock=10)
+        keys = [(first.product_id, first.store_id), (second.product_id, second.store_id)]
+        results = []
+        barrier = threading.Barrier(30)
+
+        def checkout(index):
+            # Đảo thứ tự các dòng giữa các thread để kiểm tra thứ tự khoá không gây deadlock
+            quantities = {key: 1 for key in (keys if index % 2 else reversed(keys))}
+            barrier.wait()
+            try:
+                with transaction.atomic():
+                    reserve_stock(lock_stock_rows(quantities), quantities)
+                results.append(True)
+            except InsufficientStock:
+                results.append(False)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=checkout, args=(i,)) for i in range(30)]
+        # Act
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Assert
+        assert results.count(True) == 10
+        assert results.count(False) == 20
+        assert remaining(first) == 0
+        assert remaining(second) == 0
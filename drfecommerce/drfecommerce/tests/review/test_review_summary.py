@@ -0,0 +1,129 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from drfecommerce.apps.product.models import Product
+from drfecommerce.apps.review.models import Review, ReviewSummary
+from drfecommerce.apps.review.summaries import product_ratings, rating_summary, with_ratings
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def review_detail(order_detail_factory, guest):
+    return order_detail_factory(order__guest=guest, order__order_status="delivered")
+
+
+def post_review(client, guest, detail, rating):
+    return client.post("/api/review/guest-review/", {
+        "guest_id": guest.id, "order_detail_id": detail.id, "product_id": detail.product_id,
+        "store_id": detail.store_id, "rating": rating,
+    }, format="json")
+
+
+class TestSummaryIsMaintained:
+    def test_create_update_delete_review(self, guest, guest_client, review_detail):
+        # Arrange
+        key = {"product_id": review_detail.product_id, "store_id": review_detail.store_id}
+        # Act / Assert
+        assert post_review(guest_client, guest, review_detail, 4).status_code == 201
+        assert rating_summary(**key)["histogram"][4] == 1
+
+        response = guest_client.put("/api/review/update-review/", {"guest_id": guest.id, "rating": 2, **key}, format="json")
+        assert response.status_code == 200
+        summary = rating_summary(**key)
+        assert (summary["review_count"], summary["average_rating"]) == (1, 2)
+        assert (summary["histogram"][4], summary["histogram"][2]) == (0, 1)
+
+        response = guest_client.delete(
+            f"/api/review/delete-review/?guest_id={guest.id}&product_id={key['product_id']}&store_id={key['store_id']}")
+        assert response.status_code == 200
+        assert rating_summary(**key)["review_count"] == 0
+
+    def test_review_list_without_summary_counts_reviews(self, api_client, guest, product_store):
+        # Arrange: review tạo ngoài API, chưa có dòng review_summary
+        Review.objects.create(guest=guest, product=product_store.product, store=product_store.store, rating=5)
+        # Act
+        response = api_client().get("/api/review/get-list-reviews/", {
+            "product_id": product_store.product_id, "store_id": product_store.store_id})
+        # Assert
+        data = response.data["data"]
+        assert (data["total_items"], len(data["reviews"]), data["review_count"]) == (1, 1, 0)
+
+    @pytest.mark.parametrize("rating", [0, 6, "five"])
+    def test_invalid_rating_is_rejected(self, guest, guest_client, review_detail, rating):
+        # Act
+        response = post_review(guest_client, guest, review_detail, rating)
+        # Assert
+        assert response.status_code == 400
+        assert not Review.objects.exists()
+
+    def test_rebuild_command_matches_incremental(self, api_client, guest_factory, order_detail_factory, product, store):
+        # Arrange
+        for rating in (5, 3, 5):
+            guest = guest_factory()
+            detail = order_detail_factory(order__guest=guest, order__order_status="delivered", product=product, store=store)
+            client = api_client()
+            client.force_authenticate(user=guest)
+            post_review(client, guest, detail, rating)
+        incremental = rating_summary(product.id, store.id)
+        ReviewSummary.objects.all().delete()
+        # Act
+        call_command("rebuild_review_summaries")
+        # Assert
+        assert rating_summary(product.id, store.id) == incremental
+        assert incremental["average_rating"] == 4.33
+
+
+class TestReadingSummaries:
+    @pytest.fixture
+    def summaries(self, product_factory, store_factory):
+        rated, unrated = product_factory(), product_factory()
+        first, second = store_factory(), store_factory()
+        ReviewSummary.objects.create(product=rated, store=first, review_count=2, rating_sum=9, star_4=1, star_5=1)
+        ReviewSummary.objects.create(product=rated, store=second, review_count=1, rating_sum=3, star_3=1)
+        return rated, unrated, first
+
+    def test_review_list_reads_summary(self, api_client, summaries, guest):
+        # Arrange
+        rated, _, store = summaries
+        Review.objects.create(guest=guest, product=rated, store=store, rating=4)
+        Review.objects.create(guest=guest, product=rated, store=store, rating=5)
+        # Act
+        with CaptureQueriesContext(connection) as ctx:
+            response = api_client().get("/api/review/get-list-reviews/", {"product_id": rated.id, "store_id": store.id})
+        # Assert
+        data = response.data["data"]
+        assert (data["review_count"], data["average_rating"], data["total_items"]) == (2, 4.5, 2)
+        assert data["histogram"] == {1: 0, 2: 0, 3: 0, 4: 1, 5: 1}
+        assert len(data["reviews"]) == 2
+        assert not any("AVG(" in q["sql"].upper() or "COUNT(" in q["sql"].upper() for q in ctx.captured_queries)
+
+    def test_bulk_lookup_sums_stores(self, summaries):
+        # Arrange
+        rated, unrated, _ = summaries
+        # Act
+        ratings = product_ratings([rated.id, unrated.id])
+        # Assert
+        assert ratings == {rated.id: {"review_count": 3, "average_rating": 4}}
+
+    def test_with_ratings_annotates_in_one_query(self, summaries):
+        # Arrange
+        rated, unrated, _ = summaries
+        # Act
+        with CaptureQueriesContext(connection) as ctx:
+            products = {p.id: p for p in with_ratings(Product.objects.filter(id__in=[rated.id, unrated.id]))}
+        # Assert
+        assert len(ctx.captured_queries) == 1
+        assert (products[rated.id].review_count, products[rated.id].rating_sum) == (3, 12)
+        assert products[unrated.id].review_count == 0
+
+    def test_public_product_list_shows_rating(self, api_client, summaries):
+        # Arrange
+        rated, _, _ = summaries
+        # Act
+        response = api_client().get("/api/product/get-list-products/", {"page_size": 50})
+        # Assert
+        product = next(p for p in response.data["data"]["products"] if p["id"] == rated.id)
+        assert (product["review_count"], product["average_rating"]) == (3, 4)
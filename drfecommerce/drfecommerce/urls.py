@@ -16,6 +16,7 @@ from drfecommerce.apps.product_incoming import views as views_product_incoming
 from drfecommerce.apps.product_sale import views as views_product_sale
 from drfecommerce.apps.product_store import views as views_product_store
 from drfecommerce.apps.notification import views as views_notification
+from drfecommerce.apps.notification.stream import notification_stream
 from drfecommerce.settings import base
 from django.conf.urls.static import static
 
@@ -25,6 +26,7 @@ urlpatterns = [
     #guest
     path('api/guest/login/',  views_guest.GuestViewSetLogin.as_view({'post': 'login'}), name='guest-login'),
     path('api/token/refresh/', views_guest.RefreshTokenView.as_view({'post': 'post'}), name='token_refresh'),
+    path('api/guest/logout/', views_guest.GuestViewSetLogout.as_view({'post': 'logout'}), name='guest-logout'),
     path("api/guests/list-guests/", views_guest.GuestViewSetGetData.as_view({'get': 'list_guests'}), name='guest-list'),
     path("api/guests/guest-information/<int:id>/", views_guest.GuestViewSetGetData.as_view({'get': 'detail_guest'}), name='guest-information'),
     path("api/guests/register/", views_guest.GuestViewSetCreate.as_view({'post': 'create_guest'}), name='guest-register'),
@@ -40,9 +42,11 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     path('api/admin/login/',  views_admin.AdminViewSetLogin.as_view({'post': 'login'}), name='admin-login'),
     path('api/admin/token/refresh/', views_admin.RefreshTokenView.as_view({'post': 'post'}), name='admin_token_refresh'),
+    path('api/admin/logout/', views_admin.AdminViewSetLogout.as_view({'post': 'logout'}), name='admin-logout'),
     path("api/admin/list-admins/", views_admin.AdminViewSetGetData.as_view({'get': 'list_admins'}), name='admin-list'),
     path("api/admin/admin-information/<int:id>/", views_admin.AdminViewSetGetData.as_view({'get': 'detail_admin'}), name='admin-information'),
     path("api/admin/get-list-guests/", views_admin.GuestViewSetGetData.as_view({'get': 'list_guests'}), name='admin-get-list-guests'),
+    path("api/admin/metrics/", views_admin.AdminMetricsViewSet.as_view({'get': 'metrics'}), name='admin-metrics'),
     path("api/admin/upload-image/", views_admin.AdminViewsetUploadImage.as_view({'post': 'upload_image'}), name='admin-upload-image'),
     #catalog
     #---private
@@ -51,6 +55,7 @@ urlpatterns = [
     path("api/catalog/admin/delete-catalog/", views_catalog.CatalogViewSetDeleteData.as_view({'delete': 'delete_catalog'}), name='admin-delete-catalog'),
     path("api/catalog/admin/restore-catalog/", views_catalog.CatalogViewSetRestoreData.as_view({'put': 'restore_catalog'}), name='admin-restore-catalog'),
     path("api/catalog/admin/edit-catalog/", views_catalog.CatalogViewSetEditData.as_view({'put': 'edit_catalog'}), name='admin-edit-catalog'),
+    path("api/catalog/admin/edit-image-catalog/", views_catalog.CatalogViewSetEditData.as_view({'put': 'edit_image_catalog'}), name='admin-edit-image-catalog'),
     path("api/catalog/admin/get-detail-catalog/", views_catalog.CatalogViewSetGetData.as_view({'get': 'get_catalog'}), name='admin-get-detail-catalog'),
     path("api/catalog/admin/search-catalogs/", views_catalog.CatalogViewSetGetData.as_view({'get': 'search_catalogs'}), name='admin-search-catalogs'),
     #---public
@@ -84,21 +89,28 @@ urlpatterns = [
     path("api/product/admin/delete-product/", views_product.ProductViewSet.as_view({'delete': 'delete_product'}), name='admin-delete-product'),
     path("api/product/admin/restore-product/", views_product.ProductViewSet.as_view({'put': 'restore_product'}), name='admin-restore-product'),
     path("api/product/admin/edit-product/", views_product.ProductViewSet.as_view({'put': 'edit_product'}), name='admin-edit-product'),
+    path("api/product/admin/import-products/", views_product.ProductViewSet.as_view({'post': 'import_products'}), name='admin-import-products'),
+    path("api/product/admin/export-products/", views_product.ProductViewSet.as_view({'get': 'export_products'}), name='admin-export-products'),
     path("api/product/admin/upload-gallery/", views_product.ProductViewSet.as_view({'post': 'upload_gallery'}), name='admin-upload-images'),
     path("api/product/admin/search-products/", views_product.ProductViewSet.as_view({'get': 'search_products'}), name='admin-search-products'),
     
     #product_incoming (liên quan đến sản phẩm nhập vào)
     path("api/product_incoming/admin/list-product-incomings/", views_product_incoming.ProductIncomingViewSet.as_view({'get': 'list_product_incomings'}), name='admin-get-list-product-incomings'),
     path("api/product_incoming/admin/create-product-incoming/", views_product_incoming.ProductIncomingViewSet.as_view({'post': 'add_product_incoming'}), name='admin-create-new-product-incoming'),
+    path("api/product_incoming/admin/goods-receipt/", views_product_incoming.ProductIncomingViewSet.as_view({'post': 'goods_receipt'}), name='admin-goods-receipt'),
     path("api/product_incoming/admin/delete-product-incoming/", views_product_incoming.ProductIncomingViewSet.as_view({'delete': 'delete_product_incoming'}), name='admin-delete-product-incoming'),
     path("api/product_incoming/admin/detail-product-incoming/", views_product_incoming.ProductIncomingViewSet.as_view({'get': 'detail_product_incoming'}), name='admin-get-detail-product-incomings'),
+    path("api/product_incoming/admin/export-product-incomings/", views_product_incoming.ProductIncomingViewSet.as_view({'get': 'export_product_incomings'}), name='admin-export-product-incomings'),
     path("api/product_incoming/admin/search_product_incomings/", views_product_incoming.ProductIncomingViewSet.as_view({'get': 'search_product_incomings'}), name='admin-search-product-incomings'),
     path("api/product_incoming/admin/expenditure-statistics/", views_product_incoming.ProductIncomingViewSet.as_view({'get': 'expenditure_statistics'}), name='admin-get-expenditure-statistics'),
     
     #product_sale (Liên quan đến sản phẩm đã bán, thống kê nó)
     #thống kê của cửa hàng theo ngày. các số lượng đã bán
     path("api/product_sale/admin/get-all-products-sale/", views_product_sale.AdminProductSaleViewSet.as_view({'get': 'get_all_products_sale'}), name='admin-get-all-products-sale'),
+    path("api/product_sale/admin/export-products-sale/", views_product_sale.AdminProductSaleViewSet.as_view({'get': 'export_products_sale'}), name='admin-export-products-sale'),
     path("api/product_sale/admin/get-total-report/", views_product_sale.AdminProductSaleViewSet.as_view({'get': 'get_total_report'}), name='get-total-report'),
+    #thống kê doanh thu / chi phí / lãi theo ngày, tuần, tháng
+    path("api/product_sale/admin/analytics/", views_product_sale.AdminProductSaleViewSet.as_view({'get': 'sales_analytics'}), name='admin-sales-analytics'),
     #thống kê sản phẩm đã bán (số lượng đã bán trên mỗi sản phẩm)
     path("api/product_sale/admin/get-list-sold-products-filter/", views_product_sale.AdminProductSaleViewSet.as_view({'get': 'list_sold_products_filter'}), name='admin-get-list-sold-product-filter'),
     
@@ -129,6 +141,7 @@ urlpatterns = [
     path("api/order/get-list-orders/", views_order.OrderViewSet.as_view({'get': 'list_orders'}), name='get-list-orders'),
     path("api/order/get-order-detail/", views_order_detail.OrderDetailViewSet.as_view({'get': 'get_order_detail'}), name='get-order-detail'),
     path("api/order/admin/get-list-orders/", views_order.AdminOrderViewSet.as_view({'get': 'list_orders'}), name='admin-get-list-orders'),
+    path("api/order/admin/export-orders/", views_order.AdminOrderViewSet.as_view({'get': 'export_orders'}), name='admin-export-orders'),
     path("api/order/admin/update-order-status/", views_order.AdminOrderViewSet.as_view({'put': 'update_order_status'}), name='admin-update-order-status'),
     path("api/order/admin/update-payment-status/", views_order.AdminOrderViewSet.as_view({'put': 'update_payment_status'}), name='admin-update-payment-status'),
     
@@ -143,6 +156,11 @@ urlpatterns = [
     #notifications
     path("api/notification/get-list-notifications/", views_notification.NotificationViewSet.as_view({'get': 'list_notifications'}), name='get-list-notifications'),
     path("api/notification/read-notification/", views_notification.NotificationViewSet.as_view({'put': 'read_notification'}), name='read-notification'),
+    path("api/notification/read-notifications/", views_notification.NotificationViewSet.as_view({'put': 'read_notifications'}), name='read-notifications'),
+    path("api/notification/stream/", notification_stream, name='notification-stream'),
+    path("api/notification/unread-count/", views_notification.NotificationViewSet.as_view({'get': 'get_unread_count'}), name='unread-count'),
+    path("api/notification/admin/broadcast/", views_notification.AdminBroadcastViewSet.as_view({'post': 'create_broadcast'}), name='admin-broadcast'),
+    path("api/notification/admin/broadcast-status/", views_notification.AdminBroadcastViewSet.as_view({'get': 'broadcast_status'}), name='admin-broadcast-status'),
     
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     path("api/schema/docs", SpectacularSwaggerView.as_view(url_name="schema")),